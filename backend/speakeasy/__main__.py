@@ -2,6 +2,7 @@
 SpeakEasy Backend - Entry point.
 
 Run with: python -m speakeasy
+Back up or restore the databases with: python -m speakeasy backup {create,list,restore}
 """
 
 import argparse
@@ -50,6 +51,51 @@ def setup_logging(verbose: bool = False) -> None:
     os.environ.setdefault("NEMO_LOG_LEVEL", "ERROR")
 
 
+def backup_command(args: argparse.Namespace) -> int:
+    """Run a backup subcommand."""
+    import asyncio
+
+    from .services.backup import BackupService
+    from .services.export import ExportCompression
+    from .services.settings import (
+        SettingsService,
+        get_default_backup_dir,
+        get_default_batch_db_path,
+        get_default_db_path,
+        get_default_settings_path,
+    )
+
+    logger = logging.getLogger(__name__)
+    settings = SettingsService(get_default_settings_path()).load()
+    service = BackupService(
+        get_default_backup_dir(),
+        get_default_db_path(),
+        get_default_batch_db_path(),
+        keep=settings.backup_keep,
+    )
+
+    try:
+        if args.action == "create":
+            compression = ExportCompression(args.compression) if args.compression else None
+            backup = asyncio.run(service.create(compression))
+            print(f"Created backup {backup.name} in {service.directory}")
+        elif args.action == "list":
+            for backup in service.list():
+                compression = backup.compression.value if backup.compression else "none"
+                print(
+                    f"{backup.name}  {backup.size_bytes / 1024**2:9.1f} MB  "
+                    f"{len(backup.databases)} databases  compression: {compression}"
+                )
+        elif args.action == "restore":
+            asyncio.run(service.restore(args.name))
+            print(f"Restored backup {args.name}")
+        return 0
+
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+
+
 def main() -> int:
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -83,10 +129,35 @@ def main() -> int:
         version="SpeakEasy Backend v0.1.0",
     )
 
+    commands = parser.add_subparsers(dest="command")
+    backup_parser = commands.add_parser(
+        "backup",
+        help="Back up or restore the history and batch databases",
+    )
+    backup_actions = backup_parser.add_subparsers(dest="action", required=True)
+    create_parser = backup_actions.add_parser(
+        "create",
+        help="Take a backup (safe while the server is running)",
+    )
+    create_parser.add_argument(
+        "--compression",
+        choices=["gzip", "zstd"],
+        help="Compress the backup files",
+    )
+    backup_actions.add_parser("list", help="List backups, newest first")
+    restore_parser = backup_actions.add_parser(
+        "restore",
+        help="Replace the databases with a backup (stop the server first)",
+    )
+    restore_parser.add_argument("name", help="Backup name, as shown by 'backup list'")
+
     args = parser.parse_args()
 
     setup_logging(verbose=args.verbose)
 
+    if args.command == "backup":
+        return backup_command(args)
+
     logger = logging.getLogger(__name__)
     logger.info(f"Starting SpeakEasy backend on {args.host}:{args.port}")
 
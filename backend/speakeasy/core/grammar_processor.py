@@ -2,19 +2,35 @@
 Grammar correction processor for post-processing transcriptions.
 
 Uses T5-based models to correct grammar and improve fluency while preserving
-the original meaning. Supports lazy loading, sentence-level processing,
-and graceful fallback on errors.
+the original meaning. Supports lazy or background loading, byte-accurate
+download progress, sentence-level processing, and graceful fallback on errors.
 """
 
+import fnmatch
 import logging
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 from dataclasses import dataclass, field
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Type alias for download progress callback: (downloaded_bytes, total_bytes) -> should_continue
+DownloadProgressCallback = Callable[[int, int], bool]
+
+# Type alias for preload completion callback: receives the load error, or None on success
+PreloadCompleteCallback = Callable[[Optional[Exception]], None]
+
+# Files needed to run a seq2seq model from a snapshot (weights, config, tokenizer)
+_SNAPSHOT_PATTERNS = ["*.json", "*.model", "*.txt", "*.safetensors"]
+_SNAPSHOT_PATTERNS_BIN = ["*.json", "*.model", "*.txt", "*.bin"]
+
+# How often download progress is sampled from disk (seconds)
+_PROGRESS_POLL_INTERVAL = 0.5
+
 
 class ModelStatus(str, Enum):
     """Status of a grammar model."""
@@ -136,6 +152,12 @@ def get_cache_dir() -> Path:
     return Path.home() / ".cache" / "huggingface" / "hub"
 
 
+def get_model_cache_path(model_id: str) -> Path:
+    """Get the HuggingFace cache folder for a model (may not exist yet)."""
+    # HuggingFace stores models with -- instead of /
+    return get_cache_dir() / f"models--{model_id.replace('/', '--')}"
+
+
 def is_model_downloaded(model_id: str) -> bool:
     """
     Check if a model is already downloaded.
@@ -146,10 +168,7 @@ def is_model_downloaded(model_id: str) -> bool:
     Returns:
         True if model files exist in cache
     """
-    cache_dir = get_cache_dir()
-    # HuggingFace stores models with -- instead of /
-    model_folder = f"models--{model_id.replace('/', '--')}"
-    model_path = cache_dir / model_folder
+    model_path = get_model_cache_path(model_id)
 
     if not model_path.exists():
         return False
@@ -189,16 +208,30 @@ def get_model_download_size(model_id: str) -> Optional[int]:
     return None
 
 
+def _get_directory_size(path: Path) -> int:
+    """Calculate total size of the files under a directory in bytes."""
+    total = 0
+    try:
+        for entry in os.scandir(path):
+            if entry.is_file(follow_symlinks=False):
+                total += entry.stat().st_size
+            elif entry.is_dir(follow_symlinks=False):
+                total += _get_directory_size(Path(entry.path))
+    except (PermissionError, FileNotFoundError):
+        pass
+    return total
+
+
 class GrammarProcessor:
     """
     Grammar correction processor using T5-based models.
 
     Features:
-    - Lazy loading (model loads on first use)
+    - Lazy loading (model loads on first use) or background preloading
     - Sentence-level processing for speed
     - Graceful fallback on errors
     - Manual unloading to free VRAM
-    - Download progress tracking
+    - Byte-accurate download progress tracking
     """
 
     def __init__(
@@ -214,10 +247,6 @@ class GrammarProcessor:
             device: Device to use ('auto', 'cuda', or 'cpu')
         """
         if model_name is None:
-            # Import here to avoid circular dependency issues if moved,
-            # though it's in the same file.
-            # Actually, get_default_grammar_model is defined below, so we can't call it easily?
-            # It's a module level function, so inside method it's fine.
             model_name = get_default_grammar_model()
 
         self.model_name = model_name
@@ -227,6 +256,14 @@ class GrammarProcessor:
         self._status = ModelStatus.NOT_DOWNLOADED
         self._error_message: Optional[str] = None
         self._download_progress: float = 0.0
+        self._loaded_device: Optional[str] = None
+        self._load_duration: Optional[float] = None
+        self._loaded_at: Optional[float] = None
+        self._load_lock = threading.Lock()
+        self._preload_thread: Optional[threading.Thread] = None
+        # Set by unload() to cancel the running preload
+        self._preload_cancel: Optional[threading.Event] = None
+        self._publish_lock = threading.Lock()  # Orders a finished load against unload()
 
         # Check if already downloaded
         if is_model_downloaded(model_name):
@@ -257,107 +294,346 @@ class GrammarProcessor:
         """Check if the model is downloaded."""
         return self._status in (ModelStatus.DOWNLOADED, ModelStatus.LOADING, ModelStatus.LOADED)
 
+    @property
+    def is_preloading(self) -> bool:
+        """Check if a background preload is in progress."""
+        return self._preload_thread is not None and self._preload_thread.is_alive()
+
+    @property
+    def load_time_seconds(self) -> Optional[float]:
+        """Get how long the last load took (download included), or None if never loaded."""
+        return self._load_duration
+
+    @property
+    def memory_bytes(self) -> int:
+        """Get the memory used by the loaded model's parameters and buffers."""
+        model = self._model
+        if model is None:
+            return 0
+
+        try:
+            return int(model.get_memory_footprint())
+        except Exception:
+            pass
+
+        try:
+            tensors = list(model.parameters()) + list(model.buffers())
+            return sum(t.numel() * t.element_size() for t in tensors)
+        except Exception:
+            return 0
+
+    def get_info(self) -> dict:
+        """
+        Get the processor state for API responses.
+
+        Returns:
+            Dictionary with status, download progress, load time and memory use
+        """
+        return {
+            "model_name": self.model_name,
+            "device": self._loaded_device or self.device,
+            "status": self._status.value,
+            "error_message": self._error_message,
+            "download_progress": self._download_progress,
+            "preloading": self.is_preloading,
+            "load_time_seconds": self._load_duration,
+            "loaded_at": self._loaded_at,
+            "memory_bytes": self.memory_bytes,
+        }
+
     def _get_model_info(self) -> Optional[GrammarModelInfo]:
         """Get model info for current model."""
         return GRAMMAR_MODELS.get(self.model_name)
 
-    def load(self) -> None:
-        """
-        Load the grammar model and tokenizer.
+    def _get_snapshot_patterns(self) -> list[str]:
+        """Get the file patterns to download for the current model."""
+        model_info = self._get_model_info()
+        if model_info and not model_info.use_safetensors:
+            return _SNAPSHOT_PATTERNS_BIN
+        return _SNAPSHOT_PATTERNS
 
-        Called on first use when grammar correction is enabled.
+    def _get_download_size(self, patterns: list[str]) -> int:
         """
-        # Prevent re-loading if already loaded or currently loading
-        if self._status in (ModelStatus.LOADED, ModelStatus.LOADING, ModelStatus.DOWNLOADING):
-            return
+        Get the total size of the files a snapshot download will fetch.
 
+        Uses the repository file metadata from the HF hub, falling back to the
+        nominal model size if the hub cannot be reached.
+        """
         try:
-            self._status = ModelStatus.LOADING
-            self._error_message = None
-            model_info = self._get_model_info()
+            from huggingface_hub import HfApi
 
-            # Check if we need to download first
-            if not is_model_downloaded(self.model_name):
-                self._status = ModelStatus.DOWNLOADING
-                self._download_progress = 0.0
-                logger.info(f"Downloading grammar model: {self.model_name}")
-            else:
-                self._status = ModelStatus.LOADING
+            info = HfApi().model_info(self.model_name, files_metadata=True)
+            total = sum(
+                sibling.size or 0
+                for sibling in info.siblings or []
+                if any(fnmatch.fnmatch(sibling.rfilename, p) for p in patterns)
+            )
+            if total > 0:
+                return total
+        except Exception as e:
+            logger.debug(f"Could not fetch file sizes for {self.model_name}: {e}")
 
-            # Lazy import to avoid loading torch unless needed
-            from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-            import torch
+        return get_model_download_size(self.model_name) or 0
 
-            # Determine device
-            device = self._get_device()
+    def _download(self, progress_callback: Optional[DownloadProgressCallback] = None) -> str:
+        """
+        Download the model snapshot, reporting byte-level progress.
 
-            logger.info(f"Loading grammar model: {self.model_name} on {device}")
+        The download runs in a worker thread while this thread samples the bytes
+        written to the model's cache folder against the total from the hub.
 
-            # Load with safetensors if supported
-            load_kwargs = {}
-            if model_info and model_info.use_safetensors:
-                load_kwargs["use_safetensors"] = True
+        Args:
+            progress_callback: Optional callback receiving (downloaded_bytes, total_bytes)
+                and returning True to continue or False to cancel
 
-            # Load tokenizer and model (downloads if not cached)
-            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        Returns:
+            Path to the local snapshot
 
-            # Update status after tokenizer download
-            if self._status == ModelStatus.DOWNLOADING:
-                self._download_progress = 0.3
-                logger.info("Tokenizer downloaded, downloading model weights...")
+        Raises:
+            RuntimeError: If the download is cancelled
+        """
+        from huggingface_hub import snapshot_download
+        from tqdm.auto import tqdm
 
-            self._model = AutoModelForSeq2SeqLM.from_pretrained(
-                self.model_name,
-                torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-                **load_kwargs,
-            )
+        patterns = self._get_snapshot_patterns()
+        total_bytes = self._get_download_size(patterns)
+        cache_path = get_model_cache_path(self.model_name)
+        initial_bytes = _get_directory_size(cache_path)
+        cancel_event = threading.Event()
+        outcome: dict = {}
 
-            if self._status == ModelStatus.DOWNLOADING:
-                self._download_progress = 0.9
-                logger.info("Model weights downloaded, loading to device...")
+        class CancellableTqdm(tqdm):
+            """Progress bar that aborts the download once cancellation is requested."""
 
-            self._status = ModelStatus.LOADING
-            self._model.to(device)
-            self._model.eval()  # Set to evaluation mode
+            def __init__(self, *args, **kwargs):
+                kwargs["disable"] = True
+                super().__init__(*args, **kwargs)
 
-            self._status = ModelStatus.LOADED
-            self._download_progress = 1.0
-            logger.info(f"Grammar model loaded successfully on {device}")
+            def update(self, n=1):
+                if cancel_event.is_set():
+                    raise RuntimeError("Download cancelled by user")
+                return super().update(n)
 
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(f"Failed to load grammar model: {error_msg}")
-            self._model = None
-            self._tokenizer = None
-            self._status = ModelStatus.ERROR
-            self._error_message = error_msg
-            raise
+        def run_download() -> None:
+            try:
+                outcome["path"] = snapshot_download(
+                    repo_id=self.model_name,
+                    allow_patterns=patterns,
+                    tqdm_class=CancellableTqdm,
+                )
+            except BaseException as e:
+                outcome["error"] = e
+
+        logger.info(
+            f"Downloading grammar model: {self.model_name} ({total_bytes / (1024 * 1024):.0f} MB)"
+        )
+        worker = threading.Thread(target=run_download, daemon=True)
+        worker.start()
+
+        while worker.is_alive():
+            worker.join(timeout=_PROGRESS_POLL_INTERVAL)
+            downloaded = max(_get_directory_size(cache_path) - initial_bytes, 0)
+            if total_bytes > 0:
+                downloaded = min(downloaded, total_bytes)
+                self._download_progress = downloaded / total_bytes
+            if progress_callback and not progress_callback(downloaded, total_bytes):
+                cancel_event.set()
+                raise RuntimeError("Download cancelled by user")
+
+        if "error" in outcome:
+            raise outcome["error"]
+
+        if progress_callback:
+            progress_callback(total_bytes, total_bytes)
+        self._download_progress = 1.0
+        return outcome["path"]
+
+    def load(
+        self,
+        progress_callback: Optional[DownloadProgressCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Load the grammar model and tokenizer, downloading them first if needed.
+
+        Called from a background preload at startup, or on first use when
+        grammar correction is enabled. Concurrent callers wait for the
+        in-flight load instead of starting a second one.
+
+        Args:
+            progress_callback: Optional callback receiving (downloaded_bytes, total_bytes)
+                during the download and returning True to continue or False to cancel
+            cancel_event: Optional event that cancels the load once set; the
+                download stops and a model that finishes loading is discarded
+
+        Raises:
+            RuntimeError: If the load fails or is cancelled
+        """
+
+        def cancelled() -> bool:
+            return cancel_event is not None and cancel_event.is_set()
+
+        def download_progress(downloaded: int, total: int) -> bool:
+            if cancelled():
+                return False
+            return progress_callback(downloaded, total) if progress_callback else True
+
+        with self._load_lock:
+            if self._status == ModelStatus.LOADED:
+                return
+            if cancelled():
+                raise RuntimeError("Grammar model load cancelled")
+
+            start_time = time.perf_counter()
 
-    def unload(self) -> None:
-        """Unload the model and free memory."""
-        if self._model is not None:
-            # Clear CUDA cache if using GPU
             try:
+                self._error_message = None
+                model_info = self._get_model_info()
+
+                # Lazy import to avoid loading torch unless needed
+                from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
                 import torch
 
-                if torch.cuda.is_available():
-                    del self._model
-                    del self._tokenizer
-                    torch.cuda.empty_cache()
-            except Exception:
-                pass
+                if is_model_downloaded(self.model_name):
+                    self._status = ModelStatus.LOADING
+                    self._download_progress = 1.0
+                    model_path = self.model_name
+                else:
+                    self._status = ModelStatus.DOWNLOADING
+                    self._download_progress = 0.0
+                    model_path = self._download(download_progress)
+                    self._status = ModelStatus.LOADING
+
+                # Determine device
+                device = self._get_device()
+
+                logger.info(f"Loading grammar model: {self.model_name} on {device}")
+
+                # Load with safetensors if supported
+                load_kwargs = {}
+                if model_info and model_info.use_safetensors:
+                    load_kwargs["use_safetensors"] = True
+
+                tokenizer = AutoTokenizer.from_pretrained(model_path)
+                model = AutoModelForSeq2SeqLM.from_pretrained(
+                    model_path,
+                    torch_dtype=torch.float16 if device == "cuda" else torch.float32,
+                    **load_kwargs,
+                )
 
-        self._model = None
-        self._tokenizer = None
+                model.to(device)
+                model.eval()  # Set to evaluation mode
+
+                with self._publish_lock:
+                    if cancelled():
+                        # Unloaded while loading: drop the model instead of keeping it
+                        del model, tokenizer
+                        if device == "cuda":
+                            torch.cuda.empty_cache()
+                        raise RuntimeError("Grammar model load cancelled")
+                    self._tokenizer = tokenizer
+                    self._model = model
+                    self._loaded_device = device
+                    self._load_duration = time.perf_counter() - start_time
+                    self._loaded_at = time.time()
+                    self._status = ModelStatus.LOADED
+                logger.info(
+                    f"Grammar model loaded successfully on {device} in {self._load_duration:.2f}s"
+                )
 
-        # Reset to downloaded state if files still exist
-        if is_model_downloaded(self.model_name):
-            self._status = ModelStatus.DOWNLOADED
-        else:
-            self._status = ModelStatus.NOT_DOWNLOADED
+            except Exception as e:
+                error_msg = str(e)
+                if cancelled():
+                    if is_model_downloaded(self.model_name):
+                        self._status = ModelStatus.DOWNLOADED
+                    else:
+                        self._status = ModelStatus.NOT_DOWNLOADED
+                    logger.info(f"Grammar model load cancelled: {self.model_name}")
+                    raise
+                logger.error(f"Failed to load grammar model: {error_msg}")
+                self._model = None
+                self._tokenizer = None
+                self._status = ModelStatus.ERROR
+                self._error_message = error_msg
+                raise
+
+    def preload(
+        self,
+        progress_callback: Optional[DownloadProgressCallback] = None,
+        on_complete: Optional[PreloadCompleteCallback] = None,
+    ) -> threading.Thread:
+        """
+        Download and load the model in a background thread.
 
-        self._error_message = None
-        logger.info("Grammar model unloaded")
+        Args:
+            progress_callback: Optional download progress callback (see load())
+            on_complete: Optional callback invoked from the background thread with
+                the load error, or None once the model is loaded
+
+        Returns:
+            The background thread (an existing one if a preload is already running)
+        """
+        if self.is_preloading:
+            return self._preload_thread
+
+        cancel = threading.Event()
+        self._preload_cancel = cancel
+
+        def run_preload() -> None:
+            error: Optional[Exception] = None
+            try:
+                self.load(progress_callback=progress_callback, cancel_event=cancel)
+            except Exception as e:
+                error = e
+            if on_complete:
+                try:
+                    on_complete(error)
+                except Exception as e:
+                    logger.error(f"Grammar preload callback error: {e}")
+
+        self._preload_thread = threading.Thread(
+            target=run_preload, name="grammar-preload", daemon=True
+        )
+        self._preload_thread.start()
+        logger.info(f"Preloading grammar model in background: {self.model_name}")
+        return self._preload_thread
+
+    def unload(self) -> None:
+        """
+        Unload the model and free memory.
+
+        A preload in progress is cancelled: its download stops, and a model
+        that finishes loading afterwards is discarded instead of kept.
+        """
+        if self._preload_cancel is not None:
+            self._preload_cancel.set()
+
+        with self._publish_lock:
+            if self._model is not None:
+                # Clear CUDA cache if using GPU
+                try:
+                    import torch
+
+                    if torch.cuda.is_available():
+                        del self._model
+                        del self._tokenizer
+                        torch.cuda.empty_cache()
+                except Exception:
+                    pass
+
+            self._model = None
+            self._tokenizer = None
+            self._loaded_device = None
+            self._loaded_at = None
+
+            # Reset to downloaded state if files still exist
+            if is_model_downloaded(self.model_name):
+                self._status = ModelStatus.DOWNLOADED
+            else:
+                self._status = ModelStatus.NOT_DOWNLOADED
+
+            self._error_message = None
+            logger.info("Grammar model unloaded")
 
     def _get_device(self) -> str:
         """
@@ -429,6 +705,11 @@ class GrammarProcessor:
         if not text or not text.strip():
             return text
 
+        # Don't block the caller on a download/load that is still running in the background
+        if self._status in (ModelStatus.DOWNLOADING, ModelStatus.LOADING):
+            logger.info("Grammar model still loading, using original text")
+            return text
+
         # Ensure model is loaded
         if not self.is_loaded:
             try:
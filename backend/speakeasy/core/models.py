@@ -114,6 +114,7 @@ class ModelWrapper:
         model_name: str,
         device: str = "cuda",
         compute_type: Optional[str] = None,
+        cpu_threads: Optional[int] = None,
     ):
         """
         Initialize the model wrapper.
@@ -123,11 +124,14 @@ class ModelWrapper:
             model_name: Model name or HuggingFace repo ID
             device: Device to run on ('cuda' or 'cpu')
             compute_type: Compute precision ('float16', 'int8', etc.)
+            cpu_threads: Threads used for inference on CPU, or None for the
+                library default (all cores)
         """
         self.model_type = ModelType(model_type.lower())
         self.model_name = model_name
         self.device = device
         self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
 
         self._model = None
         self._processor = None
@@ -169,6 +173,11 @@ class ModelWrapper:
         elif self.model_type == ModelType.VOXTRAL:
             logger.info(f"Target: <15s for cached models, <60s for first download")
 
+        if self.cpu_threads and self.device == "cpu" and self.model_type != ModelType.WHISPER:
+            import torch
+
+            torch.set_num_threads(self.cpu_threads)
+
         if self.model_type == ModelType.WHISPER:
             self._load_whisper(progress_callback)
         elif self.model_type == ModelType.PARAKEET:
@@ -346,10 +355,12 @@ class ModelWrapper:
         if progress_callback:
             self._download_hf_model(self.model_name, progress_callback)
 
+        options = {"cpu_threads": self.cpu_threads} if self.cpu_threads else {}
         self._model = WhisperModel(
             model_size_or_path=self.model_name,
             device=self.device,
             compute_type=self.compute_type or "float16",
+            **options,
         )
 
     def _load_parakeet(
@@ -0,0 +1,291 @@
+"""
+Composable post-processing pipeline for transcribed text.
+
+Transcriptions pass through ordered stages (filler cleanup, word replacements,
+grammar correction, formatting). Each stage declares whether it is fast enough
+to run inline on the event loop or should be offloaded to a worker thread, and
+the pipeline records per-stage wall time into the response and the shared
+metrics registry.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from ..utils.metrics import MetricsRegistry, metrics
+from .text_cleanup import get_cleanup_processor
+
+if TYPE_CHECKING:
+    from .grammar_processor import GrammarProcessor
+
+logger = logging.getLogger(__name__)
+
+# Prefix for per-stage timings in the metrics registry
+METRICS_PREFIX = "postprocess"
+
+# Maximum number of compiled replacement dictionaries kept in memory
+_REPLACEMENTS_CACHE_SIZE = 16
+
+# Runs of spaces and tabs, and the spaces and tabs around line breaks
+_SPACE_RUN = re.compile(r"[ \t]+")
+_LINE_EDGES = re.compile(r" ?\n ?")
+
+
+@dataclass
+class PostProcessResult:
+    """Result of running text through the pipeline."""
+
+    text: str
+    timings_ms: dict[str, float] = field(default_factory=dict)
+    total_ms: float = 0.0
+
+
+class PostProcessingStage(ABC):
+    """
+    Base class for a pipeline stage.
+
+    Subclasses set `name`, set `offload` to True when `process()` may block
+    (model inference, I/O), and implement `process()`.
+    """
+
+    name: str = "stage"
+    offload: bool = False
+
+    @abstractmethod
+    def process(self, text: str, language: Optional[str] = None) -> str:
+        """
+        Transform the text.
+
+        Args:
+            text: Text produced by the previous stage
+            language: Detected or requested language code, if known
+
+        Returns:
+            The transformed text
+        """
+
+
+class CleanupStage(PostProcessingStage):
+    """Removes filler words using a cached TextCleanupProcessor."""
+
+    name = "cleanup"
+
+    def __init__(self, custom_fillers: Optional[list[str]] = None):
+        self.custom_fillers = custom_fillers
+
+    def process(self, text: str, language: Optional[str] = None) -> str:
+        processor = get_cleanup_processor(custom_fillers=self.custom_fillers, language=language)
+        return processor.cleanup(text)
+
+
+class ReplacementDictionary:
+    """
+    Case-insensitive whole-word replacements compiled into a single regex.
+
+    Longer phrases win over shorter ones sharing a prefix. When the matched text
+    starts with an uppercase letter, the replacement is capitalized to match.
+    """
+
+    def __init__(self, replacements: dict[str, str]):
+        self._lookup = {
+            source.strip().lower(): target
+            for source, target in replacements.items()
+            if source and source.strip()
+        }
+        self._pattern: Optional[re.Pattern] = None
+        if self._lookup:
+            alternation = "|".join(
+                re.escape(source) for source in sorted(self._lookup, key=len, reverse=True)
+            )
+            self._pattern = re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE)
+
+    def __len__(self) -> int:
+        return len(self._lookup)
+
+    def _replace(self, match: re.Match) -> str:
+        source = match.group(0)
+        target = self._lookup.get(source.lower(), source)
+        if target and source[0].isupper() and target[0].islower():
+            target = target[0].upper() + target[1:]
+        return target
+
+    def apply(self, text: str) -> str:
+        """Apply all replacements to the text."""
+        if self._pattern is None or not text:
+            return text
+        return self._pattern.sub(self._replace, text)
+
+
+_replacements_cache: "OrderedDict[frozenset, ReplacementDictionary]" = OrderedDict()
+_replacements_lock = threading.Lock()
+
+
+def get_replacement_dictionary(replacements: dict[str, str]) -> ReplacementDictionary:
+    """
+    Get a compiled ReplacementDictionary, cached by its contents.
+
+    Compilation happens once per distinct dictionary, so applying the
+    replacements adds no compile cost to individual requests.
+    """
+    key = frozenset(replacements.items())
+
+    with _replacements_lock:
+        compiled = _replacements_cache.get(key)
+        if compiled is not None:
+            _replacements_cache.move_to_end(key)
+            return compiled
+
+    compiled = ReplacementDictionary(replacements)
+
+    with _replacements_lock:
+        _replacements_cache[key] = compiled
+        while len(_replacements_cache) > _REPLACEMENTS_CACHE_SIZE:
+            _replacements_cache.popitem(last=False)
+
+    return compiled
+
+
+class ReplacementStage(PostProcessingStage):
+    """Applies a user-defined word replacement dictionary."""
+
+    name = "replacements"
+
+    def __init__(self, replacements: dict[str, str]):
+        self.dictionary = get_replacement_dictionary(replacements)
+
+    def process(self, text: str, language: Optional[str] = None) -> str:
+        return self.dictionary.apply(text)
+
+
+class GrammarStage(PostProcessingStage):
+    """Corrects grammar with a loaded GrammarProcessor (runs off the event loop)."""
+
+    name = "grammar"
+    offload = True
+
+    def __init__(self, processor: "GrammarProcessor"):
+        self.processor = processor
+
+    def process(self, text: str, language: Optional[str] = None) -> str:
+        return self.processor.correct(text)
+
+
+class FormattingStage(PostProcessingStage):
+    """Collapses spaces left over by earlier stages, keeping line and paragraph breaks."""
+
+    name = "formatting"
+
+    def process(self, text: str, language: Optional[str] = None) -> str:
+        return _LINE_EDGES.sub("\n", _SPACE_RUN.sub(" ", text)).strip()
+
+
+class PostProcessingPipeline:
+    """
+    Runs text through an ordered list of stages.
+
+    Inline stages run directly on the calling thread; offloaded stages run in
+    the default executor so the event loop stays responsive.
+    """
+
+    def __init__(
+        self,
+        stages: list[PostProcessingStage],
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages: Stages in execution order
+            registry: Metrics registry for stage timings (defaults to the shared one)
+        """
+        self.stages = list(stages)
+        self.registry = registry if registry is not None else metrics
+
+    @property
+    def stage_names(self) -> list[str]:
+        """Names of the stages in execution order."""
+        return [stage.name for stage in self.stages]
+
+    def _record(self, result: PostProcessResult, name: str, start: float) -> None:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        result.timings_ms[name] = round(elapsed_ms, 3)
+        self.registry.record_timing(f"{METRICS_PREFIX}.{name}", elapsed_ms)
+
+    async def run(self, text: str, language: Optional[str] = None) -> PostProcessResult:
+        """
+        Run all stages.
+
+        Args:
+            text: Raw transcription text
+            language: Detected or requested language code, if known
+
+        Returns:
+            PostProcessResult with the final text and per-stage timings in ms
+        """
+        result = PostProcessResult(text=text)
+        pipeline_start = time.perf_counter()
+
+        for stage in self.stages:
+            start = time.perf_counter()
+            if stage.offload:
+                result.text = await asyncio.to_thread(stage.process, result.text, language)
+            else:
+                result.text = stage.process(result.text, language)
+            self._record(result, stage.name, start)
+
+        result.total_ms = round((time.perf_counter() - pipeline_start) * 1000, 3)
+        self.registry.record_timing(f"{METRICS_PREFIX}.total", result.total_ms)
+        return result
+
+    def run_sync(self, text: str, language: Optional[str] = None) -> PostProcessResult:
+        """Run all stages on the calling thread (for worker threads)."""
+        result = PostProcessResult(text=text)
+        pipeline_start = time.perf_counter()
+
+        for stage in self.stages:
+            start = time.perf_counter()
+            result.text = stage.process(result.text, language)
+            self._record(result, stage.name, start)
+
+        result.total_ms = round((time.perf_counter() - pipeline_start) * 1000, 3)
+        self.registry.record_timing(f"{METRICS_PREFIX}.total", result.total_ms)
+        return result
+
+
+def build_pipeline(
+    enable_cleanup: bool = True,
+    custom_fillers: Optional[list[str]] = None,
+    replacements: Optional[dict[str, str]] = None,
+    grammar_processor: Optional["GrammarProcessor"] = None,
+) -> PostProcessingPipeline:
+    """
+    Build the standard pipeline: cleanup, replacements, grammar, formatting.
+
+    Stages whose feature is disabled are left out entirely, so they cost nothing.
+
+    Args:
+        enable_cleanup: Whether to remove filler words
+        custom_fillers: Additional filler words for the cleanup stage
+        replacements: Word replacement dictionary (source -> replacement)
+        grammar_processor: Grammar processor to use, if grammar correction is enabled
+
+    Returns:
+        A configured PostProcessingPipeline
+    """
+    stages: list[PostProcessingStage] = []
+    if enable_cleanup:
+        stages.append(CleanupStage(custom_fillers))
+    if replacements:
+        stages.append(ReplacementStage(replacements))
+    if grammar_processor is not None:
+        stages.append(GrammarStage(grammar_processor))
+    if stages:
+        stages.append(FormattingStage())
+    return PostProcessingPipeline(stages)
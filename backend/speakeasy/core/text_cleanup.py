@@ -3,14 +3,39 @@ Text cleanup processor for removing filler words from transcriptions.
 
 Handles common speech fillers (um, uh, like, you know, etc.) while preserving
 sentence structure and capitalization context.
+
+Performance optimizations:
+- Fillers are compiled into a token trie, so matching cost does not grow with
+  the number of custom fillers (no giant regex alternation)
+- Filler removal, spacing/punctuation fixes and capitalization run in a single scan
+- Compiled processors are cached per filler set via get_cleanup_processor()
 """
 
 import logging
 import re
+import threading
+from collections import OrderedDict
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Splits text into alternating items: [word run, non-word char, word run, ...].
+# Even indices are maximal \w runs (possibly empty), odd indices are single \W chars.
+_TOKEN_SPLIT = re.compile(r"(\W)")
+
+# Punctuation that is merged/trimmed during spacing cleanup
+_PUNCTUATION = frozenset(",.!?;:")
+
+# Sentence-ending punctuation that triggers capitalization of the next word
+_SENTENCE_END = frozenset(".!?")
+
+# Trie node key marking the end of a filler. Its value is True when the filler ends
+# with a non-word char and so needs a word run right after it (regex \b semantics).
+_END = None
+
+# Maximum number of compiled processors kept by get_cleanup_processor()
+_REGISTRY_MAX_SIZE = 32
+
 
 class TextCleanupProcessor:
     """
@@ -18,6 +43,9 @@ class TextCleanupProcessor:
 
     Handles common speech fillers like "um", "uh", "like", "you know", etc.
     Preserves capitalization at sentence boundaries and cleans up spacing/punctuation.
+
+    Matching follows regex word-boundary semantics (case-insensitive, longest
+    filler wins) but uses a token trie instead of a regex alternation.
     """
 
     # Default filler words (case-insensitive matching)
@@ -50,25 +78,82 @@ class TextCleanupProcessor:
         "anyway",
     ]
 
-    def __init__(self, custom_fillers: Optional[list[str]] = None):
+    # Per-language filler lists, used instead of DEFAULT_FILLERS for that language
+    LANGUAGE_FILLERS: dict[str, list[str]] = {
+        "de": ["äh", "ähm", "öh", "hm", "halt", "sozusagen", "quasi", "also", "naja"],
+        "es": ["eh", "em", "este", "o sea", "pues", "bueno", "sabes", "digamos"],
+        "fr": ["euh", "heu", "ben", "bah", "genre", "du coup", "en fait", "tu vois", "quoi"],
+        "it": ["ehm", "eh", "cioè", "tipo", "allora", "insomma", "praticamente"],
+        "nl": ["eh", "uh", "ehm", "zeg maar", "eigenlijk", "gewoon"],
+        "pt": ["é", "hum", "tipo", "então", "né", "sabe", "assim"],
+    }
+
+    def __init__(
+        self,
+        custom_fillers: Optional[list[str]] = None,
+        language: Optional[str] = None,
+    ):
         """
         Initialize the text cleanup processor.
 
         Args:
             custom_fillers: Optional list of additional filler words to remove.
                            If provided, these are added to the default fillers.
+            language: Optional language code. Languages with their own filler list
+                      in LANGUAGE_FILLERS use it instead of the English defaults.
         """
-        self.fillers = self.DEFAULT_FILLERS.copy()
+        base_fillers = self.LANGUAGE_FILLERS.get(_normalize_language(language))
+        self.fillers = list(base_fillers or self.DEFAULT_FILLERS)
         if custom_fillers:
             self.fillers.extend(custom_fillers)
 
-        # Build regex pattern for word boundary matching
-        # Sort by length (longest first) to match multi-word fillers first
-        sorted_fillers = sorted(self.fillers, key=len, reverse=True)
-        # Escape special regex characters and create pattern with word boundaries
-        escaped_fillers = [re.escape(filler) for filler in sorted_fillers]
-        pattern = r"\b(" + "|".join(escaped_fillers) + r")\b"
-        self.filler_pattern = re.compile(pattern, re.IGNORECASE)
+        # Trie roots for fillers starting with a word run / with a non-word char
+        self._word_trie: dict = {}
+        self._symbol_trie: dict = {}
+        for filler in self.fillers:
+            self._add_filler(filler)
+
+    def _add_filler(self, filler: str) -> None:
+        """Insert a filler into the token trie."""
+        items = _TOKEN_SPLIT.split(filler.lower())
+
+        # A leading/trailing empty word run means the filler starts/ends with a
+        # non-word char, which (like regex \b) needs a word char on that side.
+        need_word_before = items[0] == ""
+        need_word_after = items[-1] == "" and len(items) > 1
+        if need_word_before:
+            items = items[1:]
+        if need_word_after:
+            items = items[:-1]
+        if not items or items == [""]:
+            return
+
+        node = self._symbol_trie if need_word_before else self._word_trie
+        for item in items:
+            node = node.setdefault(item, {})
+        node[_END] = need_word_after
+
+    def _match(self, items: list[str], start: int, root: dict) -> int:
+        """
+        Find the longest filler starting at items[start].
+
+        Returns:
+            Index just past the match, or -1 if no filler matches.
+        """
+        node = root
+        end = -1
+        count = len(items)
+        index = start
+        while index < count:
+            node = node.get(items[index].lower())
+            if node is None:
+                break
+            index += 1
+            need_word_after = node.get(_END)
+            if need_word_after is not None:
+                if not need_word_after or (index < count and items[index]):
+                    end = index
+        return end
 
     def cleanup(self, text: str) -> str:
         """
@@ -90,56 +175,190 @@ class TextCleanupProcessor:
         if not text or not text.strip():
             return text
 
-        result = text
-        result = self.filler_pattern.sub(" ", result)
-        result = self._cleanup_spacing(result)
-        result = self._fix_sentence_capitalization(result)
+        items = _TOKEN_SPLIT.split(text)
+        word_trie = self._word_trie
+        symbol_trie = self._symbol_trie
+        match = self._match
 
-        return result.strip()
+        # Output state, applied in one pass over the items:
+        # - pending_space: a space run, collapsed to one and dropped before punctuation
+        # - punct/punct_ws: punctuation awaiting a possible second mark (", ," -> ",")
+        # - started/tail: leading junk trimming and trailing whitespace trimming
+        # - last_char: last emitted char, for capitalizing after sentence ends
+        out: list[str] = []
+        pending_space = False
+        punct: Optional[str] = None
+        punct_ws = ""
+        started = False
+        tail = ""
+        last_char = ""
 
-    def _cleanup_spacing(self, text: str) -> str:
-        """
-        Clean up spacing and punctuation issues.
+        count = len(items)
+        index = 0
+        while index < count:
+            item = items[index]
 
-        Removes:
-        - Multiple consecutive spaces
-        - Spaces before punctuation
-        - Orphaned punctuation (e.g., ", , ")
-        - Leading punctuation
+            if index & 1:
+                # Single non-word char; fillers starting with one need a word char before
+                if symbol_trie and items[index - 1]:
+                    end = match(items, index, symbol_trie)
+                    if end != -1:
+                        index = end
+                        pending_space = True  # Fillers are replaced by a space
+                        continue
+                index += 1
 
-        Args:
-            text: Text to clean.
+                if item == " ":
+                    pending_space = True
+                    continue
+                if item in _PUNCTUATION:
+                    pending_space = False
+                    if punct is None:
+                        punct = item
+                        punct_ws = ""
+                    else:
+                        # Second mark after only whitespace is dropped
+                        units = (punct,)
+                        punct = None
+                        started, tail, last_char = _emit(out, units, started, tail, last_char)
+                    continue
+                is_word = False
+            else:
+                if not item:
+                    index += 1
+                    continue
+                if item.lower() in word_trie:
+                    end = match(items, index, word_trie)
+                    if end != -1:
+                        index = end
+                        pending_space = True
+                        continue
+                index += 1
+                is_word = True
 
-        Returns:
-            Text with spacing issues fixed.
-        """
-        text = re.sub(r" +", " ", text)
-        text = re.sub(r" ([,.!?;:])", r"\1", text)
-        text = re.sub(r"([,.!?;:])\s*([,.!?;:])", r"\1", text)
-        text = re.sub(r"^[,.!?;:\s]+", "", text)
-        text = text.strip()
+            if pending_space:
+                pending_space = False
+                if punct is not None:
+                    punct_ws += " "
+                elif started:
+                    tail += " "
 
-        return text
+            if punct is not None:
+                if not is_word and item.isspace():
+                    punct_ws += item
+                    continue
+                units = (punct, punct_ws) if punct_ws else (punct,)
+                punct = None
+                started, tail, last_char = _emit(out, units, started, tail, last_char)
 
-    def _fix_sentence_capitalization(self, text: str) -> str:
-        """
-        Capitalize first letter of text and after sentence-ending punctuation.
+            # Emit the item (inlined fast path of _emit)
+            if not is_word and item.isspace():
+                if started:
+                    tail += item
+                continue
+            if not started:
+                started = True
+                if item[0].isalpha():
+                    item = item[0].upper() + item[1:]
+            elif tail:
+                if last_char in _SENTENCE_END and "a" <= item[0] <= "z":
+                    item = item[0].upper() + item[1:]
+                out.append(tail)
+                tail = ""
+            out.append(item)
+            last_char = item[-1]
 
-        Args:
-            text: Text to fix.
+        if pending_space and punct is not None:
+            punct_ws += " "
+        if punct is not None:
+            _emit(out, (punct, punct_ws), started, tail, last_char)
 
-        Returns:
-            Text with corrected capitalization.
-        """
-        if not text:
-            return text
+        return "".join(out)
+
+
+def _emit(
+    out: list[str],
+    units: tuple[str, ...],
+    started: bool,
+    tail: str,
+    last_char: str,
+) -> tuple[bool, str, str]:
+    """
+    Emit punctuation (and the whitespace after it) for TextCleanupProcessor.cleanup().
+
+    Trims leading punctuation, holds back trailing whitespace, and returns the
+    updated (started, tail, last_char) state.
+    """
+    for unit in units:
+        if not unit:
+            continue
+        if unit.isspace():
+            if started:
+                tail += unit
+            continue
+        if not started:
+            # Leading punctuation is dropped
+            continue
+        if tail:
+            out.append(tail)
+            tail = ""
+        out.append(unit)
+        last_char = unit[-1]
+    return started, tail, last_char
+
+
+def _normalize_language(language: Optional[str]) -> Optional[str]:
+    """Normalize a language code ('es-MX' -> 'es'); 'auto' and empty mean unknown."""
+    if not language or language == "auto":
+        return None
+    return language.split("-")[0].split("_")[0].lower()
+
+
+_registry: "OrderedDict[tuple, TextCleanupProcessor]" = OrderedDict()
+_registry_lock = threading.Lock()
+
+
+def get_cleanup_processor(
+    custom_fillers: Optional[list[str]] = None,
+    language: Optional[str] = None,
+) -> TextCleanupProcessor:
+    """
+    Get a compiled TextCleanupProcessor, cached by filler set and language.
+
+    Processors are immutable once built, so a cached instance can be shared
+    across requests and threads.
+
+    Args:
+        custom_fillers: Optional additional filler words
+        language: Optional language code
+
+    Returns:
+        A cached or newly compiled TextCleanupProcessor
+    """
+    language_key = _normalize_language(language)
+    if language_key not in TextCleanupProcessor.LANGUAGE_FILLERS:
+        language_key = None
+    key = (language_key, frozenset(custom_fillers or ()))
+
+    with _registry_lock:
+        processor = _registry.get(key)
+        if processor is not None:
+            _registry.move_to_end(key)
+            return processor
+
+    processor = TextCleanupProcessor(custom_fillers=custom_fillers, language=language_key)
 
-        if text[0].isalpha():
-            text = text[0].upper() + text[1:]
+    with _registry_lock:
+        _registry[key] = processor
+        _registry.move_to_end(key)
+        while len(_registry) > _REGISTRY_MAX_SIZE:
+            _registry.popitem(last=False)
 
-        def capitalize_after_sentence(match):
-            return match.group(1) + match.group(2) + match.group(3).upper()
+    logger.debug(f"Compiled text cleanup processor ({len(processor.fillers)} fillers)")
+    return processor
 
-        text = re.sub(r"([.!?])(\s+)([a-z])", capitalize_after_sentence, text)
 
-        return text
+def clear_cleanup_processors() -> None:
+    """Drop all cached processors."""
+    with _registry_lock:
+        _registry.clear()
@@ -141,6 +141,7 @@ class TranscriberService:
         device: str = "cuda",
         compute_type: Optional[str] = None,
         progress_callback: Optional[ProgressCallback] = None,
+        cpu_threads: Optional[int] = None,
     ) -> None:
         """
         Load an ASR model.
@@ -153,6 +154,7 @@ class TranscriberService:
             progress_callback: Optional callback for download progress tracking
                 that receives (downloaded_bytes, total_bytes) and returns
                 True to continue or False to cancel
+            cpu_threads: Threads used for inference on CPU (None: all cores)
         """
         # Save args for reload
         self._last_load_args = {
@@ -161,6 +163,7 @@ class TranscriberService:
             "device": device,
             "compute_type": compute_type,
             "progress_callback": progress_callback,
+            "cpu_threads": cpu_threads,
         }
 
         self._set_state(TranscriberState.LOADING)
@@ -179,6 +182,7 @@ class TranscriberService:
                 model_name=model_name,
                 device=device,
                 compute_type=compute_type,
+                cpu_threads=cpu_threads,
             )
             self._model.load(progress_callback=progress_callback)
 
@@ -484,6 +488,7 @@ class TranscriberService:
         language: Optional[str] = None,
         progress_callback: Optional[TranscriptionProgressCallback] = None,
         instruction: Optional[str] = None,
+        completed_chunks: Optional[list[str]] = None,
     ) -> TranscriptionResult:
         """
         Transcribe audio data with optional chunked processing for long recordings.
@@ -495,6 +500,9 @@ class TranscriberService:
             progress_callback: Optional callback for progress updates during long transcriptions.
                 Receives (current_chunk, total_chunks, chunk_text) for each completed chunk.
             instruction: Optional instruction or system prompt (e.g. for grammar correction)
+            completed_chunks: Texts of the first chunks of a long recording,
+                transcribed before (e.g. checkpointed by an interrupted batch
+                job); transcription continues after them
 
         Returns:
             TranscriptionResult with transcribed text
@@ -518,6 +526,7 @@ class TranscriberService:
                     language=language,
                     progress_callback=progress_callback,
                     instruction=instruction,
+                    completed_chunks=completed_chunks,
                 )
             else:
                 # Standard single-pass transcription
@@ -545,6 +554,7 @@ class TranscriberService:
         language: Optional[str],
         progress_callback: Optional[TranscriptionProgressCallback],
         instruction: Optional[str] = None,
+        completed_chunks: Optional[list[str]] = None,
     ) -> TranscriptionResult:
         """
         Transcribe long audio in chunks with progress reporting.
@@ -555,6 +565,8 @@ class TranscriberService:
             language: Language code
             progress_callback: Progress callback
             instruction: Optional instruction
+            completed_chunks: Texts of the first chunks, which are not
+                transcribed again
 
         Returns:
             Combined TranscriptionResult
@@ -573,8 +585,11 @@ class TranscriberService:
             f"in {num_chunks} chunks of {chunk_size / sample_rate:.0f}s each"
         )
 
-        texts = []
-        for i in range(num_chunks):
+        completed = list(completed_chunks or [])[:num_chunks]
+        if completed:
+            logger.info(f"Resuming chunked transcription at chunk {len(completed) + 1}")
+        texts = [text for text in completed if text]
+        for i in range(len(completed), num_chunks):
             chunk_start = i * chunk_size
             chunk_end = min((i + 1) * chunk_size, total_samples)
             chunk_data = audio_data[chunk_start:chunk_end]
@@ -613,33 +628,24 @@ class TranscriberService:
             model_used=self._model.model_name if self._model else None,
         )
 
-    def transcribe_file(
-        self,
-        file_path: str,
-        language: Optional[str] = None,
-        progress_callback: Optional[TranscriptionProgressCallback] = None,
-        instruction: Optional[str] = None,
-    ) -> TranscriptionResult:
+    def load_audio_file(self, file_path: str) -> "NDArray[np.float32]":
         """
-        Transcribe an audio file.
+        Decode an audio file to mono float32 samples at SAMPLE_RATE.
+
+        Does not use the model, so batch jobs can decode the next files on
+        other threads while the model transcribes the current one.
 
         Args:
             file_path: Path to the audio file
-            language: Language code or 'auto'
-            progress_callback: Optional callback for progress updates
-            instruction: Optional instruction
 
         Returns:
-            TranscriptionResult with transcribed text
+            Audio samples as float32 numpy array
         """
-        if not self.is_model_loaded:
-            raise RuntimeError("No model loaded")
-
         try:
             # Use faster_whisper's robust audio decoding (handles ffmpeg, resampling to 16k)
             from faster_whisper.audio import decode_audio
 
-            audio_data = decode_audio(file_path, sampling_rate=self.SAMPLE_RATE)
+            return decode_audio(file_path, sampling_rate=self.SAMPLE_RATE)
         except ImportError:
             # Fallback if faster_whisper is not importable (should be rare in prod)
             logger.warning("faster_whisper not found, falling back to soundfile")
@@ -653,20 +659,46 @@ class TranscriberService:
             if sr != self.SAMPLE_RATE:
                 # Resample using scipy
                 number_of_samples = round(len(audio) * float(self.SAMPLE_RATE) / sr)
-                audio_data = scipy.signal.resample(audio, number_of_samples)
-            else:
-                audio_data = audio
+                return scipy.signal.resample(audio, number_of_samples)
+            return audio
 
         except Exception as e:
             logger.error(f"Error reading audio file {file_path}: {e}")
             raise
 
+    def transcribe_file(
+        self,
+        file_path: str,
+        language: Optional[str] = None,
+        progress_callback: Optional[TranscriptionProgressCallback] = None,
+        instruction: Optional[str] = None,
+        completed_chunks: Optional[list[str]] = None,
+    ) -> TranscriptionResult:
+        """
+        Transcribe an audio file.
+
+        Args:
+            file_path: Path to the audio file
+            language: Language code or 'auto'
+            progress_callback: Optional callback for progress updates
+            instruction: Optional instruction
+            completed_chunks: Texts of the first chunks, transcribed before
+
+        Returns:
+            TranscriptionResult with transcribed text
+        """
+        if not self.is_model_loaded:
+            raise RuntimeError("No model loaded")
+
+        audio_data = self.load_audio_file(file_path)
+
         return self.transcribe(
             audio_data=audio_data,
             sample_rate=self.SAMPLE_RATE,
             language=language,
             progress_callback=progress_callback,
             instruction=instruction,
+            completed_chunks=completed_chunks,
         )
 
     def stop_and_transcribe(
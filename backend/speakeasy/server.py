@@ -5,16 +5,20 @@ Provides HTTP and WebSocket APIs for the Electron frontend.
 """
 
 import asyncio
+import hashlib
 import logging
 import os
 import re
+import time
 from contextlib import asynccontextmanager
-from typing import Optional
+from datetime import date, datetime
+from typing import AsyncIterator, Optional
 
 from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field, field_validator
+from pydantic_core import to_json
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
@@ -25,9 +29,11 @@ from .core.config import (
     get_compute_types,
     get_languages_for_model,
 )
+from .core.grammar_processor import GrammarProcessor, get_available_grammar_models
 from .core.models import TranscriptionResult, get_gpu_info, recommend_model
-from .core.text_cleanup import TextCleanupProcessor
+from .core.postprocessing import PostProcessingPipeline, build_pipeline
 from .core.transcriber import TranscriberService, TranscriberState, list_audio_devices
+from .services.backup import BackupService
 from .services.batch import BatchJob, BatchJobStatus, BatchService
 from .services.download_state import (
     DownloadStatus,
@@ -37,14 +43,32 @@ from .services.download_state import (
     get_cache_info,
     get_cached_models,
 )
-from .services.export import ExportFormat, export_service
-from .services.history import HistoryService, TranscriptionRecord
+from .services.export import ExportCompression, ExportFormat, check_available, export_service
+from .services.history import (
+    HistoryFilter,
+    HistoryService,
+    TranscriptionRecord,
+    encode_cursor,
+    record_from_import,
+)
+from .services.importer import (
+    DEFAULT_IMPORT_CHUNK_SIZE,
+    IMPORT_FORMATS,
+    ImportFormatError,
+    ImportProgress,
+    import_stream,
+)
+from .services.maintenance import MaintenanceScheduler
 from .services.settings import (
     AppSettings,
     SettingsService,
+    get_default_backup_dir,
+    get_default_batch_db_path,
     get_default_db_path,
     get_default_settings_path,
 )
+from .services.worker_pool import CpuWorkerPool, ModelReplica
+from .utils.metrics import metrics
 from .utils.paste import insert_text
 
 logger = logging.getLogger(__name__)
@@ -54,6 +78,15 @@ transcriber: Optional[TranscriberService] = None
 history: Optional[HistoryService] = None
 settings_service: Optional[SettingsService] = None
 batch_service: Optional[BatchService] = None
+grammar_processor: Optional[GrammarProcessor] = None
+maintenance: Optional[MaintenanceScheduler] = None
+backup_service: Optional[BackupService] = None
+batch_pool: Optional[CpuWorkerPool] = None
+# Running batch jobs (and the resume of interrupted ones), stopped at shutdown
+batch_tasks: set[asyncio.Task] = set()
+
+# How often interrupted batch jobs check whether a model is loaded to resume them
+BATCH_RESUME_POLL_S = 2.0
 
 # WebSocket connections for real-time updates
 websocket_connections: list[WebSocket] = []
@@ -79,11 +112,12 @@ class TranscribeStopResponse(BaseModel):
     duration_ms: int
     model_used: Optional[str]
     language: Optional[str]
+    timings_ms: Optional[dict[str, float]] = None
 
 
 class HistoryListResponse(BaseModel):
     items: list[dict]
-    total: int
+    total: Optional[int]
     next_cursor: Optional[str] = None
 
 
@@ -102,10 +136,19 @@ class SettingsUpdateRequest(BaseModel):
     theme: Optional[str] = Field(None, max_length=50)
     enable_text_cleanup: Optional[bool] = None
     custom_filler_words: Optional[list[str]] = Field(None, max_length=100)
+    text_replacements: Optional[dict[str, str]] = Field(None, max_length=500)
     enable_grammar_correction: Optional[bool] = None
     grammar_model: Optional[str] = Field(None, max_length=200)
     grammar_device: Optional[str] = Field(None, pattern=r"^(cuda|cpu|auto)$")
     server_port: Optional[int] = Field(None, ge=1024, le=65535)
+    history_max_age_days: Optional[int] = Field(None, ge=0)
+    history_max_records: Optional[int] = Field(None, ge=0)
+    history_max_size_mb: Optional[int] = Field(None, ge=0)
+    history_maintenance_interval_minutes: Optional[int] = Field(None, ge=1)
+    history_archive_after_days: Optional[int] = Field(None, ge=0)
+    history_compress_text: Optional[bool] = None
+    backup_keep: Optional[int] = Field(None, ge=1)
+    batch_cpu_workers: Optional[int] = Field(None, ge=0, le=64)
 
     @field_validator("hotkey")
     @classmethod
@@ -165,13 +208,122 @@ def on_state_change(state: TranscriberState) -> None:
     )
 
 
+def build_postprocessing_pipeline(settings: Optional[AppSettings]) -> PostProcessingPipeline:
+    """
+    Build the transcription post-processing pipeline from current settings.
+
+    The grammar stage is only included once the grammar model has finished
+    loading, so a pending preload never delays a transcription.
+    """
+    if settings is None:
+        return build_pipeline(enable_cleanup=False)
+
+    grammar = None
+    if (
+        settings.enable_grammar_correction
+        and grammar_processor is not None
+        and grammar_processor.is_loaded
+    ):
+        grammar = grammar_processor
+
+    return build_pipeline(
+        enable_cleanup=settings.enable_text_cleanup,
+        custom_fillers=settings.custom_filler_words,
+        replacements=settings.text_replacements,
+        grammar_processor=grammar,
+    )
+
+
+def start_grammar_preload(settings: AppSettings) -> GrammarProcessor:
+    """
+    Create the grammar processor and preload its model in a background thread.
+
+    Download progress is tracked through the shared download state manager and
+    broadcast as `download_progress` events, unless another download is already
+    being tracked. A `grammar_status` event is broadcast once loading finishes.
+    """
+    global grammar_processor
+
+    loop = asyncio.get_running_loop()
+
+    if grammar_processor is not None:
+        # Cancels its preload if it is still loading, so no model is left behind
+        grammar_processor.unload()
+
+    processor = GrammarProcessor(model_name=settings.grammar_model, device=settings.grammar_device)
+    grammar_processor = processor
+
+    def broadcast_threadsafe(event_type: str, data: dict) -> None:
+        """Schedule a broadcast on the server loop from the preload thread."""
+        if not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(broadcast(event_type, data), loop)
+
+    download = None
+    if not processor.is_downloaded and not download_state_manager.is_downloading:
+        download = download_state_manager.start_download(
+            model_type="grammar", model_name=processor.model_name
+        )
+        broadcast_threadsafe("download_progress", download.to_dict())
+
+    def progress_callback(downloaded: int, total: int) -> bool:
+        """Feed byte progress into the download state manager."""
+        if download is None:
+            return True
+
+        if download_state_manager.cancel_requested:
+            return False
+
+        should_continue = download_state_manager.update_progress(downloaded, total)
+        current = download_state_manager.current_download
+        if current:
+            broadcast_threadsafe("download_progress", current.to_dict())
+        return should_continue
+
+    def on_complete(error: Optional[Exception]) -> None:
+        """Finish download tracking and report the final grammar status."""
+        if processor is grammar_processor:  # Not replaced while loading
+            broadcast_threadsafe("grammar_status", processor.get_info())
+
+        if download is None:
+            return
+
+        if error is None:
+            download_state_manager.complete_download()
+        elif "cancelled" not in str(error).lower():
+            download_state_manager.fail_download(str(error))
+        current = download_state_manager.current_download
+        if current:
+            broadcast_threadsafe("download_progress", current.to_dict())
+
+        # Clear download state after a delay to allow UI to show final state
+        time.sleep(2)
+        current = download_state_manager.current_download
+        if current and current.download_id == download.download_id:
+            download_state_manager.clear_download()
+
+    processor.preload(progress_callback=progress_callback, on_complete=on_complete)
+    return processor
+
+
+def app_is_busy() -> bool:
+    """Check whether a recording, transcription or batch job is in progress."""
+    if transcriber and transcriber.state in (
+        TranscriberState.LOADING,
+        TranscriberState.RECORDING,
+        TranscriberState.TRANSCRIBING,
+    ):
+        return True
+    return batch_service is not None and batch_service.is_processing
+
+
 # --- Lifespan ---
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
-    global transcriber, history, settings_service, batch_service
+    global transcriber, history, settings_service, batch_service, grammar_processor, maintenance
+    global backup_service, batch_pool
 
     logger.info("Starting SpeakEasy backend...")
 
@@ -180,14 +332,25 @@ async def lifespan(app: FastAPI):
     settings = settings_service.load()
 
     # Initialize history database
-    history = HistoryService(get_default_db_path())
+    history = HistoryService(get_default_db_path(), compress_text=settings.history_compress_text)
     await history.initialize()
 
     # Initialize batch service (uses same db path with different file)
-    batch_db_path = get_default_db_path().parent / "batch.db"
-    batch_service = BatchService(batch_db_path)
+    batch_service = BatchService(get_default_batch_db_path())
     await batch_service.initialize()
 
+    # Online backups of the history, archive and batch databases
+    backup_service = BackupService(
+        get_default_backup_dir(),
+        get_default_db_path(),
+        get_default_batch_db_path(),
+        keep=settings.backup_keep,
+    )
+
+    # Retention and database maintenance, run in idle periods
+    maintenance = MaintenanceScheduler(history, settings_service.get, is_busy=app_is_busy)
+    maintenance.start()
+
     # Initialize transcriber
     transcriber = TranscriberService(on_state_change=on_state_change)
 
@@ -209,6 +372,16 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"Failed to auto-load model: {e}")
 
+    # Resume the batch jobs the last shutdown interrupted once a model is loaded
+    start_batch_task(resume_interrupted_batch_jobs())
+
+    # Preload grammar model so the first corrected transcript doesn't pay for it
+    if settings.enable_grammar_correction:
+        try:
+            start_grammar_preload(settings)
+        except Exception as e:
+            logger.warning(f"Failed to preload grammar model: {e}")
+
     logger.info("SpeakEasy backend started")
     # Debug print to confirm server file version
     print("DEBUG: SpeakEasy server.py loaded. Endpoints registered: /api/models/cache")
@@ -218,9 +391,28 @@ async def lifespan(app: FastAPI):
     # Cleanup
     logger.info("Shutting down SpeakEasy backend...")
 
+    # Stop batch jobs before the pool and databases they write to; they
+    # resume after their last finished file or chunk on the next start
+    for task in batch_tasks:
+        task.cancel()
+    await asyncio.gather(*batch_tasks, return_exceptions=True)
+
+    if batch_pool:
+        await batch_pool.close()
+        batch_pool = None
+
     if transcriber:
         transcriber.cleanup()
 
+    if grammar_processor:
+        grammar_processor.unload()
+        grammar_processor = None
+
+    if maintenance:
+        await maintenance.stop()
+        maintenance = None
+
+    # close() flushes any queued write-behind history rows before closing
     if history:
         await history.close()
 
@@ -416,11 +608,11 @@ async def transcribe_stop(request: Request, body: TranscribeStopRequest):
             instruction=instruction,
         )
 
-        # Apply text cleanup if enabled
-        cleaned_text = result.text
-        if settings and settings.enable_text_cleanup:
-            processor = TextCleanupProcessor(custom_fillers=settings.custom_filler_words)
-            cleaned_text = processor.cleanup(result.text)
+        # Run post-processing stages (cleanup, replacements, grammar, formatting)
+        processed = await build_postprocessing_pipeline(settings).run(
+            result.text, language=result.language
+        )
+        cleaned_text = processed.text
 
         # Save to history
         record = await history.add(
@@ -450,6 +642,7 @@ async def transcribe_stop(request: Request, body: TranscribeStopRequest):
             duration_ms=result.duration_ms,
             model_used=result.model_used,
             language=result.language,
+            timings_ms=processed.timings_ms,
         )
 
     except Exception as e:
@@ -470,13 +663,46 @@ async def transcribe_cancel():
 # --- History ---
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _etag_response(request: Request, payload: object) -> Response:
+    """
+    Serialize a JSON payload with an ETag of its bytes.
+
+    A request whose If-None-Match names the same ETag gets 304 Not Modified
+    without a body. Cache-Control: no-cache makes clients revalidate each
+    time instead of reusing the response unchecked.
+    """
+    content = to_json(payload)
+    etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
 @app.get("/api/history", response_model=HistoryListResponse)
 async def history_list(
+    request: Request,
     limit: int = 50,
     offset: int = 0,
     search: Optional[str] = None,
     cursor: Optional[str] = None,
     fields: Optional[str] = None,
+    include_total: bool = True,
+    search_mode: str = "phrase",
+    order: str = "date",
+    highlight: bool = False,
+    include_archived: Optional[bool] = None,
 ):
     """
     List transcription history.
@@ -487,61 +713,244 @@ async def history_list(
         search: Optional search query for full-text search
         cursor: Optional cursor for pagination (from previous response's next_cursor)
         fields: Optional comma-separated list of fields to include (e.g., "id,text,created_at")
+        include_total: Set to false on cursor pages to skip counting (total is null)
+        search_mode: "phrase", "prefix" (search as you type) or "substring"
+        order: "date" (newest first) or "relevance" (best match first, searches only)
+        highlight: Include a "snippet" with <mark>-highlighted matches
+        include_archived: Also list records moved to archive files (default:
+            only for searches)
     """
     if not history:
         raise HTTPException(status_code=503, detail="History not initialized")
 
-    # Parse fields parameter
+    # Parse fields parameter; projection happens in the SQL query
     fields_set: Optional[set[str]] = None
     if fields:
         fields_set = set(f.strip() for f in fields.split(","))
+        if highlight:
+            fields_set.add("snippet")
 
     try:
         records, total, next_cursor = await history.list(
-            limit=limit, offset=offset, search=search, cursor=cursor, fields=fields_set
+            limit=limit,
+            offset=offset,
+            search=search,
+            cursor=cursor,
+            fields=fields_set,
+            include_total=include_total,
+            search_mode=search_mode,
+            order=order,
+            highlight=highlight,
+            include_archived=include_archived,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return HistoryListResponse(
-        items=[r.to_dict(fields_set) for r in records],
-        total=total,
-        next_cursor=next_cursor,
-    )
+    # Serialized straight to JSON bytes: the dicts already match
+    # HistoryListResponse, so response-model validation is skipped
+    payload = {
+        "items": [r.to_dict(fields_set) for r in records],
+        "total": total,
+        "next_cursor": next_cursor,
+    }
+    return _etag_response(request, payload)
 
 
 @app.get("/api/history/stats")
-async def history_stats():
+async def history_stats(request: Request):
     """Get history statistics."""
     if not history:
         raise HTTPException(status_code=503, detail="History not initialized")
 
-    return await history.get_stats()
+    return _etag_response(request, await history.get_stats())
+
+
+@app.get("/api/history/stats/series")
+async def history_stats_series(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    interval: str = "day",
+):
+    """
+    Get transcription activity over time.
+
+    Args:
+        start: First day to include (YYYY-MM-DD, UTC)
+        end: Last day to include (YYYY-MM-DD, UTC)
+        interval: Bucket size: day, week or month
+    """
+    if not history:
+        raise HTTPException(status_code=503, detail="History not initialized")
+
+    try:
+        series = await history.get_stats_series(start=start, end=end, interval=interval)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"interval": interval, "series": series}
+
+
+# --- Maintenance ---
+
+
+@app.get("/api/history/maintenance")
+async def history_maintenance_status():
+    """Get the retention policy, next scheduled run and last maintenance report."""
+    if not maintenance:
+        raise HTTPException(status_code=503, detail="Maintenance not initialized")
+
+    return maintenance.status()
+
+
+@app.post("/api/history/maintenance")
+@limiter.limit("5/minute")
+async def history_maintenance_run(request: Request):
+    """
+    Run history maintenance now.
+
+    Applies the retention settings, moves old records to the archive files,
+    merges the search indexes and returns free space to the filesystem.
+    Returns the report with per-step durations and the space freed.
+    """
+    if not maintenance:
+        raise HTTPException(status_code=503, detail="Maintenance not initialized")
+
+    report = await maintenance.run(trigger="manual")
+    return report.to_dict()
+
+
+# --- Backups ---
+
+
+class BackupRequest(BaseModel):
+    compression: Optional[str] = Field(None, pattern=r"^(gzip|zstd)$")
+
+
+@app.get("/api/backups")
+async def backups_list():
+    """List database backups, newest first, with the progress of a running one."""
+    if not backup_service:
+        raise HTTPException(status_code=503, detail="Backups not initialized")
+
+    return backup_service.status()
+
+
+@app.post("/api/backups")
+@limiter.limit("5/minute")
+async def backups_create(request: Request, body: Optional[BackupRequest] = None):
+    """
+    Back up the history, archive and batch databases while the server runs.
+
+    Databases are copied a few pages at a time on a worker thread from read
+    snapshots, so transcription and history writes continue meanwhile.
+    Older backups beyond the backup_keep setting are deleted. Restore with
+    `python -m speakeasy backup restore NAME` while the server is stopped.
+    """
+    if not backup_service or not history or not settings_service:
+        raise HTTPException(status_code=503, detail="Backups not initialized")
+    if backup_service.running:
+        raise HTTPException(status_code=409, detail="A backup is already in progress")
+
+    compression = _parse_compression(body.compression if body else None)
+    try:
+        backup = await backup_service.create(
+            compression,
+            pause_writes=history.writes_paused,
+            keep=settings_service.get().backup_keep,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return backup.to_dict()
+
+
+@app.delete("/api/backups/{name}")
+async def backups_delete(name: str):
+    """Delete a backup."""
+    if not backup_service:
+        raise HTTPException(status_code=503, detail="Backups not initialized")
+
+    deleted = await backup_service.delete(name)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Backup not found")
+
+    return {"deleted": True}
 
 
 # --- Export ---
 
 
 class ExportRequest(BaseModel):
-    format: str = Field(..., pattern=r"^(txt|json|csv|srt|vtt)$")
+    format: str = Field(..., pattern=r"^(txt|json|ndjson|csv|srt|vtt|parquet|arrow)$")
     include_metadata: bool = True
     start_date: Optional[str] = None  # ISO format
     end_date: Optional[str] = None  # ISO format
     search: Optional[str] = None
     record_ids: Optional[list[str]] = None  # Export specific records
+    model_used: Optional[str] = Field(None, max_length=200)
+    language: Optional[str] = Field(None, max_length=10)
+    compression: Optional[str] = Field(None, pattern=r"^(gzip|zstd)$")
+
+
+def _parse_iso_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an optional ISO date parameter (a trailing Z means UTC)."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {e}")
+
+
+def _parse_compression(compression: Optional[str]) -> Optional[ExportCompression]:
+    """Parse an optional export compression parameter."""
+    if not compression:
+        return None
+    try:
+        return ExportCompression(compression.lower())
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid compression: {compression}")
+
+
+def _export_response(
+    batches: AsyncIterator[list[TranscriptionRecord]],
+    export_format: ExportFormat,
+    include_metadata: bool,
+    compression: Optional[ExportCompression],
+) -> StreamingResponse:
+    """Stream an export as a file download."""
+    try:
+        check_available(export_format, compression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filename = export_service.filename(export_format, compression)
+    return StreamingResponse(
+        export_service.stream(batches, export_format, include_metadata, compression),
+        media_type=export_service.content_type(export_format, compression),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        },
+    )
 
 
 @app.get("/api/history/export")
 async def history_export_get(
     format: str = "json",
     include_metadata: bool = True,
+    compression: Optional[str] = None,
 ):
     """
     Export all transcription history.
 
+    The export is streamed from the database in batches, so any history size
+    is exported with bounded memory.
+
     Args:
-        format: Export format (txt, json, csv, srt, vtt)
-        include_metadata: Include metadata for JSON/CSV formats
+        format: Export format (txt, json, ndjson, csv, srt, vtt, and with
+            pyarrow installed parquet, arrow)
+        include_metadata: Include metadata for JSON/NDJSON/CSV/columnar formats
+        compression: Optional on-the-fly compression (gzip, or zstd with
+            zstandard installed)
     """
     if not history:
         raise HTTPException(status_code=503, detail="History not initialized")
@@ -551,26 +960,16 @@ async def history_export_get(
     except ValueError:
         raise HTTPException(status_code=400, detail=f"Invalid format: {format}")
 
-    # Get all records
-    records, _, _ = await history.list(limit=10000, offset=0)
-
-    content, filename, content_type = export_service.export(
-        records, export_format, include_metadata
-    )
-
-    from fastapi.responses import Response
-
-    return Response(
-        content=content.encode("utf-8"),
-        media_type=content_type,
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-        },
+    return _export_response(
+        history.iter_records(),
+        export_format,
+        include_metadata,
+        _parse_compression(compression),
     )
 
 
 @app.get("/api/history/{record_id}")
-async def history_get(record_id: str):
+async def history_get(request: Request, record_id: str):
     """Get a specific transcription record."""
     if not history:
         raise HTTPException(status_code=503, detail="History not initialized")
@@ -579,7 +978,7 @@ async def history_get(record_id: str):
     if not record:
         raise HTTPException(status_code=404, detail="Record not found")
 
-    return record.to_dict()
+    return _etag_response(request, record.to_dict())
 
 
 @app.delete("/api/history/{record_id}")
@@ -600,7 +999,9 @@ async def history_export_post(body: ExportRequest):
     """
     Export transcription history with filtering options.
 
-    Supports filtering by date range, search query, or specific record IDs.
+    Supports filtering by date range, search query, model, language and
+    specific record IDs; all given filters are combined in one SQL query per
+    batch. The export is streamed from the database in batches.
     """
     if not history:
         raise HTTPException(status_code=503, detail="History not initialized")
@@ -609,50 +1010,67 @@ async def history_export_post(body: ExportRequest):
         export_format = ExportFormat(body.format.lower())
     except ValueError:
         raise HTTPException(status_code=400, detail=f"Invalid format: {body.format}")
-
-    # Get records based on filters
-    if body.record_ids:
-        # Export specific records
-        records = []
-        for record_id in body.record_ids:
-            record = await history.get(record_id)
-            if record:
-                records.append(record)
-    else:
-        # Get all and filter
-        all_records, _, _ = await history.list(limit=10000, offset=0, search=body.search)
-        records = all_records
-
-        # Filter by date range if specified
-        if body.start_date or body.end_date:
-            from datetime import datetime
-
-            filtered = []
-            for r in records:
-                if body.start_date:
-                    start = datetime.fromisoformat(body.start_date.replace("Z", "+00:00"))
-                    if r.created_at < start:
-                        continue
-                if body.end_date:
-                    end = datetime.fromisoformat(body.end_date.replace("Z", "+00:00"))
-                    if r.created_at > end:
-                        continue
-                filtered.append(r)
-            records = filtered
-
-    content, filename, content_type = export_service.export(
-        records, export_format, body.include_metadata
+    compression = _parse_compression(body.compression)
+
+    criteria = HistoryFilter(
+        ids=body.record_ids or None,
+        search=body.search,
+        start=_parse_iso_date(body.start_date),
+        end=_parse_iso_date(body.end_date),
+        model_used=body.model_used,
+        language=body.language,
+    )
+    return _export_response(
+        history.iter_records(criteria), export_format, body.include_metadata, compression
     )
 
-    from fastapi.responses import Response
 
-    return Response(
-        content=content.encode("utf-8"),
-        media_type=content_type,
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-        },
+# --- Bulk Delete ---
+
+
+class HistoryDeleteRequest(BaseModel):
+    record_ids: Optional[list[str]] = None  # Delete specific records
+    start_date: Optional[str] = None  # ISO format
+    end_date: Optional[str] = None  # ISO format
+    search: Optional[str] = None
+    model_used: Optional[str] = Field(None, max_length=200)
+    language: Optional[str] = Field(None, max_length=10)
+
+
+@app.post("/api/history/delete")
+async def history_delete_many(body: HistoryDeleteRequest):
+    """
+    Delete all transcriptions matching a filter in one transaction.
+
+    Accepts the same criteria as the export; all given criteria must match.
+    At least one is required, use DELETE /api/history to clear everything.
+    """
+    if not history:
+        raise HTTPException(status_code=503, detail="History not initialized")
+
+    criteria = HistoryFilter(
+        ids=body.record_ids,
+        search=body.search or None,
+        start=_parse_iso_date(body.start_date),
+        end=_parse_iso_date(body.end_date),
+        model_used=body.model_used,
+        language=body.language,
     )
+    if criteria == HistoryFilter():
+        raise HTTPException(status_code=400, detail="No delete criteria given")
+
+    deleted = await history.delete_many(criteria)
+    return {"deleted": deleted}
+
+
+@app.delete("/api/history")
+async def history_clear():
+    """Delete all transcription history."""
+    if not history:
+        raise HTTPException(status_code=503, detail="History not initialized")
+
+    deleted = await history.clear()
+    return {"deleted": deleted}
 
 
 # --- Import ---
@@ -695,33 +1113,22 @@ async def history_import(request: Request, body: ImportRequest):
     imported_count = 0
     skipped_count = 0
 
+    # Validate up front, then insert in chunked single-transaction batches.
+    # Original IDs and timestamps are kept; existing IDs are skipped.
+    records = []
     for t in transcriptions:
         try:
-            # Validate required fields
-            if "text" not in t:
-                skipped_count += 1
-                continue
-
-            # Check if record already exists (by ID)
-            if body.merge and "id" in t:
-                existing = await history.get(t["id"])
-                if existing:
-                    skipped_count += 1
-                    continue
-
-            # Add record
-            await history.add(
-                text=t.get("text", ""),
-                duration_ms=t.get("duration_ms", 0),
-                model_used=t.get("model_used"),
-                language=t.get("language"),
-            )
-            imported_count += 1
-
-        except Exception as e:
+            records.append(record_from_import(t))
+        except (ValueError, TypeError) as e:
             logger.warning(f"Failed to import record: {e}")
             skipped_count += 1
 
+    for start in range(0, len(records), DEFAULT_IMPORT_CHUNK_SIZE):
+        chunk = records[start : start + DEFAULT_IMPORT_CHUNK_SIZE]
+        inserted = await history.import_records(chunk)
+        imported_count += inserted
+        skipped_count += len(chunk) - inserted
+
     return {
         "status": "ok",
         "imported": imported_count,
@@ -729,6 +1136,72 @@ async def history_import(request: Request, body: ImportRequest):
     }
 
 
+@app.post("/api/history/import/stream")
+@limiter.limit("5/minute")
+async def history_import_stream(
+    request: Request,
+    merge: bool = True,
+    format: str = "ndjson",
+    compression: Optional[str] = None,
+):
+    """
+    Stream-import transcriptions from an NDJSON, CSV, Parquet or Arrow export.
+
+    The request body is parsed incrementally and inserted in chunked
+    transactions, so memory use does not depend on the upload size. Original
+    IDs, timestamps and original_text are preserved; records whose ID already
+    exists are skipped. Progress is broadcast as `import_progress` events.
+
+    Args:
+        merge: If True, merge with existing history. If False, clear and replace.
+        format: Upload format (ndjson, csv, parquet, arrow)
+        compression: Upload compression (gzip, zstd), if any
+    """
+    if not history:
+        raise HTTPException(status_code=503, detail="History not initialized")
+
+    try:
+        import_format = ExportFormat(format.lower())
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid format: {format}")
+    import_compression = _parse_compression(compression)
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format cannot be imported: {format}")
+    try:
+        check_available(import_format, import_compression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not merge:
+        await history.clear()
+
+    content_length = request.headers.get("content-length")
+    total_bytes = int(content_length) if content_length and content_length.isdigit() else None
+
+    async def on_progress(progress: ImportProgress) -> None:
+        await broadcast("import_progress", progress.to_dict())
+
+    try:
+        progress = await import_stream(
+            history,
+            request.stream(),
+            import_format,
+            import_compression,
+            total_bytes=total_bytes,
+            on_progress=on_progress,
+        )
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "status": "ok",
+        "import_id": progress.import_id,
+        "imported": progress.imported,
+        "skipped": progress.skipped,
+        "bytes_read": progress.bytes_read,
+    }
+
+
 # --- Batch Transcription ---
 
 
@@ -745,6 +1218,75 @@ class BatchJobResponse(BaseModel):
     skipped: int
 
 
+async def get_batch_worker_pool() -> Optional[CpuWorkerPool]:
+    """
+    Get the worker pool batch jobs run on, or None to use the loaded model.
+
+    A pool is used when the model runs on CPU and batch_cpu_workers is set.
+    It starts with the first job and is replaced after a change of model or
+    worker count, once no batch job is running.
+    """
+    global batch_pool
+
+    settings = settings_service.get() if settings_service else None
+    if not settings or settings.device != "cpu" or settings.batch_cpu_workers == 0:
+        return None
+
+    replica = ModelReplica(settings.model_type, settings.model_name, settings.compute_type)
+    if batch_pool and (
+        batch_pool.factory != replica or batch_pool.workers != settings.batch_cpu_workers
+    ):
+        if batch_service and batch_service.is_processing:
+            return batch_pool
+        await batch_pool.close()
+        batch_pool = None
+    if batch_pool is None:
+        batch_pool = CpuWorkerPool(replica, settings.batch_cpu_workers)
+    return batch_pool
+
+
+def start_batch_task(coro) -> asyncio.Task:
+    """Run a batch coroutine in the background, tracked so shutdown can stop it."""
+    task = asyncio.create_task(coro)
+    batch_tasks.add(task)
+    task.add_done_callback(batch_tasks.discard)
+    return task
+
+
+async def resume_interrupted_batch_jobs() -> None:
+    """
+    Restart the batch jobs that were running or queued when the server stopped.
+
+    Waits until they can run (a model is loaded, or the worker pool is
+    configured), then processes them one after another. Each continues where
+    it stopped: finished files are kept and long files resume after their
+    last checkpointed chunk.
+    """
+    job_ids = batch_service.pop_interrupted_jobs() if batch_service else []
+    if not job_ids:
+        return
+    logger.info(f"Resuming {len(job_ids)} interrupted batch job(s) once a model is loaded")
+
+    while not (transcriber and transcriber.is_model_loaded) and not await get_batch_worker_pool():
+        await asyncio.sleep(BATCH_RESUME_POLL_S)
+
+    for job_id in job_ids:
+        try:
+            await batch_service.process_job(
+                job_id,
+                transcriber,
+                history,
+                broadcast,
+                language=settings_service.get().language if settings_service else "auto",
+                worker_pool=await get_batch_worker_pool(),
+            )
+        except ValueError as e:
+            # Deleted or cancelled in the meantime
+            logger.info(f"Not resuming batch job {job_id}: {e}")
+        except Exception as e:
+            logger.error(f"Failed to resume batch job {job_id}: {e}")
+
+
 @app.post("/api/transcribe/batch")
 @limiter.limit("10/minute")
 async def batch_create(request: Request, body: BatchCreateRequest):
@@ -767,13 +1309,14 @@ async def batch_create(request: Request, body: BatchCreateRequest):
     job = await batch_service.create_job(body.file_paths)
 
     # Start processing in background
-    asyncio.create_task(
+    start_batch_task(
         batch_service.process_job(
             job.id,
             transcriber,
             history,
             broadcast,
             language=settings_service.get().language if settings_service else "auto",
+            worker_pool=await get_batch_worker_pool(),
         )
     )
 
@@ -785,13 +1328,26 @@ async def batch_create(request: Request, body: BatchCreateRequest):
 
 
 @app.get("/api/transcribe/batch")
-async def batch_list():
-    """List all batch transcription jobs."""
+async def batch_list(limit: int = 50, cursor: Optional[str] = None):
+    """
+    List batch transcription jobs, newest first.
+
+    Args:
+        limit: Maximum number of jobs to return
+        cursor: Optional cursor for pagination (from previous response's next_cursor)
+    """
     if not batch_service:
         raise HTTPException(status_code=503, detail="Batch service not initialized")
 
-    jobs = await batch_service.list_jobs()
-    return {"jobs": [j.to_dict() for j in jobs]}
+    try:
+        jobs = await batch_service.list_jobs(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_cursor = None
+    if jobs and len(jobs) == limit:
+        next_cursor = encode_cursor(jobs[-1].created_at, jobs[-1].id)
+    return {"jobs": [j.to_dict() for j in jobs], "next_cursor": next_cursor}
 
 
 @app.get("/api/transcribe/batch/{job_id}")
@@ -837,13 +1393,14 @@ async def batch_retry(job_id: str, file_ids: Optional[list[str]] = None):
         raise HTTPException(status_code=404, detail=str(e))
 
     # Start processing again
-    asyncio.create_task(
+    start_batch_task(
         batch_service.process_job(
             job.id,
             transcriber,
             history,
             broadcast,
             language=settings_service.get().language if settings_service else "auto",
+            worker_pool=await get_batch_worker_pool(),
         )
     )
 
@@ -879,6 +1436,8 @@ async def settings_get():
 @limiter.limit("20/minute")
 async def settings_update(request: Request, body: SettingsUpdateRequest):
     """Update settings."""
+    global grammar_processor
+
     if not settings_service:
         raise HTTPException(status_code=503, detail="Settings not initialized")
 
@@ -899,6 +1458,19 @@ async def settings_update(request: Request, body: SettingsUpdateRequest):
         or updates.get("compute_type") != old_settings.compute_type
     ) and any(k in updates for k in ["model_type", "model_name", "device", "compute_type"])
 
+    # Preload (or drop) the grammar model when its settings change
+    grammar_changed = (
+        new_settings.enable_grammar_correction != old_settings.enable_grammar_correction
+        or new_settings.grammar_model != old_settings.grammar_model
+        or new_settings.grammar_device != old_settings.grammar_device
+    )
+    if grammar_changed:
+        if new_settings.enable_grammar_correction:
+            start_grammar_preload(new_settings)
+        elif grammar_processor is not None:
+            grammar_processor.unload()
+            grammar_processor = None
+
     return {
         "status": "ok",
         "settings": new_settings.model_dump(),
@@ -1136,6 +1708,65 @@ async def models_by_type(model_type: str):
     }
 
 
+# --- Grammar Correction ---
+
+
+@app.get("/api/grammar/status")
+async def grammar_status():
+    """Get grammar model status, download progress, load time and memory use."""
+    enabled = settings_service.get().enable_grammar_correction if settings_service else False
+
+    return {
+        "enabled": enabled,
+        "processor": grammar_processor.get_info() if grammar_processor else None,
+    }
+
+
+@app.get("/api/grammar/models")
+async def grammar_models():
+    """List available grammar correction models."""
+    return {"models": get_available_grammar_models()}
+
+
+@app.post("/api/grammar/load")
+@limiter.limit("5/minute")
+async def grammar_load(request: Request):
+    """Start loading the configured grammar model in the background."""
+    if not settings_service:
+        raise HTTPException(status_code=503, detail="Settings not initialized")
+
+    if grammar_processor and (grammar_processor.is_preloading or grammar_processor.is_loaded):
+        return {"status": grammar_processor.status.value, "processor": grammar_processor.get_info()}
+
+    processor = start_grammar_preload(settings_service.get())
+    return {"status": "loading", "processor": processor.get_info()}
+
+
+@app.post("/api/grammar/unload")
+async def grammar_unload():
+    """Unload the grammar model to free memory, or cancel its download and load."""
+    if not grammar_processor:
+        raise HTTPException(status_code=400, detail="No grammar model loaded")
+
+    preloading = grammar_processor.is_preloading
+    grammar_processor.unload()  # Cancels a preload in progress
+    return {"status": "cancelled" if preloading else "unloaded"}
+
+
+# --- Metrics ---
+
+
+@app.get("/api/metrics")
+async def metrics_get(prefix: Optional[str] = None):
+    """
+    Get backend performance metrics (timings, counters, gauges).
+
+    Args:
+        prefix: Optional metric name prefix filter (e.g., "postprocess")
+    """
+    return metrics.snapshot(prefix=prefix)
+
+
 # --- Audio Devices ---
 
 
@@ -0,0 +1,254 @@
+"""
+Monthly archive files for old transcription history.
+
+Records older than the archive threshold are moved out of the main ("hot")
+history database into one SQLite file per UTC calendar month, so the
+default history views and backups of the hot database no longer pay for
+years of old transcriptions. Each archive file holds the transcriptions
+table, its created_at index and its own word index (transcriptions_fts,
+kept in sync by triggers inside the file). The index reads its content
+through the transcriptions_text view, which decodes compressed text (see
+compression.py), so the SQL functions of TextCodec must be registered on
+every connection using an archive file.
+
+HistoryService ATTACHes an archive file to its writer connection to move,
+update or delete archived rows. Reads go through ArchiveStore, which keeps a
+few read connections to archive files open; each aiosqlite connection runs
+on its own thread, so a search over many months queries them in parallel.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import aiosqlite
+
+from .sqlite import connect, to_epoch_ms
+
+logger = logging.getLogger(__name__)
+
+# Schema name of an archive file attached to the history writer connection
+ARCHIVE_SCHEMA = "archive"
+
+# Read connections kept open to archive files. At most this many archive
+# queries run at once; beyond it the least recently used idle connection
+# is closed when another file is opened.
+ARCHIVE_READ_CONNECTIONS = 8
+
+# Statements creating the schema of an archive file attached as {schema}.
+# Archives only carry the word index: substring searches scan the month with
+# LIKE, which is cheap at that size and keeps cold files small.
+_ARCHIVE_SCHEMA_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.transcriptions (
+        id TEXT PRIMARY KEY,
+        text TEXT NOT NULL,
+        duration_ms INTEGER,
+        model_used TEXT,
+        language TEXT,
+        created_at INTEGER NOT NULL,  -- Epoch milliseconds (UTC)
+        original_text TEXT
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS {schema}.idx_transcriptions_created_at
+    ON transcriptions(created_at DESC)
+    """,
+    """
+    CREATE VIEW IF NOT EXISTS {schema}.transcriptions_text AS
+    SELECT rowid AS rid, history_text(text) AS text,
+        history_original(original_text, text) AS original_text
+    FROM transcriptions
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS {schema}.transcriptions_fts
+    USING fts5(text, original_text, content=transcriptions_text, content_rowid=rid, prefix='2 3')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {schema}.transcriptions_ai AFTER INSERT ON transcriptions BEGIN
+        INSERT INTO transcriptions_fts(rowid, text, original_text)
+        VALUES (new.rowid, history_text(new.text), history_original(new.original_text, new.text));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {schema}.transcriptions_ad AFTER DELETE ON transcriptions BEGIN
+        INSERT INTO transcriptions_fts(transcriptions_fts, rowid, text, original_text)
+        VALUES ('delete', old.rowid, history_text(old.text),
+            history_original(old.original_text, old.text));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {schema}.transcriptions_au
+    AFTER UPDATE OF text, original_text ON transcriptions BEGIN
+        INSERT INTO transcriptions_fts(transcriptions_fts, rowid, text, original_text)
+        VALUES ('delete', old.rowid, history_text(old.text),
+            history_original(old.original_text, old.text));
+        INSERT INTO transcriptions_fts(rowid, text, original_text)
+        VALUES (new.rowid, history_text(new.text), history_original(new.original_text, new.text));
+    END
+    """,
+)
+
+
+def archive_schema_sql(schema: str = ARCHIVE_SCHEMA) -> "list[str]":
+    """Statements creating the archive schema in an attached file (idempotent)."""
+    return [statement.format(schema=schema) for statement in _ARCHIVE_SCHEMA_SQL]
+
+
+def archive_directory(db_path: Path) -> Path:
+    """Directory of the archive files of a history database (next to it)."""
+    return db_path.with_name(f"{db_path.stem}-archive")
+
+
+def month_of(epoch_ms: int) -> str:
+    """UTC calendar month ("YYYY-MM") of an epoch-ms timestamp."""
+    return datetime.fromtimestamp(epoch_ms / 1000, timezone.utc).strftime("%Y-%m")
+
+
+def month_range(month: str) -> tuple[int, int]:
+    """Epoch-ms range [start, end) of a "YYYY-MM" month (UTC)."""
+    year, number = (int(part) for part in month.split("-"))
+    start = datetime(year, number, 1, tzinfo=timezone.utc)
+    end = datetime(year + number // 12, number % 12 + 1, 1, tzinfo=timezone.utc)
+    return to_epoch_ms(start), to_epoch_ms(end)
+
+
+class ArchiveStore:
+    """
+    The monthly archive files of one history database.
+
+    Files are named YYYY-MM.db inside the archive directory. The list of
+    months is read once by scan() and kept up to date by add() and remove().
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        read_connections: int = ARCHIVE_READ_CONNECTIONS,
+        setup: Optional[Callable[[aiosqlite.Connection], Awaitable[None]]] = None,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory holding the archive files
+            read_connections: Read connections kept open to archive files
+            setup: Run on each read connection after opening it (e.g. to
+                register SQL functions)
+        """
+        self.directory = directory
+        self.read_connections = max(1, read_connections)
+        self._setup = setup
+        self._months: list[str] = []  # Newest first
+        self._readers: OrderedDict[str, aiosqlite.Connection] = OrderedDict()
+        self._in_use: dict[str, int] = {}
+        self._slots = asyncio.Semaphore(self.read_connections)
+        self._open_lock = asyncio.Lock()
+
+    @property
+    def months(self) -> "list[str]":
+        """Archived months, newest first."""
+        return list(self._months)
+
+    def path(self, month: str) -> Path:
+        """Path of the archive file for a month."""
+        return self.directory / f"{month}.db"
+
+    def scan(self) -> None:
+        """Read the list of archived months from the directory."""
+        if not self.directory.is_dir():
+            self._months = []
+            return
+        self._months = sorted((p.stem for p in self.directory.glob("????-??.db")), reverse=True)
+
+    def add(self, month: str) -> None:
+        """Register a month whose archive file was just created."""
+        if month not in self._months:
+            self._months.append(month)
+            self._months.sort(reverse=True)
+
+    def months_between(self, start_ms: Optional[int], end_ms: Optional[int]) -> "list[str]":
+        """Archived months overlapping the inclusive range [start_ms, end_ms]."""
+        months = []
+        for month in self._months:
+            month_start, month_end = month_range(month)
+            if start_ms is not None and month_end <= start_ms:
+                continue
+            if end_ms is not None and month_start > end_ms:
+                continue
+            months.append(month)
+        return months
+
+    async def fetch_all(self, month: str, sql: str, params: tuple = ()) -> list[aiosqlite.Row]:
+        """Run a read query on one archive file and return all rows."""
+        if month not in self._months:
+            return []
+        async with self._slots:
+            db = await self._reader(month)
+            self._in_use[month] = self._in_use.get(month, 0) + 1
+            try:
+                return list(await db.execute_fetchall(sql, params))
+            finally:
+                self._in_use[month] -= 1
+
+    async def fetch_each(
+        self, months: "list[str]", sql: str, params: tuple = ()
+    ) -> "list[list[aiosqlite.Row]]":
+        """Run the same read query on several archive files in parallel."""
+        return list(await asyncio.gather(*(self.fetch_all(m, sql, params) for m in months)))
+
+    async def _reader(self, month: str) -> aiosqlite.Connection:
+        """Get the read connection of a month, opening it if needed."""
+        db = self._readers.get(month)
+        if db is None:
+            async with self._open_lock:
+                db = self._readers.get(month)
+                if db is None:
+                    db = await connect(self.path(month), read_only=True)
+                    if self._setup is not None:
+                        await self._setup(db)
+                    self._readers[month] = db
+                    await self._close_idle(keep=month)
+        self._readers.move_to_end(month)
+        return db
+
+    async def _close_idle(self, keep: str) -> None:
+        """Close least recently used idle connections beyond the limit."""
+        for month in list(self._readers):
+            if len(self._readers) <= self.read_connections:
+                break
+            if month != keep and not self._in_use.get(month):
+                await self._readers.pop(month).close()
+
+    async def release(self, month: str) -> None:
+        """Close the read connection of a month once its queries finish."""
+        while self._in_use.get(month):
+            await asyncio.sleep(0.01)
+        db = self._readers.pop(month, None)
+        if db is not None:
+            await db.close()
+
+    async def remove(self, month: str) -> None:
+        """Delete the archive file of a month."""
+        await self.release(month)
+        if month in self._months:
+            self._months.remove(month)
+        path = self.path(month)
+        for file in (path, path.with_name(f"{path.name}-journal")):
+            file.unlink(missing_ok=True)
+        logger.info(f"Removed history archive {path}")
+
+    async def remove_all(self) -> None:
+        """Delete every archive file."""
+        for month in self.months:
+            await self.remove(month)
+
+    async def close(self) -> None:
+        """Close all read connections."""
+        for db in self._readers.values():
+            await db.close()
+        self._readers.clear()
+        self._in_use.clear()
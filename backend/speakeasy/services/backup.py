@@ -0,0 +1,516 @@
+"""
+Online backups of the SQLite databases: history, its monthly archive files
+and batch jobs.
+
+Databases are copied with SQLite's online backup API on a worker thread,
+BACKUP_STEP_PAGES pages per step, while the server keeps running. Each
+source connection holds one read transaction for the whole copy, so the copy
+is a consistent snapshot and concurrent writes never restart it. The read
+transactions of all files are opened together (while history writes are
+held off, when the server takes the backup), so the files of a backup match
+each other. In WAL mode a reader does not block the writer; files without
+WAL (batch jobs, archive files) are small and copied first, and each is
+released as soon as it is copied.
+
+A backup is a directory named after its UTC start time with the database
+files, optionally gzip- or zstd-compressed, and a manifest.json. It is
+written under a ".partial" name and renamed when complete; only the newest
+backups are kept. restore() uses the same mechanism in the other direction.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import shutil
+import sqlite3
+import time
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from .archive import archive_directory
+from .export import (
+    COMPRESSION_EXTENSIONS,
+    ExportCompression,
+    check_available,
+    create_compressor,
+    create_decompressor,
+)
+from .sqlite import BUSY_TIMEOUT_MS
+
+logger = logging.getLogger(__name__)
+
+# Pages copied per backup step (4 MiB at the default 4 KiB page size)
+BACKUP_STEP_PAGES = 1024
+
+# Backups kept by default; older ones are deleted after each new backup
+DEFAULT_BACKUP_KEEP = 5
+
+MANIFEST_NAME = "manifest.json"
+
+# Chunk size when (de)compressing backup files
+_FILE_CHUNK_BYTES = 1024 * 1024
+
+# Backup directory names: UTC start time, with a suffix if taken twice a second
+_BACKUP_NAME = re.compile(r"^\d{8}-\d{6}(-\d+)?$")
+
+_PARTIAL_SUFFIX = ".partial"
+
+
+@dataclass
+class BackupSource:
+    """A database file to back up, named by its path relative to the data directory."""
+
+    name: str
+    path: Path
+
+
+@dataclass
+class BackupInfo:
+    """A completed backup, as described by its manifest."""
+
+    name: str
+    created_at: datetime
+    compression: Optional[ExportCompression] = None
+    duration_ms: float = 0.0
+    databases: list[dict] = field(default_factory=list)
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes the backup takes on disk."""
+        return sum(database["stored_bytes"] for database in self.databases)
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for API response and the manifest."""
+        return {
+            "name": self.name,
+            "created_at": self.created_at.isoformat(),
+            "compression": self.compression.value if self.compression else None,
+            "duration_ms": round(self.duration_ms, 3),
+            "size_bytes": self.size_bytes,
+            "databases": self.databases,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BackupInfo":
+        """Create from a manifest."""
+        compression = data.get("compression")
+        return cls(
+            name=data["name"],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            compression=ExportCompression(compression) if compression else None,
+            duration_ms=data.get("duration_ms", 0.0),
+            databases=data.get("databases", []),
+        )
+
+
+def database_sources(db_path: Path, batch_db_path: Path) -> list[BackupSource]:
+    """
+    The existing database files of the app, relative to the history database.
+
+    Args:
+        db_path: History database
+        batch_db_path: Batch job database (in the same directory)
+    """
+    base = db_path.parent
+    paths = [db_path, *sorted(archive_directory(db_path).glob("????-??.db")), batch_db_path]
+    return [
+        BackupSource(path.relative_to(base).as_posix(), path) for path in paths if path.is_file()
+    ]
+
+
+def _connect_read_only(path: Path) -> sqlite3.Connection:
+    """Open a read-only connection usable from any thread."""
+    return sqlite3.connect(
+        f"{path.resolve().as_uri()}?mode=ro",
+        uri=True,
+        isolation_level=None,
+        check_same_thread=False,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+    )
+
+
+def _open_snapshot(path: Path) -> sqlite3.Connection:
+    """Open a read transaction on a database; backups copy what it sees."""
+    db = _connect_read_only(path)
+    try:
+        db.execute("BEGIN")
+        db.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+    except sqlite3.Error:
+        db.close()
+        raise
+    return db
+
+
+def _is_wal(db: sqlite3.Connection) -> bool:
+    """Check whether a database uses WAL journaling."""
+    return db.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+
+
+def _checkpoint(path: Path) -> None:
+    """
+    Checkpoint a WAL database without waiting on its writer (PASSIVE).
+
+    The WAL frames committed while a backup snapshot was open could not be
+    checkpointed; this moves them into the database on the backup thread
+    instead of in the writer's next commit.
+    """
+    db = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000)
+    try:
+        db.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+    except sqlite3.Error as e:
+        logger.debug(f"Could not checkpoint {path} after backup: {e}")
+    finally:
+        db.close()
+
+
+def _quick_check(db: sqlite3.Connection) -> None:
+    """Raise ValueError unless the database passes PRAGMA quick_check."""
+    result = db.execute("PRAGMA quick_check").fetchone()[0]
+    if result != "ok":
+        raise ValueError(f"Database check failed: {result}")
+
+
+def _transcode(source: Path, target: Path, coder, method: str) -> None:
+    """Stream a file through a (de)compressor."""
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        while chunk := src.read(_FILE_CHUNK_BYTES):
+            dst.write(getattr(coder, method)(chunk))
+        if method == "compress":
+            dst.write(coder.flush())
+
+
+def _remove_database(path: Path) -> None:
+    """Delete a database file with its journal files."""
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+class BackupService:
+    """
+    Takes, lists, rotates and restores backups of the app databases.
+
+    Only one backup or restore runs at a time.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        db_path: Path,
+        batch_db_path: Path,
+        keep: int = DEFAULT_BACKUP_KEEP,
+        step_pages: int = BACKUP_STEP_PAGES,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            directory: Directory holding the backups
+            db_path: History database (archive files are found next to it)
+            batch_db_path: Batch job database
+            keep: Number of backups kept
+            step_pages: Pages copied per backup step
+        """
+        self.directory = directory
+        self.db_path = db_path
+        self.batch_db_path = batch_db_path
+        self.keep = max(1, keep)
+        self.step_pages = step_pages
+        self._lock = asyncio.Lock()
+        self._progress = (0, 0)  # Pages copied, pages in total
+
+    @property
+    def running(self) -> bool:
+        """Check whether a backup or restore is in progress."""
+        return self._lock.locked()
+
+    def status(self) -> dict:
+        """Get progress and the list of backups for the API."""
+        copied, total = self._progress
+        return {
+            "running": self.running,
+            "copied_pages": copied,
+            "total_pages": total,
+            "keep": self.keep,
+            "backups": [backup.to_dict() for backup in self.list()],
+        }
+
+    def list(self) -> list[BackupInfo]:
+        """Completed backups, newest first."""
+        backups = []
+        if not self.directory.is_dir():
+            return backups
+        for manifest in self.directory.glob(f"*/{MANIFEST_NAME}"):
+            if not _BACKUP_NAME.match(manifest.parent.name):
+                continue
+            try:
+                backups.append(BackupInfo.from_dict(json.loads(manifest.read_text("utf-8"))))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable backup manifest {manifest}: {e}")
+        backups.sort(key=lambda backup: backup.created_at, reverse=True)
+        return backups
+
+    def get(self, name: str) -> Optional[BackupInfo]:
+        """Get a completed backup by name."""
+        return next((backup for backup in self.list() if backup.name == name), None)
+
+    async def create(
+        self,
+        compression: Optional[ExportCompression] = None,
+        pause_writes: Optional[Callable[[], AbstractAsyncContextManager]] = None,
+        keep: Optional[int] = None,
+    ) -> BackupInfo:
+        """
+        Back up all databases, then delete the oldest backups beyond `keep`.
+
+        Args:
+            compression: Compress the backup files
+            pause_writes: Returns a context manager holding off database
+                writes while the snapshots are opened (e.g.
+                HistoryService.writes_paused); held for milliseconds
+            keep: Number of backups kept (default: the service's)
+
+        Returns:
+            The new backup
+
+        Raises:
+            ValueError: If the compression needs a package that is not installed
+        """
+        check_available(compression=compression)
+        async with self._lock:
+            start = time.perf_counter()
+            created_at = datetime.now(timezone.utc)
+            name = self._new_name(created_at)
+            partial = self.directory / f"{name}{_PARTIAL_SUFFIX}"
+            partial.mkdir(parents=True)
+            sources = database_sources(self.db_path, self.batch_db_path)
+            try:
+                if pause_writes is not None:
+                    async with pause_writes():
+                        snapshots = await asyncio.to_thread(self._open_snapshots, sources)
+                else:
+                    snapshots = await asyncio.to_thread(self._open_snapshots, sources)
+                databases = await asyncio.to_thread(
+                    self._copy_snapshots, snapshots, partial, compression
+                )
+                backup = BackupInfo(
+                    name=name,
+                    created_at=created_at,
+                    compression=compression,
+                    duration_ms=(time.perf_counter() - start) * 1000,
+                    databases=databases,
+                )
+                (partial / MANIFEST_NAME).write_text(
+                    json.dumps(backup.to_dict(), indent=2), encoding="utf-8"
+                )
+                partial.rename(self.directory / name)
+            except BaseException:
+                await asyncio.to_thread(shutil.rmtree, partial, True)
+                raise
+            finally:
+                self._progress = (0, 0)
+            await asyncio.to_thread(self._rotate, max(1, keep) if keep else self.keep)
+
+        logger.info(
+            f"Backed up {len(databases)} databases to {self.directory / name} "
+            f"({backup.size_bytes / 1024**2:.1f} MB) in {backup.duration_ms:.0f}ms"
+        )
+        return backup
+
+    async def restore(self, name: str) -> BackupInfo:
+        """
+        Replace the databases with the contents of a backup.
+
+        Every file is checked before the first database is replaced; each is
+        then copied into its database in one write transaction. Database
+        files that are not in the backup (e.g. newer archive files) are
+        deleted. Stop the server first: its services keep state in memory.
+
+        Raises:
+            ValueError: If the backup does not exist, is damaged or needs a
+                package that is not installed
+        """
+        backup = self.get(name)
+        if backup is None:
+            raise ValueError(f"Backup not found: {name}")
+        check_available(compression=backup.compression)
+        async with self._lock:
+            try:
+                await asyncio.to_thread(self._restore, backup)
+            finally:
+                self._progress = (0, 0)
+        logger.info(f"Restored {len(backup.databases)} databases from backup {name}")
+        return backup
+
+    async def delete(self, name: str) -> bool:
+        """
+        Delete a backup.
+
+        Returns:
+            True if the backup existed
+        """
+        path = self.directory / name
+        if not _BACKUP_NAME.match(name) or not path.is_dir():
+            return False
+        async with self._lock:
+            await asyncio.to_thread(shutil.rmtree, path)
+        return True
+
+    def _new_name(self, created_at: datetime) -> str:
+        """A backup name not used yet."""
+        name = created_at.strftime("%Y%m%d-%H%M%S")
+        candidate, number = name, 1
+        while (self.directory / candidate).exists() or (
+            self.directory / f"{candidate}{_PARTIAL_SUFFIX}"
+        ).exists():
+            number += 1
+            candidate = f"{name}-{number}"
+        return candidate
+
+    @staticmethod
+    def _open_snapshots(
+        sources: "list[BackupSource]",
+    ) -> "list[tuple[BackupSource, sqlite3.Connection]]":
+        """Open a read transaction on every source, files without WAL first."""
+        snapshots = []
+        try:
+            for source in sources:
+                snapshots.append((source, _open_snapshot(source.path)))
+        except BaseException:
+            for _, db in snapshots:
+                db.close()
+            raise
+        # Writers of files without WAL wait while they are read: copy and
+        # release those first
+        snapshots.sort(key=lambda snapshot: _is_wal(snapshot[1]))
+        return snapshots
+
+    def _copy_snapshots(
+        self,
+        snapshots: "list[tuple[BackupSource, sqlite3.Connection]]",
+        target: Path,
+        compression: Optional[ExportCompression],
+    ) -> "list[dict]":
+        """Copy open snapshots into a backup directory (worker thread)."""
+        total = sum(db.execute("PRAGMA page_count").fetchone()[0] for _, db in snapshots)
+        self._progress = (0, total)
+        databases = []
+        try:
+            while snapshots:
+                source, snapshot = snapshots.pop(0)
+                databases.append(self._copy_snapshot(source, snapshot, target, compression))
+        finally:
+            for _, snapshot in snapshots:
+                snapshot.close()
+        return databases
+
+    def _copy_snapshot(
+        self,
+        source: BackupSource,
+        snapshot: sqlite3.Connection,
+        target: Path,
+        compression: Optional[ExportCompression],
+    ) -> dict:
+        """Copy one snapshot (and close it) into a backup directory and describe the file."""
+        path = target / source.name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        copied_before = self._progress[0]
+
+        def progress(status: int, remaining: int, pages: int) -> None:
+            self._progress = (copied_before + pages - remaining, self._progress[1])
+
+        copy = sqlite3.connect(path)
+        try:
+            try:
+                wal = _is_wal(snapshot)
+                snapshot.backup(copy, pages=self.step_pages, progress=progress)
+            finally:
+                snapshot.close()
+            if wal:
+                _checkpoint(source.path)
+            # A backup file stands alone: no WAL next to it
+            copy.execute("PRAGMA journal_mode=DELETE").fetchone()
+            _quick_check(copy)
+            pages = copy.execute("PRAGMA page_count").fetchone()[0]
+            page_size = copy.execute("PRAGMA page_size").fetchone()[0]
+        finally:
+            copy.close()
+
+        stored = path
+        if compression is not None:
+            stored = path.with_name(f"{path.name}.{COMPRESSION_EXTENSIONS[compression]}")
+            _transcode(path, stored, create_compressor(compression), "compress")
+            path.unlink()
+        return {
+            "name": source.name,
+            "file": stored.relative_to(target).as_posix(),
+            "pages": pages,
+            "page_size": page_size,
+            "size_bytes": pages * page_size,
+            "stored_bytes": stored.stat().st_size,
+        }
+
+    def _restore(self, backup: BackupInfo) -> None:
+        """Check all files of a backup, then copy them over the databases (worker thread)."""
+        base = self.db_path.parent
+        source_dir = self.directory / backup.name
+        sources = []  # (database path, file to copy from, temporary)
+        try:
+            for database in backup.databases:
+                stored = source_dir / database["file"]
+                path = base / database["name"]
+                if backup.compression is not None:
+                    copy_from = path.with_name(f"{path.name}.restore")
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    sources.append((path, copy_from, True))
+                    decompressor = create_decompressor(backup.compression)
+                    _transcode(stored, copy_from, decompressor, "decompress")
+                else:
+                    sources.append((path, stored, False))
+                db = _connect_read_only(sources[-1][1])
+                try:
+                    _quick_check(db)
+                except ValueError as e:
+                    raise ValueError(f"Backup file {stored} is damaged: {e}") from None
+                finally:
+                    db.close()
+
+            self._progress = (0, sum(database["pages"] for database in backup.databases))
+            for path, copy_from, _ in sources:
+                self._restore_file(copy_from, path)
+
+            restored = {database["name"] for database in backup.databases}
+            for source in database_sources(self.db_path, self.batch_db_path):
+                if source.name not in restored:
+                    _remove_database(source.path)
+        finally:
+            for _, copy_from, temporary in sources:
+                if temporary:
+                    _remove_database(copy_from)
+
+    def _restore_file(self, copy_from: Path, path: Path) -> None:
+        """Copy a backup file into a database with the backup API."""
+        copied_before = self._progress[0]
+
+        def progress(status: int, remaining: int, pages: int) -> None:
+            self._progress = (copied_before + pages - remaining, self._progress[1])
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        source = _connect_read_only(copy_from)
+        target = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000)
+        try:
+            source.backup(target, pages=self.step_pages, progress=progress)
+        finally:
+            target.close()
+            source.close()
+
+    def _rotate(self, keep: int) -> None:
+        """Delete backups beyond the newest `keep` and leftovers of failed ones."""
+        for backup in self.list()[keep:]:
+            shutil.rmtree(self.directory / backup.name, ignore_errors=True)
+            logger.info(f"Deleted old backup {backup.name}")
+        for partial in self.directory.glob(f"*{_PARTIAL_SUFFIX}"):
+            shutil.rmtree(partial, ignore_errors=True)
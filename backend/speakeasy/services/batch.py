@@ -2,16 +2,30 @@
 Batch transcription service for processing multiple audio files.
 
 Supports:
-- Job queue with SQLite persistence
-- Sequential file processing with progress updates
+- Job queue with SQLite persistence (only pending and processing jobs are
+  kept in memory; finished jobs are read from the database on demand)
+- Pipelined file processing: audio is decoded ahead on a thread pool,
+  files are transcribed in order, and results are persisted while the next
+  file is transcribed
+- On CPU hosts, optionally a pool of worker processes with one model replica
+  each (see worker_pool.py), transcribing several files at once
 - Per-file error handling
-- WebSocket progress broadcasting
+- Crash-safe resume: jobs interrupted by a shutdown are reset to pending at
+  startup for the server to restart, finished files are not transcribed
+  again, and the chunk texts of long files are checkpointed as they complete
+- Batched status writes (one transaction per flush) and rate-limited
+  WebSocket progress broadcasting
 - Job cancellation
 """
 
 import asyncio
+import functools
 import logging
+import math
+import os
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
@@ -20,6 +34,11 @@ from typing import Any, Callable, Optional
 
 import aiosqlite
 
+from ..utils.metrics import metrics
+from .history import decode_cursor
+from .sqlite import ISO_TO_EPOCH_MS_SQL, from_epoch_ms, to_epoch_ms
+from .worker_pool import CpuWorkerPool
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,6 +62,61 @@ class BatchFileStatus(str, Enum):
     SKIPPED = "skipped"
 
 
+# Decode stage: threads decoding the next files of a job, how many files may
+# be decoded or decoding ahead of the model, and how much decoded audio may
+# wait (float32 at 16 kHz is 3.8 MB per minute)
+DEFAULT_DECODE_WORKERS = min(4, os.cpu_count() or 1)
+DECODE_AHEAD_FILES = 8
+DECODE_AHEAD_MAX_BYTES = 256 * 1024 * 1024
+
+# Transcribed files waiting for the persist stage
+PERSIST_QUEUE_SIZE = 64
+
+# Stages of process_job(), for busy times and utilization
+PIPELINE_STAGES = ("decode", "inference", "persist")
+
+# Status writes of running jobs are committed in one transaction once this
+# many are queued, or this long after the first queued one
+STATUS_WRITE_BATCH_SIZE = 200
+STATUS_FLUSH_INTERVAL_MS = 250
+
+# batch_progress events of a job are sent at most this often; newer events
+# replace one that is waiting, and the final event is sent at once
+PROGRESS_INTERVAL_MS = 100
+
+_UPDATE_JOB_SQL = """
+    UPDATE batch_jobs
+    SET status = ?, completed_at = ?, current_file_index = ?
+    WHERE id = ?
+"""
+
+_UPDATE_FILE_SQL = """
+    UPDATE batch_files
+    SET status = ?, error = ?, transcription_id = ?
+    WHERE id = ?
+"""
+
+_SAVE_CHUNK_SQL = """
+    INSERT OR REPLACE INTO batch_chunks (file_id, chunk_index, text) VALUES (?, ?, ?)
+"""
+
+_DELETE_CHUNKS_SQL = "DELETE FROM batch_chunks WHERE file_id = ?"
+
+# Jobs in these states stay in memory until they finish
+ACTIVE_STATUSES = (BatchJobStatus.PENDING, BatchJobStatus.PROCESSING)
+
+# Jobs selected by a subquery, joined with their files in insertion order
+# (one row per file, or one row with NULL file columns for a job without files)
+_JOBS_WITH_FILES_SQL = """
+    SELECT j.id, j.status, j.created_at, j.completed_at, j.current_file_index,
+           f.id AS file_id, f.filename, f.file_path, f.status AS file_status,
+           f.error, f.transcription_id
+    FROM ({jobs}) j
+    LEFT JOIN batch_files f ON f.job_id = j.id
+    ORDER BY j.created_at DESC, j.id DESC, f.rowid
+"""
+
+
 @dataclass
 class BatchFile:
     """A file in a batch transcription job."""
@@ -95,6 +169,237 @@ class BatchJob:
         }
 
 
+def _jobs_from_rows(rows: "list[aiosqlite.Row]") -> "list[BatchJob]":
+    """Build jobs with their files from rows of _JOBS_WITH_FILES_SQL."""
+    jobs: dict[str, BatchJob] = {}
+    for row in rows:
+        job = jobs.get(row["id"])
+        if job is None:
+            job = BatchJob(
+                id=row["id"],
+                status=BatchJobStatus(row["status"]),
+                created_at=from_epoch_ms(row["created_at"]),
+                completed_at=from_epoch_ms(row["completed_at"])
+                if row["completed_at"] is not None
+                else None,
+                current_file_index=row["current_file_index"],
+            )
+            jobs[job.id] = job
+        if row["file_id"] is not None:
+            job.files.append(
+                BatchFile(
+                    id=row["file_id"],
+                    job_id=job.id,
+                    filename=row["filename"],
+                    file_path=row["file_path"],
+                    status=BatchFileStatus(row["file_status"]),
+                    error=row["error"],
+                    transcription_id=row["transcription_id"],
+                )
+            )
+    return list(jobs.values())
+
+
+@dataclass
+class _JobRun:
+    """Counts and per-stage busy time of one process_job() run."""
+
+    completed: int = 0
+    failed: int = 0
+    busy_s: dict[str, float] = field(default_factory=lambda: dict.fromkeys(PIPELINE_STAGES, 0.0))
+
+    def utilization(
+        self, elapsed_s: float, decode_workers: int, replicas: int = 1
+    ) -> dict[str, float]:
+        """Share of the run each stage was busy (averaged over its threads or replicas)."""
+        if elapsed_s <= 0:
+            return dict.fromkeys(PIPELINE_STAGES, 0.0)
+        capacity = {"decode": max(decode_workers, 1), "inference": max(replicas, 1)}
+        return {
+            stage: round(min(busy / (elapsed_s * capacity.get(stage, 1)), 1.0), 3)
+            for stage, busy in self.busy_s.items()
+        }
+
+
+class AudioPrefetcher:
+    """
+    Decode stage of process_job(): decodes the files of a job ahead of the model.
+
+    Files are decoded in job order on a thread pool, one per thread at a
+    time. A file is only started while fewer than max_ahead files are
+    decoding or decoded and waiting, and while the waiting audio is under
+    max_bytes, so decoded audio stays under max_bytes plus one file per
+    thread.
+    """
+
+    def __init__(
+        self,
+        load_fn: Callable[[str], Any],
+        paths: "list[str]",
+        run: _JobRun,
+        workers: int = DEFAULT_DECODE_WORKERS,
+        max_ahead: int = DECODE_AHEAD_FILES,
+        max_bytes: int = DECODE_AHEAD_MAX_BYTES,
+    ):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            load_fn: Decodes a file path to audio samples (numpy array)
+            paths: Paths of the job's files, in order
+            run: Run whose decode busy time is updated
+            workers: Number of decode threads
+            max_ahead: Maximum files decoding or decoded and not yet taken
+            max_bytes: Decoded audio that may wait before no more files are started
+        """
+        self._load = load_fn
+        self._paths = paths
+        self._run = run
+        self.workers = max(1, workers)
+        self.max_ahead = max(1, max_ahead)
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="batch-decode")
+        self._futures: dict[int, asyncio.Future] = {}
+        self._next = 0  # Index of the next file to start
+        self._decoding = 0  # Files being decoded
+        self._ready_sizes: dict[int, int] = {}  # Bytes of the decoded files not yet taken
+        self.ready_bytes = 0  # Decoded audio not yet taken
+
+    def _decode(self, path: str) -> tuple[Any, float]:
+        """Decode one file on a pool thread; returns the audio and the seconds it took."""
+        start = time.perf_counter()
+        audio = self._load(path)
+        elapsed = time.perf_counter() - start
+        metrics.record_timing("batch.decode", elapsed * 1000)
+        return audio, elapsed
+
+    def _fill(self) -> None:
+        """Start decoding further files while the bounds allow."""
+        loop = asyncio.get_running_loop()
+        while (
+            self._next < len(self._paths)
+            and self._decoding < self.workers
+            and len(self._futures) < self.max_ahead
+            and self.ready_bytes < self.max_bytes
+        ):
+            future = loop.run_in_executor(self._executor, self._decode, self._paths[self._next])
+            future.add_done_callback(functools.partial(self._decoded, self._next))
+            self._futures[self._next] = future
+            self._decoding += 1
+            self._next += 1
+
+    def _decoded(self, index: int, future: asyncio.Future) -> None:
+        """Account for a finished decode and start the next files."""
+        self._decoding -= 1
+        if future.cancelled():
+            return
+        if future.exception() is None:
+            audio, elapsed = future.result()
+            self._run.busy_s["decode"] += elapsed
+            # get() may have taken the audio before this callback ran
+            if index in self._futures:
+                self._ready_sizes[index] = audio.nbytes
+                self.ready_bytes += audio.nbytes
+        if self._futures:
+            self._fill()
+
+    async def get(self, index: int) -> Any:
+        """
+        Get the decoded audio of a file, waiting for its decode if needed.
+
+        Files must be taken in order. Raises the decoder's exception if the
+        file could not be decoded.
+        """
+        if index not in self._futures:
+            self._fill()
+        future = self._futures[index]
+        try:
+            audio, _ = await asyncio.shield(future)
+        finally:
+            del self._futures[index]
+            self.ready_bytes -= self._ready_sizes.pop(index, 0)
+            self._fill()
+        return audio
+
+    async def load(self, index: int) -> Any:
+        """Decode a file again (for a retry), on the decode pool."""
+        loop = asyncio.get_running_loop()
+        audio, elapsed = await loop.run_in_executor(
+            self._executor, self._decode, self._paths[index]
+        )
+        self._run.busy_s["decode"] += elapsed
+        return audio
+
+    def close(self) -> None:
+        """Stop decoding: queued files are dropped, running decodes finish in the background."""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ProgressThrottle:
+    """
+    Coalesces the batch_progress events of one job to one per interval.
+
+    An event is broadcast at once when the previous one went out at least
+    interval_ms ago. Otherwise it waits for the rest of the interval, and
+    a newer event replaces it. A final event is broadcast at once, after
+    the waiting event and any broadcast still in flight, so the last state
+    always arrives last.
+    """
+
+    def __init__(self, broadcast_fn: Callable, interval_ms: int = PROGRESS_INTERVAL_MS):
+        """
+        Initialize the throttle.
+
+        Args:
+            broadcast_fn: Async function for WebSocket broadcasting
+            interval_ms: Minimum time between two broadcasts
+        """
+        self._broadcast = broadcast_fn
+        self.interval = interval_ms / 1000
+        self._waiting: Optional[dict] = None
+        self._last_sent = -math.inf
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.sent = 0
+
+    async def send(self, data: dict, final: bool = False) -> None:
+        """Broadcast a progress event, or queue it until the interval has passed."""
+        if final:
+            await self._flush()
+            self._waiting = data
+            await self._flush()
+            return
+        self._waiting = data
+        if self._timer is None:
+            delay = self._last_sent + self.interval - time.monotonic()
+            if delay <= 0:
+                await self._flush()
+            else:
+                self._timer = asyncio.create_task(self._send_later(delay))
+
+    async def _send_later(self, delay: float) -> None:
+        """Broadcast the waiting event after a delay."""
+        await asyncio.sleep(delay)
+        self._timer = None
+        try:
+            await self._flush()
+        except Exception as e:
+            logger.warning(f"Progress broadcast failed: {e}")
+
+    async def _flush(self) -> None:
+        """Broadcast the waiting event, if any."""
+        async with self._lock:
+            data, self._waiting = self._waiting, None
+            if data is None:
+                return
+            self._last_sent = time.monotonic()
+            self.sent += 1
+            await self._broadcast("batch_progress", data)
+
+
 class BatchService:
     """
     Service for managing batch transcription jobs.
@@ -102,23 +407,53 @@ class BatchService:
     Features:
     - Job creation and management
     - Sequential file processing
-    - Progress broadcasting via WebSocket
+    - Progress broadcasting via WebSocket, at most one event per job every
+      PROGRESS_INTERVAL_MS
+    - Status writes of running jobs queued and committed in batches
     - Cancellation support
     - SQLite persistence
     """
 
-    def __init__(self, db_path: Path):
+    def __init__(
+        self,
+        db_path: Path,
+        status_batch_size: int = STATUS_WRITE_BATCH_SIZE,
+        status_flush_interval_ms: int = STATUS_FLUSH_INTERVAL_MS,
+        progress_interval_ms: int = PROGRESS_INTERVAL_MS,
+        decode_workers: int = DEFAULT_DECODE_WORKERS,
+        decode_ahead_bytes: int = DECODE_AHEAD_MAX_BYTES,
+    ):
         """
         Initialize the batch service.
 
         Args:
             db_path: Path to the SQLite database file
+            status_batch_size: Queued status writes before a flush is forced
+            status_flush_interval_ms: Maximum time a queued status write waits
+            progress_interval_ms: Minimum time between two batch_progress
+                events of a job
+            decode_workers: Threads decoding the next files of a job
+            decode_ahead_bytes: Decoded audio that may wait for the model
         """
         self.db_path = db_path
         self._db: Optional[aiosqlite.Connection] = None
+        # Pending and processing jobs, and their per-job state
         self._jobs: dict[str, BatchJob] = {}
         self._cancel_flags: dict[str, bool] = {}
         self._processing_locks: dict[str, asyncio.Lock] = {}
+        self._last_created_ms = 0  # created_at of the newest job
+        self._interrupted: list[str] = []  # Active jobs found at startup
+
+        # Queued status writes, keyed by ID; the state at flush time is written
+        self.status_batch_size = max(1, status_batch_size)
+        self.status_flush_interval_ms = status_flush_interval_ms
+        self.progress_interval_ms = progress_interval_ms
+        self.decode_workers = decode_workers
+        self.decode_ahead_bytes = decode_ahead_bytes
+        self._pending_jobs: dict[str, BatchJob] = {}
+        self._pending_files: dict[str, BatchFile] = {}
+        self._flush_timer: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
 
     async def initialize(self) -> None:
         """Initialize the database and create tables if needed."""
@@ -132,8 +467,8 @@ class BatchService:
             CREATE TABLE IF NOT EXISTS batch_jobs (
                 id TEXT PRIMARY KEY,
                 status TEXT NOT NULL DEFAULT 'pending',
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                completed_at DATETIME,
+                created_at INTEGER NOT NULL,  -- Epoch milliseconds (UTC)
+                completed_at INTEGER,
                 current_file_index INTEGER DEFAULT 0
             )
         """)
@@ -157,57 +492,199 @@ class BatchService:
             CREATE INDEX IF NOT EXISTS idx_batch_files_job_id ON batch_files(job_id)
         """)
 
+        # Newest-first job pages (keyset on created_at, id)
+        await self._db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_batch_jobs_created_at ON batch_jobs(created_at, id)
+        """)
+
+        # Texts of the transcribed chunks of long files, until the file completes
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS batch_chunks (
+                file_id TEXT NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (file_id, chunk_index)
+            ) WITHOUT ROWID
+        """)
+
         await self._db.commit()
 
-        # Load existing jobs into memory
-        await self._load_jobs_from_db()
+        # Run migrations for existing databases
+        await self._migrate_schema()
+
+        # Load unfinished jobs into memory; they were interrupted
+        await self._load_active_jobs()
+        await self._recover_interrupted_jobs()
 
         logger.info(f"Batch service initialized at {self.db_path}")
 
-    async def _load_jobs_from_db(self) -> None:
-        """Load jobs from database into memory."""
+    async def _migrate_schema(self) -> None:
+        """Run schema migrations for existing databases."""
         if not self._db:
             return
 
-        cursor = await self._db.execute("SELECT * FROM batch_jobs ORDER BY created_at DESC")
-        rows = await cursor.fetchall()
+        cursor = await self._db.execute("PRAGMA user_version")
+        version = (await cursor.fetchone())[0]
+
+        if version < 1:
+            # created_at/completed_at were ISO text; convert them in place.
+            # Batch tables are small, so one transaction is enough.
+            await self._db.execute(f"""
+                UPDATE batch_jobs
+                SET created_at = {ISO_TO_EPOCH_MS_SQL.format(column="created_at")}
+                WHERE typeof(created_at) = 'text'
+            """)
+            await self._db.execute(f"""
+                UPDATE batch_jobs
+                SET completed_at = {ISO_TO_EPOCH_MS_SQL.format(column="completed_at")}
+                WHERE typeof(completed_at) = 'text'
+            """)
+            await self._db.execute("PRAGMA user_version = 1")
+            await self._db.commit()
+            logger.info("Migration complete: batch job timestamps converted to epoch milliseconds")
+
+    async def _load_active_jobs(self) -> None:
+        """Load pending and processing jobs with their files into memory."""
+        if not self._db:
+            return
 
-        for row in rows:
-            job = BatchJob(
-                id=row["id"],
-                status=BatchJobStatus(row["status"]),
-                created_at=datetime.fromisoformat(row["created_at"]),
-                completed_at=datetime.fromisoformat(row["completed_at"])
-                if row["completed_at"]
-                else None,
-                current_file_index=row["current_file_index"],
+        statuses = ", ".join(f"'{status.value}'" for status in ACTIVE_STATUSES)
+        rows = await self._db.execute_fetchall(
+            _JOBS_WITH_FILES_SQL.format(
+                jobs=f"SELECT * FROM batch_jobs WHERE status IN ({statuses})"
             )
+        )
+        for job in _jobs_from_rows(rows):
+            self._jobs[job.id] = job
+
+        row = await (await self._db.execute("SELECT MAX(created_at) FROM batch_jobs")).fetchone()
+        self._last_created_ms = row[0] or 0
 
-            # Load files for this job
-            file_cursor = await self._db.execute(
-                "SELECT * FROM batch_files WHERE job_id = ?",
-                (job.id,),
+    async def _recover_interrupted_jobs(self) -> None:
+        """
+        Reset the jobs that were pending or processing when the service stopped.
+
+        No job runs yet, so every loaded job was interrupted: its job and the
+        file it was on go back to pending, and its ID is kept for
+        pop_interrupted_jobs(). Completed and failed files keep their status.
+        """
+        for job in self._jobs.values():
+            done = 0
+            for bf in job.files:
+                if bf.status == BatchFileStatus.PROCESSING:
+                    bf.status = BatchFileStatus.PENDING
+                    self._pending_files[bf.id] = bf
+                elif bf.status != BatchFileStatus.PENDING:
+                    done += 1
+            if job.status != BatchJobStatus.PENDING:
+                job.status = BatchJobStatus.PENDING
+                self._pending_jobs[job.id] = job
+            self._interrupted.append(job.id)
+            logger.info(
+                f"Recovered interrupted batch job {job.id} ({done}/{len(job.files)} files done)"
             )
-            file_rows = await file_cursor.fetchall()
+        await self.flush()
 
-            job.files = [
-                BatchFile(
-                    id=fr["id"],
-                    job_id=fr["job_id"],
-                    filename=fr["filename"],
-                    file_path=fr["file_path"],
-                    status=BatchFileStatus(fr["status"]),
-                    error=fr["error"],
-                    transcription_id=fr["transcription_id"],
-                )
-                for fr in file_rows
-            ]
+    def pop_interrupted_jobs(self) -> "list[str]":
+        """
+        Take the IDs of the jobs that were interrupted by the last shutdown.
 
-            self._jobs[job.id] = job
+        They are pending again and can be restarted with process_job(),
+        which continues where they stopped. Returns each ID once.
+        """
+        job_ids, self._interrupted = self._interrupted, []
+        return job_ids
+
+    async def _load_chunks(self, job: BatchJob) -> dict[str, "list[str]"]:
+        """Checkpointed chunk texts of a job's files, by file ID (a contiguous prefix each)."""
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+
+        rows = await self._db.execute_fetchall(
+            """
+            SELECT c.file_id, c.chunk_index, c.text
+            FROM batch_chunks c JOIN batch_files f ON f.id = c.file_id
+            WHERE f.job_id = ?
+            ORDER BY c.file_id, c.chunk_index
+            """,
+            (job.id,),
+        )
+        chunks: dict[str, list[str]] = {}
+        for file_id, chunk_index, text in rows:
+            texts = chunks.setdefault(file_id, [])
+            if chunk_index == len(texts):
+                texts.append(text)
+        return chunks
+
+    async def _save_chunk(
+        self,
+        job: BatchJob,
+        bf: BatchFile,
+        done: int,
+        total: int,
+        text: str,
+        progress: "ProgressThrottle",
+        run: _JobRun,
+    ) -> None:
+        """
+        Checkpoint the text of a file's chunk and report the chunk's progress.
+
+        Committed at once: chunks of long files take minutes each, so a
+        restart recomputes at most the chunk that was running.
+        """
+        if total <= 1 or not self._db:
+            return  # Not a chunked file
+        async with self._write_lock:
+            await self._db.execute(_SAVE_CHUNK_SQL, (bf.id, done - 1, text))
+            await self._db.commit()
+        metrics.increment("batch.chunk_checkpoints")
+
+        await progress.send(
+            {
+                "job_id": job.id,
+                "status": job.status.value,
+                "current_file": bf.filename,
+                "current_index": run.completed + run.failed,
+                "total_files": len(job.files),
+                "completed": run.completed,
+                "failed": run.failed,
+                "chunk": done,
+                "total_chunks": total,
+            },
+        )
+
+    async def _load_job(self, job_id: str) -> Optional[BatchJob]:
+        """Read a job with its files from the database."""
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+
+        rows = await self._db.execute_fetchall(
+            _JOBS_WITH_FILES_SQL.format(jobs="SELECT * FROM batch_jobs WHERE id = ?"),
+            (job_id,),
+        )
+        jobs = _jobs_from_rows(rows)
+        return jobs[0] if jobs else None
+
+    def _release(self, job: BatchJob) -> None:
+        """
+        Drop a finished job and its per-job state from memory.
+
+        Jobs still being processed are kept until process_job() returns.
+        """
+        lock = self._processing_locks.get(job.id)
+        if job.status in ACTIVE_STATUSES or (lock is not None and lock.locked()):
+            return
+        self._jobs.pop(job.id, None)
+        self._cancel_flags.pop(job.id, None)
+        self._processing_locks.pop(job.id, None)
 
     async def close(self) -> None:
-        """Close the database connection."""
+        """Commit queued status writes and close the database connection."""
         if self._db:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write batch status on close: {e}")
             await self._db.close()
             self._db = None
 
@@ -227,8 +704,13 @@ class BatchService:
         if not file_paths:
             raise ValueError("At least one file path is required")
 
+        # Millisecond precision, as stored, and distinct from the previous
+        # job's so jobs created in the same millisecond list in order
+        created_ms = max(to_epoch_ms(datetime.now(timezone.utc)), self._last_created_ms + 1)
+        self._last_created_ms = created_ms
+
         job_id = str(uuid.uuid4())
-        job = BatchJob(id=job_id)
+        job = BatchJob(id=job_id, created_at=from_epoch_ms(created_ms))
 
         # Create files for the job
         for file_path in file_paths:
@@ -248,7 +730,7 @@ class BatchService:
             INSERT INTO batch_jobs (id, status, created_at, current_file_index)
             VALUES (?, ?, ?, ?)
             """,
-            (job.id, job.status.value, job.created_at, job.current_file_index),
+            (job.id, job.status.value, to_epoch_ms(job.created_at), job.current_file_index),
         )
 
         for bf in job.files:
@@ -269,34 +751,60 @@ class BatchService:
 
         return job
 
+    @property
+    def is_processing(self) -> bool:
+        """Check whether any job is currently being processed."""
+        return any(lock.locked() for lock in self._processing_locks.values())
+
     async def get_job(self, job_id: str) -> Optional[BatchJob]:
         """
         Get a job by ID.
 
+        Pending and processing jobs are served from memory, finished ones
+        are read from the database.
+
         Args:
             job_id: The job ID
 
         Returns:
             The BatchJob or None if not found
         """
-        return self._jobs.get(job_id)
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        return await self._load_job(job_id)
 
-    async def list_jobs(self, limit: int = 50) -> list[BatchJob]:
+    async def list_jobs(self, limit: int = 50, cursor: Optional[str] = None) -> list[BatchJob]:
         """
-        List all jobs.
+        List jobs, newest first.
+
+        Pages are read from the database with their files in one query;
+        pending and processing jobs are returned as their in-memory objects.
 
         Args:
             limit: Maximum number of jobs to return
+            cursor: Only return jobs created before the one this cursor was
+                encoded from (encode_cursor() of the last job of a page)
 
         Returns:
             List of BatchJob objects
+
+        Raises:
+            ValueError: If the cursor is invalid
         """
-        jobs = sorted(
-            self._jobs.values(),
-            key=lambda j: j.created_at,
-            reverse=True,
-        )
-        return jobs[:limit]
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+
+        jobs_sql = "SELECT * FROM batch_jobs"
+        params: list = []
+        if cursor:
+            jobs_sql += " WHERE (created_at, id) < (?, ?)"
+            params.extend(decode_cursor(cursor))
+        jobs_sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        rows = await self._db.execute_fetchall(_JOBS_WITH_FILES_SQL.format(jobs=jobs_sql), params)
+        return [self._jobs.get(job.id, job) for job in _jobs_from_rows(rows)]
 
     async def cancel_job(self, job_id: str) -> bool:
         """
@@ -322,11 +830,11 @@ class BatchService:
         # Set cancel flag
         self._cancel_flags[job_id] = True
 
-        # Mark remaining pending files as skipped
+        # Mark remaining pending files as skipped, written with the job
         for bf in job.files:
             if bf.status == BatchFileStatus.PENDING:
                 bf.status = BatchFileStatus.SKIPPED
-                await self._update_file_status(bf)
+                self._pending_files[bf.id] = bf
 
         job.status = BatchJobStatus.CANCELLED
         job.completed_at = datetime.now(timezone.utc)
@@ -337,34 +845,88 @@ class BatchService:
         return True
 
     async def _update_job_status(self, job: BatchJob) -> None:
-        """Update job status in database."""
-        if not self._db:
-            return
-
-        await self._db.execute(
-            """
-            UPDATE batch_jobs 
-            SET status = ?, completed_at = ?, current_file_index = ?
-            WHERE id = ?
-            """,
-            (job.status.value, job.completed_at, job.current_file_index, job.id),
-        )
-        await self._db.commit()
+        """Write job status to the database now, with any queued status writes."""
+        self._pending_jobs[job.id] = job
+        await self.flush()
+        self._release(job)
 
     async def _update_file_status(self, bf: BatchFile) -> None:
-        """Update file status in database."""
-        if not self._db:
-            return
+        """Write file status to the database now, with any queued status writes."""
+        self._pending_files[bf.id] = bf
+        await self.flush()
+
+    async def _queue_status(self, job: BatchJob, bf: BatchFile) -> None:
+        """Queue status writes of a running job and the file it is on."""
+        self._pending_jobs[job.id] = job
+        self._pending_files[bf.id] = bf
+        if len(self._pending_jobs) + len(self._pending_files) >= self.status_batch_size:
+            await self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        """Flush queued status writes after the flush interval."""
+        await asyncio.sleep(self.status_flush_interval_ms / 1000)
+        self._flush_timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Batch status flush failed: {e}")
+
+    async def flush(self) -> int:
+        """
+        Write all queued job and file statuses in a single transaction.
 
-        await self._db.execute(
-            """
-            UPDATE batch_files 
-            SET status = ?, error = ?, transcription_id = ?
-            WHERE id = ?
-            """,
-            (bf.status.value, bf.error, bf.transcription_id, bf.id),
-        )
-        await self._db.commit()
+        Returns:
+            Number of rows written
+        """
+        if not self._db:
+            return 0
+
+        if self._flush_timer is not None and self._flush_timer is not asyncio.current_task():
+            self._flush_timer.cancel()
+        self._flush_timer = None
+
+        async with self._write_lock:
+            jobs = list(self._pending_jobs.values())
+            files = list(self._pending_files.values())
+            if not jobs and not files:
+                return 0
+            self._pending_jobs.clear()
+            self._pending_files.clear()
+
+            try:
+                await self._db.executemany(
+                    _UPDATE_FILE_SQL,
+                    [(bf.status.value, bf.error, bf.transcription_id, bf.id) for bf in files],
+                )
+                await self._db.executemany(
+                    _DELETE_CHUNKS_SQL,
+                    [(bf.id,) for bf in files if bf.status == BatchFileStatus.COMPLETED],
+                )
+                await self._db.executemany(
+                    _UPDATE_JOB_SQL,
+                    [
+                        (
+                            job.status.value,
+                            to_epoch_ms(job.completed_at) if job.completed_at else None,
+                            job.current_file_index,
+                            job.id,
+                        )
+                        for job in jobs
+                    ],
+                )
+                await self._db.commit()
+            except Exception:
+                # Requeue unless newer writes replaced them meanwhile
+                await self._db.rollback()
+                for job in jobs:
+                    self._pending_jobs.setdefault(job.id, job)
+                for bf in files:
+                    self._pending_files.setdefault(bf.id, bf)
+                raise
+
+        return len(jobs) + len(files)
 
     async def process_job(
         self,
@@ -373,9 +935,37 @@ class BatchService:
         history_service: Any,
         broadcast_fn: Callable,
         language: str = "auto",
+        worker_pool: Optional[CpuWorkerPool] = None,
     ) -> None:
         """
-        Process a batch job by transcribing all files.
+        Process a batch job by transcribing its pending files.
+
+        Completed and failed files are left as they are, so a job restarted
+        after an interruption or by retry_failed() continues where it
+        stopped. Long files are transcribed in chunks whose texts are
+        checkpointed as they complete (_save_chunk()), and a file that was
+        interrupted continues after its last checkpointed chunk.
+
+        Files run through three stages, so the model does not wait for
+        decoding or database writes:
+
+        - decode: AudioPrefetcher decodes the next files on a thread pool
+          (transcriber.load_audio_file)
+        - inference: files are transcribed one at a time, in job order
+        - persist: a task adds the results to history and queues the file
+          statuses, in job order, while the next file is transcribed
+
+        Transcribers without load_audio_file() decode inside
+        transcribe_file(), in the inference stage. With a worker_pool, the
+        pool's processes decode and transcribe the files instead, several at
+        a time, and results are persisted in the order they finish. The share
+        of the run each stage was busy is logged, set as batch.utilization.*
+        gauges and sent with the final progress event.
+
+        If dispatching fails (e.g. no worker process could load its model),
+        the files finished so far are persisted, the others are left pending
+        for a retry, and the job is marked failed; the final progress event
+        carries the error.
 
         Args:
             job_id: The job ID to process
@@ -383,8 +973,10 @@ class BatchService:
             history_service: HistoryService instance
             broadcast_fn: Async function for WebSocket broadcasting
             language: Language for transcription
+            worker_pool: CpuWorkerPool to transcribe the files on (started
+                if needed), or None to use the transcriber
         """
-        job = self._jobs.get(job_id)
+        job = await self.get_job(job_id)
         if not job:
             raise ValueError(f"Job not found: {job_id}")
 
@@ -395,164 +987,405 @@ class BatchService:
         if job_id not in self._processing_locks:
             self._processing_locks[job_id] = asyncio.Lock()
 
+        progress = ProgressThrottle(broadcast_fn, self.progress_interval_ms)
+        run = _JobRun()
+
         async with self._processing_locks[job_id]:
             job.status = BatchJobStatus.PROCESSING
             await self._update_job_status(job)
 
-            # Broadcast initial progress
-            await broadcast_fn(
-                "batch_progress",
+            todo = [
+                (index, bf)
+                for index, bf in enumerate(job.files)
+                if bf.status in (BatchFileStatus.PENDING, BatchFileStatus.SKIPPED)
+            ]
+            run.completed = sum(bf.status == BatchFileStatus.COMPLETED for bf in job.files)
+            run.failed = sum(bf.status == BatchFileStatus.FAILED for bf in job.files)
+            chunks = await self._load_chunks(job) if todo else {}
+
+            # Broadcast initial progress (files done before an interruption included)
+            await progress.send(
                 {
                     "job_id": job_id,
                     "status": job.status.value,
                     "current_file": None,
-                    "current_index": 0,
+                    "current_index": run.completed + run.failed,
                     "total_files": len(job.files),
-                    "completed": 0,
-                    "failed": 0,
+                    "completed": run.completed,
+                    "failed": run.failed,
                 },
             )
 
-            completed_count = 0
-            failed_count = 0
+            prefetch: Optional[AudioPrefetcher] = None
+            if worker_pool is None and hasattr(transcriber, "load_audio_file"):
+                prefetch = AudioPrefetcher(
+                    transcriber.load_audio_file,
+                    [bf.file_path for _, bf in todo],
+                    run,
+                    workers=self.decode_workers,
+                    max_bytes=self.decode_ahead_bytes,
+                )
+            results: asyncio.Queue = asyncio.Queue(maxsize=PERSIST_QUEUE_SIZE)
+            persist = asyncio.create_task(
+                self._persist_results(job, results, history_service, progress, run)
+            )
+            started = time.perf_counter()
+            error: Optional[str] = None
+
+            try:
+                try:
+                    if worker_pool is not None:
+                        await self._dispatch_to_pool(
+                            job, todo, chunks, worker_pool, language, results, progress, run
+                        )
+                    else:
+                        await self._dispatch_in_process(
+                            job,
+                            todo,
+                            chunks,
+                            transcriber,
+                            prefetch,
+                            language,
+                            results,
+                            progress,
+                            run,
+                        )
+                except Exception as e:
+                    # E.g. no worker process could load its model: the files
+                    # finished so far are still persisted
+                    error = str(e) or type(e).__name__
+                    logger.error(f"Batch job {job_id} stopped: {error}")
+                await results.put(None)
+                await persist
+            finally:
+                if prefetch is not None:
+                    prefetch.close()
+                persist.cancel()
+
+            if worker_pool is not None:
+                utilization = run.utilization(
+                    time.perf_counter() - started, worker_pool.workers, worker_pool.workers
+                )
+            else:
+                utilization = run.utilization(
+                    time.perf_counter() - started, prefetch.workers if prefetch else 0
+                )
+            for stage, value in utilization.items():
+                metrics.set_gauge(f"batch.utilization.{stage}", value)
+
+            # Finalize job status
+            if error is not None:
+                # Files without a result stay pending for a retry
+                for bf in job.files:
+                    if bf.status == BatchFileStatus.PROCESSING:
+                        bf.status = BatchFileStatus.PENDING
+                        self._pending_files[bf.id] = bf
+            if self._cancel_flags.get(job_id, False):
+                job.status = BatchJobStatus.CANCELLED
+            elif error is not None:
+                job.status = BatchJobStatus.FAILED
+            elif run.failed == len(job.files):
+                job.status = BatchJobStatus.FAILED
+            else:
+                job.status = BatchJobStatus.COMPLETED
 
-            for index, bf in enumerate(job.files):
-                # Check for cancellation
-                if self._cancel_flags.get(job_id, False):
-                    logger.info(f"Job {job_id} cancelled at file {index}")
+            job.completed_at = datetime.now(timezone.utc)
+            await self._update_job_status(job)
+
+            # Final broadcast
+            final = {
+                "job_id": job_id,
+                "status": job.status.value,
+                "current_file": None,
+                "current_index": len(job.files),
+                "total_files": len(job.files),
+                "completed": run.completed,
+                "failed": run.failed,
+                "utilization": utilization,
+            }
+            if error is not None:
+                final["error"] = error
+            await progress.send(final, final=True)
+
+            logger.info(
+                f"Batch job {job_id} completed: {run.completed} succeeded, {run.failed} failed "
+                f"(busy: decode {utilization['decode']:.0%}, "
+                f"inference {utilization['inference']:.0%}, persist {utilization['persist']:.0%})"
+            )
+
+        self._release(job)
+
+    async def _dispatch_in_process(
+        self,
+        job: BatchJob,
+        todo: "list[tuple[int, BatchFile]]",
+        chunks: dict[str, "list[str]"],
+        transcriber: Any,
+        prefetch: Optional[AudioPrefetcher],
+        language: str,
+        results: asyncio.Queue,
+        progress: ProgressThrottle,
+        run: _JobRun,
+    ) -> None:
+        """Inference stage of process_job(): transcribe the pending files in job order."""
+        loop = asyncio.get_running_loop()
+
+        for position, (index, bf) in enumerate(todo):
+            # Check for cancellation
+            if self._cancel_flags.get(job.id, False):
+                logger.info(f"Job {job.id} cancelled at file {index}")
+                break
+
+            job.current_file_index = index
+            bf.status = BatchFileStatus.PROCESSING
+            await self._queue_status(job, bf)
+
+            # Broadcast file start
+            await progress.send(
+                {
+                    "job_id": job.id,
+                    "status": job.status.value,
+                    "current_file": bf.filename,
+                    "current_index": index,
+                    "total_files": len(job.files),
+                    "completed": run.completed,
+                    "failed": run.failed,
+                },
+            )
+
+            file_chunks = chunks.setdefault(bf.id, [])
+
+            def on_chunk(done: int, total: int, text: str, bf=bf, file_chunks=file_chunks) -> None:
+                # Called on the inference thread; waits for the checkpoint
+                if total <= 1 or done != len(file_chunks) + 1:
+                    return
+                asyncio.run_coroutine_threadsafe(
+                    self._save_chunk(job, bf, done, total, text, progress, run), loop
+                ).result()
+                file_chunks.append(text)
+
+            result, error = await self._transcribe_file(
+                bf, position, transcriber, prefetch, language, run, file_chunks, on_chunk
+            )
+            await results.put((index, bf, result, error))
+
+    async def _dispatch_to_pool(
+        self,
+        job: BatchJob,
+        todo: "list[tuple[int, BatchFile]]",
+        chunks: dict[str, "list[str]"],
+        pool: CpuWorkerPool,
+        language: str,
+        results: asyncio.Queue,
+        progress: ProgressThrottle,
+        run: _JobRun,
+    ) -> None:
+        """
+        Decode and inference stages of process_job() on a worker pool.
+
+        Pending files are submitted in job order as the pool admits them;
+        each result is put on the persist queue as soon as its file finishes,
+        after its chunk checkpoints.
+        """
+        await pool.start()
+
+        async def collect(
+            index: int, bf: BatchFile, future: asyncio.Future, saves: "list[asyncio.Task]"
+        ) -> None:
+            result, error, stats = await future
+            await asyncio.gather(*saves)
+            run.busy_s["decode"] += stats.get("decode_s", 0.0)
+            run.busy_s["inference"] += stats.get("inference_s", 0.0)
+            if error is None:
+                metrics.record_timing("batch.inference", stats["inference_s"] * 1000)
+            else:
+                logger.error(f"Failed to transcribe {bf.filename}: {error}")
+            await results.put((index, bf, result, error))
+
+        collectors = []
+        try:
+            for index, bf in todo:
+                if self._cancel_flags.get(job.id, False):
+                    logger.info(f"Job {job.id} cancelled at file {index}")
                     break
+                file_chunks = chunks.setdefault(bf.id, [])
+                saves: list[asyncio.Task] = []
+
+                def on_chunk(done: int, total: int, text: str, bf=bf, saves=saves) -> None:
+                    saves.append(
+                        asyncio.create_task(
+                            self._save_chunk(job, bf, done, total, text, progress, run)
+                        )
+                    )
+
+                future = await pool.submit(bf.file_path, language, file_chunks, on_chunk)
 
                 job.current_file_index = index
                 bf.status = BatchFileStatus.PROCESSING
-                await self._update_file_status(bf)
-
-                # Broadcast file start
-                await broadcast_fn(
-                    "batch_progress",
+                await self._queue_status(job, bf)
+                await progress.send(
                     {
-                        "job_id": job_id,
+                        "job_id": job.id,
                         "status": job.status.value,
                         "current_file": bf.filename,
                         "current_index": index,
                         "total_files": len(job.files),
-                        "completed": completed_count,
-                        "failed": failed_count,
+                        "completed": run.completed,
+                        "failed": run.failed,
                     },
                 )
+                collectors.append(asyncio.create_task(collect(index, bf, future, saves)))
+            await asyncio.gather(*collectors)
+        finally:
+            for task in collectors:
+                task.cancel()
 
-                # Retry logic: 1 retry allowed
-                max_retries = 1
-                last_error = None
-
-                for attempt in range(max_retries + 1):
-                    try:
-                        # Transcribe the file
-                        result = await asyncio.to_thread(
-                            transcriber.transcribe_file,
-                            bf.file_path,
-                            language,
-                        )
+    async def _transcribe_file(
+        self,
+        bf: BatchFile,
+        index: int,
+        transcriber: Any,
+        prefetch: Optional[AudioPrefetcher],
+        language: str,
+        run: _JobRun,
+        completed_chunks: Optional["list[str]"] = None,
+        on_chunk: Optional[Callable[[int, int, str], None]] = None,
+    ) -> tuple[Any, Optional[str]]:
+        """
+        Inference stage of process_job(): transcribe one file, with one retry.
 
-                        # Save to history
-                        record = await history_service.add(
-                            text=result.text,
-                            duration_ms=result.duration_ms,
-                            model_used=result.model_used,
-                            language=result.language,
-                        )
+        With prefetched audio, long files continue after completed_chunks,
+        and on_chunk is called with (chunks done, total chunks, chunk text)
+        on the inference thread as each chunk completes.
 
-                        bf.status = BatchFileStatus.COMPLETED
-                        bf.transcription_id = record.id
-                        bf.error = None  # Clear any previous error from retry
-                        completed_count += 1
-
-                        logger.debug(f"Completed transcription for {bf.filename}")
-                        break  # Success, exit retry loop
-
-                    except Exception as e:
-                        # Check for CUDA/GPU errors - Immediate failure & reload
-                        error_msg = str(e)
-                        if "CUDA" in error_msg or "illegal memory access" in error_msg:
-                            logger.critical(
-                                f"CUDA Error encountered on {bf.filename}. Attempting soft restart."
-                            )
-
-                            # Reload model
-                            try:
-                                if hasattr(transcriber, "reload_model"):
-                                    await asyncio.to_thread(transcriber.reload_model)
-                                else:
-                                    logger.error("Transcriber missing reload_model method")
-                            except Exception as reload_err:
-                                logger.critical(f"Failed to reload model: {reload_err}")
-
-                            bf.status = BatchFileStatus.FAILED
-                            bf.error = "GPU Error - Model Reloaded"
-                            failed_count += 1
-                            break
-
-                        last_error = e
-                        if attempt < max_retries:
-                            logger.warning(
-                                f"Transcription failed for {bf.filename} (attempt {attempt + 1}/{max_retries + 1}), retrying: {e}"
-                            )
-                            await asyncio.sleep(1)  # Brief pause before retry
-                            continue
+        Returns:
+            Tuple of (TranscriptionResult, None), or (None, error message)
+            if the file failed
+        """
+        max_retries = 1
+        audio = None
+
+        for attempt in range(max_retries + 1):
+            try:
+                if prefetch is None:
+                    start = time.perf_counter()
+                    result = await asyncio.to_thread(
+                        transcriber.transcribe_file,
+                        bf.file_path,
+                        language,
+                    )
+                else:
+                    if audio is None:
+                        fetch = prefetch.get if attempt == 0 else prefetch.load
+                        audio = await fetch(index)
+                    start = time.perf_counter()
+                    result = await asyncio.to_thread(
+                        transcriber.transcribe,
+                        audio_data=audio,
+                        language=language,
+                        progress_callback=on_chunk,
+                        completed_chunks=completed_chunks,
+                    )
+                elapsed = time.perf_counter() - start
+                run.busy_s["inference"] += elapsed
+                metrics.record_timing("batch.inference", elapsed * 1000)
+                logger.debug(f"Completed transcription for {bf.filename}")
+                return result, None
+
+            except Exception as e:
+                # Check for CUDA/GPU errors - Immediate failure & reload
+                error_msg = str(e)
+                if "CUDA" in error_msg or "illegal memory access" in error_msg:
+                    logger.critical(
+                        f"CUDA Error encountered on {bf.filename}. Attempting soft restart."
+                    )
+
+                    # Reload model
+                    try:
+                        if hasattr(transcriber, "reload_model"):
+                            await asyncio.to_thread(transcriber.reload_model)
                         else:
-                            # Final failure after retries
-                            logger.error(
-                                f"Failed to transcribe {bf.filename} after {max_retries + 1} attempts: {e}"
-                            )
-                            bf.status = BatchFileStatus.FAILED
-                            bf.error = str(e)
-                            failed_count += 1
-
-                await self._update_file_status(bf)
-
-                # Broadcast file completion
-                await broadcast_fn(
-                    "batch_progress",
-                    {
-                        "job_id": job_id,
-                        "status": job.status.value,
-                        "current_file": bf.filename,
-                        "current_index": index + 1,
-                        "total_files": len(job.files),
-                        "completed": completed_count,
-                        "failed": failed_count,
-                        "file_status": bf.status.value,
-                    },
+                            logger.error("Transcriber missing reload_model method")
+                    except Exception as reload_err:
+                        logger.critical(f"Failed to reload model: {reload_err}")
+
+                    return None, "GPU Error - Model Reloaded"
+
+                if attempt < max_retries:
+                    logger.warning(
+                        f"Transcription failed for {bf.filename} (attempt {attempt + 1}/{max_retries + 1}), retrying: {e}"
+                    )
+                    await asyncio.sleep(1)  # Brief pause before retry
+                    continue
+
+                # Final failure after retries
+                logger.error(
+                    f"Failed to transcribe {bf.filename} after {max_retries + 1} attempts: {e}"
                 )
+                return None, str(e)
 
-            # Finalize job status
-            if self._cancel_flags.get(job_id, False):
-                job.status = BatchJobStatus.CANCELLED
-            elif failed_count == len(job.files):
-                job.status = BatchJobStatus.FAILED
-            else:
-                job.status = BatchJobStatus.COMPLETED
+        return None, "Transcription failed"
 
-            job.completed_at = datetime.now(timezone.utc)
-            await self._update_job_status(job)
+    async def _persist_results(
+        self,
+        job: BatchJob,
+        results: asyncio.Queue,
+        history_service: Any,
+        progress: ProgressThrottle,
+        run: _JobRun,
+    ) -> None:
+        """
+        Persist stage of process_job(): save transcribed files in job order.
 
-            # Final broadcast
-            await broadcast_fn(
-                "batch_progress",
+        Takes (index, file, result, error) items from the queue until None.
+        """
+        while True:
+            item = await results.get()
+            if item is None:
+                return
+            index, bf, result, error = item
+            start = time.perf_counter()
+
+            if result is not None:
+                try:
+                    # Committed, not deferred: the COMPLETED status queued below
+                    # deletes the file's checkpointed chunks on the next flush(),
+                    # so the history row must already exist by then.
+                    record = await history_service.add(
+                        text=result.text,
+                        duration_ms=result.duration_ms,
+                        model_used=result.model_used,
+                        language=result.language,
+                    )
+                    bf.status = BatchFileStatus.COMPLETED
+                    bf.transcription_id = record.id
+                    bf.error = None  # Clear any previous error from retry
+                    run.completed += 1
+                except Exception as e:
+                    logger.error(f"Failed to save transcription of {bf.filename}: {e}")
+                    error = str(e)
+            if error is not None:
+                bf.status = BatchFileStatus.FAILED
+                bf.error = error
+                run.failed += 1
+
+            await self._queue_status(job, bf)
+            run.busy_s["persist"] += time.perf_counter() - start
+
+            # Broadcast file completion
+            await progress.send(
                 {
-                    "job_id": job_id,
+                    "job_id": job.id,
                     "status": job.status.value,
-                    "current_file": None,
-                    "current_index": len(job.files),
+                    "current_file": bf.filename,
+                    "current_index": run.completed + run.failed,
                     "total_files": len(job.files),
-                    "completed": completed_count,
-                    "failed": failed_count,
+                    "completed": run.completed,
+                    "failed": run.failed,
+                    "file_status": bf.status.value,
                 },
             )
 
-            logger.info(
-                f"Batch job {job_id} completed: {completed_count} succeeded, {failed_count} failed"
-            )
-
     async def retry_failed(self, job_id: str, file_ids: Optional[list[str]] = None) -> BatchJob:
         """
         Retry failed files in a job.
@@ -564,7 +1397,7 @@ class BatchService:
         Returns:
             The updated BatchJob
         """
-        job = self._jobs.get(job_id)
+        job = await self.get_job(job_id)
         if not job:
             raise ValueError(f"Job not found: {job_id}")
 
@@ -574,12 +1407,13 @@ class BatchService:
                 if file_ids is None or bf.id in file_ids:
                     bf.status = BatchFileStatus.PENDING
                     bf.error = None
-                    await self._update_file_status(bf)
+                    self._pending_files[bf.id] = bf
 
-        # Reset job status
+        # Reset job status (written with the files)
         job.status = BatchJobStatus.PENDING
         job.completed_at = None
         job.current_file_index = 0
+        self._jobs[job_id] = job
         self._cancel_flags[job_id] = False
         await self._update_job_status(job)
 
@@ -597,19 +1431,23 @@ class BatchService:
         Returns:
             True if deleted, False if not found
         """
-        if job_id not in self._jobs:
-            return False
-
         if not self._db:
             return False
 
         # Delete from database (cascade deletes files)
+        await self._db.execute(
+            "DELETE FROM batch_chunks WHERE file_id IN "
+            "(SELECT id FROM batch_files WHERE job_id = ?)",
+            (job_id,),
+        )
         await self._db.execute("DELETE FROM batch_files WHERE job_id = ?", (job_id,))
-        await self._db.execute("DELETE FROM batch_jobs WHERE id = ?", (job_id,))
+        cursor = await self._db.execute("DELETE FROM batch_jobs WHERE id = ?", (job_id,))
         await self._db.commit()
+        if cursor.rowcount == 0:
+            return False
 
         # Remove from memory
-        del self._jobs[job_id]
+        self._jobs.pop(job_id, None)
         self._cancel_flags.pop(job_id, None)
         self._processing_locks.pop(job_id, None)
 
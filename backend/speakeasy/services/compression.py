@@ -0,0 +1,211 @@
+"""
+Compressed storage of transcription text.
+
+With compression enabled, HistoryService stores text bodies of at least
+COMPRESS_MIN_BYTES as zstd frames, compressed with a dictionary trained on
+the history itself, and stores original_text as a delta against text when
+that is smaller. Encoded values are BLOBs in the TEXT columns while short
+values stay plain TEXT, so a database can hold both and compression can be
+switched on at any time.
+
+Values are decoded in SQL by history_text() and history_original(), which
+TextCodec.register() adds to every connection. Queries only apply them to
+the columns they select, and the full-text indexes read their content
+through a view that applies them. Needs the optional zstandard package.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Optional, Union
+
+import aiosqlite
+
+# Text bodies shorter than this many UTF-8 bytes are stored as plain TEXT
+COMPRESS_MIN_BYTES = 128
+
+# zstd level for stored text; decompression speed does not depend on it
+COMPRESSION_LEVEL = 9
+
+# Size of a trained dictionary and the number of newest text bodies it is
+# trained on, each cut to DICTIONARY_SAMPLE_BYTES (the start of a long
+# transcript teaches as much as all of it, at a fraction of the training
+# time); no dictionary is trained from fewer than DICTIONARY_MIN_SAMPLES
+DICTIONARY_SIZE = 64 * 1024
+DICTIONARY_SAMPLES = 5000
+DICTIONARY_SAMPLE_BYTES = 4096
+DICTIONARY_MIN_SAMPLES = 500
+
+# First byte of an encoded BLOB value
+_ZSTD = b"z"  # zstd frame of the UTF-8 text
+_DELTA = b"d"  # zstd frame of original_text compressed against the text
+
+StoredText = Union[str, bytes]
+
+_zstd: Optional[ModuleType] = None
+
+
+def load_zstd() -> ModuleType:
+    """
+    Import the zstandard package (once).
+
+    Raises:
+        ValueError: If the package is not installed
+    """
+    global _zstd
+    if _zstd is None:
+        try:
+            _zstd = importlib.import_module("zstandard")
+        except ImportError:
+            raise ValueError(
+                "zstandard is not installed (install it with: pip install 'speakeasy[compression]')"
+            ) from None
+    return _zstd
+
+
+class TextCodec:
+    """
+    Encodes text bodies for storage and decodes them again.
+
+    Decoding runs inside SQLite function calls on the connection threads, so
+    (de)compressors are kept per thread. Frames record the ID of the
+    dictionary they were compressed with; every dictionary stays loaded.
+    """
+
+    def __init__(self, level: int = COMPRESSION_LEVEL, min_bytes: int = COMPRESS_MIN_BYTES):
+        """
+        Initialize the codec.
+
+        Args:
+            level: zstd compression level
+            min_bytes: Shorter text bodies are stored as plain TEXT
+        """
+        self.level = level
+        self.min_bytes = min_bytes
+        self._dictionaries: dict[int, Any] = {}  # ZstdCompressionDict by ID
+        self._dictionary_id = 0  # Used for new frames; 0 is no dictionary
+        self._local = threading.local()
+
+    @property
+    def dictionary_id(self) -> int:
+        """ID of the dictionary new values are compressed with (0 for none)."""
+        return self._dictionary_id
+
+    def add_dictionary(self, data: bytes) -> int:
+        """
+        Load a stored dictionary and compress new values with it.
+
+        Returns:
+            The dictionary ID
+        """
+        zstd = load_zstd()
+        dictionary = zstd.ZstdCompressionDict(data)
+        dictionary_id = dictionary.dict_id()
+        self._dictionaries[dictionary_id] = dictionary
+        self._dictionary_id = dictionary_id
+        self._local = threading.local()
+        return dictionary_id
+
+    def train(self, samples: "list[str]", size: int = DICTIONARY_SIZE) -> bytes:
+        """Train a dictionary on sample text bodies and return its bytes."""
+        zstd = load_zstd()
+        encoded = [sample.encode("utf-8")[:DICTIONARY_SAMPLE_BYTES] for sample in samples]
+        return zstd.train_dictionary(size, encoded, level=self.level).as_bytes()
+
+    def encode(self, text: Optional[str]) -> Optional[StoredText]:
+        """Encode a text body for storage (short or incompressible text stays str)."""
+        if text is None:
+            return None
+        data = text.encode("utf-8")
+        if len(data) < self.min_bytes:
+            return text
+        frame = self._compressor().compress(data)
+        if len(frame) + 1 >= len(data):
+            return text
+        return _ZSTD + frame
+
+    def encode_texts(
+        self, text: str, original: Optional[str]
+    ) -> tuple[StoredText, Optional[StoredText]]:
+        """Encode the text and original_text of one record."""
+        return self.encode(text), self.encode_original(original, text)
+
+    def encode_original(self, original: Optional[str], text: str) -> Optional[StoredText]:
+        """
+        Encode original_text, as a delta against text when that is smaller.
+
+        The delta is a zstd frame compressed with text as a raw-content
+        dictionary, so the words the two share are stored as back-references
+        (zstd's --patch-from).
+        """
+        encoded = self.encode(original)
+        if not isinstance(encoded, bytes):
+            return encoded
+        zstd = load_zstd()
+        compressor = zstd.ZstdCompressor(
+            level=self.level, dict_data=self._text_dictionary(text), write_dict_id=False
+        )
+        delta = _DELTA + compressor.compress(original.encode("utf-8"))
+        return delta if len(delta) < len(encoded) else encoded
+
+    def decode(self, value: Optional[StoredText]) -> Optional[str]:
+        """Decode a stored text body (history_text() in SQL)."""
+        if not isinstance(value, bytes):
+            return value
+        # The last value decoded on this thread: a row's original_text delta
+        # is decoded right after its text
+        last = getattr(self._local, "last", None)
+        if last is not None and last[0] == value:
+            return last[1]
+        if value[:1] != _ZSTD:
+            raise ValueError(f"Unknown text encoding {value[:1]!r}")
+        text = self._decompress(memoryview(value)[1:])
+        self._local.last = (value, text)
+        return text
+
+    def decode_original(
+        self, value: Optional[StoredText], text: Optional[StoredText]
+    ) -> Optional[str]:
+        """Decode a stored original_text given the stored text (history_original() in SQL)."""
+        if isinstance(value, bytes) and value[:1] == _DELTA:
+            zstd = load_zstd()
+            decompressor = zstd.ZstdDecompressor(dict_data=self._text_dictionary(self.decode(text)))
+            return decompressor.decompress(memoryview(value)[1:]).decode("utf-8")
+        return self.decode(value)
+
+    async def register(self, db: aiosqlite.Connection) -> None:
+        """Add the history_text() and history_original() SQL functions to a connection."""
+        await db.create_function("history_text", 1, self.decode, deterministic=True)
+        await db.create_function("history_original", 2, self.decode_original, deterministic=True)
+
+    @staticmethod
+    def _text_dictionary(text: str) -> Any:
+        """A text body as a raw-content zstd dictionary for original_text deltas."""
+        zstd = load_zstd()
+        return zstd.ZstdCompressionDict(text.encode("utf-8"), dict_type=zstd.DICT_TYPE_RAWCONTENT)
+
+    def _compressor(self) -> Any:
+        """zstd compressor of the current thread for the current dictionary."""
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            zstd = load_zstd()
+            dictionary = self._dictionaries.get(self._dictionary_id)
+            compressor = zstd.ZstdCompressor(level=self.level, dict_data=dictionary)
+            self._local.compressor = compressor
+        return compressor
+
+    def _decompress(self, frame: memoryview) -> str:
+        """Decompress a frame with the dictionary it was compressed with."""
+        zstd = load_zstd()
+        dictionary_id = zstd.get_frame_parameters(frame).dict_id
+        decompressors = self._local.__dict__.setdefault("decompressors", {})
+        decompressor = decompressors.get(dictionary_id)
+        if decompressor is None:
+            dictionary = None
+            if dictionary_id:
+                dictionary = self._dictionaries.get(dictionary_id)
+                if dictionary is None:
+                    raise ValueError(f"Unknown compression dictionary {dictionary_id}")
+            decompressor = zstd.ZstdDecompressor(dict_data=dictionary)
+            decompressors[dictionary_id] = decompressor
+        return decompressor.decompress(frame).decode("utf-8")
@@ -1,17 +1,28 @@
 """
 Export service for exporting transcription records in various formats.
 
-Supports: TXT, JSON, CSV, SRT, VTT
+Supports: TXT, JSON, NDJSON, CSV, SRT, VTT and, with the optional pyarrow
+package, Parquet and Arrow IPC streams. Any format can be gzip- or (with the
+optional zstandard package) zstd-compressed.
+
+Each format is produced by a writer that encodes one batch of records at a
+time, so exports can be streamed from the database with bounded memory.
 """
 
+import asyncio
 import csv
+import importlib
 import io
-import json
+import zlib
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional
+from types import ModuleType
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Union
+
+from pydantic_core import to_json
 
 from .history import TranscriptionRecord
+from .sqlite import to_epoch_ms
 
 
 class ExportFormat(str, Enum):
@@ -19,29 +30,123 @@ class ExportFormat(str, Enum):
 
     TXT = "txt"
     JSON = "json"
+    NDJSON = "ndjson"
     CSV = "csv"
     SRT = "srt"
     VTT = "vtt"
+    PARQUET = "parquet"
+    ARROW = "arrow"
 
 
 # Content type mappings
 CONTENT_TYPES = {
     ExportFormat.TXT: "text/plain",
     ExportFormat.JSON: "application/json",
+    ExportFormat.NDJSON: "application/x-ndjson",
     ExportFormat.CSV: "text/csv",
     ExportFormat.SRT: "application/x-subrip",
     ExportFormat.VTT: "text/vtt",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
 }
 
 # File extensions
 FILE_EXTENSIONS = {
     ExportFormat.TXT: "txt",
     ExportFormat.JSON: "json",
+    ExportFormat.NDJSON: "ndjson",
     ExportFormat.CSV: "csv",
     ExportFormat.SRT: "srt",
     ExportFormat.VTT: "vtt",
+    ExportFormat.PARQUET: "parquet",
+    ExportFormat.ARROW: "arrow",
+}
+
+# Binary formats written with pyarrow; only available as streamed exports
+COLUMNAR_FORMATS = frozenset({ExportFormat.PARQUET, ExportFormat.ARROW})
+
+
+class ExportCompression(str, Enum):
+    """Supported on-the-fly compression of export streams."""
+
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
+COMPRESSION_CONTENT_TYPES = {
+    ExportCompression.GZIP: "application/gzip",
+    ExportCompression.ZSTD: "application/zstd",
 }
 
+COMPRESSION_EXTENSIONS = {
+    ExportCompression.GZIP: "gz",
+    ExportCompression.ZSTD: "zst",
+}
+
+# zlib level for streamed gzip: about 2.5x faster than the default (6) for
+# a slightly larger file
+GZIP_COMPRESSION_LEVEL = 3
+ZSTD_COMPRESSION_LEVEL = 3
+
+# Parquet row groups are flushed once the buffered batches reach this size
+PARQUET_ROW_GROUP_BYTES = 32 * 1024 * 1024
+
+# Optional packages by format/compression, installed with the "export" extra
+_OPTIONAL_DEPENDENCIES = {
+    ExportFormat.PARQUET: "pyarrow",
+    ExportFormat.ARROW: "pyarrow",
+    ExportCompression.ZSTD: "zstandard",
+}
+
+
+def import_optional(module: str) -> ModuleType:
+    """
+    Import an optional export dependency.
+
+    Raises:
+        ValueError: If the package is not installed
+    """
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        package = module.split(".")[0]
+        raise ValueError(
+            f"{package} is not installed (install it with: pip install 'speakeasy[export]')"
+        ) from None
+
+
+def check_available(
+    format: Optional[ExportFormat] = None,
+    compression: Optional[ExportCompression] = None,
+) -> None:
+    """
+    Check that the optional packages for a format and compression are installed.
+
+    Raises:
+        ValueError: If a required package is missing
+    """
+    for option in (format, compression):
+        module = _OPTIONAL_DEPENDENCIES.get(option)
+        if module is not None:
+            import_optional(module)
+
+
+def create_compressor(compression: ExportCompression):
+    """Create a streaming compressor with compress(data) and flush() methods."""
+    if compression == ExportCompression.ZSTD:
+        zstandard = import_optional("zstandard")
+        return zstandard.ZstdCompressor(level=ZSTD_COMPRESSION_LEVEL).compressobj()
+    # wbits=31 writes a gzip header and trailer
+    return zlib.compressobj(GZIP_COMPRESSION_LEVEL, wbits=31)
+
+
+def create_decompressor(compression: ExportCompression):
+    """Create a streaming decompressor with a decompress(data) method."""
+    if compression == ExportCompression.ZSTD:
+        zstandard = import_optional("zstandard")
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(wbits=31)
+
 
 def _format_timestamp(
     ms: int,
@@ -77,6 +182,325 @@ def _format_timestamp(
         return f"{minutes:02d}:{seconds:02d}{decimal_sep}{milliseconds:03d}"
 
 
+class _ExportWriter:
+    """
+    Incremental encoder for one export format.
+
+    The output is header() + write(batch) for each batch + footer(); writers
+    keep whatever state spans batches (record count, subtitle clock). Text
+    formats return str, binary formats bytes.
+    """
+
+    def __init__(self, include_metadata: bool = True):
+        self.include_metadata = include_metadata
+        self.count = 0
+        self._trailing = ""
+
+    def header(self) -> str:
+        return ""
+
+    def write(self, records: Iterable[TranscriptionRecord]) -> str:
+        raise NotImplementedError
+
+    def footer(self) -> str:
+        return ""
+
+    def _rstrip(self, text: str) -> str:
+        """
+        Hold back trailing whitespace until more output follows.
+
+        Keeps the output identical to rstrip() on the whole document.
+        """
+        text = self._trailing + text
+        stripped = text.rstrip()
+        self._trailing = text[len(stripped) :]
+        return stripped
+
+
+class _TxtWriter(_ExportWriter):
+    """Timestamp header and text per record, separated by blank lines."""
+
+    def write(self, records: Iterable[TranscriptionRecord]) -> str:
+        parts = []
+        for record in records:
+            timestamp = record.created_at.strftime("%Y-%m-%d %H:%M:%S")
+            separator = "\n\n" if self.count else ""
+            parts.append(f"{separator}[{timestamp}]\n{record.text}")
+            self.count += 1
+        return self._rstrip("".join(parts))
+
+
+class _JsonWriter(_ExportWriter):
+    """Indented JSON document; the count is written after the records."""
+
+    def header(self) -> str:
+        exported_at = datetime.now(timezone.utc).isoformat()
+        return f'{{\n  "exported_at": "{exported_at}",\n  "transcriptions": ['
+
+    def write(self, records: Iterable[TranscriptionRecord]) -> str:
+        if self.include_metadata:
+            items = [record.to_dict() for record in records]
+        else:
+            items = [
+                {
+                    "id": record.id,
+                    "text": record.text,
+                    "created_at": record.created_at.isoformat(),
+                }
+                for record in records
+            ]
+        if not items:
+            return ""
+
+        # Encode the batch as an indented array, then drop its brackets and
+        # indent it one level further to nest it under "transcriptions"
+        body = to_json(items, indent=2).decode()[2:-2].replace("\n", "\n  ")
+        separator = "," if self.count else ""
+        self.count += len(items)
+        return f"{separator}\n  {body}"
+
+    def footer(self) -> str:
+        closing = "\n  ]" if self.count else "]"
+        return f'{closing},\n  "count": {self.count}\n}}'
+
+
+class _NdjsonWriter(_ExportWriter):
+    """One JSON object per line, as read by the streaming import."""
+
+    def write(self, records: Iterable[TranscriptionRecord]) -> str:
+        if self.include_metadata:
+            items = [record.to_dict() for record in records]
+        else:
+            items = [
+                {
+                    "id": record.id,
+                    "text": record.text,
+                    "created_at": record.created_at.isoformat(),
+                }
+                for record in records
+            ]
+        self.count += len(items)
+        return "".join(f"{to_json(item).decode()}\n" for item in items)
+
+
+class _CsvWriter(_ExportWriter):
+    """Quoted CSV with a header row."""
+
+    def __init__(self, include_metadata: bool = True):
+        super().__init__(include_metadata)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, quoting=csv.QUOTE_ALL)
+
+    def _drain(self) -> str:
+        value = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return value
+
+    def header(self) -> str:
+        if self.include_metadata:
+            self._writer.writerow(
+                ["id", "text", "duration_ms", "model_used", "language", "created_at"]
+            )
+        else:
+            self._writer.writerow(["id", "text", "created_at"])
+        return self._drain()
+
+    def write(self, records: Iterable[TranscriptionRecord]) -> str:
+        for record in records:
+            if self.include_metadata:
+                self._writer.writerow(
+                    [
+                        record.id,
+                        record.text,
+                        record.duration_ms,
+                        record.model_used or "",
+                        record.language or "",
+                        record.created_at.isoformat(),
+                    ]
+                )
+            else:
+                self._writer.writerow([record.id, record.text, record.created_at.isoformat()])
+            self.count += 1
+        return self._drain()
+
+
+class _SrtWriter(_ExportWriter):
+    """Numbered SubRip cues laid end to end using duration_ms."""
+
+    def __init__(self, include_metadata: bool = True):
+        super().__init__(include_metadata)
+        self.current_time_ms = 0
+
+    def write(self, records: Iterable[TranscriptionRecord]) -> str:
+        parts = []
+        for record in records:
+            start_time = _format_timestamp(self.current_time_ms, use_comma=True, always_hours=True)
+            end_time_ms = self.current_time_ms + record.duration_ms
+            end_time = _format_timestamp(end_time_ms, use_comma=True, always_hours=True)
+
+            self.count += 1
+            separator = "\n\n" if self.count > 1 else ""
+            parts.append(f"{separator}{self.count}\n{start_time} --> {end_time}\n{record.text}")
+
+            self.current_time_ms = end_time_ms
+        return self._rstrip("".join(parts))
+
+
+class _VttWriter(_SrtWriter):
+    """WebVTT cues laid end to end using duration_ms."""
+
+    def header(self) -> str:
+        return "WEBVTT"
+
+    def write(self, records: Iterable[TranscriptionRecord]) -> str:
+        parts = []
+        for record in records:
+            start_time = _format_timestamp(
+                self.current_time_ms, use_comma=False, always_hours=False
+            )
+            end_time_ms = self.current_time_ms + record.duration_ms
+            end_time = _format_timestamp(end_time_ms, use_comma=False, always_hours=False)
+
+            parts.append(f"\n\n{start_time} --> {end_time}\n{record.text}")
+            self.count += 1
+
+            self.current_time_ms = end_time_ms
+        return self._rstrip("".join(parts))
+
+
+class _ChunkSink:
+    """Write-only file object keeping what pyarrow writes until drained."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _ArrowWriter(_ExportWriter):
+    """Arrow IPC stream with one record batch per batch of records."""
+
+    def __init__(self, include_metadata: bool = True):
+        super().__init__(include_metadata)
+        self.pa = import_optional("pyarrow")
+        pa = self.pa
+        columns = [
+            ("id", pa.string()),
+            ("text", pa.string()),
+            ("duration_ms", pa.int64()),
+            ("model_used", pa.string()),
+            ("language", pa.string()),
+            ("created_at", pa.timestamp("ms", tz="UTC")),
+            ("original_text", pa.string()),
+        ]
+        if not include_metadata:
+            columns = [c for c in columns if c[0] in ("id", "text", "created_at")]
+        self.schema = pa.schema(columns)
+        self._sink = _ChunkSink()
+        self._writer = None
+
+    def _open(self):
+        return self.pa.ipc.new_stream(self._sink, self.schema)
+
+    def _record_batch(self, records: list[TranscriptionRecord]):
+        values = {
+            "id": [r.id for r in records],
+            "text": [r.text for r in records],
+            "created_at": [to_epoch_ms(r.created_at) for r in records],
+        }
+        if self.include_metadata:
+            values["duration_ms"] = [r.duration_ms for r in records]
+            values["model_used"] = [r.model_used for r in records]
+            values["language"] = [r.language for r in records]
+            values["original_text"] = [r.original_text for r in records]
+        arrays = [self.pa.array(values[field.name], type=field.type) for field in self.schema]
+        return self.pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    def _write_batch(self, batch) -> None:
+        self._writer.write_batch(batch)
+
+    def header(self) -> bytes:
+        self._writer = self._open()
+        return self._sink.drain()
+
+    def write(self, records: Iterable[TranscriptionRecord]) -> bytes:
+        records = list(records)
+        if records:
+            self._write_batch(self._record_batch(records))
+            self.count += len(records)
+        return self._sink.drain()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+class _ParquetWriter(_ArrowWriter):
+    """Parquet file; batches are buffered into row groups of PARQUET_ROW_GROUP_BYTES."""
+
+    def __init__(self, include_metadata: bool = True):
+        super().__init__(include_metadata)
+        self._parquet = import_optional("pyarrow.parquet")
+        self._pending: list = []
+        self._pending_bytes = 0
+
+    def _open(self):
+        return self._parquet.ParquetWriter(self._sink, self.schema, compression="zstd")
+
+    def _flush_row_group(self) -> None:
+        if self._pending:
+            self._writer.write_table(self.pa.Table.from_batches(self._pending))
+            self._pending = []
+            self._pending_bytes = 0
+
+    def _write_batch(self, batch) -> None:
+        self._pending.append(batch)
+        self._pending_bytes += batch.nbytes
+        if self._pending_bytes >= PARQUET_ROW_GROUP_BYTES:
+            self._flush_row_group()
+
+    def footer(self) -> bytes:
+        self._flush_row_group()
+        return super().footer()
+
+
+_WRITERS: dict[ExportFormat, type[_ExportWriter]] = {
+    ExportFormat.TXT: _TxtWriter,
+    ExportFormat.JSON: _JsonWriter,
+    ExportFormat.NDJSON: _NdjsonWriter,
+    ExportFormat.CSV: _CsvWriter,
+    ExportFormat.SRT: _SrtWriter,
+    ExportFormat.VTT: _VttWriter,
+    ExportFormat.PARQUET: _ParquetWriter,
+    ExportFormat.ARROW: _ArrowWriter,
+}
+
+
+def _render(writer: _ExportWriter, records: list[TranscriptionRecord]) -> str:
+    """Encode a complete export in memory."""
+    return writer.header() + writer.write(records) + writer.footer()
+
+
 class ExportService:
     """
     Service for exporting transcription records to various formats.
@@ -88,14 +512,7 @@ class ExportService:
 
         Each record is separated by a blank line with timestamp header.
         """
-        lines = []
-        for record in records:
-            timestamp = record.created_at.strftime("%Y-%m-%d %H:%M:%S")
-            lines.append(f"[{timestamp}]")
-            lines.append(record.text)
-            lines.append("")  # Blank line separator
-
-        return "\n".join(lines).rstrip()
+        return _render(_TxtWriter(), records)
 
     def to_json(
         self,
@@ -109,27 +526,21 @@ class ExportService:
             records: List of transcription records
             include_metadata: Include full metadata or just text
         """
-        if include_metadata:
-            data = {
-                "exported_at": datetime.now(timezone.utc).isoformat(),
-                "count": len(records),
-                "transcriptions": [record.to_dict() for record in records],
-            }
-        else:
-            data = {
-                "exported_at": datetime.now(timezone.utc).isoformat(),
-                "count": len(records),
-                "transcriptions": [
-                    {
-                        "id": record.id,
-                        "text": record.text,
-                        "created_at": record.created_at.isoformat(),
-                    }
-                    for record in records
-                ],
-            }
-
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return _render(_JsonWriter(include_metadata), records)
+
+    def to_ndjson(
+        self,
+        records: list[TranscriptionRecord],
+        include_metadata: bool = True,
+    ) -> str:
+        """
+        Export records to newline-delimited JSON (one record per line).
+
+        Args:
+            records: List of transcription records
+            include_metadata: Include full metadata or just text
+        """
+        return _render(_NdjsonWriter(include_metadata), records)
 
     def to_csv(
         self,
@@ -143,38 +554,7 @@ class ExportService:
             records: List of transcription records
             include_metadata: Include full metadata columns
         """
-        output = io.StringIO()
-
-        if include_metadata:
-            fieldnames = ["id", "text", "duration_ms", "model_used", "language", "created_at"]
-        else:
-            fieldnames = ["id", "text", "created_at"]
-
-        writer = csv.DictWriter(output, fieldnames=fieldnames, quoting=csv.QUOTE_ALL)
-        writer.writeheader()
-
-        for record in records:
-            if include_metadata:
-                writer.writerow(
-                    {
-                        "id": record.id,
-                        "text": record.text,
-                        "duration_ms": record.duration_ms,
-                        "model_used": record.model_used or "",
-                        "language": record.language or "",
-                        "created_at": record.created_at.isoformat(),
-                    }
-                )
-            else:
-                writer.writerow(
-                    {
-                        "id": record.id,
-                        "text": record.text,
-                        "created_at": record.created_at.isoformat(),
-                    }
-                )
-
-        return output.getvalue()
+        return _render(_CsvWriter(include_metadata), records)
 
     def to_srt(self, records: list[TranscriptionRecord]) -> str:
         """
@@ -187,22 +567,7 @@ class ExportService:
 
         Uses sequential numbering and calculates timestamps from duration_ms.
         """
-        lines = []
-        current_time_ms = 0
-
-        for index, record in enumerate(records, start=1):
-            start_time = _format_timestamp(current_time_ms, use_comma=True, always_hours=True)
-            end_time_ms = current_time_ms + record.duration_ms
-            end_time = _format_timestamp(end_time_ms, use_comma=True, always_hours=True)
-
-            lines.append(str(index))
-            lines.append(f"{start_time} --> {end_time}")
-            lines.append(record.text)
-            lines.append("")  # Blank line separator
-
-            current_time_ms = end_time_ms
-
-        return "\n".join(lines).rstrip()
+        return _render(_SrtWriter(), records)
 
     def to_vtt(self, records: list[TranscriptionRecord]) -> str:
         """
@@ -214,21 +579,7 @@ class ExportService:
         00:00.000 --> 00:05.123
         First transcription text
         """
-        lines = ["WEBVTT", ""]  # Header and blank line
-        current_time_ms = 0
-
-        for record in records:
-            start_time = _format_timestamp(current_time_ms, use_comma=False, always_hours=False)
-            end_time_ms = current_time_ms + record.duration_ms
-            end_time = _format_timestamp(end_time_ms, use_comma=False, always_hours=False)
-
-            lines.append(f"{start_time} --> {end_time}")
-            lines.append(record.text)
-            lines.append("")  # Blank line separator
-
-            current_time_ms = end_time_ms
-
-        return "\n".join(lines).rstrip()
+        return _render(_VttWriter(), records)
 
     def export(
         self,
@@ -237,34 +588,99 @@ class ExportService:
         include_metadata: bool = True,
     ) -> tuple[str, str, str]:
         """
-        Export records to the specified format.
+        Export records to the specified text format.
 
         Args:
             records: List of transcription records
-            format: Export format
+            format: Export format (not a COLUMNAR_FORMATS member; use stream())
             include_metadata: Include metadata for JSON/CSV formats
 
         Returns:
             Tuple of (content, filename, content_type)
         """
+        writer_class = _WRITERS.get(format)
+        if writer_class is None:
+            raise ValueError(f"Unsupported export format: {format}")
+        if format in COLUMNAR_FORMATS:
+            raise ValueError(f"{format.value} exports are binary; use stream()")
+
+        content = _render(writer_class(include_metadata), records)
+        return content, self.filename(format), self.content_type(format)
+
+    def filename(
+        self,
+        format: ExportFormat,
+        compression: Optional[ExportCompression] = None,
+    ) -> str:
+        """Build a timestamped download filename for an export."""
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         filename = f"speakeasy_export_{timestamp}.{FILE_EXTENSIONS[format]}"
-        content_type = CONTENT_TYPES[format]
-
-        if format == ExportFormat.TXT:
-            content = self.to_txt(records)
-        elif format == ExportFormat.JSON:
-            content = self.to_json(records, include_metadata)
-        elif format == ExportFormat.CSV:
-            content = self.to_csv(records, include_metadata)
-        elif format == ExportFormat.SRT:
-            content = self.to_srt(records)
-        elif format == ExportFormat.VTT:
-            content = self.to_vtt(records)
-        else:
-            raise ValueError(f"Unsupported export format: {format}")
+        if compression is not None:
+            filename += f".{COMPRESSION_EXTENSIONS[compression]}"
+        return filename
 
-        return content, filename, content_type
+    def content_type(
+        self,
+        format: ExportFormat,
+        compression: Optional[ExportCompression] = None,
+    ) -> str:
+        """Get the content type of an export."""
+        if compression is not None:
+            return COMPRESSION_CONTENT_TYPES[compression]
+        return CONTENT_TYPES[format]
+
+    async def stream(
+        self,
+        batches: AsyncIterable[list[TranscriptionRecord]],
+        format: ExportFormat,
+        include_metadata: bool = True,
+        compression: Optional[ExportCompression] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Encode batches of records as they arrive.
+
+        Yields one chunk per batch (plus header and footer), so memory is
+        bounded by the batch size rather than the size of the export. Parquet
+        output is yielded per row group instead.
+
+        Args:
+            batches: Async iterable of record batches, e.g. HistoryService.iter_records()
+            format: Export format
+            include_metadata: Include metadata for JSON/NDJSON/CSV/columnar formats
+            compression: Optional compression applied on the fly
+
+        Yields:
+            Encoded (and possibly compressed) chunks of the export
+
+        Raises:
+            ValueError: If the format is unknown or an optional package it
+                needs is missing
+        """
+        writer_class = _WRITERS.get(format)
+        if writer_class is None:
+            raise ValueError(f"Unsupported export format: {format}")
+        writer = writer_class(include_metadata)
+        compressor = create_compressor(compression) if compression is not None else None
+
+        async def encode(output: Union[str, bytes]) -> bytes:
+            data = output.encode("utf-8") if isinstance(output, str) else output
+            if compressor is None or not data:
+                return data
+            # zlib and zstd release the GIL; keep the event loop free meanwhile
+            return await asyncio.to_thread(compressor.compress, data)
+
+        chunk = await encode(writer.header())
+        if chunk:
+            yield chunk
+        async for records in batches:
+            chunk = await encode(writer.write(records))
+            if chunk:
+                yield chunk
+        chunk = await encode(writer.footer())
+        if compressor is not None:
+            chunk += compressor.flush()
+        if chunk:
+            yield chunk
 
 
 # Singleton instance
@@ -1,26 +1,204 @@
 """
 History service for storing and retrieving transcription records.
 
-Uses SQLite with FTS5 for full-text search.
-Supports cursor-based pagination and field projection.
+Uses SQLite with FTS5 for full-text search (phrase, prefix and trigram
+substring matching, bm25 ranking, highlighted snippets).
+Supports cursor-based pagination and field projection. Old records can be
+moved to monthly archive files (see archive.py), which are only queried when
+a search or date range reaches them.
 """
 
+import asyncio
 import base64
+import heapq
 import logging
+import math
+import time
 import uuid
-from dataclasses import dataclass, fields as dataclass_fields
-from datetime import datetime, timezone
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, fields as dataclass_fields, replace
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Awaitable, Callable, Optional
 
 import aiosqlite
 
+from ..utils.metrics import metrics
+from .archive import (
+    ARCHIVE_SCHEMA,
+    ArchiveStore,
+    archive_directory,
+    archive_schema_sql,
+    month_of,
+    month_range,
+)
+from .compression import DICTIONARY_MIN_SAMPLES, DICTIONARY_SAMPLES, TextCodec, load_zstd
+from .sqlite import (
+    DEFAULT_READ_CONNECTIONS,
+    ISO_TO_EPOCH_MS_SQL,
+    ReaderPool,
+    connect,
+    from_epoch_ms,
+    to_epoch_ms,
+)
+
 logger = logging.getLogger(__name__)
 
+# Write-behind defaults: deferred inserts are committed in one transaction once
+# this many rows are queued, or this long after the first queued row
+DEFAULT_WRITE_BATCH_SIZE = 500
+DEFAULT_WRITE_FLUSH_INTERVAL_MS = 50
 
-@dataclass
+# Number of distinct search queries whose match counts are cached
+SEARCH_TOTALS_CACHE_SIZE = 256
+
+# Search result pages are cached this long, so repeated keystrokes,
+# backspacing and re-renders of the same query skip the index
+SEARCH_CACHE_SIZE = 128
+SEARCH_CACHE_TTL_S = 30.0
+
+# Recently added or read records, and the first pages of the plain history
+# list (no search, dates or cursor) per projection and page size, kept in
+# memory. Writes update both in place rather than dropping them, so the
+# reads that follow each dictation are served without a query.
+RECENT_RECORDS_CACHE_SIZE = 512
+RECENT_PAGES_CACHE_SIZE = 16
+RECENT_PAGE_MAX_LIMIT = 200
+
+# Search modes for list(search=...): quoted phrase, search-as-you-type (last
+# term is a prefix) and substring (trigram index)
+SEARCH_MODES = ("phrase", "prefix", "substring")
+SEARCH_ORDERS = ("date", "relevance")
+
+# bm25() column weights (text, original_text): matches in the stored text
+# rank above matches only in the pre-correction text
+_BM25_WEIGHTS = "1.0, 0.5"
+
+# Date-ordered searches with at least this many matches scan the created_at
+# index and test FTS membership, instead of sorting all matches by date
+INDEX_WALK_MIN_MATCHES = 5000
+
+# Markers around matched terms in snippets
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+# Snippets for a page spanning fewer than this many rowids per record are
+# generated with one rowid range scan instead of per-row lookups
+SNIPPET_RANGE_FACTOR = 64
+
+# Records read per query by iter_records() (exports) and IDs looked up per
+# query by get_many() and delete_many()
+EXPORT_BATCH_SIZE = 500
+
+# PRAGMA auto_vacuum value for incremental mode: free pages stay in the file
+# until PRAGMA incremental_vacuum returns them, instead of needing a VACUUM
+AUTO_VACUUM_INCREMENTAL = 2
+
+# compact() converts files without incremental auto-vacuum (full VACUUM) once
+# this share of their pages is free
+COMPACT_CONVERT_FREE_RATIO = 0.25
+
+# Rows deleted per transaction by apply_retention()
+RETENTION_CHUNK_SIZE = 1000
+
+# Pages written per FTS5 'merge' step by optimize()
+FTS_MERGE_PAGES = 256
+
+# Rows moved to an archive file per transaction by archive()
+ARCHIVE_CHUNK_SIZE = 5000
+
+# archive() rewrites the hot full-text indexes (FTS5 'optimize') after moving
+# at least this share of the rows: the delete markers left behind would
+# otherwise make up most of the index, and level merges keep them
+ARCHIVE_OPTIMIZE_RATIO = 0.25
+
+# Rows whose text is compressed per transaction by compress()
+COMPRESS_CHUNK_SIZE = 2000
+
+# Sync triggers of the full-text indexes that fire when text is updated
+_FTS_UPDATE_TRIGGERS = ("transcriptions_au", "transcriptions_trigram_au")
+
+_DELETE_OLDEST_SQL = """
+    DELETE FROM transcriptions WHERE rowid IN (
+        SELECT rowid FROM transcriptions WHERE created_at < ? ORDER BY created_at LIMIT ?
+    )
+"""
+
+# PRAGMA user_version after all migrations in _migrate_schema() have run
+SCHEMA_VERSION = 2
+
+# Rows converted per transaction by the created_at migration
+MIGRATION_CHUNK_SIZE = 10_000
+
+# Period expressions over history_daily_stats.day for get_stats_series()
+_SERIES_PERIODS = {
+    "day": "day",
+    "week": "date(day, '-6 days', 'weekday 1')",  # Monday starting the week
+    "month": "strftime('%Y-%m', day)",
+}
+
+# Decoded text, the content of the full-text indexes once the database may
+# hold compressed text
+_TEXT_VIEW_SQL = """
+    CREATE VIEW IF NOT EXISTS transcriptions_text AS
+    SELECT rowid AS rid, history_text(text) AS text,
+        history_original(original_text, text) AS original_text
+    FROM transcriptions
+"""
+
+_INSERT_SQL = """
+    INSERT INTO transcriptions (id, text, duration_ms, model_used, language, created_at, original_text)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Imports keep the original IDs; rows whose ID already exists (archived
+# records included) are skipped
+_IMPORT_SQL = """
+    INSERT OR IGNORE INTO transcriptions (id, text, duration_ms, model_used, language, created_at, original_text)
+    SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7
+    WHERE NOT EXISTS (SELECT 1 FROM history_archive_index WHERE id = ?1)
+"""
+
+# Daily rollup updates for a deleted row, run by the delete triggers of the
+# hot table and of attached archive files
+_ROLLUP_DELETE_SQL = """
+    UPDATE history_daily_stats
+    SET count = count - 1,
+        total_duration_ms = total_duration_ms - COALESCE(old.duration_ms, 0)
+    WHERE day = date(old.created_at / 1000, 'unixepoch');
+    UPDATE history_daily_breakdown SET count = count - 1
+    WHERE day = date(old.created_at / 1000, 'unixepoch') AND (
+        (dimension = 'model' AND key = COALESCE(old.model_used, 'unknown'))
+        OR (dimension = 'language' AND key = COALESCE(old.language, 'unknown'))
+    );
+    DELETE FROM history_daily_stats WHERE day = date(old.created_at / 1000, 'unixepoch') AND count <= 0;
+    DELETE FROM history_daily_breakdown WHERE day = date(old.created_at / 1000, 'unixepoch') AND count <= 0;
+"""
+
+# Archived rows stay in the daily rollups (stats cover the whole history);
+# deleting one from an attached archive file updates the rollups, the ID
+# index and the archived counter in the hot database
+_ARCHIVE_DELETE_TRIGGER_SQL = f"""
+    CREATE TEMP TRIGGER IF NOT EXISTS archive_ad AFTER DELETE ON {ARCHIVE_SCHEMA}.transcriptions BEGIN
+        {_ROLLUP_DELETE_SQL}
+        DELETE FROM history_archive_index WHERE id = old.id;
+        UPDATE history_counters SET value = value - 1 WHERE name = 'archived';
+    END
+"""
+
+
+@dataclass(slots=True)
 class TranscriptionRecord:
-    """A stored transcription record."""
+    """
+    A stored transcription record.
+
+    Records listed with a field projection only carry the projected fields
+    (plus id and created_at); the other fields are None.
+    """
 
     id: str
     text: str
@@ -29,6 +207,7 @@ class TranscriptionRecord:
     language: Optional[str]
     created_at: datetime
     original_text: Optional[str] = None  # Original text before AI enhancement
+    snippet: Optional[str] = None  # Highlighted search match (list(highlight=True))
 
     # All valid field names for projection
     VALID_FIELDS = {
@@ -39,6 +218,7 @@ class TranscriptionRecord:
         "language",
         "created_at",
         "original_text",
+        "snippet",
     }
 
     @property
@@ -53,6 +233,19 @@ class TranscriptionRecord:
         Args:
             fields: Optional set of field names to include. If None, include all fields.
         """
+        if fields is not None:
+            # Convert only what was requested
+            data = {}
+            for name in _DICT_FIELDS:
+                if name in fields:
+                    value = getattr(self, name)
+                    if name == "created_at":
+                        value = value.isoformat()
+                    elif name == "snippet" and value is None:
+                        continue
+                    data[name] = value
+            return data
+
         all_data = {
             "id": self.id,
             "text": self.text,
@@ -63,20 +256,126 @@ class TranscriptionRecord:
             "original_text": self.original_text,
             "is_ai_enhanced": self.is_ai_enhanced,
         }
-        if fields is None:
-            return all_data
-        return {k: v for k, v in all_data.items() if k in fields}
+        if self.snippet is not None:
+            all_data["snippet"] = self.snippet
+        return all_data
+
+
+# Projectable fields in to_dict() key order
+_DICT_FIELDS = (
+    "id",
+    "text",
+    "duration_ms",
+    "model_used",
+    "language",
+    "created_at",
+    "original_text",
+    "snippet",
+)
+
+# Stored columns in TranscriptionRecord field order, so rows decode
+# positionally. id and created_at are always selected (cursor keys).
+_RECORD_COLUMNS = (
+    "id",
+    "text",
+    "duration_ms",
+    "model_used",
+    "language",
+    "created_at",
+    "original_text",
+)
+_RECORD_SELECT = ", ".join(f"t.{column}" for column in _RECORD_COLUMNS)
+
+# Text columns decoded by the SQL functions of TextCodec, for databases that
+# may hold compressed text
+_DECODED_TEXT = "history_text(t.text)"
+_DECODED_ORIGINAL_TEXT = "history_original(t.original_text, t.text)"
+_DECODED_COLUMNS = {
+    "text": f"{_DECODED_TEXT} AS text",
+    "original_text": f"{_DECODED_ORIGINAL_TEXT} AS original_text",
+}
+_RECORD_SELECT_DECODED = ", ".join(
+    _DECODED_COLUMNS.get(column, f"t.{column}") for column in _RECORD_COLUMNS
+)
+
+# Rows after a (created_at, id) position in newest-first order. The row value
+# comparison is a range scan on the created_at index; the equivalent OR of
+# two terms is planned as a multi-index OR that sorts every earlier row.
+_KEYSET_AFTER = "(t.created_at, t.id) < (?, ?)"
+
+
+def _stored_select(fields: Optional[set[str]]) -> str:
+    """
+    Build the stored columns a decoding outer SELECT needs from `transcriptions t`.
+
+    Like _record_select(), but every column keeps its name (NULL AS ...)
+    and text is also read when only original_text, stored as a diff
+    against it, is projected.
+    """
+    needed = set(fields or _RECORD_COLUMNS) | {"id", "created_at"}
+    if "original_text" in needed:
+        needed.add("text")
+    return ", ".join(
+        f"t.{column}" if column in needed else f"NULL AS {column}" for column in _RECORD_COLUMNS
+    )
+
+
+def _record_select(fields: Optional[set[str]], decode: bool = False) -> str:
+    """
+    Build the record column list for a SELECT on `transcriptions t`.
+
+    Columns outside the projection are selected as NULL so large text
+    bodies are never read (or decompressed), while rows keep one positional
+    layout. With decode, text columns are decoded in SQL.
+    """
+    if not fields:
+        return _RECORD_SELECT_DECODED if decode else _RECORD_SELECT
+    columns = _DECODED_COLUMNS if decode else {}
+    return ", ".join(
+        columns.get(column, f"t.{column}")
+        if column in fields or column in ("id", "created_at")
+        else "NULL"
+        for column in _RECORD_COLUMNS
+    )
+
+
+@dataclass
+class HistoryFilter:
+    """
+    Criteria selecting transcriptions, compiled into one SQL WHERE clause.
+
+    All criteria that are set must match. Used for filtered exports via
+    HistoryService.iter_records().
+    """
+
+    ids: Optional[list[str]] = None  # Only these records
+    search: Optional[str] = None  # Full-text search query
+    search_mode: str = "phrase"  # See HistoryService.list()
+    start: Optional[datetime] = None  # Created at or after
+    end: Optional[datetime] = None  # Created at or before
+    model_used: Optional[str] = None
+    language: Optional[str] = None
+    include_archived: bool = True  # Also match records in the archive files
+
+
+def _chunks(items: list, size: int):
+    """Split a list into consecutive slices of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
 
 
 def encode_cursor(created_at: datetime, record_id: str) -> str:
-    """Encode cursor from timestamp and ID."""
-    cursor_str = f"{created_at.isoformat()}_{record_id}"
+    """Encode cursor from timestamp (as epoch milliseconds) and ID."""
+    cursor_str = f"{to_epoch_ms(created_at)}_{record_id}"
     return base64.urlsafe_b64encode(cursor_str.encode()).decode()
 
 
-def decode_cursor(cursor: str) -> tuple[datetime, str]:
+def decode_cursor(cursor: str) -> tuple[int, str]:
     """
-    Decode cursor to timestamp and ID.
+    Decode cursor to epoch-millisecond timestamp and ID.
+
+    Cursors issued before timestamps were stored as integers carry an ISO
+    timestamp and are still accepted.
 
     Raises:
         ValueError: If cursor format is invalid.
@@ -84,12 +383,276 @@ def decode_cursor(cursor: str) -> tuple[datetime, str]:
     try:
         decoded = base64.urlsafe_b64decode(cursor.encode()).decode()
         timestamp_str, record_id = decoded.rsplit("_", 1)
-        created_at = datetime.fromisoformat(timestamp_str)
-        return created_at, record_id
+        if timestamp_str.lstrip("-").isdigit():
+            return int(timestamp_str), record_id
+        return to_epoch_ms(datetime.fromisoformat(timestamp_str)), record_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor format: {e}")
+
+
+def encode_rank_cursor(score: float, record_id: str) -> str:
+    """Encode cursor for relevance-ordered pages from bm25 score and ID."""
+    cursor_str = f"rank:{score!r}_{record_id}"
+    return base64.urlsafe_b64encode(cursor_str.encode()).decode()
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, str]:
+    """
+    Decode a relevance cursor to bm25 score and ID.
+
+    Raises:
+        ValueError: If cursor format is invalid.
+    """
+    try:
+        decoded = base64.urlsafe_b64decode(cursor.encode()).decode()
+        if not decoded.startswith("rank:"):
+            raise ValueError("not a relevance cursor")
+        score_str, record_id = decoded[len("rank:") :].rsplit("_", 1)
+        return float(score_str), record_id
     except Exception as e:
         raise ValueError(f"Invalid cursor format: {e}")
 
 
+def _fts_string(term: str) -> str:
+    """Quote a term as an FTS5 string so quotes and keywords are literal."""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _like_pattern(search: str) -> str:
+    """Build a LIKE pattern matching `search` anywhere (escape character: backslash)."""
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def build_search_query(search: str, mode: str = "phrase") -> str:
+    """
+    Build an FTS5 MATCH expression for a user search.
+
+    Args:
+        search: The user's search text
+        mode: "phrase" or "substring" match the text as one literal string;
+            "prefix" matches all terms, the last one as a prefix
+
+    Returns:
+        The MATCH expression
+    """
+    terms = search.split()
+    if mode != "prefix" or not terms:
+        return _fts_string(search)
+    return " ".join([_fts_string(t) for t in terms[:-1]] + [_fts_string(terms[-1]) + "*"])
+
+
+def record_from_import(data: dict) -> TranscriptionRecord:
+    """
+    Build a record from an exported/imported dictionary.
+
+    The original id, created_at and original_text are preserved; a new id and
+    the current time are used when they are missing.
+
+    Raises:
+        ValueError: If the data has no text or contains invalid values.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Record must be an object")
+    text = data.get("text")
+    if not isinstance(text, str):
+        raise ValueError("Record is missing 'text'")
+
+    created_at_value = data.get("created_at")
+    if created_at_value:
+        created_at = datetime.fromisoformat(str(created_at_value))
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+    else:
+        created_at = datetime.now(timezone.utc)
+
+    return TranscriptionRecord(
+        id=str(data.get("id") or uuid.uuid4()),
+        text=text,
+        duration_ms=int(data.get("duration_ms") or 0),
+        model_used=data.get("model_used"),
+        language=data.get("language"),
+        created_at=created_at,
+        original_text=data.get("original_text"),
+    )
+
+
+def _insert_params(record: TranscriptionRecord, codec: Optional[TextCodec] = None) -> tuple:
+    """Build INSERT parameters for a record, encoding its text with codec if given."""
+    text, original_text = record.text, record.original_text
+    if codec is not None:
+        text, original_text = codec.encode_texts(text, original_text)
+    return (
+        record.id,
+        text,
+        record.duration_ms,
+        record.model_used,
+        record.language,
+        to_epoch_ms(record.created_at),
+        original_text,
+    )
+
+
+def _record_from_row(row: aiosqlite.Row) -> TranscriptionRecord:
+    """Build a record from a row starting with the _RECORD_COLUMNS columns."""
+    return TranscriptionRecord(
+        row[0], row[1], row[2], row[3], row[4], from_epoch_ms(row[5]), row[6]
+    )
+
+
+def _project(record: TranscriptionRecord, fields: Optional[frozenset]) -> TranscriptionRecord:
+    """A record as list(fields=...) loads it: fields outside the projection are None."""
+    if fields is None:
+        return record
+    return replace(
+        record,
+        **{
+            name: None
+            for name in _RECORD_COLUMNS
+            if name not in fields and name not in ("id", "created_at")
+        },
+    )
+
+
+def _row_key(row: aiosqlite.Row) -> tuple[int, str]:
+    """(created_at, id) of a row selected with _RECORD_SELECT."""
+    return row[5], row[0]
+
+
+def _keyset_pager(
+    fetch_all: Callable[..., Awaitable["list[aiosqlite.Row]"]],
+    source: str,
+    conditions: "list[str]",
+    params: "list",
+    batch_size: int,
+    decode: bool = False,
+) -> Callable[[Optional[tuple[int, str]]], Awaitable["list[aiosqlite.Row]"]]:
+    """Build a reader of the next batch_size rows (newest first) after a (created_at, id)."""
+    order_by = "t.created_at DESC, t.id DESC"
+
+    async def read_page(after: Optional[tuple[int, str]]) -> "list[aiosqlite.Row]":
+        page_conditions = conditions[:]
+        page_params = params[:]
+        if after is not None:
+            page_conditions.append(_KEYSET_AFTER)
+            page_params.extend(after)
+        where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+        sql = f"""
+            SELECT {_stored_select(None) if decode else _RECORD_SELECT} FROM {source}
+            {where}
+            ORDER BY {order_by}
+            LIMIT ?
+        """
+        if decode:
+            sql = f"SELECT {_RECORD_SELECT_DECODED} FROM ({sql}) t ORDER BY {order_by}"
+        return await fetch_all(sql, (*page_params, batch_size))
+
+    return read_page
+
+
+async def _merge_newest_first(
+    pagers: "list[Callable[[Optional[tuple[int, str]]], Awaitable[list[aiosqlite.Row]]]]",
+    batch_size: int,
+) -> AsyncIterator["list[aiosqlite.Row]"]:
+    """
+    Merge keyset-paged databases into batches of rows, newest first.
+
+    A row is passed on once no database can still hold a newer unread row:
+    at or above the oldest buffered row of every database with pages left.
+    Databases whose buffer ran out are read again (in parallel), so at most
+    one page per database is held in memory.
+    """
+    buffers: list[list[aiosqlite.Row]] = [[] for _ in pagers]
+    positions: list[Optional[tuple[int, str]]] = [None] * len(pagers)
+    exhausted = [False] * len(pagers)
+    ready: list[aiosqlite.Row] = []
+    while True:
+        refill = [i for i, buffer in enumerate(buffers) if not buffer and not exhausted[i]]
+        pages = await asyncio.gather(*(pagers[i](positions[i]) for i in refill))
+        for i, rows in zip(refill, pages):
+            buffers[i] = rows
+            exhausted[i] = len(rows) < batch_size
+            if rows:
+                positions[i] = _row_key(rows[-1])
+
+        open_keys = [_row_key(buffers[i][-1]) for i in range(len(pagers)) if not exhausted[i]]
+        bound = max(open_keys) if open_keys else None
+        emit = []
+        for i, buffer in enumerate(buffers):
+            if bound is None:
+                cut = len(buffer)
+            else:
+                cut = bisect_left(buffer, True, key=lambda row: _row_key(row) < bound)
+            emit.append(buffer[:cut])
+            buffers[i] = buffer[cut:]
+        ready.extend(heapq.merge(*emit, key=_row_key, reverse=True))
+
+        while len(ready) >= batch_size:
+            yield ready[:batch_size]
+            ready = ready[batch_size:]
+        if bound is None:
+            if ready:
+                yield ready
+            return
+
+
+def _page_query(
+    source: str,
+    conditions: "list[str]",
+    params: "list",
+    fts_table: Optional[str],
+    fields: Optional[set[str]],
+    by_relevance: bool,
+    cursor: Optional[str],
+    decode: bool = False,
+) -> tuple[str, "list"]:
+    """
+    Build the SELECT of a list() page for one database, ending in LIMIT ? OFFSET ?.
+
+    Rows carry row_id (for snippets) and, ordered by relevance, score. A
+    relevance-ordered page without an FTS table (LIKE search in an archive
+    file) scores every row 0, after all ranked matches.
+
+    With decode, text is decoded by an outer SELECT over the page: in a
+    sorted query SQLite evaluates the select list of every matching row
+    before sorting, which would decompress all matches.
+    """
+    conditions = conditions[:]
+    params = params[:]
+    record_columns = _stored_select(fields) if decode else _record_select(fields)
+    extra_columns = "t.row_id"
+    if by_relevance:
+        score = f"bm25({fts_table}, {_BM25_WEIGHTS})" if fts_table else "0.0"
+        columns = f"{record_columns}, t.rowid AS row_id, {score} AS score"
+        extra_columns += ", t.score"
+        order_by = "score, t.id"
+        if cursor:
+            cursor_score, cursor_id = decode_rank_cursor(cursor)
+            conditions.append(f"({score} > ? OR ({score} = ? AND t.id > ?))")
+            params.extend((cursor_score, cursor_score, cursor_id))
+    else:
+        columns = f"{record_columns}, t.rowid AS row_id"
+        order_by = "t.created_at DESC, t.id DESC"
+        if cursor:
+            # Keyset pagination: rows strictly after the cursor position
+            conditions.append(_KEYSET_AFTER)
+            params.extend(decode_cursor(cursor))
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"""
+        SELECT {columns} FROM {source}
+        {where}
+        ORDER BY {order_by}
+        LIMIT ? OFFSET ?
+    """
+    if decode:
+        sql = f"""
+            SELECT {_record_select(fields, decode)}, {extra_columns} FROM ({sql}) t
+            ORDER BY {order_by}
+        """
+    return sql, params
+
+
 class HistoryService:
     """
     Manages transcription history storage using SQLite.
@@ -97,25 +660,94 @@ class HistoryService:
     Features:
     - Async database operations
     - Full-text search via FTS5
-    - Automatic cleanup of old records
+    - Retention cleanup of old records and index/free-space maintenance
+    - WAL mode with a dedicated writer connection and a pool of read
+      connections, so list/search never wait behind inserts
+    - Optional write-behind queue that coalesces inserts into one transaction
     """
 
-    def __init__(self, db_path: Path):
+    def __init__(
+        self,
+        db_path: Path,
+        read_connections: int = DEFAULT_READ_CONNECTIONS,
+        write_batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+        write_flush_interval_ms: int = DEFAULT_WRITE_FLUSH_INTERVAL_MS,
+        substring_search: bool = True,
+        compress_text: bool = False,
+    ):
         """
         Initialize the history service.
 
         Args:
             db_path: Path to the SQLite database file
+            read_connections: Number of read-only connections for queries
+            write_batch_size: Deferred inserts queued before a flush is forced
+            write_flush_interval_ms: Maximum time a deferred insert waits for a flush
+            substring_search: Maintain the trigram index for substring search
+                (roughly triples index size; without it substring search
+                falls back to a LIKE scan)
+            compress_text: Store new text bodies zstd-compressed and
+                original_text as a diff against text (see compression.py;
+                needs the zstandard package)
         """
         self.db_path = db_path
-        self._db: Optional[aiosqlite.Connection] = None
+        self._db: Optional[aiosqlite.Connection] = None  # Writer connection
+
+        # Text encoding. Every connection gets the decoding SQL functions;
+        # _compressed is set once the database may hold encoded text.
+        self.compress_text = compress_text
+        self._codec = TextCodec()
+        self._compressed = False
+
+        self._readers = ReaderPool(db_path, size=read_connections, setup=self._codec.register)
+
+        # Write-behind queue for add(deferred=True), keyed by record ID
+        self.write_batch_size = max(1, write_batch_size)
+        self.write_flush_interval_ms = write_flush_interval_ms
+        self._pending: dict[str, TranscriptionRecord] = {}
+        self._flush_timer: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+
+        # Match counts per FTS query, dropped whenever the table changes. The
+        # generation guards against caching a count computed before a write.
+        self._search_totals: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._write_generation = 0
+
+        # Short-lived cache of search result pages, keyed by list() arguments
+        self._search_cache: OrderedDict[tuple, tuple[float, tuple]] = OrderedDict()
+
+        # Write-through caches: records by ID, first list pages as
+        # [records, total, next_cursor] keyed by (fields, limit, include_total),
+        # and get_stats() for one (generation, local date)
+        self._recent_records: OrderedDict[str, TranscriptionRecord] = OrderedDict()
+        self._recent_pages: OrderedDict[tuple, list] = OrderedDict()
+        self._stats_cache: Optional[tuple[tuple[int, date], dict]] = None
+        self._cache_lookups: dict[str, list[int]] = {}  # [hits, misses] per cache
+
+        self.substring_search = substring_search
+        self._trigram_enabled = False
+
+        self._last_write_at = time.monotonic()
+
+        # Monthly archive files of old records, next to the database file
+        self.archives = ArchiveStore(archive_directory(db_path), setup=self._codec.register)
 
     async def initialize(self) -> None:
         """Initialize the database and create tables if needed."""
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        self._db = await aiosqlite.connect(self.db_path)
-        self._db.row_factory = aiosqlite.Row
+        self._db = await connect(self.db_path)
+        await self._codec.register(self._db)
+
+        # Incremental auto-vacuum can only be switched on by a VACUUM, which
+        # is instant while the file is still empty; existing files are
+        # converted by the first clear(), when little data is left to copy
+        cursor = await self._db.execute("PRAGMA auto_vacuum")
+        if (await cursor.fetchone())[0] != AUTO_VACUUM_INCREMENTAL:
+            cursor = await self._db.execute("SELECT COUNT(*) FROM sqlite_master")
+            if (await cursor.fetchone())[0] == 0:
+                await self._db.execute(f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}")
+                await self._db.execute("VACUUM")
 
         # Create main transcriptions table
         await self._db.execute("""
@@ -125,52 +757,301 @@ class HistoryService:
                 duration_ms INTEGER,
                 model_used TEXT,
                 language TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                created_at INTEGER NOT NULL,  -- Epoch milliseconds (UTC)
                 original_text TEXT
             )
         """)
 
+        # Run migrations for existing databases before the indexes and
+        # triggers below are (re)created
+        await self._migrate_schema()
+
         # Create index on created_at for fast sorting
         await self._db.execute("""
             CREATE INDEX IF NOT EXISTS idx_transcriptions_created_at 
             ON transcriptions(created_at DESC)
         """)
 
-        # Create FTS5 virtual table for full-text search
+        await self._load_dictionaries()
+        await self._create_search_indexes()
+
+        # Row counter maintained by triggers, so list() never needs COUNT(*).
+        # Seeded from the table the first time (existing databases).
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS history_counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+
         await self._db.execute("""
-            CREATE VIRTUAL TABLE IF NOT EXISTS transcriptions_fts 
-            USING fts5(text, content=transcriptions, content_rowid=rowid)
+            INSERT OR IGNORE INTO history_counters (name, value)
+            SELECT 'transcriptions', COUNT(*) FROM transcriptions
         """)
 
-        # Create triggers to keep FTS index in sync
         await self._db.execute("""
-            CREATE TRIGGER IF NOT EXISTS transcriptions_ai AFTER INSERT ON transcriptions BEGIN
-                INSERT INTO transcriptions_fts(rowid, text) VALUES (new.rowid, new.text);
+            CREATE TRIGGER IF NOT EXISTS transcriptions_count_ai AFTER INSERT ON transcriptions BEGIN
+                UPDATE history_counters SET value = value + 1 WHERE name = 'transcriptions';
             END
         """)
 
         await self._db.execute("""
-            CREATE TRIGGER IF NOT EXISTS transcriptions_ad AFTER DELETE ON transcriptions BEGIN
-                INSERT INTO transcriptions_fts(transcriptions_fts, rowid, text) 
-                VALUES('delete', old.rowid, old.text);
+            CREATE TRIGGER IF NOT EXISTS transcriptions_count_ad AFTER DELETE ON transcriptions BEGIN
+                UPDATE history_counters SET value = value - 1 WHERE name = 'transcriptions';
             END
         """)
 
+        await self._create_daily_rollups()
+
+        # Archive file (month) of each archived record, so lookups by ID go
+        # straight to the right file
         await self._db.execute("""
-            CREATE TRIGGER IF NOT EXISTS transcriptions_au AFTER UPDATE ON transcriptions BEGIN
-                INSERT INTO transcriptions_fts(transcriptions_fts, rowid, text) 
-                VALUES('delete', old.rowid, old.text);
-                INSERT INTO transcriptions_fts(rowid, text) VALUES (new.rowid, new.text);
-            END
+            CREATE TABLE IF NOT EXISTS history_archive_index (
+                id TEXT PRIMARY KEY,
+                month TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+
+        await self._db.execute("""
+            INSERT OR IGNORE INTO history_counters (name, value) VALUES ('archived', 0)
         """)
 
         await self._db.commit()
 
-        # Run migrations for existing databases
-        await self._migrate_schema()
+        # Readers are opened after the schema exists
+        await self._readers.open()
+        self.archives.scan()
 
         logger.info(f"History database initialized at {self.db_path}")
 
+    async def _create_search_indexes(self) -> None:
+        """
+        Create the full-text indexes used by list(search=...).
+
+        transcriptions_fts indexes text and original_text with unicode61
+        words plus 2- and 3-character prefix indexes, so search-as-you-type
+        prefix queries stay fast. transcriptions_trigram (optional) indexes
+        the same columns as trigrams for substring matches inside words.
+        Both are external-content tables kept in sync by triggers, and are
+        rebuilt from the table when first created on an existing database.
+        Once the database may hold compressed text, their content is the
+        transcriptions_text view, which decodes it.
+        """
+        if self._compressed:
+            await self._db.execute(_TEXT_VIEW_SQL)
+
+        await self._create_fts_table(
+            "transcriptions_fts",
+            "prefix='2 3'",
+            ("transcriptions_ai", "transcriptions_ad", "transcriptions_au"),
+        )
+
+        triggers = (
+            "transcriptions_trigram_ai",
+            "transcriptions_trigram_ad",
+            "transcriptions_trigram_au",
+        )
+        if self.substring_search:
+            try:
+                await self._create_fts_table(
+                    "transcriptions_trigram", "tokenize='trigram'", triggers
+                )
+                self._trigram_enabled = True
+            except aiosqlite.OperationalError as e:
+                # The trigram tokenizer needs SQLite 3.34+
+                logger.warning(f"Trigram index unavailable, substring search uses LIKE: {e}")
+                self._trigram_enabled = False
+        else:
+            for trigger in triggers:
+                await self._db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            await self._db.execute("DROP TABLE IF EXISTS transcriptions_trigram")
+            self._trigram_enabled = False
+
+    async def _create_fts_table(
+        self, table: str, options: str, triggers: tuple[str, str, str]
+    ) -> None:
+        """
+        Create one external-content FTS5 table over text and original_text.
+
+        Args:
+            table: Virtual table name
+            options: Extra fts5() options (prefix indexes, tokenizer)
+            triggers: Names of the insert, delete and update sync triggers
+
+        Raises:
+            aiosqlite.OperationalError: If this SQLite build does not support
+                the options
+        """
+        if self._compressed:
+            content = "content=transcriptions_text, content_rowid=rid"
+            new_values = "history_text(new.text), history_original(new.original_text, new.text)"
+            old_values = "history_text(old.text), history_original(old.original_text, old.text)"
+        else:
+            content = "content=transcriptions, content_rowid=rowid"
+            new_values = "new.text, new.original_text"
+            old_values = "old.text, old.original_text"
+
+        cursor = await self._db.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        )
+        row = await cursor.fetchone()
+        if row is not None and content not in row[0]:
+            # Compression was enabled: reindex from the decoding view
+            logger.info(f"Switching search index {table} to decoded content")
+            for trigger in triggers:
+                await self._db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            await self._db.execute(f"DROP TABLE {table}")
+            row = None
+        needs_rebuild = row is None
+
+        await self._db.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {table}
+            USING fts5(text, original_text, {content}, {options})
+        """)
+
+        insert_trigger, delete_trigger, update_trigger = triggers
+        await self._db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {insert_trigger} AFTER INSERT ON transcriptions BEGIN
+                INSERT INTO {table}(rowid, text, original_text)
+                VALUES (new.rowid, {new_values});
+            END
+        """)
+
+        await self._db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {delete_trigger} AFTER DELETE ON transcriptions BEGIN
+                INSERT INTO {table}({table}, rowid, text, original_text)
+                VALUES ('delete', old.rowid, {old_values});
+            END
+        """)
+
+        await self._db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {update_trigger}
+            AFTER UPDATE OF text, original_text ON transcriptions BEGIN
+                INSERT INTO {table}({table}, rowid, text, original_text)
+                VALUES ('delete', old.rowid, {old_values});
+                INSERT INTO {table}(rowid, text, original_text)
+                VALUES (new.rowid, {new_values});
+            END
+        """)
+
+        if needs_rebuild:
+            logger.info(f"Building search index {table}")
+            await self._db.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+    async def _load_dictionaries(self) -> None:
+        """
+        Set up compressed text storage.
+
+        The history_text_dictionaries table is created the first time
+        compression is enabled. From then on the database may hold encoded
+        text, also after compression is disabled again, so reads decode it.
+        Stored dictionaries are loaded into the codec; the newest one
+        compresses new text.
+
+        Raises:
+            ValueError: If the database may hold compressed text and the
+                zstandard package is not installed
+        """
+        if self.compress_text:
+            try:
+                load_zstd()
+            except ValueError as e:
+                logger.warning(f"Text compression disabled: {e}")
+                self.compress_text = False
+            else:
+                await self._db.execute("""
+                    CREATE TABLE IF NOT EXISTS history_text_dictionaries (
+                        id INTEGER PRIMARY KEY,
+                        data BLOB NOT NULL,
+                        created_at INTEGER NOT NULL  -- Epoch milliseconds (UTC)
+                    )
+                """)
+
+        cursor = await self._db.execute(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type = 'table' AND name = 'history_text_dictionaries'"
+        )
+        self._compressed = await cursor.fetchone() is not None
+        if not self._compressed:
+            return
+
+        load_zstd()
+        cursor = await self._db.execute("SELECT data FROM history_text_dictionaries ORDER BY id")
+        for (data,) in await cursor.fetchall():
+            self._codec.add_dictionary(data)
+
+    async def _create_daily_rollups(self) -> None:
+        """
+        Create the per-day rollup tables used by get_stats().
+
+        history_daily_stats holds count and total duration per UTC day;
+        history_daily_breakdown holds per-model and per-language counts per day.
+        Both are maintained by triggers on insert and delete (imports included)
+        and are backfilled once when first created on an existing database.
+        """
+        cursor = await self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'history_daily_stats'"
+        )
+        needs_backfill = await cursor.fetchone() is None
+
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS history_daily_stats (
+                day TEXT PRIMARY KEY,
+                count INTEGER NOT NULL DEFAULT 0,
+                total_duration_ms INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS history_daily_breakdown (
+                day TEXT NOT NULL,
+                dimension TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, dimension, key)
+            ) WITHOUT ROWID
+        """)
+
+        if needs_backfill:
+            logger.info("Building daily history rollups")
+            await self._db.execute("""
+                INSERT INTO history_daily_stats (day, count, total_duration_ms)
+                SELECT date(created_at / 1000, 'unixepoch'), COUNT(*), COALESCE(SUM(duration_ms), 0)
+                FROM transcriptions GROUP BY 1
+            """)
+            await self._db.execute("""
+                INSERT INTO history_daily_breakdown (day, dimension, key, count)
+                SELECT date(created_at / 1000, 'unixepoch'), 'model', COALESCE(model_used, 'unknown'), COUNT(*)
+                FROM transcriptions GROUP BY 1, 3
+            """)
+            await self._db.execute("""
+                INSERT INTO history_daily_breakdown (day, dimension, key, count)
+                SELECT date(created_at / 1000, 'unixepoch'), 'language', COALESCE(language, 'unknown'), COUNT(*)
+                FROM transcriptions GROUP BY 1, 3
+            """)
+
+        await self._db.execute("""
+            CREATE TRIGGER IF NOT EXISTS transcriptions_rollup_ai AFTER INSERT ON transcriptions BEGIN
+                INSERT INTO history_daily_stats (day, count, total_duration_ms)
+                VALUES (date(new.created_at / 1000, 'unixepoch'), 1, COALESCE(new.duration_ms, 0))
+                ON CONFLICT(day) DO UPDATE SET
+                    count = count + 1,
+                    total_duration_ms = total_duration_ms + excluded.total_duration_ms;
+                INSERT INTO history_daily_breakdown (day, dimension, key, count)
+                VALUES (date(new.created_at / 1000, 'unixepoch'), 'model', COALESCE(new.model_used, 'unknown'), 1)
+                ON CONFLICT(day, dimension, key) DO UPDATE SET count = count + 1;
+                INSERT INTO history_daily_breakdown (day, dimension, key, count)
+                VALUES (date(new.created_at / 1000, 'unixepoch'), 'language', COALESCE(new.language, 'unknown'), 1)
+                ON CONFLICT(day, dimension, key) DO UPDATE SET count = count + 1;
+            END
+        """)
+
+        await self._db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS transcriptions_rollup_ad AFTER DELETE ON transcriptions BEGIN
+                {_ROLLUP_DELETE_SQL}
+            END
+        """)
+
     async def _migrate_schema(self) -> None:
         """Run schema migrations for existing databases."""
         if not self._db:
@@ -189,12 +1070,263 @@ class HistoryService:
             await self._db.commit()
             logger.info("Migration complete: original_text column added")
 
+        cursor = await self._db.execute("PRAGMA user_version")
+        version = (await cursor.fetchone())[0]
+
+        if version < 1:
+            await self._migrate_created_at_to_epoch_ms()
+
+        if version < 2:
+            # The FTS table indexed text only, without prefix indexes; drop it
+            # so initialize() recreates and rebuilds it over both columns
+            for trigger in ("transcriptions_ai", "transcriptions_ad", "transcriptions_au"):
+                await self._db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            await self._db.execute("DROP TABLE IF EXISTS transcriptions_fts")
+            await self._db.commit()
+
+        if version < SCHEMA_VERSION:
+            await self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            await self._db.commit()
+
+    async def _migrate_created_at_to_epoch_ms(self) -> None:
+        """
+        Convert created_at from ISO text to integer epoch milliseconds.
+
+        Rows are rewritten in place in rowid ranges of MIGRATION_CHUNK_SIZE,
+        committing after each range, so other connections are only blocked
+        for one chunk at a time and an interrupted migration resumes where it
+        stopped (already converted rows are skipped). Triggers whose
+        definitions depend on the storage format are dropped first and
+        recreated by initialize().
+        """
+        for trigger in (
+            "transcriptions_au",
+            "transcriptions_rollup_ai",
+            "transcriptions_rollup_ad",
+        ):
+            await self._db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        await self._db.commit()
+
+        cursor = await self._db.execute("SELECT MIN(rowid), MAX(rowid) FROM transcriptions")
+        first_rowid, last_rowid = await cursor.fetchone()
+        if first_rowid is None:
+            return
+
+        logger.info("Migrating database: converting created_at to epoch milliseconds")
+        converted = 0
+        update_sql = f"""
+            UPDATE transcriptions
+            SET created_at = {ISO_TO_EPOCH_MS_SQL.format(column="created_at")}
+            WHERE rowid >= ? AND rowid < ? AND typeof(created_at) = 'text'
+        """
+        for low in range(first_rowid, last_rowid + 1, MIGRATION_CHUNK_SIZE):
+            cursor = await self._db.execute(update_sql, (low, low + MIGRATION_CHUNK_SIZE))
+            await self._db.commit()
+            converted += max(cursor.rowcount, 0)
+        logger.info(f"Migration complete: {converted} timestamps converted")
+
     async def close(self) -> None:
-        """Close the database connection."""
+        """Flush pending write-behind inserts and close the database connections."""
+        if self._db and self._pending:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush {len(self._pending)} pending history rows: {e}")
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        await self._readers.close()
+        await self.archives.close()
         if self._db:
             await self._db.close()
             self._db = None
 
+    async def _fetch_one(self, sql: str, params: tuple = ()) -> Optional[aiosqlite.Row]:
+        """Run a read query on a pooled read connection and return the first row."""
+        async with self._readers.acquire() as db:
+            rows = await db.execute_fetchall(sql, params)
+        return rows[0] if rows else None
+
+    async def _fetch_all(self, sql: str, params: tuple = ()) -> list[aiosqlite.Row]:
+        """Run a read query on a pooled read connection and return all rows."""
+        async with self._readers.acquire() as db:
+            return list(await db.execute_fetchall(sql, params))
+
+    def _invalidate_caches(self, records: bool = True, pages: bool = True) -> None:
+        """
+        Drop cached search counts, search pages and stats after a write.
+
+        Writes that update the recent record and page caches themselves pass
+        records=False and pages=False to keep them.
+        """
+        self._last_write_at = time.monotonic()
+        self._write_generation += 1
+        self._search_totals.clear()
+        self._search_cache.clear()
+        self._stats_cache = None
+        if records:
+            self._recent_records.clear()
+        if pages:
+            self._recent_pages.clear()
+
+    def _count_lookup(self, cache: str, hit: bool) -> None:
+        """Count a hit or miss of a recent cache and update its hit rate gauge."""
+        lookups = self._cache_lookups.setdefault(cache, [0, 0])
+        lookups[0 if hit else 1] += 1
+        metrics.increment(f"history.{cache}_cache_{'hits' if hit else 'misses'}")
+        metrics.set_gauge(f"history.{cache}_cache_hit_rate", lookups[0] / sum(lookups))
+
+    def cache_stats(self) -> dict:
+        """
+        Get hits, misses, hit rate and size of the recent record, page and stats caches.
+
+        The same counts are reported as history.<cache>_cache_* metrics.
+        """
+        sizes = {
+            "record": len(self._recent_records),
+            "page": len(self._recent_pages),
+            "stats": int(self._stats_cache is not None),
+        }
+        stats = {}
+        for cache, size in sizes.items():
+            hits, misses = self._cache_lookups.get(cache, (0, 0))
+            stats[cache] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else None,
+                "size": size,
+            }
+        return stats
+
+    def _remember(self, records: "list[TranscriptionRecord]") -> None:
+        """Put records in the recent record cache."""
+        for record in records:
+            self._recent_records[record.id] = record
+            self._recent_records.move_to_end(record.id)
+        while len(self._recent_records) > RECENT_RECORDS_CACHE_SIZE:
+            self._recent_records.popitem(last=False)
+
+    def _cache_inserted(self, records: "list[TranscriptionRecord]") -> None:
+        """Write newly inserted records through to the recent caches."""
+        self._remember(records)
+        for (fields, limit, _), page in self._recent_pages.items():
+            items, total, _ = page
+            for record in records:
+                # Pages are newest first; a new record almost always goes first
+                key = (record.created_at, record.id)
+                position = 0
+                while position < len(items) and (
+                    (items[position].created_at, items[position].id) > key
+                ):
+                    position += 1
+                if position < limit:
+                    items.insert(position, _project(record, fields))
+            del items[limit:]
+            if total is not None:
+                page[1] = total + len(records)
+            last = items[-1] if len(items) == limit else None
+            page[2] = encode_cursor(last.created_at, last.id) if last else None
+
+    def _cache_updated(self, record_id: str, text: str, original_text: str) -> None:
+        """Write a text update through to the recent caches."""
+        record = self._recent_records.get(record_id)
+        if record is not None:
+            self._recent_records[record_id] = replace(
+                record, text=text, original_text=original_text
+            )
+        for (fields, _, _), page in self._recent_pages.items():
+            for i, item in enumerate(page[0]):
+                if item.id == record_id:
+                    page[0][i] = replace(
+                        item,
+                        text=text if fields is None or "text" in fields else None,
+                        original_text=(
+                            original_text if fields is None or "original_text" in fields else None
+                        ),
+                    )
+
+    def _cache_deleted(self, record_id: str) -> None:
+        """
+        Write the deletion of a hot record through to the recent caches.
+
+        A full page without the record only loses one from its total; a page
+        holding it, or one that is not full, is dropped and reloaded.
+        """
+        self._recent_records.pop(record_id, None)
+        for key, page in list(self._recent_pages.items()):
+            items, total, _ = page
+            if len(items) == key[1] and all(item.id != record_id for item in items):
+                if total is not None:
+                    page[1] = total - 1
+            else:
+                del self._recent_pages[key]
+
+    async def count(self) -> int:
+        """
+        Get the number of stored transcriptions from the maintained counter.
+
+        Rows still queued on the write-behind queue are not included.
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+
+        row = await self._fetch_one(
+            "SELECT value FROM history_counters WHERE name = 'transcriptions'"
+        )
+        return row[0] if row else 0
+
+    async def count_archived(self) -> int:
+        """Get the number of records moved to archive files."""
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+
+        row = await self._fetch_one("SELECT value FROM history_counters WHERE name = 'archived'")
+        return row[0] if row else 0
+
+    async def _count_search(self, search_query: str, table: str = "transcriptions_fts") -> int:
+        """Count FTS matches for a sanitized query, cached until the next write."""
+        key = (table, search_query)
+        cached = self._search_totals.get(key)
+        if cached is not None:
+            self._search_totals.move_to_end(key)
+            return cached
+
+        generation = self._write_generation
+        row = await self._fetch_one(
+            f"SELECT COUNT(*) FROM {table} WHERE {table} MATCH ?",
+            (search_query,),
+        )
+        total = row[0]
+
+        if generation == self._write_generation:
+            self._search_totals[key] = total
+            while len(self._search_totals) > SEARCH_TOTALS_CACHE_SIZE:
+                self._search_totals.popitem(last=False)
+        return total
+
+    def _get_cached_search(self, key: tuple) -> Optional[tuple]:
+        """Return a cached search page if it has not expired."""
+        entry = self._search_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._search_cache[key]
+            return None
+        self._search_cache.move_to_end(key)
+        metrics.increment("history.search_cache_hits")
+        records, total, next_cursor = result
+        return list(records), total, next_cursor
+
+    def _put_cached_search(self, key: tuple, result: tuple, generation: int) -> None:
+        """Cache a search page unless a write happened while it was computed."""
+        if generation != self._write_generation:
+            return
+        self._search_cache[key] = (time.monotonic() + SEARCH_CACHE_TTL_S, result)
+        while len(self._search_cache) > SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+
     async def update_text(
         self,
         record_id: str,
@@ -212,24 +1344,50 @@ class HistoryService:
         if not self._db:
             raise RuntimeError("Database not initialized")
 
-        await self._db.execute(
-            """
-            UPDATE transcriptions 
-            SET text = ?, original_text = ?
-            WHERE id = ?
-            """,
-            (new_text, original_text, record_id),
-        )
-        await self._db.commit()
-        logger.debug(f"Updated transcription {record_id} with corrected text")
+        if self._pending:
+            await self.flush()
 
-    async def add(
-        self,
-        text: str,
-        duration_ms: int,
-        model_used: Optional[str] = None,
+        stored_text, stored_original = new_text, original_text
+        if self.compress_text:
+            stored_text, stored_original = await asyncio.to_thread(
+                self._codec.encode_texts, new_text, original_text
+            )
+
+        async with self._write_lock:
+            cursor = await self._db.execute(
+                """
+                UPDATE transcriptions 
+                SET text = ?, original_text = ?
+                WHERE id = ?
+                """,
+                (stored_text, stored_original, record_id),
+            )
+            await self._db.commit()
+            if cursor.rowcount == 0:
+                month = await self._archived_month(record_id)
+                if month is not None:
+                    async with self._attached(month):
+                        await self._db.execute(
+                            f"""
+                            UPDATE {ARCHIVE_SCHEMA}.transcriptions
+                            SET text = ?, original_text = ?
+                            WHERE id = ?
+                            """,
+                            (stored_text, stored_original, record_id),
+                        )
+                        await self._db.commit()
+            self._invalidate_caches(records=False, pages=False)
+            self._cache_updated(record_id, new_text, original_text)
+        logger.debug(f"Updated transcription {record_id} with corrected text")
+
+    async def add(
+        self,
+        text: str,
+        duration_ms: int,
+        model_used: Optional[str] = None,
         language: Optional[str] = None,
         original_text: Optional[str] = None,
+        deferred: bool = False,
     ) -> TranscriptionRecord:
         """
         Add a new transcription to history.
@@ -240,6 +1398,10 @@ class HistoryService:
             model_used: Name of the model used
             language: Language of the transcription
             original_text: Original text before AI enhancement (if applicable)
+            deferred: Queue the insert on the write-behind queue instead of
+                committing it now. The record is returned immediately and is
+                visible to get() at once, and to list()/search after the next
+                flush (at most write_flush_interval_ms later).
 
         Returns:
             The created TranscriptionRecord
@@ -247,30 +1409,196 @@ class HistoryService:
         if not self._db:
             raise RuntimeError("Database not initialized")
 
-        record_id = str(uuid.uuid4())
-        created_at = datetime.now(timezone.utc)
-
-        await self._db.execute(
-            """
-            INSERT INTO transcriptions (id, text, duration_ms, model_used, language, created_at, original_text)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (record_id, text, duration_ms, model_used, language, created_at, original_text),
-        )
-        await self._db.commit()
-
-        logger.debug(f"Added transcription {record_id}: {text[:50]}...")
-
-        return TranscriptionRecord(
-            id=record_id,
+        record = TranscriptionRecord(
+            id=str(uuid.uuid4()),
             text=text,
             duration_ms=duration_ms,
             model_used=model_used,
             language=language,
-            created_at=created_at,
+            # Millisecond precision, as stored
+            created_at=from_epoch_ms(to_epoch_ms(datetime.now(timezone.utc))),
             original_text=original_text,
         )
 
+        if deferred:
+            self._pending[record.id] = record
+            metrics.set_gauge("history.write_queue_depth", len(self._pending))
+            if len(self._pending) >= self.write_batch_size:
+                await self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = asyncio.create_task(self._flush_later())
+            return record
+
+        params = (await self._insert_rows([record]))[0]
+        async with self._write_lock:
+            await self._db.execute(_INSERT_SQL, params)
+            await self._db.commit()
+            self._invalidate_caches(records=False, pages=False)
+            self._cache_inserted([record])
+
+        logger.debug(f"Added transcription {record.id}: {text[:50]}...")
+
+        return record
+
+    @property
+    def seconds_since_write(self) -> float:
+        """Time since the last committed write (or since startup)."""
+        return time.monotonic() - self._last_write_at
+
+    @property
+    def pending_writes(self) -> int:
+        """Number of deferred inserts waiting to be flushed."""
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """
+        Commit all pending write-behind inserts in a single transaction.
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            RuntimeError: If the database is not initialized
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+
+        if self._flush_timer is not None and self._flush_timer is not asyncio.current_task():
+            self._flush_timer.cancel()
+        self._flush_timer = None
+
+        async with self._write_lock:
+            # Rows queued while this flush runs are left for the next one
+            records = list(self._pending.values())
+            if not records:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                await self._db.executemany(_INSERT_SQL, await self._insert_rows(records))
+                await self._db.commit()
+            except aiosqlite.OperationalError:
+                # Locked, full or failing database: rows stay queued so a
+                # later flush (or close()) can retry them
+                await self._db.rollback()
+                raise
+            except Exception as e:
+                await self._db.rollback()
+                logger.warning(
+                    f"Flush of {len(records)} history rows failed, retrying one by one: {e}"
+                )
+                records = await self._flush_one_by_one(records)
+
+            for record in records:
+                self._pending.pop(record.id, None)
+            self._invalidate_caches(records=False, pages=False)
+            self._cache_inserted(records)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        metrics.record_timing("history.flush", elapsed_ms)
+        metrics.increment("history.rows_flushed", len(records))
+        metrics.set_gauge("history.write_queue_depth", len(self._pending))
+        logger.debug(f"Flushed {len(records)} history rows in {elapsed_ms:.1f}ms")
+
+        if self._pending and self._flush_timer is None:
+            self._flush_timer = asyncio.create_task(self._flush_later())
+
+        return len(records)
+
+    async def _flush_one_by_one(
+        self, records: "list[TranscriptionRecord]"
+    ) -> "list[TranscriptionRecord]":
+        """
+        Insert queued rows one at a time, after their batch failed.
+
+        Rows that still fail are dropped from the queue and logged, so a bad
+        row cannot block the deferred writes queued behind it. Database
+        errors (OperationalError) leave the remaining rows queued.
+
+        Returns:
+            The records written
+        """
+        written = []
+        try:
+            for record in records:
+                try:
+                    await self._db.execute(_INSERT_SQL, (await self._insert_rows([record]))[0])
+                except aiosqlite.OperationalError:
+                    raise
+                except Exception as e:
+                    self._pending.pop(record.id, None)
+                    metrics.increment("history.rows_dropped")
+                    logger.error(f"Dropped queued history row {record.id}: {e}")
+                    continue
+                written.append(record)
+            await self._db.commit()
+        except Exception:
+            await self._db.rollback()
+            raise
+        return written
+
+    @asynccontextmanager
+    async def writes_paused(self) -> AsyncIterator[None]:
+        """
+        Hold off writes to the history database and its archive files.
+
+        Pending write-behind inserts are committed first. Used by backups
+        to open their read snapshots of all files at one point in time.
+        """
+        await self.flush()
+        async with self._write_lock:
+            yield
+
+    async def import_records(self, records: list[TranscriptionRecord]) -> int:
+        """
+        Insert records in a single transaction, keeping their IDs and timestamps.
+
+        Records whose ID already exists are skipped (INSERT OR IGNORE), so
+        re-importing the same export is idempotent.
+
+        Args:
+            records: Records to insert, e.g. from record_from_import()
+
+        Returns:
+            Number of records actually inserted
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+        if not records:
+            return 0
+
+        if self._pending:
+            await self.flush()
+
+        rows = await self._insert_rows(records)
+        async with self._write_lock:
+            try:
+                cursor = await self._db.executemany(_IMPORT_SQL, rows)
+                await self._db.commit()
+                self._invalidate_caches()
+            except Exception:
+                await self._db.rollback()
+                raise
+
+        return max(cursor.rowcount, 0)
+
+    async def _insert_rows(self, records: "list[TranscriptionRecord]") -> "list[tuple]":
+        """INSERT parameters of records, compressing their text off the event loop."""
+        if not self.compress_text:
+            return [_insert_params(record) for record in records]
+        return await asyncio.to_thread(
+            lambda: [_insert_params(record, self._codec) for record in records]
+        )
+
+    async def _flush_later(self) -> None:
+        """Flush the write-behind queue after the flush interval."""
+        await asyncio.sleep(self.write_flush_interval_ms / 1000)
+        self._flush_timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Write-behind flush failed, {len(self._pending)} rows still queued: {e}")
+
     async def get(self, record_id: str) -> Optional[TranscriptionRecord]:
         """
         Get a transcription by ID.
@@ -284,24 +1612,117 @@ class HistoryService:
         if not self._db:
             raise RuntimeError("Database not initialized")
 
-        cursor = await self._db.execute(
-            "SELECT * FROM transcriptions WHERE id = ?",
+        pending = self._pending.get(record_id)
+        if pending is not None:
+            return pending
+
+        record = self._recent_records.get(record_id)
+        self._count_lookup("record", record is not None)
+        if record is not None:
+            self._recent_records.move_to_end(record_id)
+            return record
+
+        generation = self._write_generation
+        row = await self._fetch_one(
+            f"SELECT {_record_select(None, self._compressed)} FROM transcriptions t WHERE t.id = ?",
             (record_id,),
         )
-        row = await cursor.fetchone()
 
         if not row:
-            return None
+            archived = await self._fetch_archived_ids([record_id], "transcriptions t", [], [])
+            row = archived.get(record_id)
+            if not row:
+                return None
+
+        record = _record_from_row(row)
+        if generation == self._write_generation:
+            self._remember([record])
+        return record
+
+    async def get_many(self, record_ids: "list[str]") -> "list[TranscriptionRecord]":
+        """
+        Get several transcriptions by ID.
+
+        IDs are looked up EXPORT_BATCH_SIZE at a time with one IN query per
+        chunk instead of one query per ID.
+
+        Args:
+            record_ids: The record IDs; duplicates are ignored
+
+        Returns:
+            The found records, in the order of record_ids (missing IDs are
+            skipped). Archived records are included.
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+
+        if self._pending:
+            await self.flush()
+
+        no_filter = ("transcriptions t", [], [])
+        records: list[TranscriptionRecord] = []
+        for chunk in _chunks(list(dict.fromkeys(record_ids)), EXPORT_BATCH_SIZE):
+            records.extend(await self._fetch_ids(chunk, *no_filter, archived=no_filter))
+        return records
+
+    async def _fetch_ids(
+        self,
+        record_ids: "list[str]",
+        source: str,
+        conditions: "list[str]",
+        params: "list",
+        archived: Optional[tuple] = None,
+    ) -> "list[TranscriptionRecord]":
+        """
+        Fetch one chunk of IDs matching extra filters, in the order given.
 
-        return TranscriptionRecord(
-            id=row["id"],
-            text=row["text"],
-            duration_ms=row["duration_ms"],
-            model_used=row["model_used"],
-            language=row["language"],
-            created_at=datetime.fromisoformat(row["created_at"]),
-            original_text=row["original_text"] if "original_text" in row.keys() else None,
+        With archived, the (source, conditions, params) filters compiled for
+        archive files, IDs missing from the hot database are looked up in
+        their archive files.
+        """
+        placeholders = ", ".join("?" * len(record_ids))
+        where = " AND ".join([f"t.id IN ({placeholders})", *conditions])
+        rows = await self._fetch_all(
+            f"SELECT {_record_select(None, self._compressed)} FROM {source} WHERE {where}",
+            (*record_ids, *params),
+        )
+        by_id = {row[0]: row for row in rows}
+        missing = [i for i in record_ids if i not in by_id]
+        if archived is not None and missing:
+            by_id.update(await self._fetch_archived_ids(missing, *archived))
+        return [_record_from_row(by_id[i]) for i in record_ids if i in by_id]
+
+    async def _fetch_archived_ids(
+        self,
+        record_ids: "list[str]",
+        source: str,
+        conditions: "list[str]",
+        params: "list",
+    ) -> "dict[str, aiosqlite.Row]":
+        """Look up archived IDs in their archive files, querying the files in parallel."""
+        if not self.archives.months:
+            return {}
+
+        placeholders = ", ".join("?" * len(record_ids))
+        index_rows = await self._fetch_all(
+            f"SELECT id, month FROM history_archive_index WHERE id IN ({placeholders})",
+            tuple(record_ids),
+        )
+        by_month: dict[str, list[str]] = {}
+        for record_id, month in index_rows:
+            by_month.setdefault(month, []).append(record_id)
+
+        def query(ids: "list[str]") -> str:
+            where = " AND ".join([f"t.id IN ({', '.join('?' * len(ids))})", *conditions])
+            return f"SELECT {_record_select(None, self._compressed)} FROM {source} WHERE {where}"
+
+        pages = await asyncio.gather(
+            *(
+                self.archives.fetch_all(month, query(ids), (*ids, *params))
+                for month, ids in by_month.items()
+            )
         )
+        return {row[0]: row for page in pages for row in page}
 
     async def list(
         self,
@@ -310,19 +1731,50 @@ class HistoryService:
         search: Optional[str] = None,
         cursor: Optional[str] = None,
         fields: Optional[set[str]] = None,
-    ) -> tuple[list[TranscriptionRecord], int, Optional[str]]:
+        include_total: bool = True,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        search_mode: str = "phrase",
+        order: str = "date",
+        highlight: bool = False,
+        include_archived: Optional[bool] = None,
+    ) -> tuple[list[TranscriptionRecord], Optional[int], Optional[str]]:
         """
         List transcriptions with optional search, cursor pagination, and field projection.
 
+        Search matches both the stored text and the original (pre-correction)
+        text. Search pages are cached for SEARCH_CACHE_TTL_S seconds or until
+        the next write.
+
+        By default only searches and date-filtered lists read the archive
+        files (those whose month overlaps the date range); plain lists show
+        the records in the hot database. Archive files are queried in
+        parallel and their pages merged with the hot one.
+
         Args:
             limit: Maximum number of records to return
             offset: Number of records to skip (ignored if cursor is provided)
             search: Optional search query for full-text search
-            cursor: Optional cursor for pagination (format: base64 encoded "timestamp_id")
-            fields: Optional set of field names to include in response
+            cursor: Optional cursor for pagination (from a previous next_cursor
+                with the same search and order)
+            fields: Optional set of field names to load. Only these columns
+                (plus id and created_at) are read; other fields are None.
+            include_total: Compute the total count. Cursor pages that already
+                know the total can pass False to skip it.
+            start: Only include records created at or after this time
+            end: Only include records created at or before this time
+            search_mode: "phrase" (literal phrase), "prefix" (search as you
+                type: all terms, the last one as a prefix) or "substring"
+                (matches inside words via the trigram index)
+            order: "date" (newest first) or "relevance" (bm25, best first;
+                only applies to searches)
+            highlight: Set TranscriptionRecord.snippet to an excerpt with the
+                matches wrapped in HIGHLIGHT_START/HIGHLIGHT_END
+            include_archived: Also list archived records (True), never (False),
+                or only for searches and date ranges (None)
 
         Returns:
-            Tuple of (list of records, total count, next cursor or None)
+            Tuple of (list of records, total count or None, next cursor or None)
         """
         if not self._db:
             raise RuntimeError("Database not initialized")
@@ -332,104 +1784,418 @@ class HistoryService:
             invalid_fields = fields - TranscriptionRecord.VALID_FIELDS
             if invalid_fields:
                 raise ValueError(f"Invalid fields: {invalid_fields}")
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Invalid search mode: {search_mode}")
+        if order not in SEARCH_ORDERS:
+            raise ValueError(f"Invalid order: {order}")
 
-        # Parse cursor if provided
-        cursor_created_at: Optional[datetime] = None
-        cursor_id: Optional[str] = None
-        if cursor:
-            cursor_created_at, cursor_id = decode_cursor(cursor)
-
+        cache_key: Optional[tuple] = None
+        generation = self._write_generation
         if search:
-            # Sanitize search query for FTS5
-            # Escape double quotes and wrap in double quotes to treat as a literal string/phrase
-            # This prevents syntax errors with single quotes or FTS5 keywords
-            sanitized = search.replace('"', '""')
-            search_query = f'"{sanitized}"'
-
-            # Use FTS5 for full-text search
-            count_cursor_db = await self._db.execute(
-                """
-                SELECT COUNT(*) FROM transcriptions t
-                INNER JOIN transcriptions_fts fts ON t.rowid = fts.rowid
-                WHERE transcriptions_fts MATCH ?
-                """,
-                (search_query,),
+            cache_key = (
+                search,
+                search_mode,
+                order,
+                highlight,
+                frozenset(fields) if fields else None,
+                limit,
+                offset,
+                cursor,
+                start,
+                end,
+                include_total,
+                include_archived,
             )
-            total = (await count_cursor_db.fetchone())[0]
+            cached = self._get_cached_search(cache_key)
+            if cached is not None:
+                return cached
+
+        page_key: Optional[tuple] = None
+        if (
+            not search
+            and not cursor
+            and not offset
+            and start is None
+            and end is None
+            and not include_archived
+            and 0 < limit <= RECENT_PAGE_MAX_LIMIT
+        ):
+            page_key = (frozenset(fields) if fields else None, limit, include_total)
+            page = self._recent_pages.get(page_key)
+            self._count_lookup("page", page is not None)
+            if page is not None:
+                self._recent_pages.move_to_end(page_key)
+                records, total, next_cursor = page
+                return list(records), total, next_cursor
+
+        if include_archived is None:
+            include_archived = bool(search) or start is not None or end is not None
+        filters = HistoryFilter(
+            search=search,
+            search_mode=search_mode,
+            start=start,
+            end=end,
+            include_archived=include_archived,
+        )
+        months = self._archived_months(filters)
 
-            if cursor_created_at and cursor_id:
-                # Cursor-based pagination with search
-                db_cursor = await self._db.execute(
-                    """
-                    SELECT t.* FROM transcriptions t
-                    INNER JOIN transcriptions_fts fts ON t.rowid = fts.rowid
-                    WHERE transcriptions_fts MATCH ?
-                    AND (t.created_at < ? OR (t.created_at = ? AND t.id < ?))
-                    ORDER BY t.created_at DESC, t.id DESC
-                    LIMIT ?
-                    """,
-                    (search_query, cursor_created_at, cursor_created_at, cursor_id, limit),
-                )
-            else:
-                # Offset-based pagination with search (backward compatible)
-                db_cursor = await self._db.execute(
-                    """
-                    SELECT t.* FROM transcriptions t
-                    INNER JOIN transcriptions_fts fts ON t.rowid = fts.rowid
-                    WHERE transcriptions_fts MATCH ?
-                    ORDER BY t.created_at DESC, t.id DESC
-                    LIMIT ? OFFSET ?
-                    """,
-                    (search_query, limit, offset),
-                )
-        else:
-            count_cursor_db = await self._db.execute("SELECT COUNT(*) FROM transcriptions")
-            total = (await count_cursor_db.fetchone())[0]
+        # Filters shared by the page query and the total count
+        source, conditions, params, fts_table, search_query = await self._build_filters(
+            filters, index_walk=order == "date"
+        )
 
-            if cursor_created_at and cursor_id:
-                # Cursor-based pagination
-                db_cursor = await self._db.execute(
-                    """
-                    SELECT * FROM transcriptions 
-                    WHERE created_at < ? OR (created_at = ? AND id < ?)
-                    ORDER BY created_at DESC, id DESC
-                    LIMIT ?
-                    """,
-                    (cursor_created_at, cursor_created_at, cursor_id, limit),
-                )
+        total: Optional[int] = None
+        if include_total:
+            if not conditions:
+                total = await self.count()
+            elif fts_table and len(conditions) == 1:
+                total = await self._count_search(search_query, fts_table)
             else:
-                # Offset-based pagination (backward compatible)
-                db_cursor = await self._db.execute(
-                    """
-                    SELECT * FROM transcriptions 
-                    ORDER BY created_at DESC, id DESC
-                    LIMIT ? OFFSET ?
-                    """,
-                    (limit, offset),
+                row = await self._fetch_one(
+                    f"SELECT COUNT(*) FROM {source} WHERE {' AND '.join(conditions)}",
+                    tuple(params),
                 )
+                total = row[0]
 
-        rows = await db_cursor.fetchall()
-        records = [
-            TranscriptionRecord(
-                id=row["id"],
-                text=row["text"],
-                duration_ms=row["duration_ms"],
-                model_used=row["model_used"],
-                language=row["language"],
-                created_at=datetime.fromisoformat(row["created_at"]),
-                original_text=row["original_text"] if "original_text" in row.keys() else None,
+        by_relevance = order == "relevance" and fts_table is not None
+        page_sql, page_params = _page_query(
+            source, conditions, params, fts_table, fields, by_relevance, cursor, self._compressed
+        )
+        if cursor:
+            offset = 0
+
+        if not months:
+            rows = await self._fetch_all(page_sql, (*page_params, limit, offset))
+            records = [_record_from_row(row) for row in rows]
+            if highlight and fts_table and records:
+                await self._add_snippets(records, rows, fts_table, search_query)
+        else:
+            tagged, archived_total, archive_fts, archive_query = await self._list_archived(
+                months,
+                (page_sql, page_params),
+                filters,
+                fields,
+                by_relevance,
+                cursor,
+                offset + limit,
+                include_total,
             )
-            for row in rows
-        ]
+            tagged = tagged[offset:]
+            rows = [row for _, row in tagged]
+            records = [_record_from_row(row) for row in rows]
+            if total is not None:
+                total += archived_total
+
+            if highlight and fts_table and records:
+                # Snippets come from the index of the file each row is in
+                groups: dict[Optional[str], list[int]] = {}
+                for i, (month, _) in enumerate(tagged):
+                    groups.setdefault(month, []).append(i)
+                snippet_tasks = []
+                for month, indexes in groups.items():
+                    if month is None:
+                        fetch_all, table, query = self._fetch_all, fts_table, search_query
+                    else:
+                        fetch_all = partial(self.archives.fetch_all, month)
+                        table, query = archive_fts, archive_query
+                    if table:
+                        snippet_tasks.append(
+                            self._add_snippets(
+                                [records[i] for i in indexes],
+                                [rows[i] for i in indexes],
+                                table,
+                                query,
+                                fetch_all,
+                            )
+                        )
+                await asyncio.gather(*snippet_tasks)
 
         # Generate next cursor if there are more records
         next_cursor: Optional[str] = None
         if records and len(records) == limit:
             last_record = records[-1]
-            next_cursor = encode_cursor(last_record.created_at, last_record.id)
-
+            if by_relevance:
+                next_cursor = encode_rank_cursor(rows[-1]["score"], last_record.id)
+            else:
+                next_cursor = encode_cursor(last_record.created_at, last_record.id)
+
+        if cache_key is not None:
+            self._put_cached_search(cache_key, (records, total, next_cursor), generation)
+        if page_key is not None and generation == self._write_generation:
+            self._recent_pages[page_key] = [list(records), total, next_cursor]
+            while len(self._recent_pages) > RECENT_PAGES_CACHE_SIZE:
+                self._recent_pages.popitem(last=False)
         return records, total, next_cursor
 
+    def _archived_months(self, criteria: HistoryFilter) -> "list[str]":
+        """Archived months a query has to read, from its date range."""
+        if not criteria.include_archived:
+            return []
+        return self.archives.months_between(
+            to_epoch_ms(criteria.start) if criteria.start is not None else None,
+            to_epoch_ms(criteria.end) if criteria.end is not None else None,
+        )
+
+    async def _list_archived(
+        self,
+        months: "list[str]",
+        hot_page: tuple[str, "list"],
+        filters: HistoryFilter,
+        fields: Optional[set[str]],
+        by_relevance: bool,
+        cursor: Optional[str],
+        window: int,
+        include_total: bool,
+    ) -> tuple["list[tuple[Optional[str], aiosqlite.Row]]", int, Optional[str], Optional[str]]:
+        """
+        Read the first `window` rows of a list() page from the hot database and archives.
+
+        The hot database and every archive file return their own first
+        window rows, all queried in parallel, and the pages are merged in
+        the requested order. Relevance scores come from each file's own
+        index, so they compare only approximately across files.
+
+        Args:
+            months: Archive files to read
+            hot_page: Page query (see _page_query()) and parameters for the hot database
+            filters: The list() criteria
+            fields: Field projection
+            by_relevance: Order by bm25 score instead of date
+            cursor: Cursor the page continues from
+            window: Rows to read (offset + limit)
+            include_total: Also count the matches in the archive files
+
+        Returns:
+            Tuple of (rows tagged with their month, None for the hot
+            database; archived matches or 0; archive FTS table and query for
+            snippets, or None)
+        """
+        source, conditions, params, fts_table, search_query = await self._build_filters(
+            filters, index_walk=False, schema="main"
+        )
+        page_sql, page_params = _page_query(
+            source, conditions, params, fts_table, fields, by_relevance, cursor, self._compressed
+        )
+        hot_sql, hot_params = hot_page
+
+        tasks = [
+            self._fetch_all(hot_sql, (*hot_params, window, 0)),
+            self.archives.fetch_each(months, page_sql, (*page_params, window, 0)),
+        ]
+        if include_total:
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            count_sql = f"SELECT COUNT(*) FROM {source} {where}"
+            tasks.append(self.archives.fetch_each(months, count_sql, tuple(params)))
+        hot_rows, archive_pages, *counts = await asyncio.gather(*tasks)
+
+        pages = [[(None, row) for row in hot_rows]]
+        pages.extend([(month, row) for row in page] for month, page in zip(months, archive_pages))
+        if by_relevance:
+            merged = heapq.merge(*pages, key=lambda item: (item[1]["score"], item[1]["id"]))
+        else:
+            merged = heapq.merge(
+                *pages, key=lambda item: (item[1]["created_at"], item[1]["id"]), reverse=True
+            )
+
+        archived_total = sum(rows[0][0] for rows in counts[0]) if counts else 0
+        return list(islice(merged, window)), archived_total, fts_table, search_query
+
+    async def iter_records(
+        self,
+        criteria: Optional[HistoryFilter] = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator["list[TranscriptionRecord]"]:
+        """
+        Iterate over all matching transcriptions in batches.
+
+        Each batch is one query with all criteria applied in SQL. Without
+        criteria.ids, records come newest first and each batch is a keyset
+        query continuing after the previous one, so memory stays bounded by
+        batch_size and no read connection is held between batches (a slow
+        consumer does not pin a reader or the WAL). Archive files in the
+        date range (unless criteria.include_archived is False) are paged the
+        same way and merged in. With criteria.ids, records come in the order
+        of the IDs, looked up batch_size at a time. Pending write-behind rows
+        are flushed first. Results bypass the search caches.
+
+        Args:
+            criteria: Optional filter; None iterates over all records
+            batch_size: Records per batch
+
+        Yields:
+            Lists of up to batch_size records
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+        criteria = criteria or HistoryFilter()
+        if criteria.search_mode not in SEARCH_MODES:
+            raise ValueError(f"Invalid search mode: {criteria.search_mode}")
+
+        if self._pending:
+            await self.flush()
+
+        if criteria.ids is not None:
+            # A bounded ID set: probe the primary key per chunk rather than
+            # re-testing every ID on each keyset page
+            source, conditions, params, _, _ = await self._build_filters(criteria, index_walk=False)
+            archived = None
+            if criteria.include_archived:
+                archived = (await self._build_filters(criteria, False, schema="main"))[:3]
+            for chunk in _chunks(list(dict.fromkeys(criteria.ids)), batch_size):
+                records = await self._fetch_ids(chunk, source, conditions, params, archived)
+                if records:
+                    yield records
+            return
+
+        pagers = [
+            _keyset_pager(
+                self._fetch_all,
+                *(await self._build_filters(criteria, index_walk=True))[:3],
+                batch_size,
+                self._compressed,
+            )
+        ]
+        months = self._archived_months(criteria)
+        if months:
+            archive_filters = (await self._build_filters(criteria, False, schema="main"))[:3]
+            for month in months:
+                fetch_all = partial(self.archives.fetch_all, month)
+                pagers.append(
+                    _keyset_pager(fetch_all, *archive_filters, batch_size, self._compressed)
+                )
+
+        async for rows in _merge_newest_first(pagers, batch_size):
+            yield [_record_from_row(row) for row in rows]
+
+    async def _build_filters(
+        self,
+        criteria: HistoryFilter,
+        index_walk: bool,
+        schema: Optional[str] = None,
+    ) -> tuple[str, "list[str]", "list", Optional[str], Optional[str]]:
+        """
+        Compile filter criteria into SQL.
+
+        Date ranges are integer comparisons on created_at, i.e. index range
+        scans. criteria.ids is left to the caller, which chunks the IDs.
+
+        Args:
+            criteria: Filter criteria
+            index_walk: Allow broad searches to walk the created_at index
+                (only useful when reading newest first with a LIMIT)
+            schema: Compile for an archive file instead of the hot database:
+                "main" on an archive read connection, ARCHIVE_SCHEMA when
+                attached to the writer. Archives have no trigram index
+                (substring searches use LIKE) and are never index-walked.
+
+        Returns:
+            Tuple of (FROM source, WHERE conditions, parameters, FTS table or
+            None, sanitized FTS query or None)
+        """
+        archived = schema is not None
+        prefix = f"{schema}." if archived else ""
+        source = f"{prefix}transcriptions t"
+        conditions: list[str] = []
+        params: list = []
+
+        search = criteria.search
+        search_mode = criteria.search_mode
+        fts_table: Optional[str] = None
+        search_query: Optional[str] = None
+        if search:
+            if search_mode == "substring" and (
+                archived or len(search) < 3 or not self._trigram_enabled
+            ):
+                # Trigrams need at least 3 characters; shorter substrings scan
+                pattern = _like_pattern(search)
+                text, original_text = (
+                    (_DECODED_TEXT, _DECODED_ORIGINAL_TEXT)
+                    if self._compressed
+                    else ("t.text", "t.original_text")
+                )
+                conditions.append(
+                    f"({text} LIKE ? ESCAPE '\\' OR {original_text} LIKE ? ESCAPE '\\')"
+                )
+                params.extend((pattern, pattern))
+            else:
+                fts_table = (
+                    "transcriptions_trigram" if search_mode == "substring" else "transcriptions_fts"
+                )
+                search_query = build_search_query(search, search_mode)
+                if (
+                    not archived
+                    and index_walk
+                    and await self._count_search(search_query, fts_table) >= INDEX_WALK_MIN_MATCHES
+                ):
+                    # Broad match (e.g. the first keystrokes of a prefix
+                    # search): walk the created_at index newest first and
+                    # stop at the page end instead of sorting every match
+                    source = "transcriptions t INDEXED BY idx_transcriptions_created_at"
+                    conditions.append(
+                        f"+t.rowid IN (SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH ?)"
+                    )
+                else:
+                    source += f" INNER JOIN {prefix}{fts_table} ON t.rowid = {fts_table}.rowid"
+                    conditions.append(f"{fts_table} MATCH ?")
+                params.append(search_query)
+
+        if criteria.start is not None:
+            conditions.append("t.created_at >= ?")
+            params.append(to_epoch_ms(criteria.start))
+        if criteria.end is not None:
+            conditions.append("t.created_at <= ?")
+            params.append(to_epoch_ms(criteria.end))
+        if criteria.model_used is not None:
+            conditions.append("t.model_used = ?")
+            params.append(criteria.model_used)
+        if criteria.language is not None:
+            conditions.append("t.language = ?")
+            params.append(criteria.language)
+
+        return source, conditions, params, fts_table, search_query
+
+    async def _add_snippets(
+        self,
+        records: "list[TranscriptionRecord]",
+        rows: "list[aiosqlite.Row]",
+        fts_table: str,
+        search_query: str,
+        fetch_all: Optional[Callable[..., Awaitable["list[aiosqlite.Row]"]]] = None,
+    ) -> None:
+        """
+        Attach highlighted snippets to a page of search results.
+
+        Snippets are generated for the page only, after sorting and limiting,
+        rather than for every match. A page whose rowids are close together
+        (date order) is highlighted with one rowid range scan; scattered pages
+        (relevance order) look up each row, which re-evaluates the query per
+        row and is only cheap for selective queries. fetch_all runs the query
+        on the database the rows came from (default: the hot database).
+        """
+        # Trigram tokens are characters, so the excerpt needs more of them
+        tokens = 48 if fts_table == "transcriptions_trigram" else 16
+        row_ids = [row["row_id"] for row in rows]
+        low, high = min(row_ids), max(row_ids)
+        if high - low < len(row_ids) * SNIPPET_RANGE_FACTOR:
+            rowid_filter = "rowid >= ? AND rowid <= ?"
+            rowid_params: tuple = (low, high)
+        else:
+            rowid_filter = f"rowid IN ({', '.join('?' * len(row_ids))})"
+            rowid_params = tuple(row_ids)
+
+        fetch_all = fetch_all or self._fetch_all
+        snippet_rows = await fetch_all(
+            f"""
+            SELECT rowid, snippet({fts_table}, -1, ?, ?, '…', ?) AS snippet
+            FROM {fts_table}
+            WHERE {fts_table} MATCH ? AND {rowid_filter}
+            """,
+            (HIGHLIGHT_START, HIGHLIGHT_END, tokens, search_query, *rowid_params),
+        )
+        snippets = {r["rowid"]: r["snippet"] for r in snippet_rows}
+        for record, row_id in zip(records, row_ids):
+            record.snippet = snippets.get(row_id)
+
     async def delete(self, record_id: str) -> bool:
         """
         Delete a transcription by ID.
@@ -443,81 +2209,830 @@ class HistoryService:
         if not self._db:
             raise RuntimeError("Database not initialized")
 
-        cursor = await self._db.execute(
-            "DELETE FROM transcriptions WHERE id = ?",
-            (record_id,),
+        if self._pending:
+            await self.flush()
+
+        async with self._write_lock:
+            cursor = await self._db.execute(
+                "DELETE FROM transcriptions WHERE id = ?",
+                (record_id,),
+            )
+            await self._db.commit()
+            if cursor.rowcount > 0:
+                self._invalidate_caches(records=False, pages=False)
+                self._cache_deleted(record_id)
+        if cursor.rowcount > 0:
+            return True
+
+        month = await self._archived_month(record_id)
+        if month is None:
+            return False
+        deleted = await self._delete_archived(
+            month, [(f"DELETE FROM {ARCHIVE_SCHEMA}.transcriptions WHERE id = ?", [record_id])]
         )
-        await self._db.commit()
+        return deleted > 0
+
+    async def delete_many(self, criteria: HistoryFilter) -> int:
+        """
+        Delete all transcriptions matching a filter in a single transaction.
+
+        The criteria are compiled to SQL as for iter_records(); criteria.ids
+        are deleted EXPORT_BATCH_SIZE at a time within the same transaction.
+        Matching archived records are deleted afterwards, one transaction per
+        archive file. A filter without any criteria deletes everything
+        through clear(). Freed pages are returned to the filesystem afterwards.
+
+        Args:
+            criteria: Which records to delete
+
+        Returns:
+            Number of records deleted
+
+        Raises:
+            ValueError: If the search mode is invalid
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+        if criteria.search_mode not in SEARCH_MODES:
+            raise ValueError(f"Invalid search mode: {criteria.search_mode}")
+
+        source, conditions, params, _, _ = await self._build_filters(criteria, index_walk=False)
+        if criteria.ids is None and not conditions and criteria.include_archived:
+            return await self.clear()
 
-        return cursor.rowcount > 0
+        if self._pending:
+            await self.flush()
+
+        def statements(table: str, source: str, filters: "list[str]", filter_params: "list"):
+            """DELETE statements for one database, chunking criteria.ids."""
+            if criteria.ids is None:
+                chunks = [(" AND ".join(filters) or "1", filter_params)]
+            else:
+                chunks = [
+                    (
+                        " AND ".join([f"t.id IN ({', '.join('?' * len(chunk))})", *filters]),
+                        [*chunk, *filter_params],
+                    )
+                    for chunk in _chunks(list(dict.fromkeys(criteria.ids)), EXPORT_BATCH_SIZE)
+                ]
+            return [
+                (
+                    f"DELETE FROM {table} "
+                    f"WHERE rowid IN (SELECT t.rowid FROM {source} WHERE {where})",
+                    chunk_params,
+                )
+                for where, chunk_params in chunks
+            ]
+
+        deleted = 0
+        async with self._write_lock:
+            try:
+                for sql, statement_params in statements(
+                    "transcriptions", source, conditions, params
+                ):
+                    cursor = await self._db.execute(sql, statement_params)
+                    deleted += max(cursor.rowcount, 0)
+                await self._db.commit()
+            except Exception:
+                await self._db.rollback()
+                raise
+            self._invalidate_caches()
+
+            if deleted:
+                await self._reclaim_space()
+
+        months = self._archived_months(criteria)
+        if months and criteria.ids is not None:
+            # Only the files holding the requested IDs
+            index_months = set()
+            for chunk in _chunks(list(dict.fromkeys(criteria.ids)), EXPORT_BATCH_SIZE):
+                rows = await self._fetch_all(
+                    "SELECT DISTINCT month FROM history_archive_index "
+                    f"WHERE id IN ({', '.join('?' * len(chunk))})",
+                    tuple(chunk),
+                )
+                index_months.update(row[0] for row in rows)
+            months = [month for month in months if month in index_months]
+        if months:
+            archive_filters = await self._build_filters(criteria, False, schema=ARCHIVE_SCHEMA)
+            archive_statements = statements(
+                f"{ARCHIVE_SCHEMA}.transcriptions", *archive_filters[:3]
+            )
+            for month in months:
+                deleted += await self._delete_archived(month, archive_statements)
+
+        logger.info(f"Deleted {deleted} history records")
+        return deleted
 
     async def clear(self) -> int:
         """
         Delete all transcriptions.
 
+        Instead of running the per-row delete triggers (one full-text index
+        delete per row), the triggers are dropped for the duration of the
+        transaction: the table is truncated, the full-text indexes are emptied
+        with 'delete-all', the counter and daily rollups are reset, and the
+        triggers are recreated. Freed pages are returned to the filesystem
+        afterwards, and the archive files are deleted.
+
+        Returns:
+            Number of records deleted (archived records included)
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+
+        if self._pending:
+            await self.flush()
+
+        async with self._write_lock:
+            try:
+                await self._db.execute("BEGIN IMMEDIATE")
+                cursor = await self._db.execute(
+                    "SELECT (SELECT COUNT(*) FROM transcriptions), "
+                    "(SELECT value FROM history_counters WHERE name = 'archived')"
+                )
+                deleted = sum(value or 0 for value in await cursor.fetchone())
+
+                triggers = await self._db.execute_fetchall(
+                    "SELECT name, sql FROM sqlite_master "
+                    "WHERE type = 'trigger' AND tbl_name = 'transcriptions'"
+                )
+                for name, _ in triggers:
+                    await self._db.execute(f"DROP TRIGGER {name}")
+
+                # Without triggers or a WHERE clause SQLite drops the table's
+                # pages wholesale instead of deleting row by row
+                await self._db.execute("DELETE FROM transcriptions")
+                for table in self._fts_tables():
+                    await self._db.execute(f"INSERT INTO {table}({table}) VALUES ('delete-all')")
+                await self._db.execute("DELETE FROM history_daily_stats")
+                await self._db.execute("DELETE FROM history_daily_breakdown")
+                await self._db.execute("DELETE FROM history_archive_index")
+                await self._db.execute(
+                    "UPDATE history_counters SET value = 0 "
+                    "WHERE name IN ('transcriptions', 'archived')"
+                )
+                await self._db.execute(
+                    "DELETE FROM history_counters WHERE name = 'compressed_rowid'"
+                )
+
+                for _, sql in triggers:
+                    await self._db.execute(sql)
+                await self._db.commit()
+            except Exception:
+                await self._db.rollback()
+                raise
+            self._invalidate_caches()
+
+            await self._reclaim_space(convert=True)
+            await self.archives.remove_all()
+
+        logger.info(f"Cleared {deleted} history records")
+        return deleted
+
+    async def _reclaim_space(self, convert: bool = False) -> None:
+        """
+        Return free pages to the filesystem after a large delete.
+
+        Must be called with the write lock held and no transaction open.
+
+        Args:
+            convert: Switch a file that predates incremental auto-vacuum to
+                it with a full VACUUM (cheap right after clear())
+        """
+        try:
+            cursor = await self._db.execute("PRAGMA auto_vacuum")
+            if (await cursor.fetchone())[0] == AUTO_VACUUM_INCREMENTAL:
+                # Run as a script: the pragma frees pages over several steps,
+                # and a cursor only takes the first
+                await self._db.executescript("PRAGMA incremental_vacuum;")
+            elif convert:
+                await self._db.execute(f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}")
+                await self._db.execute("VACUUM")
+        except aiosqlite.OperationalError as e:
+            logger.warning(f"Could not reclaim free space in {self.db_path}: {e}")
+
+    def _fts_tables(self) -> "list[str]":
+        """Names of the full-text index tables in use."""
+        if self._trigram_enabled:
+            return ["transcriptions_fts", "transcriptions_trigram"]
+        return ["transcriptions_fts"]
+
+    async def apply_retention(
+        self,
+        max_age_days: int = 0,
+        max_records: int = 0,
+        max_bytes: int = 0,
+        chunk_size: int = RETENTION_CHUNK_SIZE,
+    ) -> int:
+        """
+        Delete the oldest transcriptions beyond the retention limits.
+
+        Rows are deleted oldest first, chunk_size per transaction, and the
+        write lock is released between chunks so new transcriptions are not
+        blocked for the whole cleanup. max_bytes bounds the live data in the
+        database (free pages excluded); the number of rows to delete for it
+        is estimated from the average row size. max_age_days also applies to
+        archived records (archive files left empty are deleted); the other
+        limits only count the hot database.
+
+        Args:
+            max_age_days: Delete records older than this (0 = no limit)
+            max_records: Keep at most this many records in the hot database
+                (0 = no limit)
+            max_bytes: Keep the live data below this size (0 = no limit)
+            chunk_size: Rows deleted per transaction
+
         Returns:
             Number of records deleted
         """
         if not self._db:
             raise RuntimeError("Database not initialized")
 
-        cursor = await self._db.execute("DELETE FROM transcriptions")
-        await self._db.commit()
+        if self._pending:
+            await self.flush()
+
+        deleted = 0
+        if max_age_days > 0:
+            cutoff = to_epoch_ms(datetime.now(timezone.utc) - timedelta(days=max_age_days))
+            deleted += await self._delete_oldest(chunk_size, before=cutoff)
+            expired = f"DELETE FROM {ARCHIVE_SCHEMA}.transcriptions WHERE created_at < ?"
+            for month in self.archives.months_between(None, cutoff - 1):
+                deleted += await self._delete_archived(month, [(expired, [cutoff])])
+
+        if max_records > 0:
+            excess = await self.count() - max_records
+            if excess > 0:
+                deleted += await self._delete_oldest(chunk_size, limit=excess)
+
+        if max_bytes > 0:
+            used = await self._used_bytes()
+            total = await self.count()
+            if used > max_bytes and total > 0:
+                rows = math.ceil((used - max_bytes) / (used / total))
+                deleted += await self._delete_oldest(chunk_size, limit=min(rows, total))
+
+        if deleted:
+            logger.info(f"Retention deleted {deleted} history records")
+        return deleted
+
+    async def _delete_oldest(
+        self, chunk_size: int, limit: Optional[int] = None, before: Optional[int] = None
+    ) -> int:
+        """Delete up to limit oldest rows created before an epoch-ms time, in chunks."""
+        before = before if before is not None else 2**63 - 1
+        deleted = 0
+        while limit is None or deleted < limit:
+            size = chunk_size if limit is None else min(chunk_size, limit - deleted)
+            async with self._write_lock:
+                try:
+                    cursor = await self._db.execute(_DELETE_OLDEST_SQL, (before, size))
+                    await self._db.commit()
+                except Exception:
+                    await self._db.rollback()
+                    raise
+                self._invalidate_caches()
+
+            count = max(cursor.rowcount, 0)
+            deleted += count
+            if count < size:
+                break
+            # Let queued writes take the lock between chunks
+            await asyncio.sleep(0)
+        return deleted
+
+    async def _used_bytes(self) -> int:
+        """Bytes of the database file in use (page count minus free pages)."""
+        cursor = await self._db.execute(
+            "SELECT (page_count - freelist_count) * page_size "
+            "FROM pragma_page_count, pragma_freelist_count, pragma_page_size"
+        )
+        return (await cursor.fetchone())[0]
+
+    async def optimize(self, merge_pages: int = FTS_MERGE_PAGES) -> None:
+        """
+        Merge full-text index segments and refresh query planner statistics.
+
+        Merging runs as FTS5 'merge' steps of about merge_pages pages, each in
+        its own transaction, until no work is left, so writes can proceed
+        between steps. With usermerge=2 every level holding two or more
+        segments is merged, which also drops the delete markers left behind
+        by large deletes. (Full merges with a negative page count are not
+        used: interleaving inserts with them corrupts the index on SQLite
+        3.40.)
+
+        Args:
+            merge_pages: Pages written per merge step
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+
+        for table in self._fts_tables():
+            async with self._write_lock:
+                await self._db.execute(
+                    f"INSERT INTO {table}({table}, rank) VALUES ('usermerge', 2)"
+                )
+                await self._db.commit()
+            while True:
+                async with self._write_lock:
+                    changes_before = self._db.total_changes
+                    await self._db.execute(
+                        f"INSERT INTO {table}({table}, rank) VALUES ('merge', ?)",
+                        (merge_pages,),
+                    )
+                    await self._db.commit()
+                    changes = self._db.total_changes - changes_before
+                # Fewer than 2 changes means the step found nothing to merge
+                if changes < 2:
+                    break
+                await asyncio.sleep(0)
+
+        async with self._write_lock:
+            await self._db.execute("PRAGMA optimize")
+
+    async def compact(self) -> bool:
+        """
+        Return free pages to the filesystem and truncate the WAL.
+
+        Files that predate incremental auto-vacuum are converted with a full
+        VACUUM once at least COMPACT_CONVERT_FREE_RATIO of their pages are free.
+
+        Returns:
+            True if the WAL was fully checkpointed and truncated, False if a
+            reader still needed part of it
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+
+        async with self._write_lock:
+            cursor = await self._db.execute(
+                "SELECT freelist_count, page_count FROM pragma_freelist_count, pragma_page_count"
+            )
+            free_pages, pages = await cursor.fetchone()
+            await self._reclaim_space(convert=free_pages >= pages * COMPACT_CONVERT_FREE_RATIO)
+            cursor = await self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            busy = (await cursor.fetchone())[0]
+        return not busy
+
+    async def archive(self, max_age_days: int, chunk_size: int = ARCHIVE_CHUNK_SIZE) -> int:
+        """
+        Move records older than max_age_days into the monthly archive files.
+
+        Rows move oldest first, in created_at ranges of about chunk_size rows
+        within one month. Each range is copied into the month's archive file
+        (ATTACHed to the writer connection, created on first use) and deleted
+        from the hot database in one transaction, and the write lock is
+        released between ranges. Archived records keep counting in the daily
+        rollups, so get_stats() still covers the whole history. After a large
+        move (ARCHIVE_OPTIMIZE_RATIO) the hot full-text indexes are rewritten,
+        each in one transaction, so compact() can return their space.
+
+        Args:
+            max_age_days: Archive records older than this (0 = disabled)
+            chunk_size: Rows moved per transaction
+
+        Returns:
+            Number of records archived
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+        if max_age_days <= 0:
+            return 0
+
+        if self._pending:
+            await self.flush()
+
+        cutoff = to_epoch_ms(datetime.now(timezone.utc) - timedelta(days=max_age_days))
+        archived = 0
+        while True:
+            async with self._write_lock:
+                cursor = await self._db.execute("SELECT MIN(created_at) FROM transcriptions")
+                oldest = (await cursor.fetchone())[0]
+                if oldest is None or oldest >= cutoff:
+                    break
+                month = month_of(oldest)
+                end = min(month_range(month)[1], cutoff)
+                cursor = await self._db.execute(
+                    "SELECT created_at FROM transcriptions "
+                    "WHERE created_at >= ? AND created_at < ? ORDER BY created_at LIMIT 1 OFFSET ?",
+                    (oldest, end, chunk_size),
+                )
+                row = await cursor.fetchone()
+                # Ranges end between two timestamps, so rows created in the
+                # same millisecond always move together
+                upper = end if row is None else max(row[0], oldest + 1)
+                archived += await self._move_to_archive(month, oldest, upper)
+            # Let queued writes take the lock between ranges
+            await asyncio.sleep(0)
+
+        if archived and archived >= (archived + await self.count()) * ARCHIVE_OPTIMIZE_RATIO:
+            for table in self._fts_tables():
+                async with self._write_lock:
+                    await self._db.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+                    await self._db.commit()
+
+        if archived:
+            logger.info(f"Archived {archived} history records")
+        return archived
+
+    async def _move_to_archive(self, month: str, low: int, high: int) -> int:
+        """Move the rows created in [low, high) to a month's archive file (write lock held)."""
+        columns = ", ".join(_RECORD_COLUMNS)
+        where = "created_at >= ? AND created_at < ?"
+        async with self._attached(month):
+            try:
+                await self._db.execute("BEGIN IMMEDIATE")
+                # Archived rows stay in the rollups: skip their delete trigger
+                rollup_triggers = await self._db.execute_fetchall(
+                    "SELECT sql FROM sqlite_master "
+                    "WHERE type = 'trigger' AND name = 'transcriptions_rollup_ad'"
+                )
+                await self._db.execute("DROP TRIGGER IF EXISTS transcriptions_rollup_ad")
+
+                await self._db.execute(
+                    f"""
+                    INSERT OR IGNORE INTO {ARCHIVE_SCHEMA}.transcriptions ({columns})
+                    SELECT {columns} FROM main.transcriptions WHERE {where}
+                    """,
+                    (low, high),
+                )
+                cursor = await self._db.execute(
+                    f"""
+                    INSERT OR IGNORE INTO history_archive_index (id, month)
+                    SELECT id, ? FROM main.transcriptions WHERE {where}
+                    """,
+                    (month, low, high),
+                )
+                await self._db.execute(
+                    "UPDATE history_counters SET value = value + ? WHERE name = 'archived'",
+                    (max(cursor.rowcount, 0),),
+                )
+                cursor = await self._db.execute(
+                    f"DELETE FROM main.transcriptions WHERE {where}", (low, high)
+                )
+                moved = max(cursor.rowcount, 0)
 
-        return cursor.rowcount
+                for (sql,) in rollup_triggers:
+                    await self._db.execute(sql)
+                await self._db.commit()
+            except Exception:
+                await self._db.rollback()
+                raise
+
+        self.archives.add(month)
+        self._invalidate_caches()
+        return moved
+
+    @asynccontextmanager
+    async def _attached(self, month: str) -> AsyncIterator[None]:
+        """
+        Attach a month's archive file to the writer connection as ARCHIVE_SCHEMA.
+
+        The file and its schema are created on first use. Must be used with
+        the write lock held and no transaction open.
+        """
+        path = self.archives.path(month)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        new_file = not path.exists()
+        await self._db.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (str(path),))
+        try:
+            if new_file:
+                await self._db.execute(
+                    f"PRAGMA {ARCHIVE_SCHEMA}.auto_vacuum = {AUTO_VACUUM_INCREMENTAL}"
+                )
+            for statement in archive_schema_sql():
+                await self._db.execute(statement)
+            await self._db.execute(_ARCHIVE_DELETE_TRIGGER_SQL)
+            yield
+        finally:
+            await self._db.execute("DROP TRIGGER IF EXISTS temp.archive_ad")
+            await self._db.execute(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+
+    async def _archived_month(self, record_id: str) -> Optional[str]:
+        """Month of the archive file holding a record, or None if it is not archived."""
+        row = await self._fetch_one(
+            "SELECT month FROM history_archive_index WHERE id = ?", (record_id,)
+        )
+        return row[0] if row else None
+
+    async def _delete_archived(self, month: str, statements: "list[tuple[str, list]]") -> int:
+        """
+        Run DELETE statements on one archive file in a single transaction.
+
+        The statements refer to the file as ARCHIVE_SCHEMA. Freed pages are
+        returned to the filesystem, and a file left empty is deleted.
+
+        Returns:
+            Number of records deleted
+        """
+        deleted = 0
+        async with self._write_lock:
+            async with self._attached(month):
+                try:
+                    for sql, params in statements:
+                        cursor = await self._db.execute(sql, params)
+                        deleted += max(cursor.rowcount, 0)
+                    await self._db.commit()
+                except Exception:
+                    await self._db.rollback()
+                    raise
+                cursor = await self._db.execute(
+                    f"SELECT EXISTS (SELECT 1 FROM {ARCHIVE_SCHEMA}.transcriptions)"
+                )
+                empty = not (await cursor.fetchone())[0]
+                if deleted and not empty:
+                    await self._db.executescript(f"PRAGMA {ARCHIVE_SCHEMA}.incremental_vacuum;")
+            # Plain list pages only hold hot records
+            self._invalidate_caches(pages=False)
+
+            if empty:
+                await self.archives.remove(month)
+        return deleted
+
+    async def train_dictionary(self) -> Optional[int]:
+        """
+        Train a compression dictionary on the newest records.
+
+        The dictionary is stored in the database and compresses all text
+        written from now on; values compressed with older dictionaries stay
+        readable.
+
+        Returns:
+            The dictionary ID, or None if the history has fewer than
+            DICTIONARY_MIN_SAMPLES records to train on
+
+        Raises:
+            RuntimeError: If the database is not initialized or compression
+                is not enabled
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+        if not self.compress_text:
+            raise RuntimeError("Text compression is not enabled")
+
+        rows = await self._fetch_all(
+            f"SELECT {_DECODED_TEXT} FROM transcriptions t ORDER BY t.created_at DESC LIMIT ?",
+            (DICTIONARY_SAMPLES,),
+        )
+        if len(rows) < DICTIONARY_MIN_SAMPLES:
+            return None
+
+        start = time.perf_counter()
+        data = await asyncio.to_thread(self._codec.train, [row[0] for row in rows])
+        async with self._write_lock:
+            await self._db.execute(
+                "INSERT INTO history_text_dictionaries (data, created_at) VALUES (?, ?)",
+                (data, to_epoch_ms(datetime.now(timezone.utc))),
+            )
+            await self._db.commit()
+        dictionary_id = self._codec.add_dictionary(data)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"Trained compression dictionary {dictionary_id} on {len(rows)} records "
+            f"in {elapsed_ms:.0f}ms"
+        )
+        return dictionary_id
+
+    async def compress(self, chunk_size: int = COMPRESS_CHUNK_SIZE) -> int:
+        """
+        Compress the text of records written before compression was enabled.
+
+        Trains the compression dictionary first if there is none yet (and
+        the history is large enough). Rows are read in rowid order from
+        where the previous run stopped and re-encoded chunk_size per
+        transaction. The decoded text does not change, so the full-text
+        index update triggers are dropped for each transaction instead of
+        reindexing every row. Archived records are left as they are.
+        Does nothing unless compress_text is set.
+
+        Returns:
+            Number of records whose text was compressed
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+        if not self.compress_text:
+            return 0
+
+        if self._pending:
+            await self.flush()
+        if not self._codec.dictionary_id:
+            await self.train_dictionary()
+
+        row = await self._fetch_one(
+            "SELECT value FROM history_counters WHERE name = 'compressed_rowid'"
+        )
+        after = row[0] if row else 0
+        compressed = 0
+        while True:
+            async with self._write_lock:
+                rows = await self._db.execute_fetchall(
+                    """
+                    SELECT rowid, text, original_text FROM transcriptions
+                    WHERE rowid > ? ORDER BY rowid LIMIT ?
+                    """,
+                    (after, chunk_size),
+                )
+                if not rows:
+                    break
+                after = rows[-1][0]
+                updates = await asyncio.to_thread(self._encode_plain_rows, rows)
+                try:
+                    await self._db.execute("BEGIN IMMEDIATE")
+                    triggers = await self._db.execute_fetchall(
+                        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+                        f"AND name IN ({', '.join('?' * len(_FTS_UPDATE_TRIGGERS))})",
+                        _FTS_UPDATE_TRIGGERS,
+                    )
+                    for name, _ in triggers:
+                        await self._db.execute(f"DROP TRIGGER {name}")
+                    await self._db.executemany(
+                        "UPDATE transcriptions SET text = ?, original_text = ? WHERE rowid = ?",
+                        updates,
+                    )
+                    for _, sql in triggers:
+                        await self._db.execute(sql)
+                    await self._db.execute(
+                        """
+                        INSERT INTO history_counters (name, value) VALUES ('compressed_rowid', ?)
+                        ON CONFLICT (name) DO UPDATE SET value = excluded.value
+                        """,
+                        (after,),
+                    )
+                    await self._db.commit()
+                except Exception:
+                    await self._db.rollback()
+                    raise
+            compressed += len(updates)
+            if len(rows) < chunk_size:
+                break
+            # Let queued writes take the lock between chunks
+            await asyncio.sleep(0)
+
+        if compressed:
+            logger.info(f"Compressed the text of {compressed} history records")
+        return compressed
+
+    def _encode_plain_rows(self, rows: "list[aiosqlite.Row]") -> "list[tuple]":
+        """UPDATE parameters for the rows of (rowid, text, original_text) stored as plain text."""
+        updates = []
+        for row_id, text, original_text in rows:
+            if isinstance(text, bytes) or isinstance(original_text, bytes):
+                continue
+            stored_text, stored_original = self._codec.encode_texts(text, original_text)
+            if stored_text is not text or stored_original is not original_text:
+                updates.append((stored_text, stored_original, row_id))
+        return updates
 
     async def get_stats(self) -> dict:
         """
         Get statistics about the history.
 
+        Reads the daily rollup tables, so the cost depends on the number of
+        days with activity rather than the number of transcriptions. The
+        result is cached until the next write or the end of the day.
+
         Returns:
             Dictionary with stats including activity counts by time period
         """
         if not self._db:
             raise RuntimeError("Database not initialized")
 
-        # Basic stats
-        cursor = await self._db.execute("""
-            SELECT 
-                COUNT(*) as total_count,
-                SUM(duration_ms) as total_duration_ms,
-                MIN(created_at) as first_transcription,
-                MAX(created_at) as last_transcription
-            FROM transcriptions
+        key = (self._write_generation, date.today())
+        cached = self._stats_cache
+        self._count_lookup("stats", cached is not None and cached[0] == key)
+        if cached is not None and cached[0] == key:
+            return dict(cached[1])
+
+        # Totals and activity counts by time period from the daily rollup
+        row = await self._fetch_one("""
+            SELECT
+                COALESCE(SUM(count), 0) AS total_count,
+                COALESCE(SUM(total_duration_ms), 0) AS total_duration_ms,
+                COALESCE(SUM(CASE WHEN day = date('now', 'localtime')
+                    THEN count END), 0) AS today_count,
+                COALESCE(SUM(CASE WHEN day >= date('now', 'localtime', 'weekday 0', '-7 days')
+                    THEN count END), 0) AS week_count,
+                COALESCE(SUM(CASE WHEN strftime('%Y-%m', day) = strftime('%Y-%m', 'now', 'localtime')
+                    THEN count END), 0) AS month_count
+            FROM history_daily_stats
         """)
-        row = await cursor.fetchone()
 
-        # Activity counts by time period (using SQLite date functions)
-        # Today: created_at >= start of today (00:00:00)
-        cursor = await self._db.execute("""
-            SELECT COUNT(*) as today_count
-            FROM transcriptions
-            WHERE date(created_at) = date('now', 'localtime')
+        # Separate MIN/MAX subqueries so each is a single index lookup
+        range_row = await self._fetch_one("""
+            SELECT
+                (SELECT MIN(created_at) FROM transcriptions) AS first_transcription,
+                (SELECT MAX(created_at) FROM transcriptions) AS last_transcription
         """)
-        today_row = await cursor.fetchone()
 
-        # This week: created_at >= start of this week (Sunday)
-        cursor = await self._db.execute("""
-            SELECT COUNT(*) as week_count
-            FROM transcriptions
-            WHERE date(created_at) >= date('now', 'localtime', 'weekday 0', '-7 days')
+        breakdown = await self._fetch_all("""
+            SELECT dimension, key, SUM(count) AS count
+            FROM history_daily_breakdown
+            GROUP BY dimension, key
         """)
-        week_row = await cursor.fetchone()
+        models = {r["key"]: r["count"] for r in breakdown if r["dimension"] == "model"}
+        languages = {r["key"]: r["count"] for r in breakdown if r["dimension"] == "language"}
 
-        # This month: created_at >= start of this month
-        cursor = await self._db.execute("""
-            SELECT COUNT(*) as month_count
-            FROM transcriptions
-            WHERE strftime('%Y-%m', created_at) = strftime('%Y-%m', 'now', 'localtime')
-        """)
-        month_row = await cursor.fetchone()
-
-        return {
-            "total_count": row["total_count"] or 0,
-            "total_duration_ms": row["total_duration_ms"] or 0,
-            "first_transcription": row["first_transcription"],
-            "last_transcription": row["last_transcription"],
-            "today_count": today_row["today_count"] or 0,
-            "this_week_count": week_row["week_count"] or 0,
-            "this_month_count": month_row["month_count"] or 0,
+        first, last = range_row["first_transcription"], range_row["last_transcription"]
+
+        # Archive files are in month order: the oldest and newest hold the bounds
+        months = self.archives.months
+        if months:
+            oldest, newest = await asyncio.gather(
+                self.archives.fetch_all(months[-1], "SELECT MIN(created_at) FROM transcriptions"),
+                self.archives.fetch_all(months[0], "SELECT MAX(created_at) FROM transcriptions"),
+            )
+            archived_first = oldest[0][0] if oldest else None
+            archived_last = newest[0][0] if newest else None
+            if archived_first is not None and (first is None or archived_first < first):
+                first = archived_first
+            if archived_last is not None and (last is None or archived_last > last):
+                last = archived_last
+
+        stats = {
+            "total_count": row["total_count"],
+            "archived_count": await self.count_archived(),
+            "total_duration_ms": row["total_duration_ms"],
+            "first_transcription": from_epoch_ms(first).isoformat() if first is not None else None,
+            "last_transcription": from_epoch_ms(last).isoformat() if last is not None else None,
+            "today_count": row["today_count"],
+            "this_week_count": row["week_count"],
+            "this_month_count": row["month_count"],
+            "models": models,
+            "languages": languages,
+        }
+        if key[0] == self._write_generation:
+            self._stats_cache = (key, stats)
+        return dict(stats)
+
+    async def get_stats_series(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        interval: str = "day",
+    ) -> "list[dict]":
+        """
+        Get activity over time from the daily rollup.
+
+        Args:
+            start: First day to include (UTC), or None for no lower bound
+            end: Last day to include (UTC), or None for no upper bound
+            interval: Bucket size: "day", "week" (starting Monday) or "month"
+
+        Returns:
+            List of buckets ordered by period, each with count, total
+            duration and per-model/per-language counts
+
+        Raises:
+            ValueError: If interval is not supported
+        """
+        if not self._db:
+            raise RuntimeError("Database not initialized")
+
+        period = _SERIES_PERIODS.get(interval)
+        if period is None:
+            raise ValueError(f"Invalid interval: {interval}")
+
+        bounds = (
+            start.isoformat() if start else "",
+            end.isoformat() if end else "9999-12-31",
+        )
+
+        rows = await self._fetch_all(
+            f"""
+            SELECT {period} AS period, SUM(count) AS count,
+                SUM(total_duration_ms) AS total_duration_ms
+            FROM history_daily_stats
+            WHERE day >= ? AND day <= ?
+            GROUP BY period
+            ORDER BY period
+            """,
+            bounds,
+        )
+        breakdown = await self._fetch_all(
+            f"""
+            SELECT {period} AS period, dimension, key, SUM(count) AS count
+            FROM history_daily_breakdown
+            WHERE day >= ? AND day <= ?
+            GROUP BY period, dimension, key
+            """,
+            bounds,
+        )
+
+        series = {
+            r["period"]: {
+                "period": r["period"],
+                "count": r["count"],
+                "total_duration_ms": r["total_duration_ms"],
+                "models": {},
+                "languages": {},
+            }
+            for r in rows
         }
+        for r in breakdown:
+            bucket = series.get(r["period"])
+            if bucket is not None:
+                target = "models" if r["dimension"] == "model" else "languages"
+                bucket[target][r["key"]] = r["count"]
+
+        return list(series.values())
@@ -0,0 +1,348 @@
+"""
+Streaming import of transcription history.
+
+Parses exported records incrementally from an async byte stream and inserts
+them in chunked single-transaction batches, so memory use stays bounded by the
+chunk size regardless of the upload size. Accepts the record-carrying export
+formats (NDJSON, CSV, and with pyarrow Parquet and Arrow), optionally gzip- or
+zstd-compressed. Columnar uploads are spooled to a temporary file first, as
+Parquet keeps its index at the end of the file.
+"""
+
+import asyncio
+import codecs
+import csv
+import io
+import json
+import logging
+import tempfile
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from .export import (
+    ExportCompression,
+    ExportFormat,
+    create_decompressor,
+    import_optional,
+)
+from .history import HistoryService, TranscriptionRecord, record_from_import
+
+logger = logging.getLogger(__name__)
+
+# Records inserted per transaction
+DEFAULT_IMPORT_CHUNK_SIZE = 1000
+
+# Longest accepted NDJSON line (or CSV record); protects against unbounded
+# buffering of input that contains no newlines
+MAX_LINE_BYTES = 4 * 1024 * 1024
+
+# Formats that can be imported (the ones carrying ids and metadata)
+IMPORT_FORMATS = (
+    ExportFormat.NDJSON,
+    ExportFormat.CSV,
+    ExportFormat.PARQUET,
+    ExportFormat.ARROW,
+)
+
+# Columnar uploads are kept in memory up to this size, then on disk
+SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+
+# CSV columns that were written as "" for missing values
+_OPTIONAL_CSV_COLUMNS = ("duration_ms", "model_used", "language", "original_text")
+
+
+class ImportFormatError(ValueError):
+    """Raised when the import stream cannot be parsed at all."""
+
+
+@dataclass
+class ImportProgress:
+    """Progress of a streaming import."""
+
+    import_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    processed: int = 0  # Lines seen (excluding blank lines)
+    imported: int = 0  # Rows inserted
+    skipped: int = 0  # Invalid lines and duplicate IDs
+    bytes_read: int = 0
+    total_bytes: Optional[int] = None
+    status: str = "running"
+
+    @property
+    def progress_percent(self) -> Optional[float]:
+        """Percentage of the upload read (0-100), if its size is known."""
+        if not self.total_bytes:
+            return None
+        return min(100 * self.bytes_read / self.total_bytes, 100.0)
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for API response and WebSocket events."""
+        return {
+            "import_id": self.import_id,
+            "status": self.status,
+            "processed": self.processed,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "bytes_read": self.bytes_read,
+            "total_bytes": self.total_bytes,
+            "progress_percent": self.progress_percent,
+        }
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes],
+    progress: Optional[ImportProgress] = None,
+    max_line_bytes: int = MAX_LINE_BYTES,
+) -> AsyncIterator[bytes]:
+    """
+    Split an async byte stream into non-blank lines.
+
+    Args:
+        chunks: Async iterator of raw byte chunks (e.g. request.stream())
+        progress: Optional progress object whose bytes_read is updated
+        max_line_bytes: Maximum length of a single line
+
+    Yields:
+        Each non-blank line without its line terminator
+
+    Raises:
+        ImportFormatError: If a line exceeds max_line_bytes
+    """
+    buffer = b""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        if progress is not None:
+            progress.bytes_read += len(chunk)
+
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        if len(buffer) > max_line_bytes:
+            raise ImportFormatError(f"Line exceeds {max_line_bytes} bytes")
+
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield line
+
+    buffer = buffer.strip()
+    if buffer:
+        yield buffer
+
+
+async def _count_bytes(
+    chunks: AsyncIterator[bytes], progress: ImportProgress
+) -> AsyncIterator[bytes]:
+    """Pass chunks through, adding their size to progress.bytes_read."""
+    async for chunk in chunks:
+        progress.bytes_read += len(chunk)
+        yield chunk
+
+
+async def _decompress(
+    chunks: AsyncIterator[bytes], compression: ExportCompression
+) -> AsyncIterator[bytes]:
+    """Decompress a gzip or zstd byte stream incrementally."""
+    decompressor = create_decompressor(compression)
+    async for chunk in chunks:
+        try:
+            data = decompressor.decompress(chunk)
+        except Exception as e:
+            raise ImportFormatError(f"Invalid {compression.value} data: {e}") from e
+        if data:
+            yield data
+    if not getattr(decompressor, "eof", True):
+        raise ImportFormatError(f"Truncated {compression.value} data")
+
+
+def _split_csv_records(text: str) -> tuple[str, str]:
+    """
+    Split text into complete CSV records and an incomplete remainder.
+
+    A newline ends a record only outside quotes, i.e. after an even number
+    of quote characters (escaped quotes are doubled, keeping the parity).
+    """
+    cut = 0
+    quotes = 0
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end < 0:
+            break
+        quotes += text.count('"', start, end)
+        start = end + 1
+        if quotes % 2 == 0:
+            cut = start
+    return text[:cut], text[cut:]
+
+
+async def iter_csv_rows(
+    chunks: AsyncIterator[bytes],
+    max_record_bytes: int = MAX_LINE_BYTES,
+) -> AsyncIterator[dict]:
+    """
+    Parse an async CSV byte stream (as written by the CSV export) into rows.
+
+    Quoted fields may contain newlines. Empty optional columns become None.
+
+    Args:
+        chunks: Async iterator of raw byte chunks
+        max_record_bytes: Maximum length of a single record
+
+    Yields:
+        One dictionary per row, keyed by the header row
+
+    Raises:
+        ImportFormatError: If the header has no "text" column or a record is too long
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    header: Optional[list[str]] = None
+    pending = ""
+
+    def parse(text: str):
+        nonlocal header
+        for row in csv.reader(io.StringIO(text)):
+            if header is None:
+                header = row
+                if "text" not in header:
+                    raise ImportFormatError("CSV header has no 'text' column")
+                continue
+            if not row:
+                continue
+            data = dict(zip(header, row))
+            for column in _OPTIONAL_CSV_COLUMNS:
+                if data.get(column) == "":
+                    data[column] = None
+            yield data
+
+    async for chunk in chunks:
+        complete, pending = _split_csv_records(pending + decoder.decode(chunk))
+        if len(pending) > max_record_bytes:
+            raise ImportFormatError(f"CSV record exceeds {max_record_bytes} bytes")
+        for row in parse(complete):
+            yield row
+
+    for row in parse(pending + decoder.decode(b"", final=True)):
+        yield row
+
+
+async def iter_columnar_rows(
+    chunks: AsyncIterator[bytes],
+    format: ExportFormat,
+    batch_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+) -> AsyncIterator[dict]:
+    """
+    Read a Parquet file or Arrow IPC stream upload in record batches.
+
+    The upload is spooled to a temporary file; batches are decoded in a
+    worker thread.
+
+    Raises:
+        ImportFormatError: If the data is not a valid file of that format
+        ValueError: If pyarrow is not installed
+    """
+    pa = import_optional("pyarrow")
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES) as spool:
+        async for chunk in chunks:
+            spool.write(chunk)
+        spool.seek(0)
+
+        try:
+            if format == ExportFormat.PARQUET:
+                parquet = import_optional("pyarrow.parquet")
+                batches = parquet.ParquetFile(spool).iter_batches(batch_size=batch_size)
+            else:
+                batches = iter(pa.ipc.open_stream(spool))
+            while True:
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    break
+                for row in batch.to_pylist():
+                    yield row
+        except (pa.ArrowException, OSError) as e:
+            raise ImportFormatError(f"Invalid {format.value} data: {e}") from e
+
+
+async def import_stream(
+    history: HistoryService,
+    chunks: AsyncIterator[bytes],
+    format: ExportFormat = ExportFormat.NDJSON,
+    compression: Optional[ExportCompression] = None,
+    total_bytes: Optional[int] = None,
+    chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+    on_progress: Optional[Callable[[ImportProgress], Awaitable[None]]] = None,
+) -> ImportProgress:
+    """
+    Import exported records from a byte stream into history.
+
+    Records are inserted `chunk_size` at a time in one transaction each;
+    existing IDs are skipped. Items that are not valid records (including
+    export header objects without "text") are counted as skipped.
+
+    Args:
+        history: Initialized HistoryService to import into
+        chunks: Async iterator of raw byte chunks
+        format: One of IMPORT_FORMATS
+        compression: Compression of the upload, if any
+        total_bytes: Upload size, if known, for progress percentages
+        chunk_size: Records per transaction
+        on_progress: Optional async callback invoked after each committed chunk
+
+    Returns:
+        Final ImportProgress (status "completed")
+
+    Raises:
+        ImportFormatError: If the stream cannot be parsed at all
+        ValueError: If the format is not importable or needs a missing package
+    """
+    if format not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {format}")
+
+    progress = ImportProgress(total_bytes=total_bytes)
+    batch: list[TranscriptionRecord] = []
+
+    data = _count_bytes(chunks, progress)
+    if compression is not None:
+        data = _decompress(data, compression)
+
+    items: AsyncIterator[Any]
+    parse: Callable[[Any], Any]
+    if format == ExportFormat.NDJSON:
+        items, parse = iter_ndjson_lines(data), json.loads
+    elif format == ExportFormat.CSV:
+        items, parse = iter_csv_rows(data), dict
+    else:
+        items, parse = iter_columnar_rows(data, format, chunk_size), dict
+
+    async def commit_batch() -> None:
+        inserted = await history.import_records(batch)
+        progress.imported += inserted
+        progress.skipped += len(batch) - inserted
+        batch.clear()
+        if on_progress is not None:
+            await on_progress(progress)
+
+    async for item in items:
+        progress.processed += 1
+        try:
+            batch.append(record_from_import(parse(item)))
+        except (ValueError, TypeError) as e:
+            progress.skipped += 1
+            logger.debug(f"Skipping import item {progress.processed}: {e}")
+            continue
+
+        if len(batch) >= chunk_size:
+            await commit_batch()
+
+    progress.status = "completed"
+    if batch:
+        await commit_batch()
+    elif on_progress is not None:
+        await on_progress(progress)
+
+    logger.info(
+        f"Imported {progress.imported} history records "
+        f"({progress.skipped} skipped, {progress.bytes_read} bytes)"
+    )
+    return progress
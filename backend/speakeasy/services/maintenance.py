@@ -0,0 +1,262 @@
+"""
+Background database maintenance for transcription history.
+
+Enforces the retention settings (maximum age, record count and database
+size), compresses the text of older records once compression is enabled,
+moves old records to the monthly archive files and keeps the database
+compact: expired records are deleted in chunks, full-text index segments are
+merged, planner statistics are refreshed, free pages are returned to the
+filesystem and the WAL is truncated. Scheduled runs wait until the app is
+idle; every run is summarized in a MaintenanceReport.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, Optional
+
+from ..utils.metrics import metrics
+from .history import HistoryService
+from .settings import AppSettings
+
+logger = logging.getLogger(__name__)
+
+# History must have had no writes for this long before a scheduled run starts
+IDLE_WRITE_GAP_S = 60.0
+
+# How long a scheduled run waits before checking again while the app is busy
+IDLE_RETRY_S = 30.0
+
+
+@dataclass
+class RetentionPolicy:
+    """History retention limits and archive threshold; 0 means unlimited."""
+
+    max_age_days: int = 0
+    max_records: int = 0
+    max_bytes: int = 0
+    archive_after_days: int = 0
+
+    @classmethod
+    def from_settings(cls, settings: AppSettings) -> "RetentionPolicy":
+        """Build the policy from the history_* settings."""
+        return cls(
+            max_age_days=settings.history_max_age_days,
+            max_records=settings.history_max_records,
+            max_bytes=settings.history_max_size_mb * 1024 * 1024,
+            archive_after_days=settings.history_archive_after_days,
+        )
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for API response."""
+        return {
+            "max_age_days": self.max_age_days,
+            "max_records": self.max_records,
+            "max_bytes": self.max_bytes,
+            "archive_after_days": self.archive_after_days,
+        }
+
+
+@dataclass
+class MaintenanceReport:
+    """Outcome of one maintenance run."""
+
+    started_at: datetime
+    trigger: str  # "scheduled" or "manual"
+    duration_ms: float = 0.0
+    deleted_records: int = 0
+    archived_records: int = 0
+    compressed_records: int = 0
+    size_before_bytes: int = 0
+    size_after_bytes: int = 0
+    wal_truncated: bool = False
+    steps_ms: dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def freed_bytes(self) -> int:
+        """Bytes returned to the filesystem (database file plus WAL)."""
+        return max(0, self.size_before_bytes - self.size_after_bytes)
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for API response."""
+        return {
+            "started_at": self.started_at.isoformat(),
+            "trigger": self.trigger,
+            "duration_ms": round(self.duration_ms, 3),
+            "deleted_records": self.deleted_records,
+            "archived_records": self.archived_records,
+            "compressed_records": self.compressed_records,
+            "size_before_bytes": self.size_before_bytes,
+            "size_after_bytes": self.size_after_bytes,
+            "freed_bytes": self.freed_bytes,
+            "wal_truncated": self.wal_truncated,
+            "steps_ms": {name: round(ms, 3) for name, ms in self.steps_ms.items()},
+            "error": self.error,
+        }
+
+
+class MaintenanceScheduler:
+    """
+    Runs history maintenance periodically during idle periods.
+
+    The interval and retention limits are read from the settings at every
+    run, so changes apply without a restart. Runs never overlap; a manual
+    run() while a scheduled one is in progress waits for it.
+    """
+
+    def __init__(
+        self,
+        history: HistoryService,
+        get_settings: Callable[[], AppSettings],
+        is_busy: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            history: Initialized HistoryService to maintain
+            get_settings: Returns the current settings
+            is_busy: Returns True while the app should not be disturbed
+                (recording, transcription, batch jobs)
+        """
+        self.history = history
+        self._get_settings = get_settings
+        self._is_busy = is_busy
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.last_report: Optional[MaintenanceReport] = None
+        self.next_run_at: Optional[datetime] = None
+
+    @property
+    def running(self) -> bool:
+        """Check whether a maintenance run is in progress."""
+        return self._lock.locked()
+
+    def is_idle(self) -> bool:
+        """Check that nothing is in progress and history saw no recent writes."""
+        if self._is_busy is not None and self._is_busy():
+            return False
+        return self.history.seconds_since_write >= IDLE_WRITE_GAP_S
+
+    def start(self) -> None:
+        """Start the background schedule."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def stop(self) -> None:
+        """Stop the background schedule, interrupting a run in progress."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.next_run_at = None
+
+    def status(self) -> dict:
+        """Get scheduler state, policy and the last report for the API."""
+        settings = self._get_settings()
+        return {
+            "running": self.running,
+            "interval_minutes": settings.history_maintenance_interval_minutes,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "policy": RetentionPolicy.from_settings(settings).to_dict(),
+            "last_report": self.last_report.to_dict() if self.last_report else None,
+        }
+
+    async def run(self, trigger: str = "manual") -> MaintenanceReport:
+        """
+        Run one maintenance pass now.
+
+        Applies retention, compresses text stored before compression was
+        enabled, moves old records to the archive files, merges the full-text
+        index segments, refreshes planner statistics, then reclaims free
+        pages and truncates the WAL.
+        A failing step ends the run and is recorded in report.error.
+
+        Args:
+            trigger: What started the run, for the report
+
+        Returns:
+            The report of this run (also kept as last_report)
+        """
+        async with self._lock:
+            policy = RetentionPolicy.from_settings(self._get_settings())
+            report = MaintenanceReport(started_at=datetime.now(timezone.utc), trigger=trigger)
+            report.size_before_bytes = self._database_bytes()
+            start = time.perf_counter()
+
+            try:
+                with self._step(report, "retention"):
+                    report.deleted_records = await self.history.apply_retention(
+                        max_age_days=policy.max_age_days,
+                        max_records=policy.max_records,
+                        max_bytes=policy.max_bytes,
+                    )
+                with self._step(report, "compress"):
+                    report.compressed_records = await self.history.compress()
+                with self._step(report, "archive"):
+                    report.archived_records = await self.history.archive(policy.archive_after_days)
+                with self._step(report, "optimize"):
+                    await self.history.optimize()
+                with self._step(report, "compact"):
+                    report.wal_truncated = await self.history.compact()
+            except Exception as e:
+                report.error = str(e)
+                logger.error(f"History maintenance failed: {e}")
+
+            report.duration_ms = (time.perf_counter() - start) * 1000
+            report.size_after_bytes = self._database_bytes()
+            self.last_report = report
+
+        metrics.record_timing("history.maintenance", report.duration_ms)
+        logger.info(
+            f"History maintenance ({trigger}) took {report.duration_ms:.0f}ms: "
+            f"{report.deleted_records} records deleted, {report.archived_records} archived, "
+            f"{report.freed_bytes} bytes freed"
+        )
+        return report
+
+    @contextmanager
+    def _step(self, report: MaintenanceReport, name: str) -> Iterator[None]:
+        """Record the duration of one maintenance step."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            report.steps_ms[name] = elapsed_ms
+            metrics.record_timing(f"history.maintenance.{name}", elapsed_ms)
+
+    def _database_bytes(self) -> int:
+        """Size of the database file and its WAL."""
+        db_path = self.history.db_path
+        total = 0
+        for path in (db_path, db_path.with_name(f"{db_path.name}-wal")):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    async def _run_periodically(self) -> None:
+        """Run maintenance every interval, once the app is idle."""
+        while True:
+            interval_s = self._get_settings().history_maintenance_interval_minutes * 60
+            self.next_run_at = datetime.now(timezone.utc) + timedelta(seconds=interval_s)
+            await asyncio.sleep(interval_s)
+
+            while not self.is_idle():
+                await asyncio.sleep(IDLE_RETRY_S)
+
+            self.next_run_at = None
+            try:
+                await self.run(trigger="scheduled")
+            except Exception as e:
+                logger.error(f"Scheduled history maintenance failed: {e}")
@@ -51,6 +51,9 @@ class AppSettings(BaseModel):
     custom_filler_words: Optional[list[str]] = Field(
         default=None, description="Additional filler words to remove"
     )
+    text_replacements: Optional[dict[str, str]] = Field(
+        default=None, description="Word replacement dictionary applied after cleanup"
+    )
 
     # Grammar correction settings
     enable_grammar_correction: bool = Field(
@@ -65,6 +68,44 @@ class AppSettings(BaseModel):
         description="Device for grammar model (auto/cuda/cpu)",
     )
 
+    # History retention (0 = unlimited) and maintenance
+    history_max_age_days: int = Field(
+        default=0, ge=0, description="Delete transcriptions older than this many days"
+    )
+    history_max_records: int = Field(
+        default=0, ge=0, description="Keep at most this many transcriptions"
+    )
+    history_max_size_mb: int = Field(
+        default=0, ge=0, description="Delete the oldest transcriptions above this database size"
+    )
+    history_maintenance_interval_minutes: int = Field(
+        default=60, ge=1, description="Minutes between background database maintenance runs"
+    )
+    history_archive_after_days: int = Field(
+        default=0,
+        ge=0,
+        description="Move transcriptions older than this many days to monthly archive files",
+    )
+    history_compress_text: bool = Field(
+        default=False,
+        description="Store long transcription text compressed (needs zstandard; "
+        "applies after a restart)",
+    )
+
+    # Backups
+    backup_keep: int = Field(
+        default=5, ge=1, description="Number of database backups kept; older ones are deleted"
+    )
+
+    # Batch jobs on CPU
+    batch_cpu_workers: int = Field(
+        default=0,
+        ge=0,
+        le=64,
+        description="Worker processes, each with its own model replica, that batch jobs run "
+        "on when the model runs on CPU (0 = use the loaded model)",
+    )
+
     # Server settings
     server_port: int = Field(default=8765, description="Backend server port")
 
@@ -192,3 +233,13 @@ def get_default_settings_path() -> Path:
 def get_default_db_path() -> Path:
     """Get the default database file path."""
     return get_data_dir() / "speakeasy.db"
+
+
+def get_default_batch_db_path() -> Path:
+    """Get the default batch job database file path."""
+    return get_data_dir() / "batch.db"
+
+
+def get_default_backup_dir() -> Path:
+    """Get the default directory for database backups."""
+    return get_data_dir() / "backups"
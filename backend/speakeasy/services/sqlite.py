@@ -0,0 +1,163 @@
+"""
+SQLite connection helpers shared by the database-backed services.
+
+Provides tuned connections (WAL journaling, relaxed fsync, larger page cache,
+memory-mapped I/O, statement caching), a small pool of read-only
+connections so reads never queue behind writes on the writer connection, and
+conversions for timestamps, which are stored as integer epoch milliseconds.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+# Page cache per connection in KiB (negative cache_size means KiB, not pages)
+PAGE_CACHE_KIB = 16 * 1024
+
+# Memory-mapped I/O window per connection
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+
+# How long a connection waits on a lock held by another before failing
+BUSY_TIMEOUT_MS = 5000
+
+# Number of prepared statements kept per connection by the sqlite3 module.
+# Statements are cached by SQL text, so services should keep their queries as
+# constant strings and pass values as parameters.
+STATEMENT_CACHE_SIZE = 256
+
+# Default number of read-only connections per pool
+DEFAULT_READ_CONNECTIONS = 3
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MS = timedelta(milliseconds=1)
+
+# SQL expression converting an ISO/SQLite timestamp text column to epoch
+# milliseconds; used by the migrations from DATETIME text columns. Naive
+# values are treated as UTC, offsets such as +00:00 are honored.
+ISO_TO_EPOCH_MS_SQL = "CAST(round((julianday({column}) - 2440587.5) * 86400000) AS INTEGER)"
+
+
+def to_epoch_ms(value: datetime) -> int:
+    """Convert a datetime to integer epoch milliseconds (naive values are UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _ONE_MS
+
+
+def from_epoch_ms(value: int) -> datetime:
+    """Convert integer epoch milliseconds to an aware UTC datetime."""
+    # Exact for millisecond values: the float error is far below the
+    # microsecond rounding done by fromtimestamp()
+    return datetime.fromtimestamp(value / 1000, timezone.utc)
+
+
+async def connect(db_path: Path, read_only: bool = False) -> aiosqlite.Connection:
+    """
+    Open a tuned aiosqlite connection.
+
+    The writer connection switches the database to WAL mode (persistent in the
+    file), so readers can run concurrently with the writer and commits only
+    append to the log instead of fsyncing the main database.
+
+    Args:
+        db_path: Path to the SQLite database file
+        read_only: Open a read-only connection (reader pool members)
+
+    Returns:
+        The configured connection with aiosqlite.Row as row factory
+    """
+    db = await aiosqlite.connect(
+        db_path,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+    )
+    db.row_factory = aiosqlite.Row
+
+    if not read_only:
+        cursor = await db.execute("PRAGMA journal_mode=WAL")
+        mode = (await cursor.fetchone())[0]
+        if mode.lower() != "wal":
+            logger.warning(f"Could not enable WAL for {db_path} (journal_mode={mode})")
+
+    # NORMAL is durable in WAL mode except for the last commits on power loss
+    await db.execute("PRAGMA synchronous=NORMAL")
+    await db.execute(f"PRAGMA cache_size=-{PAGE_CACHE_KIB}")
+    await db.execute(f"PRAGMA mmap_size={MMAP_SIZE_BYTES}")
+    await db.execute("PRAGMA temp_store=MEMORY")
+    if read_only:
+        await db.execute("PRAGMA query_only=ON")
+
+    return db
+
+
+class ReaderPool:
+    """
+    Fixed-size pool of read-only connections.
+
+    Each aiosqlite connection runs its queries on its own thread, so several
+    readers let list/search/stats queries proceed in parallel with each other
+    and with the writer.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        size: int = DEFAULT_READ_CONNECTIONS,
+        setup: Optional[Callable[[aiosqlite.Connection], Awaitable[None]]] = None,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            db_path: Path to the SQLite database file
+            size: Number of read connections to open
+            setup: Run on each connection after opening it (e.g. to register
+                SQL functions)
+        """
+        self.db_path = db_path
+        self.size = max(1, size)
+        self._setup = setup
+        self._connections: list[aiosqlite.Connection] = []
+        self._available: Optional[asyncio.Queue] = None
+
+    @property
+    def is_open(self) -> bool:
+        """Check whether the pool has open connections."""
+        return bool(self._connections)
+
+    async def open(self) -> None:
+        """Open all read connections."""
+        self._available = asyncio.Queue()
+        for _ in range(self.size):
+            db = await connect(self.db_path, read_only=True)
+            if self._setup is not None:
+                await self._setup(db)
+            self._connections.append(db)
+            self._available.put_nowait(db)
+
+    async def close(self) -> None:
+        """Close all read connections."""
+        for db in self._connections:
+            await db.close()
+        self._connections = []
+        self._available = None
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read connection for the duration of the block."""
+        if self._available is None:
+            raise RuntimeError("Reader pool not open")
+
+        available = self._available
+        db = await available.get()
+        try:
+            yield db
+        finally:
+            available.put_nowait(db)
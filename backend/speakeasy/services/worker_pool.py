@@ -0,0 +1,538 @@
+"""
+Multi-process CPU worker pool for batch transcription.
+
+On CPU-only hosts one model instance transcribes one file at a time and
+scales poorly past a few threads, so batch jobs can instead run on K worker
+processes, each with its own model replica using cores // K threads. Each
+worker decodes and transcribes whole files.
+
+Admitted files wait in one queue in the parent, and a worker is sent the
+next file whenever it is idle, so a worker that finishes early takes the
+files queued behind a slow one instead of leaving them to it (work
+stealing, at file granularity). A file is admitted only while the
+estimated decoded audio of the files queued or running stays under a
+memory budget, and while at most two files per worker are outstanding.
+
+Each worker has its own pipes, so a worker that dies (e.g. killed when out
+of memory) cannot leave a shared queue locked. A reader thread waits on the
+result pipes and the process sentinels, and resolves the asyncio futures
+returned by submit() on the event loop. A worker process that dies fails
+the file it was on and is replaced.
+
+Long files are transcribed in chunks; a worker reports each chunk's text as
+it completes, and submit() can skip the chunks completed before, so batch
+jobs can checkpoint and resume long files run on the pool.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from typing import Any, Callable, Optional
+
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Decoded audio is mono float32 at 16 kHz
+DECODED_BYTES_PER_SECOND = 16000 * 4
+
+# Decoded size of a file whose duration cannot be read, per byte of file
+# (a 64 kbit/s stream decodes to 8x its size)
+COMPRESSED_EXPANSION = 8
+
+# Decoded audio the files queued or running in the pool may hold: this share
+# of the available memory, at most MEMORY_BUDGET_MAX_BYTES
+MEMORY_BUDGET_SHARE = 0.25
+MEMORY_BUDGET_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# Files admitted per worker (one running, one waiting in the queue)
+TASKS_PER_WORKER = 2
+
+# How long the result reader waits before picking up replaced workers
+MONITOR_INTERVAL_S = 0.5
+
+# How long close() waits for a worker to exit before terminating it
+SHUTDOWN_TIMEOUT_S = 10.0
+
+
+def available_memory() -> Optional[int]:
+    """Physical memory available to new allocations in bytes, or None if unknown."""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def default_memory_budget() -> int:
+    """Decoded audio the pool may hold by default (see MEMORY_BUDGET_SHARE)."""
+    free = available_memory()
+    if free is None:
+        return MEMORY_BUDGET_MAX_BYTES // 4
+    return int(min(free * MEMORY_BUDGET_SHARE, MEMORY_BUDGET_MAX_BYTES))
+
+
+def estimate_decoded_bytes(path: str) -> int:
+    """
+    Estimate the decoded size of an audio file.
+
+    Uses the duration from the file header when soundfile can read it, and
+    COMPRESSED_EXPANSION times the file size otherwise.
+    """
+    try:
+        import soundfile as sf
+
+        info = sf.info(path)
+        if info.samplerate > 0:
+            return int(info.frames / info.samplerate * DECODED_BYTES_PER_SECOND)
+    except Exception:
+        pass
+    try:
+        return os.path.getsize(path) * COMPRESSED_EXPANSION
+    except OSError:
+        return 0
+
+
+def threads_per_worker(workers: int, cores: Optional[int] = None) -> int:
+    """Inference threads of each replica, so the replicas share the cores evenly."""
+    cores = cores or os.cpu_count() or 1
+    return max(1, cores // max(1, workers))
+
+
+@dataclass
+class ModelReplica:
+    """
+    Loads the model replica of a worker process (picklable).
+
+    Called in the worker with the thread count; returns a transcriber with
+    load_audio_file(path) and transcribe(audio_data=..., language=...,
+    progress_callback=..., completed_chunks=...).
+    """
+
+    model_type: str
+    model_name: str
+    compute_type: Optional[str] = None
+
+    def __call__(self, cpu_threads: int) -> Any:
+        from ..core.transcriber import TranscriberService
+
+        transcriber = TranscriberService()
+        transcriber.load_model(
+            model_type=self.model_type,
+            model_name=self.model_name,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=cpu_threads,
+        )
+        return transcriber
+
+
+def _transcribe(
+    model: Any,
+    path: str,
+    language: str,
+    completed_chunks: "list[str]",
+    on_chunk: Callable[[int, int, str], None],
+) -> dict:
+    """
+    Decode and transcribe one file in a worker, with one retry.
+
+    A long file continues after completed_chunks, and each chunk completed
+    here is reported to on_chunk, so the retry continues after it too.
+    """
+    outcome: dict = {"result": None, "error": None, "decode_s": 0.0, "inference_s": 0.0}
+    audio = None
+    chunks = list(completed_chunks)
+
+    def progress(done: int, total: int, text: str) -> None:
+        if total > 1 and done == len(chunks) + 1:
+            chunks.append(text)
+            on_chunk(done, total, text)
+
+    for attempt in range(2):
+        try:
+            if audio is None:
+                start = time.perf_counter()
+                audio = model.load_audio_file(path)
+                outcome["decode_s"] += time.perf_counter() - start
+            start = time.perf_counter()
+            outcome["result"] = model.transcribe(
+                audio_data=audio,
+                language=language,
+                progress_callback=progress,
+                completed_chunks=chunks,
+            )
+            outcome["inference_s"] += time.perf_counter() - start
+            outcome["error"] = None
+            return outcome
+        except Exception as e:
+            outcome["error"] = str(e) or type(e).__name__
+            if attempt == 0:
+                logger.warning(f"Transcription failed for {path}, retrying: {e}")
+    return outcome
+
+
+def _worker_main(
+    worker_id: int,
+    factory: Callable[[int], Any],
+    cpu_threads: int,
+    tasks: Any,
+    results: Any,
+) -> None:
+    """Worker process: load a replica, then transcribe the tasks sent until None."""
+    try:
+        model = factory(cpu_threads)
+    except Exception as e:
+        results.send(("failed", None, str(e)))
+        return
+    results.send(("ready", None, None))
+
+    while True:
+        try:
+            task = tasks.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        task_id, path, language, completed_chunks = task
+
+        def on_chunk(done: int, total: int, text: str, task_id: int = task_id) -> None:
+            results.send(("chunk", task_id, (done, total, text)))
+
+        outcome = _transcribe(model, path, language, completed_chunks, on_chunk)
+        results.send(("done", task_id, outcome))
+
+
+@dataclass
+class _Worker:
+    """A worker process and the parent's ends of its pipes."""
+
+    process: Any
+    tasks: Any  # Connection the parent sends tasks on
+    results: Any  # Connection the parent receives messages on
+    ready: asyncio.Future  # Resolves to None once loaded, or an error message
+    task_id: Optional[int] = None  # File being transcribed
+
+
+class CpuWorkerPool:
+    """
+    K worker processes, each transcribing files with its own model replica.
+
+    submit() waits for admission and returns a future of
+    (result, error, stats); start() and close() manage the processes.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[int], Any],
+        workers: int,
+        cpu_threads: Optional[int] = None,
+        memory_budget: Optional[int] = None,
+        estimate_fn: Callable[[str], int] = estimate_decoded_bytes,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            factory: Picklable callable loading a replica in a worker,
+                given its thread count (e.g. ModelReplica)
+            workers: Number of worker processes (K)
+            cpu_threads: Inference threads per replica (default: cores // K)
+            memory_budget: Decoded audio the admitted files may hold
+                (default: default_memory_budget())
+            estimate_fn: Estimates the decoded size of a file
+        """
+        self.factory = factory
+        self.workers = max(1, workers)
+        self.cpu_threads = cpu_threads or threads_per_worker(self.workers)
+        self.memory_budget = memory_budget or default_memory_budget()
+        self._estimate = estimate_fn
+
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: dict[int, _Worker] = {}
+        self._workers_lock = threading.Lock()  # The reader thread lists the workers
+        self._next_worker_id = 0
+        self._reader: Optional[threading.Thread] = None
+        self._reader_stop = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = False
+        self._start_lock = asyncio.Lock()
+
+        # Admitted files: futures and estimated decoded bytes by task ID, and
+        # the tasks not yet sent to a worker
+        self._futures: dict[int, asyncio.Future] = {}
+        self._chunk_callbacks: dict[int, Callable[[int, int, str], None]] = {}
+        self._reserved: dict[int, int] = {}
+        self._queue: deque = deque()
+        self._next_task_id = 0
+        self._admission = asyncio.Condition()
+        self.restarts = 0
+
+    @property
+    def started(self) -> bool:
+        """Whether the worker processes are running."""
+        return self._running
+
+    @property
+    def reserved_bytes(self) -> int:
+        """Estimated decoded audio of the files queued or running."""
+        return sum(self._reserved.values())
+
+    async def start(self) -> None:
+        """
+        Start the worker processes and wait until their replicas are loaded.
+
+        Does nothing if the pool is running. Workers whose replica fails to
+        load exit; the pool runs with the others.
+
+        Raises:
+            RuntimeError: If no replica could be loaded
+        """
+        async with self._start_lock:
+            if self._running:
+                return
+            self._loop = asyncio.get_running_loop()
+            self._running = True
+            self._reader_stop.clear()
+
+            start = time.perf_counter()
+            workers = [self._spawn() for _ in range(self.workers)]
+            self._reader = threading.Thread(
+                target=self._read_results, name="batch-pool-results", daemon=True
+            )
+            self._reader.start()
+
+            errors = [error for error in await asyncio.gather(*(w.ready for w in workers)) if error]
+            if len(errors) == len(workers):
+                await self.close()
+                raise RuntimeError(f"No model replica could be loaded: {errors[0]}")
+
+            metrics.set_gauge("batch.pool.workers", len(self._workers))
+            logger.info(
+                f"Batch worker pool started: {len(self._workers)} workers x "
+                f"{self.cpu_threads} threads in {time.perf_counter() - start:.1f}s"
+            )
+
+    def _spawn(self) -> _Worker:
+        """Start one worker process."""
+        worker_id = self._next_worker_id
+        self._next_worker_id += 1
+        task_reader, task_writer = self._context.Pipe(duplex=False)
+        result_reader, result_writer = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self.factory, self.cpu_threads, task_reader, result_writer),
+            name=f"batch-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        # The child has its own copies of these ends
+        task_reader.close()
+        result_writer.close()
+
+        worker = _Worker(process, task_writer, result_reader, self._loop.create_future())
+        with self._workers_lock:
+            self._workers[worker_id] = worker
+        return worker
+
+    async def submit(
+        self,
+        path: str,
+        language: str = "auto",
+        completed_chunks: Optional["list[str]"] = None,
+        on_chunk: Optional[Callable[[int, int, str], None]] = None,
+    ) -> asyncio.Future:
+        """
+        Queue a file once it is admitted.
+
+        Waits while TASKS_PER_WORKER files per worker are outstanding, or
+        while the file's estimated decoded audio does not fit the memory
+        budget next to them (a file is always admitted into an idle pool).
+
+        A long file continues after completed_chunks, and on_chunk is called
+        on the event loop with (chunks done, total chunks, chunk text) as
+        each further chunk completes.
+
+        Returns:
+            Future of (TranscriptionResult or None, error message or None,
+            stats dict with decode_s and inference_s)
+        """
+        if not self._running:
+            raise RuntimeError("Worker pool not started")
+        estimate = await asyncio.to_thread(self._estimate, path)
+
+        async with self._admission:
+            await self._admission.wait_for(
+                lambda: (
+                    not self._running
+                    or not self._futures
+                    or (
+                        len(self._futures) < self.workers * TASKS_PER_WORKER
+                        and self.reserved_bytes + estimate <= self.memory_budget
+                    )
+                )
+            )
+            if not self._running:
+                raise RuntimeError("Worker pool closed")
+            task_id = self._next_task_id
+            self._next_task_id += 1
+            future = self._loop.create_future()
+            self._futures[task_id] = future
+            self._reserved[task_id] = estimate
+            if on_chunk is not None:
+                self._chunk_callbacks[task_id] = on_chunk
+            self._queue.append((task_id, path, language, list(completed_chunks or [])))
+            metrics.set_gauge("batch.pool.reserved_bytes", self.reserved_bytes)
+
+        self._dispatch()
+        return future
+
+    def _dispatch(self) -> None:
+        """Send queued files to the idle workers."""
+        for worker in list(self._workers.values()):
+            if not self._queue:
+                return
+            if worker.task_id is None and worker.ready.done() and worker.ready.result() is None:
+                task = self._queue.popleft()
+                worker.task_id = task[0]
+                worker.tasks.send(task)
+
+    def _read_results(self) -> None:
+        """Reader thread: hand worker messages and exits to the event loop."""
+        while not self._reader_stop.is_set():
+            with self._workers_lock:
+                workers = list(self._workers.items())
+            handles = {}
+            for worker_id, worker in workers:
+                handles[worker.results] = worker_id
+                handles[worker.process.sentinel] = worker_id
+            try:
+                ready = wait(list(handles), timeout=MONITOR_INTERVAL_S)
+                for handle in ready:
+                    worker_id = handles[handle]
+                    worker = dict(workers)[worker_id]
+                    if handle is worker.results:
+                        try:
+                            message = worker.results.recv()
+                        except (EOFError, OSError):
+                            continue  # Exited; reported through the sentinel
+                        self._loop.call_soon_threadsafe(self._handle, worker_id, message)
+                    elif not worker.results.poll():
+                        # Report the exit once the worker's last messages are read
+                        self._loop.call_soon_threadsafe(self._worker_exited, worker_id)
+            except (OSError, ValueError):
+                continue  # A pipe was closed since the workers were listed
+            except RuntimeError:  # Event loop closed
+                return
+
+    def _handle(self, worker_id: int, message: tuple) -> None:
+        """Apply a worker message on the event loop."""
+        worker = self._workers.get(worker_id)
+        if worker is None:
+            return
+        kind, task_id, payload = message
+        if kind == "ready":
+            worker.ready.set_result(None)
+        elif kind == "failed":
+            logger.error(f"Batch worker {worker_id} could not load its model: {payload}")
+            self._remove(worker_id)
+            worker.ready.set_result(payload)
+        elif kind == "chunk":
+            on_chunk = self._chunk_callbacks.get(task_id)
+            if on_chunk is not None:
+                on_chunk(*payload)
+        elif kind == "done":
+            worker.task_id = None
+            result, error = payload.pop("result"), payload.pop("error")
+            self._finish(task_id, (result, error, payload))
+        self._dispatch()
+
+    def _worker_exited(self, worker_id: int) -> None:
+        """Fail the file of a worker process that died and start a replacement."""
+        worker = self._workers.get(worker_id)
+        if worker is None or not self._running:
+            return
+        self._remove(worker_id)
+        worker.process.join()
+        message = f"Worker process exited (code {worker.process.exitcode})"
+        if not worker.ready.done():
+            # Died while loading its replica; not replaced
+            worker.ready.set_result(message)
+        else:
+            logger.error(f"Batch worker {worker_id}: {message}")
+            if worker.task_id is not None:
+                self._finish(worker.task_id, (None, message, {}))
+            self.restarts += 1
+            metrics.increment("batch.pool.worker_restarts")
+            self._spawn()
+        self._fail_orphans()
+
+    def _remove(self, worker_id: int) -> None:
+        """Forget a worker whose process exited."""
+        with self._workers_lock:
+            worker = self._workers.pop(worker_id)
+        worker.tasks.close()
+        worker.results.close()
+
+    def _fail_orphans(self) -> None:
+        """Fail the queued files once no worker process is left to run them."""
+        if self._workers or not self._running:
+            return
+        while self._queue:
+            self._finish(self._queue.popleft()[0], (None, "No batch worker process left", {}))
+
+    def _finish(self, task_id: int, outcome: tuple) -> None:
+        """Resolve a task's future and free its admission."""
+        future = self._futures.pop(task_id, None)
+        self._reserved.pop(task_id, None)
+        self._chunk_callbacks.pop(task_id, None)
+        if future is not None and not future.done():
+            future.set_result(outcome)
+        metrics.set_gauge("batch.pool.reserved_bytes", self.reserved_bytes)
+        asyncio.ensure_future(self._notify())
+
+    async def _notify(self) -> None:
+        """Wake submit() calls waiting for admission."""
+        async with self._admission:
+            self._admission.notify_all()
+
+    async def close(self) -> None:
+        """Stop the worker processes; files still outstanding fail."""
+        if not self._running:
+            return
+        self._running = False
+        workers = list(self._workers.values())
+        for worker in workers:
+            try:
+                worker.tasks.send(None)
+            except OSError:
+                pass
+
+        def stop() -> None:
+            for worker in workers:
+                worker.process.join(SHUTDOWN_TIMEOUT_S)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+                    worker.process.join()
+            # The reader delivers the last results until the workers have exited
+            self._reader_stop.set()
+            if self._reader is not None:
+                self._reader.join()
+
+        await asyncio.to_thread(stop)
+        for worker_id in list(self._workers):
+            self._remove(worker_id)
+        for worker in workers:
+            if not worker.ready.done():
+                worker.ready.set_result("Worker pool closed")
+        self._queue.clear()
+        for task_id in list(self._futures):
+            self._finish(task_id, (None, "Worker pool closed", {}))
+        await self._notify()
+        metrics.set_gauge("batch.pool.workers", 0)
+        logger.info("Batch worker pool stopped")
@@ -0,0 +1,147 @@
+"""
+In-process metrics registry.
+
+Collects timings, counters and gauges from the backend (post-processing
+stages, database writers, ...) so they can be inspected through the API.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+# Number of recent samples kept per timing for percentile estimates
+_RECENT_SAMPLES = 256
+
+
+@dataclass
+class TimingStats:
+    """Aggregated wall-clock timings for one metric, in milliseconds."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    min_ms: float = 0.0
+    max_ms: float = 0.0
+    last_ms: float = 0.0
+    recent: deque = field(default_factory=lambda: deque(maxlen=_RECENT_SAMPLES))
+
+    def add(self, value_ms: float) -> None:
+        """Record one sample."""
+        if self.count == 0 or value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+        self.count += 1
+        self.total_ms += value_ms
+        self.last_ms = value_ms
+        self.recent.append(value_ms)
+
+    def percentile(self, percent: float) -> float:
+        """Estimate a percentile (0-100) from the recent samples."""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        index = min(int(len(ordered) * percent / 100), len(ordered) - 1)
+        return ordered[index]
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for API response."""
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "last_ms": round(self.last_ms, 3),
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of named timings, counters and gauges.
+
+    Metric names are free-form dotted strings, e.g. "postprocess.cleanup".
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings: dict[str, TimingStats] = {}
+        self._counters: dict[str, int] = {}
+        self._gauges: dict[str, float] = {}
+
+    def record_timing(self, name: str, value_ms: float) -> None:
+        """Record a duration in milliseconds."""
+        with self._lock:
+            stats = self._timings.get(name)
+            if stats is None:
+                stats = self._timings[name] = TimingStats()
+            stats.add(value_ms)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Context manager that records the wall time of its block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_timing(name, (time.perf_counter() - start) * 1000)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Increase a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to its current value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def get_timing(self, name: str) -> Optional[dict]:
+        """Get aggregated stats for one timing, or None if never recorded."""
+        with self._lock:
+            stats = self._timings.get(name)
+            return stats.to_dict() if stats else None
+
+    def snapshot(self, prefix: Optional[str] = None) -> dict:
+        """
+        Get a point-in-time copy of all metrics.
+
+        Args:
+            prefix: Optional name prefix to filter metrics
+
+        Returns:
+            Dictionary with "timings", "counters" and "gauges" sections
+        """
+
+        def matches(name: str) -> bool:
+            return prefix is None or name.startswith(prefix)
+
+        with self._lock:
+            return {
+                "timings": {
+                    name: stats.to_dict()
+                    for name, stats in sorted(self._timings.items())
+                    if matches(name)
+                },
+                "counters": {
+                    name: value for name, value in sorted(self._counters.items()) if matches(name)
+                },
+                "gauges": {
+                    name: value for name, value in sorted(self._gauges.items()) if matches(name)
+                },
+            }
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+
+# Shared registry used across the backend
+metrics = MetricsRegistry()
@@ -91,3 +91,25 @@ class TestHealthEndpoint:
         assert data1["status"] == data2["status"]
         assert data1["model_loaded"] == data2["model_loaded"]
         assert data1["gpu_available"] == data2["gpu_available"]
+
+
+class TestMetricsEndpoint:
+    """Tests for GET /api/metrics endpoint."""
+
+    def test_metrics_returns_sections(self, client):
+        """Metrics snapshot contains timings, counters and gauges."""
+        response = client.get("/api/metrics")
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data) == {"timings", "counters", "gauges"}
+
+    def test_metrics_prefix_filter(self, client):
+        """Prefix filter only returns matching metric names."""
+        from speakeasy.utils.metrics import metrics
+
+        metrics.record_timing("test.endpoint", 1.5)
+        metrics.record_timing("other.endpoint", 2.5)
+
+        response = client.get("/api/metrics?prefix=test.")
+        assert response.status_code == 200
+        assert list(response.json()["timings"]) == ["test.endpoint"]
@@ -2,8 +2,12 @@
 Tests for /api/models endpoints.
 """
 
+from unittest.mock import patch
+
 import pytest
 
+from speakeasy.core.grammar_processor import GrammarProcessor
+
 
 class TestModelsListEndpoint:
     """Test suite for GET /api/models."""
@@ -249,3 +253,46 @@ class TestModelsRecommendEndpoint:
         assert response.status_code == 200
         data = response.json()
         assert "recommendation" in data
+
+
+class TestGrammarStatusEndpoint:
+    """Test suite for GET /api/grammar/status."""
+
+    def test_grammar_status_returns_200(self, client):
+        """GET /api/grammar/status returns 200 OK."""
+        response = client.get("/api/grammar/status")
+        assert response.status_code == 200
+
+    def test_grammar_status_has_fields(self, client):
+        """Response contains 'enabled' and 'processor' fields."""
+        response = client.get("/api/grammar/status")
+        data = response.json()
+        assert "enabled" in data
+        assert "processor" in data
+
+    def test_grammar_models_lists_models(self, client):
+        """GET /api/grammar/models returns the available models."""
+        response = client.get("/api/grammar/models")
+        assert response.status_code == 200
+        assert len(response.json()["models"]) > 0
+
+    def test_grammar_unload_cancels_preload(self, client, tmp_path):
+        """POST /api/grammar/unload during a preload cancels it."""
+        with patch("speakeasy.core.grammar_processor.get_cache_dir", return_value=tmp_path):
+            processor = GrammarProcessor(model_name="google/flan-t5-small", device="cpu")
+
+        def slow_load(progress_callback=None, cancel_event=None):
+            cancel_event.wait(timeout=5)
+            raise RuntimeError("Grammar model load cancelled")
+
+        with (
+            patch.object(processor, "load", side_effect=slow_load),
+            patch("speakeasy.server.grammar_processor", processor),
+        ):
+            thread = processor.preload()
+            response = client.post("/api/grammar/unload")
+            thread.join(timeout=5)
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "cancelled"
+        assert not thread.is_alive()
@@ -0,0 +1,238 @@
+"""
+Tests for online database backups.
+
+Tests cover:
+- Backups of history, archive files and batch jobs with a manifest
+- Consistent snapshots while records are being inserted
+- gzip-compressed backups and restore
+- Restore removing databases that are not in the backup
+- Rotation and deletion
+- Damaged backups
+"""
+
+import asyncio
+import gzip
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from speakeasy.services.backup import BackupService, database_sources
+from speakeasy.services.batch import BatchService
+from speakeasy.services.export import ExportCompression
+from speakeasy.services.history import HistoryService, TranscriptionRecord
+
+
+def _records(count: int, days_apart: int = 0) -> list[TranscriptionRecord]:
+    """Records with distinct IDs, days_apart days apart going back from now."""
+    now = datetime.now(timezone.utc)
+    return [
+        TranscriptionRecord(
+            id=f"rec-{i:04d}",
+            text=f"backup test transcription {i} " * 5,
+            duration_ms=100,
+            model_used="base",
+            language="en",
+            created_at=now - timedelta(days=i * days_apart, hours=1),
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def paths(tmp_path: Path) -> dict[str, Path]:
+    """Database and backup locations inside a temporary data directory."""
+    return {
+        "db": tmp_path / "speakeasy.db",
+        "batch": tmp_path / "batch.db",
+        "backups": tmp_path / "backups",
+    }
+
+
+@pytest.fixture
+async def history_service(paths: dict[str, Path]):
+    """Provide an initialized HistoryService with 50 records."""
+    service = HistoryService(paths["db"])
+    await service.initialize()
+    await service.import_records(_records(50))
+    yield service
+    await service.close()
+
+
+@pytest.fixture
+async def batch_service(paths: dict[str, Path]):
+    """Provide an initialized BatchService with one job."""
+    service = BatchService(paths["batch"])
+    await service.initialize()
+    await service.create_job(["/tmp/a.wav", "/tmp/b.wav"])
+    yield service
+    await service.close()
+
+
+@pytest.fixture
+def backup_service(paths: dict[str, Path]) -> BackupService:
+    """Provide a BackupService for the temporary data directory."""
+    return BackupService(paths["backups"], paths["db"], paths["batch"], keep=3)
+
+
+def _count(path: Path, table: str) -> int:
+    """Count the rows of a table in a database file."""
+    with sqlite3.connect(path) as db:
+        count = db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    db.close()
+    return count
+
+
+class TestCreateBackup:
+    """Tests for taking backups."""
+
+    async def test_backup_contains_all_databases(
+        self, backup_service, history_service, batch_service, paths
+    ):
+        """A backup holds every database file and a manifest describing them."""
+        backup = await backup_service.create(pause_writes=history_service.writes_paused)
+
+        directory = paths["backups"] / backup.name
+        assert [d["name"] for d in backup.databases] == ["batch.db", "speakeasy.db"]
+        assert _count(directory / "speakeasy.db", "transcriptions") == 50
+        assert _count(directory / "batch.db", "batch_files") == 2
+        assert backup.size_bytes == sum(
+            (directory / d["file"]).stat().st_size for d in backup.databases
+        )
+        assert [b.name for b in backup_service.list()] == [backup.name]
+        assert backup_service.get(backup.name).to_dict() == backup.to_dict()
+        assert not list(paths["backups"].glob("*.partial"))
+
+    async def test_backup_is_consistent_under_writes(self, backup_service, history_service, paths):
+        """Rows inserted while a backup runs are either fully in it or not at all."""
+        await history_service.import_records(_records(3000)[50:])
+        backup_service.step_pages = 8
+        stop = asyncio.Event()
+
+        async def writer():
+            i = 0
+            while not stop.is_set():
+                await history_service.add(text=f"written during backup {i}", duration_ms=10)
+                i += 1
+
+        writer_task = asyncio.create_task(writer())
+        try:
+            backup = await backup_service.create(pause_writes=history_service.writes_paused)
+        finally:
+            stop.set()
+            await writer_task
+
+        copy = paths["backups"] / backup.name / "speakeasy.db"
+        with sqlite3.connect(copy) as db:
+            rows = db.execute("SELECT COUNT(*) FROM transcriptions").fetchone()[0]
+            indexed = db.execute("SELECT COUNT(*) FROM transcriptions_fts").fetchone()[0]
+            counted = db.execute(
+                "SELECT value FROM history_counters WHERE name = 'transcriptions'"
+            ).fetchone()[0]
+        db.close()
+        assert rows >= 3000
+        assert indexed == rows
+        assert counted == rows
+
+    async def test_includes_archive_files(self, backup_service, paths):
+        """Monthly archive files are backed up next to the history database."""
+        service = HistoryService(paths["db"])
+        await service.initialize()
+        try:
+            await service.import_records(_records(20, days_apart=10))
+            await service.archive(max_age_days=30)
+            months = service.archives.months
+            backup = await backup_service.create(pause_writes=service.writes_paused)
+        finally:
+            await service.close()
+
+        names = [d["name"] for d in backup.databases]
+        assert names[-1] == "speakeasy.db"  # WAL files are copied last
+        assert sorted(names[:-1]) == [f"speakeasy-archive/{month}.db" for month in sorted(months)]
+
+    async def test_rotation_keeps_newest(self, backup_service, history_service):
+        """Only the newest `keep` backups remain."""
+        names = [(await backup_service.create()).name for _ in range(4)]
+
+        assert [b.name for b in backup_service.list()] == names[:0:-1]
+        backup = await backup_service.create(keep=1)
+        assert [b.name for b in backup_service.list()] == [backup.name]
+
+    async def test_delete(self, backup_service, history_service):
+        """Backups are deleted by name; other names are rejected."""
+        backup = await backup_service.create()
+
+        assert await backup_service.delete("../speakeasy") is False
+        assert await backup_service.delete(backup.name) is True
+        assert backup_service.list() == []
+        assert await backup_service.delete(backup.name) is False
+
+
+class TestRestoreBackup:
+    """Tests for restoring backups."""
+
+    async def test_restore_compressed_backup(self, backup_service, paths):
+        """A gzip backup restores the databases as they were."""
+        service = HistoryService(paths["db"])
+        await service.initialize()
+        await service.import_records(_records(50))
+        backup = await backup_service.create(
+            ExportCompression.GZIP, pause_writes=service.writes_paused
+        )
+        await service.delete("rec-0001")
+        await service.add(text="added after the backup", duration_ms=10)
+        await service.close()
+
+        stored = paths["backups"] / backup.name / "speakeasy.db.gz"
+        with gzip.open(stored) as f:
+            assert f.read(16) == b"SQLite format 3\x00"
+        await backup_service.restore(backup.name)
+
+        service = HistoryService(paths["db"])
+        await service.initialize()
+        try:
+            assert await service.count() == 50
+            assert await service.get("rec-0001") is not None
+            records, total, _ = await service.list(search="added")
+            assert total == 0
+        finally:
+            await service.close()
+
+    async def test_restore_removes_newer_databases(self, backup_service, paths):
+        """Archive files created after the backup are removed on restore."""
+        service = HistoryService(paths["db"])
+        await service.initialize()
+        await service.import_records(_records(20, days_apart=10))
+        backup = await backup_service.create(pause_writes=service.writes_paused)
+        await service.archive(max_age_days=30)
+        await service.close()
+        assert len(database_sources(paths["db"], paths["batch"])) > 1
+
+        await backup_service.restore(backup.name)
+
+        assert [s.name for s in database_sources(paths["db"], paths["batch"])] == ["speakeasy.db"]
+        service = HistoryService(paths["db"])
+        await service.initialize()
+        try:
+            assert await service.count() == 20
+            assert await service.count_archived() == 0
+        finally:
+            await service.close()
+
+    async def test_damaged_backup_is_rejected(self, backup_service, history_service, paths):
+        """A damaged backup file fails the check before any database is replaced."""
+        backup = await backup_service.create()
+        copy = paths["backups"] / backup.name / "speakeasy.db"
+        data = bytearray(copy.read_bytes())
+        data[4096:8192] = b"\xff" * 4096
+        copy.write_bytes(bytes(data))
+
+        with pytest.raises(ValueError, match="damaged"):
+            await backup_service.restore(backup.name)
+        assert await history_service.count() == 50
+
+    async def test_unknown_backup(self, backup_service):
+        """Restoring a backup that does not exist raises ValueError."""
+        with pytest.raises(ValueError, match="not found"):
+            await backup_service.restore("20200101-000000")
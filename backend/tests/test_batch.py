@@ -3,25 +3,37 @@ Comprehensive tests for the BatchService.
 
 Tests cover:
 - Job creation and management
-- Job retrieval and listing
+- Job retrieval and listing (cursor pages read from the database)
+- Finished jobs leaving memory
+- Batched status writes, rate-limited progress events and the processing pipeline
 - Job cancellation
 - Job status transitions
+- Resuming interrupted jobs and checkpointed chunks of long files
 - BatchFile and BatchJob dataclasses
 - Edge cases: empty lists, single items, many items
 """
 
-from datetime import datetime
+import asyncio
+import functools
+import sqlite3
+from datetime import datetime, timezone
 from pathlib import Path
+from types import SimpleNamespace
 
+import numpy as np
 import pytest
 
 from speakeasy.services.batch import (
+    AudioPrefetcher,
     BatchFile,
     BatchFileStatus,
     BatchJob,
     BatchJobStatus,
     BatchService,
+    ProgressThrottle,
+    _JobRun,
 )
+from speakeasy.services.history import HistoryService, encode_cursor
 
 
 @pytest.fixture
@@ -38,6 +50,53 @@ async def batch_service(tmp_path: Path):
     await service.close()
 
 
+class FakeTranscriber:
+    """Transcribes a file to its path, instantly."""
+
+    def transcribe_file(self, path: str, language: str):
+        return SimpleNamespace(text=path, duration_ms=1, model_used="tiny", language="en")
+
+
+class FakeHistory:
+    """Hands out record IDs derived from the text."""
+
+    async def add(self, **kwargs):
+        return SimpleNamespace(id=f"record-{kwargs['text']}")
+
+
+class FakeDecodingTranscriber:
+    """Decodes a file to samples holding its number, fails on 'broken' files."""
+
+    def __init__(self):
+        self.loaded: list[str] = []
+
+    def load_audio_file(self, path: str) -> np.ndarray:
+        self.loaded.append(path)
+        if "broken" in path:
+            raise ValueError(f"Cannot decode {path}")
+        return np.full(100, int(Path(path).stem.split("_")[-1]), dtype=np.float32)
+
+    def transcribe(self, audio_data: np.ndarray, language=None, **kwargs):
+        return SimpleNamespace(
+            text=f"clip {int(audio_data[0])}", duration_ms=1, model_used="tiny", language="en"
+        )
+
+
+class RecordingHistory:
+    """Records the texts added to history, in order."""
+
+    def __init__(self):
+        self.texts: list[str] = []
+
+    async def add(self, **kwargs):
+        self.texts.append(kwargs["text"])
+        return SimpleNamespace(id=f"record-{len(self.texts)}")
+
+
+async def _ignore(event: str, data: dict) -> None:
+    """Broadcast function that drops events."""
+
+
 @pytest.fixture
 def sample_file_paths(tmp_path: Path) -> list[str]:
     """Provide sample file paths for testing."""
@@ -200,6 +259,27 @@ class TestListJobs:
         assert jobs[1].id == job2.id
         assert jobs[2].id == job1.id
 
+    async def test_list_jobs_cursor(
+        self, batch_service: BatchService, sample_file_paths: list[str]
+    ):
+        """Cursor pages continue after the last job of the previous page."""
+        created = [await batch_service.create_job(sample_file_paths) for _ in range(5)]
+        await batch_service.cancel_job(created[2].id)
+
+        first = await batch_service.list_jobs(limit=3)
+        cursor = encode_cursor(first[-1].created_at, first[-1].id)
+        second = await batch_service.list_jobs(limit=3, cursor=cursor)
+
+        assert [j.id for j in first + second] == [j.id for j in reversed(created)]
+        assert [len(j.files) for j in first + second] == [3] * 5
+        assert [f.file_path for f in second[0].files] == sample_file_paths
+        assert first[0] is created[4]  # Active jobs are the in-memory objects
+
+    async def test_list_jobs_invalid_cursor(self, batch_service: BatchService):
+        """An invalid cursor raises ValueError."""
+        with pytest.raises(ValueError):
+            await batch_service.list_jobs(cursor="not-a-cursor")
+
 
 class TestCancelJob:
     """Tests for job cancellation."""
@@ -560,3 +640,384 @@ class TestPersistence:
         assert len(retrieved.files) == 1
 
         await service2.close()
+
+    async def test_iso_timestamps_migrated(self, tmp_path: Path):
+        """Jobs stored with ISO text timestamps load after the migration."""
+        db_path = tmp_path / "legacy_batch.db"
+        db = sqlite3.connect(db_path)
+        db.execute("""
+            CREATE TABLE batch_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL DEFAULT 'pending',
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                completed_at DATETIME,
+                current_file_index INTEGER DEFAULT 0
+            )
+        """)
+        db.execute(
+            "INSERT INTO batch_jobs (id, status, created_at, completed_at) VALUES (?, ?, ?, ?)",
+            ("old-job", "completed", "2024-01-15 10:30:00+00:00", "2024-01-15 10:35:00.5+00:00"),
+        )
+        db.commit()
+        db.close()
+
+        service = BatchService(db_path)
+        await service.initialize()
+        try:
+            job = await service.get_job("old-job")
+            assert job.created_at == datetime(2024, 1, 15, 10, 30, tzinfo=timezone.utc)
+            assert job.completed_at == datetime(2024, 1, 15, 10, 35, 0, 500000, tzinfo=timezone.utc)
+
+            cursor = await service._db.execute("SELECT typeof(created_at) FROM batch_jobs")
+            assert (await cursor.fetchone())[0] == "integer"
+        finally:
+            await service.close()
+
+    async def test_only_active_jobs_loaded(self, tmp_path: Path, sample_file_paths: list[str]):
+        """A restart loads pending jobs; finished ones are read when asked for."""
+        db_path = tmp_path / "active_test.db"
+        service = BatchService(db_path)
+        await service.initialize()
+        finished = await service.create_job(sample_file_paths)
+        await service.cancel_job(finished.id)
+        pending = await service.create_job(sample_file_paths)
+        await service.close()
+
+        service = BatchService(db_path)
+        await service.initialize()
+        try:
+            assert list(service._jobs) == [pending.id]
+            job = await service.get_job(finished.id)
+            assert job.status == BatchJobStatus.CANCELLED
+            assert [f.file_path for f in job.files] == sample_file_paths
+            assert all(f.status == BatchFileStatus.SKIPPED for f in job.files)
+            assert finished.id not in service._jobs
+        finally:
+            await service.close()
+
+
+class TestMemoryEviction:
+    """Tests for dropping finished jobs from memory."""
+
+    async def test_finished_job_evicted(
+        self, batch_service: BatchService, sample_file_paths: list[str]
+    ):
+        """A processed job and its per-job state leave memory but stay readable."""
+        job = await batch_service.create_job(sample_file_paths)
+        await batch_service.process_job(job.id, FakeTranscriber(), FakeHistory(), _ignore)
+
+        assert job.id not in batch_service._jobs
+        assert job.id not in batch_service._cancel_flags
+        assert job.id not in batch_service._processing_locks
+        stored = await batch_service.get_job(job.id)
+        assert stored.status == BatchJobStatus.COMPLETED
+        assert [f.transcription_id for f in stored.files] == [
+            f"record-{path}" for path in sample_file_paths
+        ]
+
+    async def test_retry_reloads_finished_job(
+        self, batch_service: BatchService, sample_file_paths: list[str]
+    ):
+        """Retrying a finished job brings it back into memory as pending."""
+        job = await batch_service.create_job(sample_file_paths)
+        await batch_service.cancel_job(job.id)
+        assert job.id not in batch_service._jobs
+
+        bf = (await batch_service.get_job(job.id)).files[0]
+        bf.status = BatchFileStatus.FAILED
+        await batch_service._update_file_status(bf)
+        retried = await batch_service.retry_failed(job.id)
+
+        assert retried.status == BatchJobStatus.PENDING
+        assert await batch_service.get_job(job.id) is retried
+
+
+class TestBatchedWrites:
+    """Tests for queued status writes and rate-limited progress events."""
+
+    async def test_status_writes_are_batched(self, tmp_path: Path):
+        """Running-job status writes wait for a flush; close() commits them."""
+        db_path = tmp_path / "batched.db"
+        service = BatchService(db_path, status_batch_size=1000, status_flush_interval_ms=60_000)
+        await service.initialize()
+        job = await service.create_job(["/tmp/a.wav", "/tmp/b.wav"])
+
+        def stored_status(file_id: str) -> str:
+            with sqlite3.connect(db_path) as db:
+                row = db.execute("SELECT status FROM batch_files WHERE id = ?", (file_id,))
+                status = row.fetchone()[0]
+            db.close()
+            return status
+
+        bf = job.files[0]
+        bf.status = BatchFileStatus.COMPLETED
+        await service._queue_status(job, bf)
+        assert stored_status(bf.id) == "pending"
+
+        await service.close()
+        assert stored_status(bf.id) == "completed"
+
+    async def test_cancel_writes_one_transaction(
+        self, batch_service: BatchService, sample_file_paths: list[str]
+    ):
+        """Cancelling writes the skipped files and the job in one flush."""
+        job = await batch_service.create_job(sample_file_paths)
+
+        commits = 0
+        commit = batch_service._db.commit
+
+        async def counting_commit():
+            nonlocal commits
+            commits += 1
+            await commit()
+
+        batch_service._db.commit = counting_commit
+        await batch_service.cancel_job(job.id)
+
+        assert commits == 1
+        stored = await batch_service.get_job(job.id)
+        assert all(f.status == BatchFileStatus.SKIPPED for f in stored.files)
+
+    async def test_progress_coalesced(self, tmp_path: Path):
+        """A large job sends a few progress events, ending with its final state."""
+        service = BatchService(tmp_path / "progress.db", progress_interval_ms=60_000)
+        await service.initialize()
+        events = []
+
+        async def broadcast(event, data):
+            events.append(data)
+
+        try:
+            job = await service.create_job([f"/tmp/{i}.wav" for i in range(200)])
+            await service.process_job(job.id, FakeTranscriber(), FakeHistory(), broadcast)
+            stored = await service.get_job(job.id)
+        finally:
+            await service.close()
+
+        # The first event, the last file's waiting event and the final state
+        assert len(events) == 3
+        assert events[1]["file_status"] == "completed"
+        assert events[-1]["status"] == "completed"
+        assert events[-1]["completed"] == 200
+        assert all(f.status == BatchFileStatus.COMPLETED for f in stored.files)
+
+    async def test_throttle_sends_latest(self):
+        """Events within the interval are replaced by newer ones and sent later."""
+        sent = []
+
+        async def broadcast(event, data):
+            sent.append(data["n"])
+
+        throttle = ProgressThrottle(broadcast, interval_ms=50)
+        for n in range(5):
+            await throttle.send({"n": n})
+        assert sent == [0]
+
+        await asyncio.sleep(0.1)
+        assert sent == [0, 4]
+
+        await asyncio.sleep(0.06)  # A full interval after 4 went out
+        await throttle.send({"n": 5})
+        await throttle.send({"n": 6})
+        await throttle.send({"n": 7}, final=True)
+        assert sent == [0, 4, 5, 6, 7]
+
+
+class TestPipeline:
+    """Tests for the decode/inference/persist pipeline of process_job()."""
+
+    async def test_results_persisted_in_order(self, batch_service: BatchService):
+        """Decoded-ahead files are transcribed and saved in job order."""
+        paths = [f"/audio/clip_{i}.wav" for i in range(20)]
+        paths[7] = "/audio/broken_7.wav"
+        history = RecordingHistory()
+        events = []
+
+        async def broadcast(event, data):
+            events.append(data)
+
+        job = await batch_service.create_job(paths)
+        await batch_service.process_job(job.id, FakeDecodingTranscriber(), history, broadcast)
+
+        stored = await batch_service.get_job(job.id)
+        assert history.texts == [f"clip {i}" for i in range(20) if i != 7]
+        assert stored.status == BatchJobStatus.COMPLETED
+        assert stored.files[7].status == BatchFileStatus.FAILED
+        assert "Cannot decode" in stored.files[7].error
+        assert [f.transcription_id for f in stored.files[8:10]] == ["record-8", "record-9"]
+        assert events[-1]["completed"] == 19
+        assert events[-1]["failed"] == 1
+        assert set(events[-1]["utilization"]) == {"decode", "inference", "persist"}
+
+    async def test_prefetch_bounded_by_memory(self):
+        """Decoding stops once the waiting audio reaches the byte limit."""
+        transcriber = FakeDecodingTranscriber()
+        paths = [f"/audio/clip_{i}.wav" for i in range(10)]
+        prefetch = AudioPrefetcher(
+            transcriber.load_audio_file, paths, _JobRun(), workers=2, max_ahead=8, max_bytes=800
+        )
+        try:
+            first = await prefetch.get(0)
+            await asyncio.sleep(0.1)
+
+            # 400 bytes per file: two waiting, plus one per decode thread
+            assert prefetch.ready_bytes <= 800 + 2 * 400
+            assert len(transcriber.loaded) < len(paths)
+            rest = [await prefetch.get(i) for i in range(1, 10)]
+        finally:
+            prefetch.close()
+
+        assert [int(a[0]) for a in [first, *rest]] == list(range(10))
+        assert prefetch.ready_bytes == 0
+
+    async def test_decode_finishing_as_file_is_taken(self):
+        """A decode whose callback runs after get() took the file is not counted."""
+        prefetch = AudioPrefetcher(lambda path: None, ["/audio/clip_0.wav"], _JobRun())
+        try:
+            # Start decoding file 0 by hand, as _fill() does
+            future = asyncio.get_running_loop().create_future()
+            future.add_done_callback(functools.partial(prefetch._decoded, 0))
+            prefetch._futures[0] = future
+            prefetch._decoding = 1
+            prefetch._next = 1
+
+            # The decode finishes; get() takes the audio before its callback runs
+            future.set_result((np.zeros(100, dtype=np.float32), 0.0))
+            audio = await prefetch.get(0)
+            await asyncio.sleep(0)
+        finally:
+            prefetch.close()
+
+        assert len(audio) == 100
+        assert prefetch.ready_bytes == 0
+
+
+class FakeChunkingTranscriber:
+    """Transcribes each sample of a file as a chunk, failing at chunk fail_at."""
+
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+        self.transcribed: list[int] = []
+
+    def load_audio_file(self, path: str) -> np.ndarray:
+        return np.zeros(5, dtype=np.float32)
+
+    def transcribe(self, audio_data, language=None, progress_callback=None, completed_chunks=None):
+        texts = list(completed_chunks or [])
+        for i in range(len(texts), len(audio_data)):
+            if i == self.fail_at:
+                raise RuntimeError(f"Interrupted at chunk {i}")
+            self.transcribed.append(i)
+            texts.append(f"part {i}")
+            progress_callback(i + 1, len(audio_data), texts[-1])
+        return SimpleNamespace(
+            text=" ".join(texts), duration_ms=1, model_used="tiny", language="en"
+        )
+
+
+class TestResume:
+    """Tests for resuming interrupted jobs and checkpointed chunks."""
+
+    async def test_interrupted_job_recovered(self, tmp_path: Path):
+        """A job running at shutdown is pending again and continues after its finished files."""
+        db_path = tmp_path / "resume_test.db"
+        service = BatchService(db_path)
+        await service.initialize()
+        job = await service.create_job([f"/audio/clip_{i}.wav" for i in range(4)])
+        job.status = BatchJobStatus.PROCESSING
+        job.files[0].status = BatchFileStatus.COMPLETED
+        job.files[0].transcription_id = "record-0"
+        job.files[1].status = BatchFileStatus.PROCESSING
+        await service._update_file_status(job.files[0])
+        await service._update_file_status(job.files[1])
+        await service._update_job_status(job)
+        await service.close()
+
+        service = BatchService(db_path)
+        await service.initialize()
+        try:
+            recovered = await service.get_job(job.id)
+            assert recovered.status == BatchJobStatus.PENDING
+            assert recovered.files[1].status == BatchFileStatus.PENDING
+            assert service.pop_interrupted_jobs() == [job.id]
+            assert service.pop_interrupted_jobs() == []
+
+            history = RecordingHistory()
+            events = []
+
+            async def broadcast(event, data):
+                events.append(data)
+
+            await service.process_job(job.id, FakeDecodingTranscriber(), history, broadcast)
+
+            stored = await service.get_job(job.id)
+            assert history.texts == ["clip 1", "clip 2", "clip 3"]
+            assert stored.status == BatchJobStatus.COMPLETED
+            assert all(f.status == BatchFileStatus.COMPLETED for f in stored.files)
+            assert stored.files[0].transcription_id == "record-0"
+            assert events[0]["completed"] == 1
+            assert events[-1]["completed"] == 4
+        finally:
+            await service.close()
+
+    async def test_chunks_resumed_after_restart(self, tmp_path: Path):
+        """Chunks completed before a failure are not transcribed again."""
+        db_path = tmp_path / "chunks_test.db"
+        service = BatchService(db_path)
+        await service.initialize()
+        job = await service.create_job(["/audio/long.wav"])
+        transcriber = FakeChunkingTranscriber(fail_at=2)
+        events = []
+
+        async def broadcast(event, data):
+            events.append(data)
+
+        await service.process_job(job.id, transcriber, FakeHistory(), broadcast)
+        await service.close()
+
+        # The retry within the job continued after the checkpointed chunks too
+        assert transcriber.transcribed == [0, 1]
+        chunk_events = [e for e in events if "chunk" in e]
+        assert (chunk_events[-1]["chunk"], chunk_events[-1]["total_chunks"]) == (2, 5)
+
+        service = BatchService(db_path)
+        await service.initialize()
+        try:
+            await service.retry_failed(job.id)
+            transcriber = FakeChunkingTranscriber()
+            history = RecordingHistory()
+            await service.process_job(job.id, transcriber, history, _ignore)
+
+            assert transcriber.transcribed == [2, 3, 4]
+            assert history.texts == ["part 0 part 1 part 2 part 3 part 4"]
+            assert (await service.get_job(job.id)).status == BatchJobStatus.COMPLETED
+            cursor = await service._db.execute("SELECT COUNT(*) FROM batch_chunks")
+            assert (await cursor.fetchone())[0] == 0
+        finally:
+            await service.close()
+
+    async def test_history_failure_keeps_chunks(self, tmp_path: Path, monkeypatch):
+        """A file whose history row is not committed fails and keeps its chunks."""
+        history = HistoryService(tmp_path / "history.db")
+        await history.initialize()
+        service = BatchService(tmp_path / "history_failure_test.db")
+        await service.initialize()
+        try:
+
+            async def locked():
+                raise sqlite3.OperationalError("database is locked")
+
+            monkeypatch.setattr(history._db, "commit", locked)
+            job = await service.create_job(["/audio/long.wav"])
+            await service.process_job(job.id, FakeChunkingTranscriber(), history, _ignore)
+
+            stored = await service.get_job(job.id)
+            assert stored.files[0].status == BatchFileStatus.FAILED
+            assert stored.files[0].transcription_id is None
+            assert "database is locked" in stored.files[0].error
+            cursor = await service._db.execute("SELECT COUNT(*) FROM batch_chunks")
+            assert (await cursor.fetchone())[0] == 5
+        finally:
+            await service.close()
+            monkeypatch.undo()
+            await history.close()
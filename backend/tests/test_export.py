@@ -8,20 +8,26 @@ Tests cover:
 - SRT subtitle format and timestamps
 - VTT subtitle format and timestamps
 - Unified export method for all formats
+- Streaming export in batches, with optional gzip
 - Timestamp formatting helpers
 """
 
+import gzip
 import json
-from datetime import datetime
+import sys
+from datetime import datetime, timezone
 
 import pytest
 
 from speakeasy.services.export import (
+    COLUMNAR_FORMATS,
     CONTENT_TYPES,
     FILE_EXTENSIONS,
+    ExportCompression,
     ExportFormat,
     ExportService,
     _format_timestamp,
+    check_available,
 )
 from speakeasy.services.history import TranscriptionRecord
 
@@ -350,6 +356,8 @@ class TestExportAllFormats:
         records = [single_record]
 
         for fmt in ExportFormat:
+            if fmt in COLUMNAR_FORMATS:
+                continue
             content, filename, content_type = export_service.export(records, fmt)
 
             # Content is non-empty
@@ -414,6 +422,169 @@ class TestExportAllFormats:
         assert filename.endswith(".vtt")
         assert content.startswith("WEBVTT")
 
+    def test_export_ndjson_format(
+        self, export_service: ExportService, multiple_records: list[TranscriptionRecord]
+    ):
+        """Export with NDJSON format writes one record per line."""
+        content, filename, content_type = export_service.export(
+            multiple_records, ExportFormat.NDJSON
+        )
+
+        assert content_type == "application/x-ndjson"
+        assert filename.endswith(".ndjson")
+        lines = content.splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [r.id for r in multiple_records]
+
+    def test_columnar_formats_require_stream(
+        self, export_service: ExportService, single_record: TranscriptionRecord
+    ):
+        """Parquet and Arrow are binary and only available through stream()."""
+        with pytest.raises(ValueError):
+            export_service.export([single_record], ExportFormat.PARQUET)
+
+
+async def one_record_batches(records: list[TranscriptionRecord]):
+    """Yield records one per batch, the worst case for state across batches."""
+    for record in records:
+        yield [record]
+
+
+async def collect(chunks) -> bytes:
+    """Join an async stream of byte chunks."""
+    return b"".join([chunk async for chunk in chunks])
+
+
+class TestStreamingExport:
+    """Tests for ExportService.stream()."""
+
+    @pytest.mark.parametrize(
+        "fmt",
+        [
+            ExportFormat.TXT,
+            ExportFormat.NDJSON,
+            ExportFormat.CSV,
+            ExportFormat.SRT,
+            ExportFormat.VTT,
+        ],
+    )
+    async def test_stream_matches_in_memory_export(
+        self,
+        export_service: ExportService,
+        multiple_records: list[TranscriptionRecord],
+        fmt: ExportFormat,
+    ):
+        """Streaming in batches produces the same document as export()."""
+        expected, _, _ = export_service.export(multiple_records, fmt)
+
+        content = await collect(export_service.stream(one_record_batches(multiple_records), fmt))
+
+        assert content.decode("utf-8") == expected
+
+    async def test_stream_json(
+        self, export_service: ExportService, multiple_records: list[TranscriptionRecord]
+    ):
+        """Streamed JSON is one valid document with the count at the end."""
+        content = await collect(
+            export_service.stream(one_record_batches(multiple_records), ExportFormat.JSON)
+        )
+
+        data = json.loads(content)
+        assert data["count"] == 3
+        assert [item["id"] for item in data["transcriptions"]] == [
+            record.id for record in multiple_records
+        ]
+
+    async def test_stream_empty(self, export_service: ExportService):
+        """An empty stream still produces a valid document."""
+        content = await collect(export_service.stream(one_record_batches([]), ExportFormat.JSON))
+
+        assert json.loads(content)["transcriptions"] == []
+
+    async def test_stream_gzip(
+        self, export_service: ExportService, multiple_records: list[TranscriptionRecord]
+    ):
+        """gzip compression is applied on the fly."""
+        expected, _, _ = export_service.export(multiple_records, ExportFormat.CSV)
+
+        content = await collect(
+            export_service.stream(
+                one_record_batches(multiple_records),
+                ExportFormat.CSV,
+                compression=ExportCompression.GZIP,
+            )
+        )
+
+        assert gzip.decompress(content).decode("utf-8") == expected
+
+    async def test_stream_zstd(
+        self, export_service: ExportService, multiple_records: list[TranscriptionRecord]
+    ):
+        """zstd compression is applied on the fly when zstandard is installed."""
+        zstandard = pytest.importorskip("zstandard")
+        expected, _, _ = export_service.export(multiple_records, ExportFormat.NDJSON)
+
+        content = await collect(
+            export_service.stream(
+                one_record_batches(multiple_records),
+                ExportFormat.NDJSON,
+                compression=ExportCompression.ZSTD,
+            )
+        )
+
+        reader = zstandard.ZstdDecompressor().stream_reader(content)
+        assert reader.read().decode("utf-8") == expected
+
+    async def test_stream_parquet(
+        self, export_service: ExportService, multiple_records: list[TranscriptionRecord]
+    ):
+        """Parquet exports keep every record and typed columns."""
+        pytest.importorskip("pyarrow")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        content = await collect(
+            export_service.stream(one_record_batches(multiple_records), ExportFormat.PARQUET)
+        )
+
+        table = pq.read_table(pa.BufferReader(content))
+        assert table.column("id").to_pylist() == [r.id for r in multiple_records]
+        assert table.schema.field("created_at").type == pa.timestamp("ms", tz="UTC")
+        created_at = table.column("created_at").to_pylist()[0]
+        assert created_at == multiple_records[0].created_at.replace(tzinfo=timezone.utc)
+
+    async def test_stream_arrow(
+        self, export_service: ExportService, multiple_records: list[TranscriptionRecord]
+    ):
+        """Arrow exports are an IPC stream with one batch per export batch."""
+        pytest.importorskip("pyarrow")
+        import pyarrow as pa
+
+        content = await collect(
+            export_service.stream(
+                one_record_batches(multiple_records), ExportFormat.ARROW, include_metadata=False
+            )
+        )
+
+        table = pa.ipc.open_stream(content).read_all()
+        assert table.column_names == ["id", "text", "created_at"]
+        assert table.column("text").to_pylist() == [r.text for r in multiple_records]
+
+    def test_missing_optional_dependency(self, monkeypatch):
+        """Formats needing an uninstalled package are rejected up front."""
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+        with pytest.raises(ValueError, match="pyarrow"):
+            check_available(ExportFormat.PARQUET)
+
+    def test_compressed_filename_and_content_type(self, export_service: ExportService):
+        """Compressed exports are downloaded as .gz files."""
+        filename = export_service.filename(ExportFormat.CSV, ExportCompression.GZIP)
+
+        assert filename.endswith(".csv.gz")
+        assert export_service.content_type(ExportFormat.CSV, ExportCompression.GZIP) == (
+            "application/gzip"
+        )
+
 
 class TestFormatTimestamp:
     """Tests for the _format_timestamp helper function."""
@@ -0,0 +1,175 @@
+"""
+Tests for the GrammarProcessor background preloading and download progress.
+
+Model downloads and transformers loading are mocked - no network access or
+real model weights are needed.
+"""
+
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from speakeasy.core.grammar_processor import GrammarProcessor, ModelStatus
+
+
+@pytest.fixture
+def processor(tmp_path: Path) -> GrammarProcessor:
+    """Provide a GrammarProcessor whose HF cache lives in a temp directory."""
+    with patch("speakeasy.core.grammar_processor.get_cache_dir", return_value=tmp_path):
+        yield GrammarProcessor(model_name="google/flan-t5-small", device="cpu")
+
+
+class TestGrammarProcessorInfo:
+    """Tests for status reporting."""
+
+    def test_initial_status_not_downloaded(self, processor):
+        """A model missing from the cache starts as NOT_DOWNLOADED."""
+        assert processor.status == ModelStatus.NOT_DOWNLOADED
+        assert not processor.is_preloading
+
+    def test_get_info_fields(self, processor):
+        """get_info() reports status, load time and memory use."""
+        info = processor.get_info()
+
+        assert info["model_name"] == "google/flan-t5-small"
+        assert info["status"] == "not_downloaded"
+        assert info["load_time_seconds"] is None
+        assert info["memory_bytes"] == 0
+        assert info["preloading"] is False
+
+    def test_memory_bytes_from_model(self, processor):
+        """memory_bytes uses the model's memory footprint."""
+        processor._model = MagicMock()
+        processor._model.get_memory_footprint.return_value = 1234
+
+        assert processor.memory_bytes == 1234
+
+
+class TestGrammarProcessorDownload:
+    """Tests for byte-accurate download progress."""
+
+    def test_download_reports_bytes(self, processor, tmp_path: Path):
+        """Progress callback receives bytes written to the cache and the hub total."""
+        total = 4096
+        calls: list[tuple[int, int]] = []
+
+        def fake_snapshot_download(repo_id, allow_patterns, tqdm_class):
+            blobs = tmp_path / "models--google--flan-t5-small" / "blobs"
+            blobs.mkdir(parents=True)
+            (blobs / "weights").write_bytes(b"\0" * total)
+            return str(tmp_path / "snapshot")
+
+        def on_progress(downloaded: int, total_bytes: int) -> bool:
+            calls.append((downloaded, total_bytes))
+            return True
+
+        with (
+            patch("huggingface_hub.snapshot_download", side_effect=fake_snapshot_download),
+            patch.object(processor, "_get_download_size", return_value=total),
+        ):
+            path = processor._download(on_progress)
+
+        assert path == str(tmp_path / "snapshot")
+        assert calls[-1] == (total, total)
+        assert all(downloaded <= total for downloaded, _ in calls)
+        assert processor.download_progress == 1.0
+
+    def test_download_cancelled(self, processor):
+        """Returning False from the callback cancels the download."""
+        release = threading.Event()
+
+        def slow_snapshot_download(repo_id, allow_patterns, tqdm_class):
+            release.wait(timeout=5)
+            return "unused"
+
+        try:
+            with (
+                patch("huggingface_hub.snapshot_download", side_effect=slow_snapshot_download),
+                patch.object(processor, "_get_download_size", return_value=100),
+            ):
+                with pytest.raises(RuntimeError, match="cancelled"):
+                    processor._download(lambda downloaded, total: False)
+        finally:
+            release.set()
+
+
+class TestGrammarProcessorPreload:
+    """Tests for background preloading."""
+
+    def test_preload_runs_load_in_background(self, processor):
+        """preload() loads the model off-thread and reports success."""
+        done = threading.Event()
+        errors: list = []
+
+        def fake_load(progress_callback=None, cancel_event=None):
+            processor._status = ModelStatus.LOADED
+
+        def on_complete(error):
+            errors.append(error)
+            done.set()
+
+        with patch.object(processor, "load", side_effect=fake_load):
+            thread = processor.preload(on_complete=on_complete)
+            assert done.wait(timeout=5)
+            thread.join(timeout=5)
+
+        assert errors == [None]
+        assert processor.is_loaded
+
+    def test_preload_reports_error(self, processor):
+        """Load failures are passed to on_complete instead of raised."""
+        done = threading.Event()
+        errors: list = []
+
+        def on_complete(error):
+            errors.append(error)
+            done.set()
+
+        with patch.object(processor, "load", side_effect=RuntimeError("boom")):
+            processor.preload(on_complete=on_complete)
+            assert done.wait(timeout=5)
+
+        assert isinstance(errors[0], RuntimeError)
+
+    def test_unload_cancels_preload(self, processor):
+        """A model that finishes loading after unload() is discarded."""
+        loading = threading.Event()
+        release = threading.Event()
+        done = threading.Event()
+        errors: list = []
+
+        def slow_from_pretrained(*args, **kwargs):
+            loading.set()
+            release.wait(timeout=5)
+            return MagicMock()
+
+        def on_complete(error):
+            errors.append(error)
+            done.set()
+
+        transformers = MagicMock()
+        transformers.AutoModelForSeq2SeqLM.from_pretrained.side_effect = slow_from_pretrained
+        with (
+            patch.dict(sys.modules, {"transformers": transformers}),
+            patch("speakeasy.core.grammar_processor.is_model_downloaded", return_value=True),
+        ):
+            processor.preload(on_complete=on_complete)
+            assert loading.wait(timeout=5)
+            processor.unload()
+            release.set()
+            assert done.wait(timeout=5)
+
+        assert "cancelled" in str(errors[0])
+        assert processor._model is None
+        assert processor.status == ModelStatus.DOWNLOADED
+
+    def test_correct_does_not_block_while_loading(self, processor):
+        """correct() returns the original text while a preload is in flight."""
+        processor._status = ModelStatus.DOWNLOADING
+
+        with patch.object(processor, "load") as mock_load:
+            assert processor.correct("hello world") == "hello world"
+            mock_load.assert_not_called()
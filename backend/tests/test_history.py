@@ -11,13 +11,21 @@ Tests cover:
 """
 
 import asyncio
+import base64
+import sqlite3
 import uuid
-from datetime import datetime
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 
 import pytest
 
-from speakeasy.services.history import HistoryService, TranscriptionRecord
+from speakeasy.services import history as history_module
+from speakeasy.services.history import (
+    SCHEMA_VERSION,
+    HistoryFilter,
+    HistoryService,
+    TranscriptionRecord,
+)
 
 
 @pytest.fixture
@@ -232,6 +240,20 @@ class TestListTranscriptions:
         for i in range(len(records) - 1):
             assert records[i].created_at >= records[i + 1].created_at
 
+    async def test_list_projects_fields_in_sql(self, history_service: HistoryService):
+        """Fields outside the projection are not read from the database."""
+        await history_service.add(text="Projected", duration_ms=100, model_used="m")
+
+        records, total, _ = await history_service.list(fields={"duration_ms"})
+
+        assert total == 1
+        record = records[0]
+        assert record.id and record.created_at
+        assert record.duration_ms == 100
+        assert record.text is None
+        assert record.model_used is None
+        assert set(record.to_dict({"duration_ms"})) == {"duration_ms"}
+
 
 class TestSearchTranscriptions:
     """Tests for full-text search."""
@@ -277,6 +299,217 @@ class TestSearchTranscriptions:
         assert len(page2) == 2
 
 
+class TestRankedSearch:
+    """Tests for prefix/substring search, bm25 ordering, snippets and the page cache."""
+
+    @pytest.fixture
+    async def searchable(self, history_service: HistoryService) -> HistoryService:
+        """History with a few records to search."""
+        await history_service.add(text="Planning the quarterly roadmap", duration_ms=1)
+        await history_service.add(text="A plan for the plan review", duration_ms=2)
+        await history_service.add(
+            text="Meeting notes", duration_ms=3, original_text="meeting notes about planners"
+        )
+        await history_service.add(text="Unrelated dictation", duration_ms=4)
+        return history_service
+
+    async def test_prefix_mode(self, searchable: HistoryService):
+        """The last term matches as a prefix; phrase mode needs whole words."""
+        records, total, _ = await searchable.list(search="plan", search_mode="prefix")
+        assert total == 3
+
+        _, total, _ = await searchable.list(search="plan")
+        assert total == 1
+
+        _, total, _ = await searchable.list(search="the quarterly road", search_mode="prefix")
+        assert total == 1
+
+    async def test_original_text_is_indexed(self, searchable: HistoryService):
+        """Words only present in original_text are found."""
+        records, _, _ = await searchable.list(search="planners")
+        assert [r.text for r in records] == ["Meeting notes"]
+
+    async def test_substring_mode(self, searchable: HistoryService):
+        """Substring search matches inside words, including short substrings."""
+        _, total, _ = await searchable.list(search="oadma", search_mode="substring")
+        assert total == 1
+
+        records, _, _ = await searchable.list(search="ic", search_mode="substring")
+        assert [r.text for r in records] == ["Unrelated dictation"]
+
+    async def test_relevance_order_with_keyset_pages(self, searchable: HistoryService):
+        """bm25 ordering pages through every match exactly once."""
+        first, total, cursor = await searchable.list(search="plan", order="relevance", limit=1)
+        assert first[0].text == "A plan for the plan review"
+
+        seen = [first[0].id]
+        while cursor:
+            page, _, cursor = await searchable.list(
+                search="plan", order="relevance", limit=1, cursor=cursor
+            )
+            seen.extend(r.id for r in page)
+        assert len(seen) == len(set(seen)) == total == 1
+
+        ids = set()
+        cursor = None
+        while True:
+            page, total, cursor = await searchable.list(
+                search="plan", search_mode="prefix", order="relevance", limit=2, cursor=cursor
+            )
+            ids.update(r.id for r in page)
+            if not cursor:
+                break
+        assert len(ids) == 3
+
+    async def test_index_walk_matches_join_plan(self, searchable: HistoryService, monkeypatch):
+        """Broad searches walking the created_at index return the same pages."""
+        expected, expected_total, _ = await searchable.list(search="pla", search_mode="prefix")
+
+        monkeypatch.setattr(history_module, "INDEX_WALK_MIN_MATCHES", 1)
+        searchable._search_cache.clear()
+        records, total, cursor = await searchable.list(search="pla", search_mode="prefix", limit=2)
+        rest, _, _ = await searchable.list(search="pla", search_mode="prefix", cursor=cursor)
+
+        assert [r.id for r in records + rest] == [r.id for r in expected]
+        assert total == expected_total == 3
+
+    async def test_highlighted_snippets(self, searchable: HistoryService):
+        """highlight=True adds snippets with marked matches."""
+        records, _, _ = await searchable.list(search="road", search_mode="prefix", highlight=True)
+
+        assert records[0].snippet == "Planning the quarterly <mark>roadmap</mark>"
+        assert records[0].to_dict()["snippet"] == records[0].snippet
+
+        records, _, _ = await searchable.list(search="roadmap")
+        assert records[0].snippet is None
+        assert "snippet" not in records[0].to_dict()
+
+    async def test_update_reindexes_both_columns(self, history_service: HistoryService):
+        """Grammar corrections update the index for text and original_text."""
+        record = await history_service.add(text="teh draft", duration_ms=1)
+        await history_service.update_text(record.id, "the draft", "teh draft")
+
+        _, total, _ = await history_service.list(search="the")
+        assert total == 1
+        _, total, _ = await history_service.list(search="teh")
+        assert total == 1
+
+    async def test_page_cache_invalidated_on_write(self, searchable: HistoryService):
+        """Repeated searches are served from the cache until the next write."""
+        first = await searchable.list(search="plan", search_mode="prefix")
+        assert await searchable.list(search="plan", search_mode="prefix") == first
+        assert len(searchable._search_cache) == 1
+
+        await searchable.add(text="planetary notes", duration_ms=5)
+
+        assert not searchable._search_cache
+        _, total, _ = await searchable.list(search="plan", search_mode="prefix")
+        assert total == 4
+
+    async def test_invalid_mode_and_order(self, searchable: HistoryService):
+        """Unknown search modes and orders are rejected."""
+        with pytest.raises(ValueError):
+            await searchable.list(search="plan", search_mode="fuzzy")
+        with pytest.raises(ValueError):
+            await searchable.list(search="plan", order="oldest")
+
+
+class TestIterRecords:
+    """Tests for batched iteration used by streaming exports."""
+
+    @pytest.fixture
+    async def tied_history(self, history_service: HistoryService):
+        """Provide 25 records sharing 5 timestamps, so batches split ties."""
+        await history_service.import_records(
+            [
+                TranscriptionRecord(
+                    id=f"rec-{i:02d}",
+                    text=f"{'planning' if i % 2 else 'budget'} record {i}",
+                    duration_ms=i,
+                    model_used="small" if i < 10 else "large",
+                    language="fr" if i % 3 == 0 else "en",
+                    created_at=datetime(2024, 1, 1 + i % 5, tzinfo=timezone.utc),
+                )
+                for i in range(25)
+            ]
+        )
+        return history_service
+
+    async def test_batches_cover_all_records_in_order(self, tied_history: HistoryService):
+        """Every record is yielded once, newest first, in bounded batches."""
+        batches = [batch async for batch in tied_history.iter_records(batch_size=4)]
+        records = [record for batch in batches for record in batch]
+
+        assert max(len(batch) for batch in batches) == 4
+        assert len({record.id for record in records}) == 25
+        keys = [(record.created_at, record.id) for record in records]
+        assert keys == sorted(keys, reverse=True)
+
+    async def test_filters(self, tied_history: HistoryService):
+        """Search and date range filters are applied in SQL."""
+        criteria = HistoryFilter(
+            search="planning",
+            start=datetime(2024, 1, 2, tzinfo=timezone.utc),
+            end=datetime(2024, 1, 3, tzinfo=timezone.utc),
+        )
+        matched = [
+            record
+            async for batch in tied_history.iter_records(criteria, batch_size=2)
+            for record in batch
+        ]
+
+        assert {record.id for record in matched} == {
+            "rec-01",
+            "rec-07",
+            "rec-11",
+            "rec-17",
+            "rec-21",
+        }
+
+    async def test_model_and_language_filters(self, tied_history: HistoryService):
+        """Model and language filters combine with the other criteria."""
+        criteria = HistoryFilter(model_used="small", language="fr")
+        matched = [
+            record async for batch in tied_history.iter_records(criteria) for record in batch
+        ]
+
+        assert {record.id for record in matched} == {"rec-00", "rec-03", "rec-06", "rec-09"}
+
+    async def test_id_filter_keeps_requested_order(self, tied_history: HistoryService):
+        """Records selected by ID come in ID order and honor the other criteria."""
+        criteria = HistoryFilter(ids=["rec-09", "missing", "rec-01", "rec-02", "rec-09"])
+        batches = [batch async for batch in tied_history.iter_records(criteria, batch_size=2)]
+
+        assert [[record.id for record in batch] for batch in batches] == [
+            ["rec-09"],
+            ["rec-01", "rec-02"],
+        ]
+
+        criteria.search = "planning"
+        matched = [
+            record async for batch in tied_history.iter_records(criteria) for record in batch
+        ]
+        assert [record.id for record in matched] == ["rec-09", "rec-01"]
+
+    async def test_get_many(self, tied_history: HistoryService, monkeypatch):
+        """get_many() fetches chunks of IDs and preserves their order."""
+        monkeypatch.setattr(history_module, "EXPORT_BATCH_SIZE", 2)
+
+        records = await tied_history.get_many(["rec-04", "rec-00", "missing", "rec-12", "rec-00"])
+
+        assert [record.id for record in records] == ["rec-04", "rec-00", "rec-12"]
+        assert records[2].text == "budget record 12"
+
+    async def test_includes_pending_writes(self, history_service: HistoryService):
+        """Queued write-behind rows are flushed before iterating."""
+        await history_service.add(text="queued", duration_ms=1, deferred=True)
+
+        batches = [batch async for batch in history_service.iter_records()]
+
+        assert [record.text for record in batches[0]] == ["queued"]
+        assert history_service.pending_writes == 0
+
+
 class TestDeleteTranscription:
     """Tests for deleting transcriptions."""
 
@@ -299,6 +532,79 @@ class TestDeleteTranscription:
         assert result is False
 
 
+class TestBulkDelete:
+    """Tests for deleting records by filter in one transaction."""
+
+    @pytest.fixture
+    async def filled_history(self, history_service: HistoryService):
+        """Provide 20 records over 5 days, two models and two words."""
+        await history_service.import_records(
+            [
+                TranscriptionRecord(
+                    id=f"rec-{i:02d}",
+                    text=f"{'planning' if i % 2 else 'budget'} record {i}",
+                    duration_ms=100,
+                    model_used="small" if i < 10 else "large",
+                    language="en",
+                    created_at=datetime(2024, 1, 1 + i % 5, tzinfo=timezone.utc),
+                )
+                for i in range(20)
+            ]
+        )
+        return history_service
+
+    async def remaining_ids(self, service: HistoryService) -> list[str]:
+        return sorted(r.id for batch in [b async for b in service.iter_records()] for r in batch)
+
+    async def test_delete_by_ids(self, filled_history: HistoryService, monkeypatch):
+        """IDs are deleted in chunks; unknown IDs are ignored."""
+        monkeypatch.setattr(history_module, "EXPORT_BATCH_SIZE", 2)
+
+        deleted = await filled_history.delete_many(
+            HistoryFilter(ids=["rec-00", "rec-01", "rec-02", "missing"])
+        )
+
+        assert deleted == 3
+        assert await filled_history.count() == 17
+        assert "rec-01" not in await self.remaining_ids(filled_history)
+
+    async def test_delete_combines_filters(self, filled_history: HistoryService):
+        """Search, model and date range must all match."""
+        deleted = await filled_history.delete_many(
+            HistoryFilter(
+                search="planning",
+                model_used="large",
+                start=datetime(2024, 1, 2, tzinfo=timezone.utc),
+                end=datetime(2024, 1, 3, tzinfo=timezone.utc),
+            )
+        )
+
+        assert deleted == 2  # rec-11 and rec-17
+        remaining = await self.remaining_ids(filled_history)
+        assert "rec-11" not in remaining and "rec-17" not in remaining
+        records, total, _ = await filled_history.list(search="planning")
+        assert total == 8
+
+    async def test_delete_updates_rollups(self, filled_history: HistoryService):
+        """Per-day stats drop the deleted rows."""
+        await filled_history.delete_many(HistoryFilter(model_used="small"))
+
+        stats = await filled_history.get_stats()
+
+        assert stats["total_count"] == 10
+        assert stats["total_duration_ms"] == 1000
+
+    async def test_empty_id_list_deletes_nothing(self, filled_history: HistoryService):
+        """An empty ID list is a filter matching no records."""
+        assert await filled_history.delete_many(HistoryFilter(ids=[])) == 0
+        assert await filled_history.count() == 20
+
+    async def test_no_criteria_clears(self, filled_history: HistoryService):
+        """A filter without criteria goes through the clear() fast path."""
+        assert await filled_history.delete_many(HistoryFilter()) == 20
+        assert await filled_history.count() == 0
+
+
 class TestClearTranscriptions:
     """Tests for clearing all transcriptions."""
 
@@ -324,6 +630,502 @@ class TestClearTranscriptions:
 
         assert deleted_count == 0
 
+    async def test_clear_resets_indexes_and_keeps_triggers(self, history_service: HistoryService):
+        """The fast path empties search, counts and rollups, and inserts still sync."""
+        for i in range(5):
+            await history_service.add(text=f"meeting notes {i}", duration_ms=100)
+        deleted_count = await history_service.clear()
+
+        assert deleted_count == 5
+        assert await history_service.count() == 0
+        assert (await history_service.list(search="meeting"))[1] == 0
+        assert (await history_service.list(search="eeti", search_mode="substring"))[1] == 0
+        assert (await history_service.get_stats())["total_count"] == 0
+
+        await history_service.add(text="meeting after clear", duration_ms=100)
+        assert await history_service.count() == 1
+        assert (await history_service.list(search="meeting"))[1] == 1
+        assert (await history_service.list(search="eeti", search_mode="substring"))[1] == 1
+
+    async def test_clear_returns_space(self, history_service: HistoryService):
+        """New databases use incremental auto-vacuum, so clear() shrinks the file."""
+        await history_service.import_records(
+            [
+                TranscriptionRecord(
+                    id=f"rec-{i}",
+                    text=f"record {i} " * 50,
+                    duration_ms=100,
+                    model_used=None,
+                    language=None,
+                    created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+                )
+                for i in range(2000)
+            ]
+        )
+        pages_before = await history_service._db.execute_fetchall("PRAGMA page_count")
+
+        await history_service.clear()
+
+        auto_vacuum = await history_service._db.execute_fetchall("PRAGMA auto_vacuum")
+        pages_after = await history_service._db.execute_fetchall("PRAGMA page_count")
+        freelist = await history_service._db.execute_fetchall("PRAGMA freelist_count")
+        assert auto_vacuum[0][0] == history_module.AUTO_VACUUM_INCREMENTAL
+        assert pages_after[0][0] < pages_before[0][0] // 10
+        assert freelist[0][0] == 0
+
+    async def test_clear_converts_existing_database(self, tmp_path: Path):
+        """Databases created without auto-vacuum are converted by clear()."""
+        db_path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE unrelated (x INTEGER)")
+        conn.close()
+
+        service = HistoryService(db_path)
+        await service.initialize()
+        try:
+            assert (await service._db.execute_fetchall("PRAGMA auto_vacuum"))[0][0] == 0
+            await service.add(text="Record", duration_ms=100)
+
+            await service.clear()
+
+            auto_vacuum = await service._db.execute_fetchall("PRAGMA auto_vacuum")
+            assert auto_vacuum[0][0] == history_module.AUTO_VACUUM_INCREMENTAL
+        finally:
+            await service.close()
+
+
+class TestRetention:
+    """Tests for retention cleanup and index/space maintenance."""
+
+    @pytest.fixture
+    async def dated_history(self, history_service: HistoryService):
+        """Provide 30 records, one per day ending today."""
+        now = datetime.now(timezone.utc)
+        await history_service.import_records(
+            [
+                TranscriptionRecord(
+                    id=f"day-{age:02d}",
+                    text=f"record from {age} days ago " * 20,
+                    duration_ms=100,
+                    model_used=None,
+                    language=None,
+                    created_at=now - timedelta(days=age, hours=1),
+                )
+                for age in range(30)
+            ]
+        )
+        return history_service
+
+    async def test_max_age(self, dated_history: HistoryService):
+        """Records older than max_age_days are deleted, in chunks."""
+        deleted = await dated_history.apply_retention(max_age_days=10, chunk_size=4)
+
+        assert deleted == 20
+        assert await dated_history.get("day-09") is not None
+        assert await dated_history.get("day-10") is None
+        assert (await dated_history.get_stats())["total_count"] == 10
+
+    async def test_max_records_keeps_newest(self, dated_history: HistoryService):
+        """Only the newest max_records records are kept."""
+        deleted = await dated_history.apply_retention(max_records=5, chunk_size=7)
+
+        assert deleted == 25
+        assert await dated_history.count() == 5
+        assert await dated_history.get("day-04") is not None
+        assert await dated_history.get("day-05") is None
+
+    async def test_max_bytes(self, dated_history: HistoryService):
+        """The oldest records are deleted until the live data fits."""
+        used = await dated_history._used_bytes()
+
+        deleted = await dated_history.apply_retention(max_bytes=used // 2)
+
+        assert 0 < deleted < 30
+        assert await dated_history.get("day-00") is not None
+        assert await dated_history.get("day-29") is None
+
+    async def test_no_limits(self, dated_history: HistoryService):
+        """Without limits nothing is deleted."""
+        assert await dated_history.apply_retention() == 0
+        assert await dated_history.count() == 30
+
+    async def test_optimize_and_compact(self, dated_history: HistoryService):
+        """Merging keeps search working and compacting empties the freelist."""
+        await dated_history.apply_retention(max_records=3)
+
+        await dated_history.optimize()
+        truncated = await dated_history.compact()
+
+        assert truncated is True
+        assert (await dated_history.list(search="record"))[1] == 3
+        freelist = await dated_history._db.execute_fetchall("PRAGMA freelist_count")
+        assert freelist[0][0] == 0
+
+
+class TestArchive:
+    """Tests for moving old records to monthly archive files."""
+
+    @pytest.fixture
+    async def archived_history(self, history_service: HistoryService):
+        """Provide 60 records, one every 5 days, with those older than 30 days archived."""
+        now = datetime.now(timezone.utc)
+        await history_service.import_records(
+            [
+                TranscriptionRecord(
+                    id=f"age-{age:03d}",
+                    text=f"common words record {age}",
+                    duration_ms=100,
+                    model_used="base",
+                    language="en",
+                    created_at=now - timedelta(days=age, hours=1),
+                )
+                for age in range(0, 300, 5)
+            ]
+        )
+        archived = await history_service.archive(max_age_days=30, chunk_size=4)
+        assert archived == 54
+        return history_service
+
+    async def test_archive_moves_old_records(self, archived_history: HistoryService):
+        """Old records move to one file per month; stats still cover everything."""
+        months = archived_history.archives.months
+
+        assert await archived_history.count() == 6
+        assert await archived_history.count_archived() == 54
+        assert len(months) >= 9
+        assert all(archived_history.archives.path(m).exists() for m in months)
+        stats = await archived_history.get_stats()
+        assert stats["total_count"] == 60
+        assert stats["archived_count"] == 54
+        assert (
+            stats["first_transcription"]
+            < (datetime.now(timezone.utc) - timedelta(days=290)).isoformat()
+        )
+        assert await archived_history.archive(max_age_days=30) == 0
+        # The hot indexes were rewritten after the large move
+        for table in ("transcriptions_fts", "transcriptions_trigram"):
+            await archived_history._db.execute(
+                f"INSERT INTO {table}({table}, rank) VALUES ('integrity-check', 1)"
+            )
+
+    async def test_default_list_reads_hot_database(self, archived_history: HistoryService):
+        """Plain lists skip the archives unless asked to include them."""
+        records, total, _ = await archived_history.list(limit=100)
+        assert total == 6
+        assert [r.id for r in records] == [f"age-{age:03d}" for age in range(0, 30, 5)]
+
+        records, total, _ = await archived_history.list(limit=100, include_archived=True)
+        assert total == 60
+        assert [r.id for r in records] == [f"age-{age:03d}" for age in range(0, 300, 5)]
+
+    async def test_cursor_pages_cross_into_archives(self, archived_history: HistoryService):
+        """Keyset pages continue from the hot database into the archive files."""
+        ids = []
+        cursor = None
+        while True:
+            records, _, cursor = await archived_history.list(
+                limit=7, cursor=cursor, include_archived=True, include_total=False
+            )
+            ids.extend(r.id for r in records)
+            if cursor is None:
+                break
+
+        assert ids == [f"age-{age:03d}" for age in range(0, 300, 5)]
+
+    async def test_search_fans_out_to_archives(self, archived_history: HistoryService):
+        """Searches query every archive file and merge the matches."""
+        records, total, _ = await archived_history.list(search="common", limit=10, offset=3)
+        assert total == 60
+        assert [r.id for r in records] == [f"age-{age:03d}" for age in range(15, 65, 5)]
+
+        records, total, _ = await archived_history.list(search="record 250", highlight=True)
+        assert total == 1
+        assert records[0].id == "age-250"
+        assert "<mark>record 250</mark>" in records[0].snippet
+
+        records, _, _ = await archived_history.list(search="250", order="relevance")
+        assert records[0].id == "age-250"
+
+        records, total, _ = await archived_history.list(search="rd 29", search_mode="substring")
+        assert {r.id for r in records} == {"age-290", "age-295"}
+
+    async def test_date_range_reads_overlapping_archives(
+        self, archived_history: HistoryService, monkeypatch
+    ):
+        """Only the archive files whose month overlaps the range are queried."""
+        queried = set()
+        fetch_all = archived_history.archives.fetch_all
+
+        async def spy(month, sql, params=()):
+            queried.add(month)
+            return await fetch_all(month, sql, params)
+
+        monkeypatch.setattr(archived_history.archives, "fetch_all", spy)
+        now = datetime.now(timezone.utc)
+        start = now - timedelta(days=99)
+        end = now - timedelta(days=89)
+
+        records, total, _ = await archived_history.list(start=start, end=end)
+
+        assert [r.id for r in records] == ["age-090", "age-095"]
+        assert total == 2
+        overlapping = archived_history.archives.months_between(
+            history_module.to_epoch_ms(start), history_module.to_epoch_ms(end)
+        )
+        assert queried == set(overlapping)
+        assert len(queried) <= 2
+
+    async def test_archived_record_by_id(self, archived_history: HistoryService):
+        """Archived records can be fetched, corrected and deleted by ID."""
+        record = await archived_history.get("age-200")
+        assert record is not None and record.text == "common words record 200"
+        assert [r.id for r in await archived_history.get_many(["age-200", "age-005"])] == [
+            "age-200",
+            "age-005",
+        ]
+
+        await archived_history.update_text("age-200", "corrected archive text", record.text)
+        records, _, _ = await archived_history.list(search="corrected")
+        assert [r.id for r in records] == ["age-200"]
+        assert records[0].original_text == "common words record 200"
+
+        assert await archived_history.delete("age-200") is True
+        assert await archived_history.get("age-200") is None
+        assert await archived_history.delete("age-200") is False
+        assert await archived_history.count_archived() == 53
+        assert (await archived_history.get_stats())["total_count"] == 59
+
+    async def test_emptied_archive_file_is_removed(self, archived_history: HistoryService):
+        """Deleting every record of a month deletes its archive file."""
+        month = archived_history.archives.months[-1]
+        records = await archived_history.get_many([f"age-{age:03d}" for age in range(0, 300, 5)])
+        ids = [
+            r.id
+            for r in records
+            if history_module.month_of(history_module.to_epoch_ms(r.created_at)) == month
+        ]
+
+        deleted = await archived_history.delete_many(HistoryFilter(ids=ids))
+
+        assert deleted == len(ids)
+        assert month not in archived_history.archives.months
+        assert not archived_history.archives.path(month).exists()
+
+    async def test_iter_records_merges_archives(self, archived_history: HistoryService):
+        """Exports include archived records, newest first, merged with late imports."""
+        now = datetime.now(timezone.utc)
+        late = TranscriptionRecord(
+            id="late-import",
+            text="imported after archiving",
+            duration_ms=100,
+            model_used=None,
+            language=None,
+            created_at=now - timedelta(days=102),
+        )
+        archived = await archived_history.get("age-100")
+        assert await archived_history.import_records([late, archived]) == 1
+
+        ids = []
+        async for batch in archived_history.iter_records(batch_size=4):
+            assert len(batch) <= 4
+            ids.extend(r.id for r in batch)
+
+        expected = [f"age-{age:03d}" for age in range(0, 300, 5)]
+        expected.insert(expected.index("age-105"), "late-import")
+        assert ids == expected
+
+        hot_only = HistoryFilter(include_archived=False)
+        assert sum([len(b) async for b in archived_history.iter_records(hot_only)]) == 7
+
+    async def test_delete_many_and_retention(self, archived_history: HistoryService):
+        """Bulk deletes and max-age retention reach into the archive files."""
+        now = datetime.now(timezone.utc)
+        deleted = await archived_history.delete_many(
+            HistoryFilter(
+                search="record", start=now - timedelta(days=61), end=now - timedelta(days=2)
+            )
+        )
+        assert deleted == 12  # Ages 5 to 60, 7 of them archived
+
+        deleted = await archived_history.apply_retention(max_age_days=200)
+        assert deleted == 20  # Ages 200 to 295
+        assert await archived_history.count_archived() == 54 - 7 - 20
+        stats = await archived_history.get_stats()
+        assert stats["total_count"] == 60 - 12 - 20
+        assert sum(stats["models"].values()) == stats["total_count"]
+
+    async def test_clear_removes_archives(self, archived_history: HistoryService):
+        """clear() deletes hot and archived records alike."""
+        assert await archived_history.clear() == 60
+
+        assert archived_history.archives.months == []
+        assert list(archived_history.archives.directory.glob("*.db")) == []
+        assert await archived_history.count_archived() == 0
+        assert (await archived_history.list(search="common"))[1] == 0
+
+    async def test_archives_found_after_reopen(self, archived_history: HistoryService):
+        """A new service instance picks up the existing archive files."""
+        service = HistoryService(archived_history.db_path)
+        await service.initialize()
+        try:
+            assert service.archives.months == archived_history.archives.months
+            assert (await service.list(search="common"))[1] == 60
+        finally:
+            await service.close()
+
+
+class TestTextCompression:
+    """Tests for compressed text storage (compress_text=True)."""
+
+    WORDS = "meeting budget review quarter planning design notes status project".split()
+
+    @classmethod
+    def long_text(cls, seed: int, words: int = 60) -> str:
+        """A text body long enough to be compressed."""
+        return " ".join(
+            f"{cls.WORDS[(seed * 7 + i * i) % len(cls.WORDS)]}{(seed + i) % 13}"
+            for i in range(words)
+        )
+
+    @pytest.fixture
+    async def compressed_history(self, tmp_path: Path):
+        """Provide an initialized HistoryService storing compressed text."""
+        pytest.importorskip("zstandard")
+        service = HistoryService(tmp_path / "compressed.db", compress_text=True)
+        await service.initialize()
+        yield service
+        await service.close()
+
+    async def stored(self, service: HistoryService, record_id: str) -> tuple:
+        """Raw stored text and original_text of a record."""
+        row = await service._fetch_one(
+            "SELECT text, original_text FROM transcriptions WHERE id = ?", (record_id,)
+        )
+        return tuple(row)
+
+    async def test_round_trip(self, compressed_history: HistoryService):
+        """Long bodies are stored compressed, originals as diffs, and read back as text."""
+        text = self.long_text(1)
+        original = text.replace("budget", "budgets").replace("review", "reveiw")
+        record = await compressed_history.add(text, 100, original_text=original)
+        short = await compressed_history.add("short note", 100, original_text="short Note")
+
+        stored_text, stored_original = await self.stored(compressed_history, record.id)
+        assert isinstance(stored_text, bytes) and len(stored_text) < len(text)
+        assert stored_original[:1] == b"d"  # Diff against text
+        assert await self.stored(compressed_history, short.id) == ("short note", "short Note")
+
+        fetched = await compressed_history.get(record.id)
+        assert (fetched.text, fetched.original_text) == (text, original)
+        records, _, _ = await compressed_history.list(fields={"original_text"})
+        assert [(r.text, r.original_text) for r in records] == [
+            (None, "short Note"),
+            (None, original),
+        ]
+
+        await compressed_history.update_text(record.id, "corrected " + text, text)
+        fetched = await compressed_history.get(record.id)
+        assert (fetched.text, fetched.original_text) == ("corrected " + text, text)
+
+    async def test_search_over_compressed_text(self, compressed_history: HistoryService):
+        """Word, substring and LIKE searches, snippets and deletes see the decoded text."""
+        record = await compressed_history.add(self.long_text(2) + " zebrafish", 100)
+        await compressed_history.add(self.long_text(3), 100)
+
+        for mode in ("phrase", "prefix", "substring"):
+            records, total, _ = await compressed_history.list(
+                search="zebrafis" if mode != "phrase" else "zebrafish",
+                search_mode=mode,
+                highlight=True,
+            )
+            assert [r.id for r in records] == [record.id]
+            assert "<mark>" in records[0].snippet
+        compressed_history._trigram_enabled = False
+        records, _, _ = await compressed_history.list(search="ebrafi", search_mode="substring")
+        assert [r.id for r in records] == [record.id]
+
+        await compressed_history.delete(record.id)
+        records, _, _ = await compressed_history.list(search="zebrafish")
+        assert records == []
+        for table in ("transcriptions_fts", "transcriptions_trigram"):
+            await compressed_history._db.execute(
+                f"INSERT INTO {table}({table}, rank) VALUES ('integrity-check', 1)"
+            )
+
+    async def test_enable_on_existing_database(self, tmp_path: Path, monkeypatch):
+        """Existing records are reindexed from the view, then compressed by compress()."""
+        pytest.importorskip("zstandard")
+        monkeypatch.setattr(history_module, "DICTIONARY_MIN_SAMPLES", 50)
+        db_path = tmp_path / "existing.db"
+        service = HistoryService(db_path)
+        await service.initialize()
+        texts = [self.long_text(seed) for seed in range(120)]
+        for text in texts:
+            await service.add(text, 100, original_text=text.upper())
+        await service.close()
+
+        service = HistoryService(db_path, compress_text=True)
+        await service.initialize()
+        try:
+            records, total, _ = await service.list(search="meeting1")
+            assert total > 0
+
+            assert await service.compress(chunk_size=50) == 120
+            assert service._codec.dictionary_id != 0
+            assert await service.compress() == 0  # Resumes after the last row
+
+            stored_text, _ = await self.stored(service, records[0].id)
+            assert isinstance(stored_text, bytes)
+            records, _, _ = await service.list(limit=200)
+            assert sorted(r.text for r in records) == sorted(texts)
+            assert all(r.original_text == r.text.upper() for r in records)
+            again, total_again, _ = await service.list(search="meeting1")
+            assert total_again == total
+        finally:
+            await service.close()
+
+        # Compressed text stays readable with compression switched off
+        service = HistoryService(db_path)
+        await service.initialize()
+        try:
+            record = await service.get(records[0].id)
+            assert record.text == records[0].text
+            new = await service.add(self.long_text(500), 100)
+            assert (await self.stored(service, new.id))[0] == self.long_text(500)
+        finally:
+            await service.close()
+
+    async def test_archived_records_stay_compressed(self, compressed_history: HistoryService):
+        """Archive files keep the encoded text and index its decoded form."""
+        now = datetime.now(timezone.utc)
+        text = self.long_text(4) + " walrus"
+        await compressed_history.import_records(
+            [
+                TranscriptionRecord(
+                    id="old",
+                    text=text,
+                    duration_ms=100,
+                    model_used=None,
+                    language=None,
+                    created_at=now - timedelta(days=90),
+                    original_text=text + " extra",
+                )
+            ]
+        )
+
+        assert await compressed_history.archive(max_age_days=30) == 1
+        month = compressed_history.archives.months[0]
+        rows = await compressed_history.archives.fetch_all(
+            month, "SELECT typeof(text), typeof(original_text) FROM transcriptions"
+        )
+        assert tuple(rows[0]) == ("blob", "blob")
+
+        records, _, _ = await compressed_history.list(search="walrus", highlight=True)
+        assert [r.id for r in records] == ["old"]
+        assert "<mark>walrus</mark>" in records[0].snippet
+        record = await compressed_history.get("old")
+        assert (record.text, record.original_text) == (text, text + " extra")
+
 
 class TestGetStats:
     """Tests for statistics aggregation."""
@@ -351,6 +1153,552 @@ class TestGetStats:
         assert stats["last_transcription"] is None
 
 
+class TestDailyRollup:
+    """Tests for the per-day rollup behind get_stats() and get_stats_series()."""
+
+    @staticmethod
+    def _record(record_id: str, day: int, model: str, language: str, duration_ms: int):
+        return TranscriptionRecord(
+            id=record_id,
+            text=f"record {record_id}",
+            duration_ms=duration_ms,
+            model_used=model,
+            language=language,
+            created_at=datetime(2024, 1, day, 12, 0, tzinfo=timezone.utc),
+        )
+
+    async def test_stats_breakdown_by_model_and_language(self, history_service: HistoryService):
+        """get_stats() includes per-model and per-language counts."""
+        await history_service.add(text="a", duration_ms=100, model_used="m1", language="en")
+        await history_service.add(text="b", duration_ms=200, model_used="m1", language="de")
+        await history_service.add(text="c", duration_ms=300)
+
+        stats = await history_service.get_stats()
+
+        assert stats["today_count"] == 3
+        assert stats["models"] == {"m1": 2, "unknown": 1}
+        assert stats["languages"] == {"en": 1, "de": 1, "unknown": 1}
+
+    async def test_rollup_follows_deletes(self, history_service: HistoryService):
+        """Deleting rows decrements and prunes rollup entries."""
+        record = await history_service.add(text="gone", duration_ms=500, model_used="m2")
+        await history_service.add(text="kept", duration_ms=100, model_used="m1")
+
+        await history_service.delete(record.id)
+        stats = await history_service.get_stats()
+
+        assert stats["total_count"] == 1
+        assert stats["total_duration_ms"] == 100
+        assert stats["models"] == {"m1": 1}
+
+    async def test_series_by_day_and_month(self, history_service: HistoryService):
+        """Imported rows are bucketed by their original day."""
+        await history_service.import_records(
+            [
+                self._record("r1", 1, "m1", "en", 100),
+                self._record("r2", 1, "m2", "en", 200),
+                self._record("r3", 3, "m1", "fr", 300),
+            ]
+        )
+
+        daily = await history_service.get_stats_series()
+        assert [(b["period"], b["count"]) for b in daily] == [
+            ("2024-01-01", 2),
+            ("2024-01-03", 1),
+        ]
+        assert daily[0]["models"] == {"m1": 1, "m2": 1}
+        assert daily[1]["languages"] == {"fr": 1}
+
+        monthly = await history_service.get_stats_series(interval="month")
+        assert monthly == [
+            {
+                "period": "2024-01",
+                "count": 3,
+                "total_duration_ms": 600,
+                "models": {"m1": 2, "m2": 1},
+                "languages": {"en": 2, "fr": 1},
+            }
+        ]
+
+    async def test_series_range_and_week(self, history_service: HistoryService):
+        """Range bounds are inclusive and weeks start on Monday."""
+        await history_service.import_records(
+            [self._record(f"r{day}", day, "m", "en", 10) for day in (1, 7, 8, 14)]
+        )
+
+        ranged = await history_service.get_stats_series(
+            start=date(2024, 1, 7), end=date(2024, 1, 8)
+        )
+        assert [b["period"] for b in ranged] == ["2024-01-07", "2024-01-08"]
+
+        weekly = await history_service.get_stats_series(interval="week")
+        assert [(b["period"], b["count"]) for b in weekly] == [
+            ("2024-01-01", 2),
+            ("2024-01-08", 2),
+        ]
+
+    async def test_series_invalid_interval(self, history_service: HistoryService):
+        """Unsupported intervals raise ValueError."""
+        with pytest.raises(ValueError):
+            await history_service.get_stats_series(interval="hour")
+
+    async def test_rollup_backfilled_for_existing_rows(self, tmp_path: Path):
+        """Rollups are rebuilt from existing rows when first created."""
+        db_path = tmp_path / "backfill.db"
+        service = HistoryService(db_path)
+        await service.initialize()
+        await service.add(text="old", duration_ms=250, model_used="m1")
+        await service._db.execute("DROP TRIGGER transcriptions_rollup_ai")
+        await service._db.execute("DROP TRIGGER transcriptions_rollup_ad")
+        await service._db.execute("DROP TABLE history_daily_stats")
+        await service._db.execute("DROP TABLE history_daily_breakdown")
+        await service._db.commit()
+        await service.close()
+
+        reopened = HistoryService(db_path)
+        await reopened.initialize()
+        try:
+            stats = await reopened.get_stats()
+            assert stats["total_count"] == 1
+            assert stats["total_duration_ms"] == 250
+            assert stats["models"] == {"m1": 1}
+        finally:
+            await reopened.close()
+
+
+class TestConnectionTuning:
+    """Tests for WAL mode and the read connection pool."""
+
+    async def test_wal_mode_enabled(self, history_service: HistoryService):
+        """The database uses WAL journaling with synchronous=NORMAL."""
+        cursor = await history_service._db.execute("PRAGMA journal_mode")
+        assert (await cursor.fetchone())[0] == "wal"
+
+        cursor = await history_service._db.execute("PRAGMA synchronous")
+        assert (await cursor.fetchone())[0] == 1  # NORMAL
+
+    async def test_readers_are_read_only(self, history_service: HistoryService):
+        """Pooled read connections reject writes."""
+        async with history_service._readers.acquire() as db:
+            with pytest.raises(Exception, match="readonly|read-only|query_only"):
+                await db.execute("DELETE FROM transcriptions")
+
+    async def test_readers_see_committed_writes(self, history_service: HistoryService):
+        """Records written on the writer are immediately visible to readers."""
+        record = await history_service.add(text="visible to readers", duration_ms=100)
+
+        assert (await history_service.get(record.id)) is not None
+        records, total, _ = await history_service.list(search="readers")
+        assert total == 1
+        assert records[0].id == record.id
+
+    async def test_concurrent_reads_and_writes(self, history_service: HistoryService):
+        """Reads interleaved with writes all succeed."""
+
+        async def writer():
+            for i in range(20):
+                await history_service.add(text=f"concurrent write {i}", duration_ms=i)
+
+        async def reader():
+            for _ in range(20):
+                await history_service.list(limit=10)
+                await history_service.list(search="concurrent")
+
+        await asyncio.gather(writer(), reader(), reader())
+
+        _, total, _ = await history_service.list()
+        assert total == 20
+
+
+class TestWriteBehind:
+    """Tests for deferred inserts on the write-behind queue."""
+
+    async def test_deferred_add_returns_record_immediately(self, history_service: HistoryService):
+        """Deferred adds return the record and queue the insert."""
+        record = await history_service.add(text="queued", duration_ms=10, deferred=True)
+
+        assert record.id
+        assert history_service.pending_writes == 1
+        assert await history_service.get(record.id) is record
+
+    async def test_flush_commits_pending_rows(self, history_service: HistoryService):
+        """flush() writes every queued row in one go."""
+        for i in range(5):
+            await history_service.add(text=f"queued {i}", duration_ms=i, deferred=True)
+
+        assert await history_service.flush() == 5
+
+        assert history_service.pending_writes == 0
+        _, total, _ = await history_service.list()
+        assert total == 5
+
+    async def test_batch_size_triggers_flush(self, tmp_path: Path):
+        """Reaching write_batch_size flushes without waiting for the timer."""
+        service = HistoryService(
+            tmp_path / "batch_size.db", write_batch_size=3, write_flush_interval_ms=60_000
+        )
+        await service.initialize()
+        try:
+            for i in range(3):
+                await service.add(text=f"row {i}", duration_ms=i, deferred=True)
+
+            assert service.pending_writes == 0
+            _, total, _ = await service.list()
+            assert total == 3
+        finally:
+            await service.close()
+
+    async def test_interval_triggers_flush(self, tmp_path: Path):
+        """Queued rows are flushed after write_flush_interval_ms."""
+        service = HistoryService(tmp_path / "interval.db", write_flush_interval_ms=10)
+        await service.initialize()
+        try:
+            await service.add(text="timed", duration_ms=1, deferred=True)
+            await asyncio.sleep(0.2)
+
+            assert service.pending_writes == 0
+            records, _, _ = await service.list(search="timed")
+            assert len(records) == 1
+        finally:
+            await service.close()
+
+    async def test_close_flushes_pending_rows(self, tmp_path: Path):
+        """close() commits queued rows before closing the connections."""
+        db_path = tmp_path / "close.db"
+        service = HistoryService(db_path, write_flush_interval_ms=60_000)
+        await service.initialize()
+        await service.add(text="survives shutdown", duration_ms=1, deferred=True)
+        await service.close()
+
+        reopened = HistoryService(db_path)
+        await reopened.initialize()
+        try:
+            _, total, _ = await reopened.list()
+            assert total == 1
+        finally:
+            await reopened.close()
+
+    async def test_bad_row_does_not_block_queue(self, history_service: HistoryService):
+        """A row that fails on its own is dropped; the rest of its batch is written."""
+        records = [
+            await history_service.add(text=f"queued {i}", duration_ms=i, deferred=True)
+            for i in range(3)
+        ]
+        # Make the middle row a duplicate of one already stored
+        await history_service._db.execute(
+            history_module._INSERT_SQL, history_module._insert_params(records[1])
+        )
+        await history_service._db.commit()
+
+        assert await history_service.flush() == 2
+        assert history_service.pending_writes == 0
+
+        await history_service.add(text="after the bad row", duration_ms=1, deferred=True)
+        assert await history_service.flush() == 1
+        assert await history_service.count() == 4
+
+    async def test_delete_sees_pending_rows(self, history_service: HistoryService):
+        """Writes that target a queued row flush the queue first."""
+        record = await history_service.add(text="delete me", duration_ms=1, deferred=True)
+
+        assert await history_service.delete(record.id) is True
+        assert await history_service.get(record.id) is None
+
+
+class TestMaintainedCounts:
+    """Tests for trigger-maintained totals and cached search counts."""
+
+    async def test_counter_tracks_inserts_and_deletes(self, history_service: HistoryService):
+        """The maintained counter follows inserts, deletes and clear."""
+        records = [await history_service.add(text=f"row {i}", duration_ms=i) for i in range(3)]
+        assert await history_service.count() == 3
+
+        await history_service.delete(records[0].id)
+        assert await history_service.count() == 2
+
+        await history_service.clear()
+        assert await history_service.count() == 0
+
+    async def test_counter_seeded_for_existing_rows(self, tmp_path: Path):
+        """Databases created before the counter table get a correct seed."""
+        db_path = tmp_path / "existing.db"
+        service = HistoryService(db_path)
+        await service.initialize()
+        for i in range(4):
+            await service.add(text=f"old row {i}", duration_ms=i)
+        await service._db.execute("DROP TABLE history_counters")
+        await service._db.execute("DROP TRIGGER transcriptions_count_ai")
+        await service._db.execute("DROP TRIGGER transcriptions_count_ad")
+        await service._db.commit()
+        await service.close()
+
+        reopened = HistoryService(db_path)
+        await reopened.initialize()
+        try:
+            assert await reopened.count() == 4
+        finally:
+            await reopened.close()
+
+    async def test_search_total_cache_invalidated_on_write(self, history_service: HistoryService):
+        """Cached search totals are dropped when rows change."""
+        await history_service.add(text="cached apple", duration_ms=1)
+        _, total, _ = await history_service.list(search="apple")
+        assert total == 1
+
+        await history_service.add(text="another apple", duration_ms=1)
+        _, total, _ = await history_service.list(search="apple")
+        assert total == 2
+
+    async def test_skip_total(self, history_service: HistoryService):
+        """include_total=False returns records without a total."""
+        await history_service.add(text="row", duration_ms=1)
+
+        records, total, _ = await history_service.list(include_total=False)
+        assert total is None
+        assert len(records) == 1
+
+        _, total, _ = await history_service.list(search="row", include_total=False)
+        assert total is None
+
+
+class TestEpochTimestamps:
+    """Tests for integer created_at storage, range filters and the migration."""
+
+    @staticmethod
+    def _create_legacy_db(db_path: Path) -> None:
+        """Create a database in the pre-migration format (ISO text timestamps)."""
+        db = sqlite3.connect(db_path)
+        db.executescript("""
+            CREATE TABLE transcriptions (
+                id TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                duration_ms INTEGER,
+                model_used TEXT,
+                language TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                original_text TEXT
+            );
+            CREATE VIRTUAL TABLE transcriptions_fts
+            USING fts5(text, content=transcriptions, content_rowid=rowid);
+            CREATE TRIGGER transcriptions_ai AFTER INSERT ON transcriptions BEGIN
+                INSERT INTO transcriptions_fts(rowid, text) VALUES (new.rowid, new.text);
+            END;
+            CREATE TRIGGER transcriptions_au AFTER UPDATE ON transcriptions BEGIN
+                INSERT INTO transcriptions_fts(transcriptions_fts, rowid, text)
+                VALUES('delete', old.rowid, old.text);
+                INSERT INTO transcriptions_fts(rowid, text) VALUES (new.rowid, new.text);
+            END;
+        """)
+        db.executemany(
+            "INSERT INTO transcriptions (id, text, duration_ms, created_at) VALUES (?, ?, ?, ?)",
+            [
+                ("a", "legacy alpha", 100, "2024-01-01 08:00:00.250000+00:00"),
+                ("b", "legacy beta", 200, "2024-01-02 09:30:00+02:00"),
+                ("c", "legacy gamma", 300, "2024-01-03 10:00:00"),
+            ],
+        )
+        db.commit()
+        db.close()
+
+    async def test_created_at_stored_as_epoch_ms(self, history_service: HistoryService):
+        """New rows store integer milliseconds and round-trip exactly."""
+        record = await history_service.add(text="stamp", duration_ms=1)
+
+        cursor = await history_service._db.execute(
+            "SELECT typeof(created_at) FROM transcriptions WHERE id = ?", (record.id,)
+        )
+        assert (await cursor.fetchone())[0] == "integer"
+        assert (await history_service.get(record.id)).created_at == record.created_at
+        assert record.created_at.microsecond % 1000 == 0
+
+    async def test_range_filter(self, history_service: HistoryService):
+        """start/end filter in SQL and the total reflects the range."""
+        await history_service.import_records(
+            [
+                TranscriptionRecord(
+                    id=f"r{day}",
+                    text=f"day {day}",
+                    duration_ms=day,
+                    model_used=None,
+                    language=None,
+                    created_at=datetime(2024, 1, day, 12, 0, tzinfo=timezone.utc),
+                )
+                for day in range(1, 11)
+            ]
+        )
+
+        records, total, _ = await history_service.list(
+            start=datetime(2024, 1, 3, tzinfo=timezone.utc),
+            end=datetime(2024, 1, 5, 12, 0, tzinfo=timezone.utc),
+        )
+        assert [r.id for r in records] == ["r5", "r4", "r3"]
+        assert total == 3
+
+        records, total, _ = await history_service.list(
+            search="day", start=datetime(2024, 1, 9, tzinfo=timezone.utc)
+        )
+        assert [r.id for r in records] == ["r10", "r9"]
+        assert total == 2
+
+    async def test_legacy_iso_cursor_accepted(self, history_service: HistoryService):
+        """Cursors issued with ISO timestamps still paginate."""
+        for i in range(3):
+            await history_service.import_records(
+                [
+                    TranscriptionRecord(
+                        id=f"r{i}",
+                        text=f"row {i}",
+                        duration_ms=i,
+                        model_used=None,
+                        language=None,
+                        created_at=datetime(2024, 1, 1, i, tzinfo=timezone.utc),
+                    )
+                ]
+            )
+        legacy = base64.urlsafe_b64encode(b"2024-01-01T02:00:00+00:00_r2").decode()
+
+        records, _, _ = await history_service.list(cursor=legacy)
+
+        assert [r.id for r in records] == ["r1", "r0"]
+
+    async def test_migrates_iso_timestamps(self, tmp_path: Path):
+        """Existing ISO text timestamps are converted and triggers upgraded."""
+        db_path = tmp_path / "legacy.db"
+        self._create_legacy_db(db_path)
+
+        service = HistoryService(db_path)
+        await service.initialize()
+        try:
+            cursor = await service._db.execute(
+                "SELECT id, created_at FROM transcriptions ORDER BY id"
+            )
+            assert [tuple(r) for r in await cursor.fetchall()] == [
+                ("a", 1704096000250),
+                ("b", 1704180600000),
+                ("c", 1704276000000),
+            ]
+            cursor = await service._db.execute("PRAGMA user_version")
+            assert (await cursor.fetchone())[0] == SCHEMA_VERSION
+
+            record = await service.get("b")
+            assert record.created_at == datetime(2024, 1, 2, 7, 30, tzinfo=timezone.utc)
+
+            records, total, _ = await service.list(search="legacy")
+            assert [r.id for r in records] == ["c", "b", "a"]
+            assert total == 3
+
+            stats = await service.get_stats()
+            assert stats["total_count"] == 3
+            assert stats["first_transcription"] == "2024-01-01T08:00:00.250000+00:00"
+            series = await service.get_stats_series()
+            assert [b["period"] for b in series] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+        finally:
+            await service.close()
+
+
+class TestRecentCache:
+    """Tests for the write-through caches of recent records, list pages and stats."""
+
+    @staticmethod
+    async def _uncached(service: HistoryService, **kwargs):
+        """list() with the recent caches dropped first, i.e. straight from the database."""
+        service._invalidate_caches()
+        return await service.list(**kwargs)
+
+    async def test_pages_follow_writes(self, history_service: HistoryService):
+        """Cached first pages match the database after adds, updates and deletes."""
+        for i in range(12):
+            await history_service.add(text=f"Record {i}", duration_ms=i, model_used="base")
+        views = [
+            {"limit": 5},
+            {"limit": 5, "fields": {"id", "text"}},
+            {"limit": 20, "include_total": False},
+            {"limit": 3, "fields": {"original_text"}},
+        ]
+
+        async def check():
+            for view in views:
+                cached = await history_service.list(**view)
+                assert history_service._recent_pages
+                # Copies of the cached state, so the comparison below cannot
+                # see its own reload
+                pages = dict(history_service._recent_pages)
+                assert cached == await self._uncached(history_service, **view), view
+                history_service._recent_pages.update(pages)
+
+        await check()
+        newest = await history_service.add(text="Newest", duration_ms=1)
+        await check()
+        await history_service.add(text="Deferred", duration_ms=1, deferred=True)
+        await history_service.flush()
+        await check()
+        await history_service.update_text(newest.id, "Corrected", "Newest")
+        await check()
+        records, _, _ = await history_service.list(limit=20)
+        await history_service.delete(records[1].id)  # On every page
+        await check()
+        await history_service.delete(records[-1].id)  # Only on the 20-record page
+        await check()
+
+    async def test_page_cache_hits(self, history_service: HistoryService):
+        """Repeated first pages are served from memory, other lists are not cached."""
+        await history_service.add(text="Cached page", duration_ms=1)
+
+        await history_service.list(limit=10)
+        await history_service.list(limit=10)
+        await history_service.add(text="Written through", duration_ms=1)
+        records, total, _ = await history_service.list(limit=10)
+        await history_service.list(limit=10, offset=1)
+        await history_service.list(limit=10, search="Cached")
+
+        assert [r.text for r in records] == ["Written through", "Cached page"]
+        assert total == 2
+        stats = history_service.cache_stats()["page"]
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+        assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+    async def test_get_reads_through(self, history_service: HistoryService):
+        """get() serves added and previously read records without a query."""
+        record = await history_service.add(text="Recent", duration_ms=1)
+        history_service._invalidate_caches()
+
+        assert await history_service.get(record.id) == record
+        assert await history_service.get(record.id) == record
+        await history_service.update_text(record.id, "Corrected", "Recent")
+        assert (await history_service.get(record.id)).text == "Corrected"
+        await history_service.delete(record.id)
+        assert await history_service.get(record.id) is None
+
+        stats = history_service.cache_stats()["record"]
+        assert (stats["hits"], stats["misses"]) == (2, 2)
+
+    async def test_bulk_writes_drop_caches(self, history_service: HistoryService):
+        """Bulk deletes and clear() drop the cached pages."""
+        for i in range(3):
+            await history_service.add(text=f"Record {i}", duration_ms=1, model_used="base")
+        await history_service.list(limit=10)
+
+        await history_service.delete_many(HistoryFilter(model_used="base"))
+        assert await history_service.list(limit=10) == ([], 0, None)
+
+        await history_service.add(text="After", duration_ms=1)
+        await history_service.clear()
+        assert await history_service.list(limit=10) == ([], 0, None)
+
+    async def test_stats_cached_until_write(self, history_service: HistoryService):
+        """get_stats() is cached until the next write."""
+        await history_service.add(text="First", duration_ms=1000)
+        first = await history_service.get_stats()
+        assert await history_service.get_stats() == first
+
+        await history_service.add(text="Second", duration_ms=2000)
+        stats = await history_service.get_stats()
+
+        assert stats["total_count"] == 2
+        assert stats["total_duration_ms"] == 3000
+        assert history_service.cache_stats()["stats"]["hits"] == 1
+
+
 class TestUninitializedService:
     """Tests for error handling when service is not initialized."""
 
@@ -426,3 +1774,19 @@ class TestTranscriptionRecord:
 
         assert result["model_used"] is None
         assert result["language"] is None
+
+    def test_to_dict_with_fields(self):
+        """to_dict(fields) returns only the requested keys."""
+        record = TranscriptionRecord(
+            id="test-uuid-789",
+            text="Some text",
+            duration_ms=1000,
+            model_used=None,
+            language="en",
+            created_at=datetime(2024, 6, 1, 12, 0, 0),
+        )
+
+        assert record.to_dict({"id", "created_at"}) == {
+            "id": "test-uuid-789",
+            "created_at": "2024-06-01T12:00:00",
+        }
@@ -0,0 +1,254 @@
+"""
+Tests for streaming history import.
+"""
+
+import gzip
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from speakeasy.services.export import ExportCompression, ExportFormat, export_service
+from speakeasy.services.history import HistoryService, record_from_import
+from speakeasy.services.importer import (
+    ImportFormatError,
+    import_stream,
+    iter_csv_rows,
+    iter_ndjson_lines,
+)
+
+
+@pytest.fixture
+async def history_service(tmp_path: Path):
+    """Provide an initialized HistoryService with automatic cleanup."""
+    service = HistoryService(tmp_path / "import_test.db")
+    await service.initialize()
+    yield service
+    await service.close()
+
+
+async def byte_chunks(data: bytes, size: int):
+    """Yield data in fixed-size chunks, like a request body stream."""
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def make_ndjson(count: int, start: int = 0) -> bytes:
+    """Build NDJSON for `count` exported records."""
+    lines = [
+        json.dumps(
+            {
+                "id": f"record-{i}",
+                "text": f"Imported text {i}",
+                "duration_ms": i,
+                "model_used": "test-model",
+                "language": "en",
+                "created_at": f"2024-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}+00:00",
+                "original_text": f"imported text {i}",
+            }
+        )
+        for i in range(start, start + count)
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+class TestNdjsonParsing:
+    """Tests for incremental line splitting."""
+
+    async def test_lines_split_across_chunks(self):
+        """Lines spanning chunk boundaries are reassembled."""
+        data = b'{"a": 1}\n\n{"b": 2}\r\n{"c": 3}'
+        lines = [line async for line in iter_ndjson_lines(byte_chunks(data, 3))]
+        assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+    async def test_line_too_long_raises(self):
+        """A line longer than the limit is rejected instead of buffered."""
+        with pytest.raises(ImportFormatError):
+            async for _ in iter_ndjson_lines(byte_chunks(b"x" * 100, 10), max_line_bytes=50):
+                pass
+
+
+class TestRecordFromImport:
+    """Tests for converting exported dictionaries into records."""
+
+    def test_preserves_exported_fields(self):
+        """id, created_at and original_text are kept."""
+        record = record_from_import(
+            {
+                "id": "abc",
+                "text": "fixed",
+                "original_text": "raw",
+                "created_at": "2024-03-01T12:00:00+00:00",
+            }
+        )
+        assert record.id == "abc"
+        assert record.original_text == "raw"
+        assert record.created_at == datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+    def test_missing_text_raises(self):
+        """Records without text are rejected."""
+        with pytest.raises(ValueError):
+            record_from_import({"id": "abc"})
+
+
+class TestStreamingImport:
+    """Tests for chunked streaming import into HistoryService."""
+
+    async def test_import_preserves_ids_and_timestamps(self, history_service):
+        """Imported rows keep their original metadata."""
+        progress = await import_stream(
+            history_service, byte_chunks(make_ndjson(3), 7), ExportFormat.NDJSON
+        )
+
+        assert progress.imported == 3
+        assert progress.status == "completed"
+        record = await history_service.get("record-2")
+        assert record.created_at == datetime(2024, 1, 1, 0, 0, 2, tzinfo=timezone.utc)
+        assert record.original_text == "imported text 2"
+
+    async def test_duplicate_ids_are_skipped(self, history_service):
+        """Re-importing the same records inserts nothing new."""
+        await import_stream(history_service, byte_chunks(make_ndjson(5), 64), ExportFormat.NDJSON)
+        progress = await import_stream(
+            history_service, byte_chunks(make_ndjson(8), 64), ExportFormat.NDJSON
+        )
+
+        assert progress.imported == 3
+        assert progress.skipped == 5
+        _, total, _ = await history_service.list()
+        assert total == 8
+
+    async def test_invalid_lines_are_skipped(self, history_service):
+        """Malformed JSON and objects without text are counted as skipped."""
+        data = b'{"exported_at": "2024-01-01"}\nnot json\n' + make_ndjson(2)
+
+        progress = await import_stream(
+            history_service, byte_chunks(data, 1024), ExportFormat.NDJSON
+        )
+
+        assert progress.processed == 4
+        assert progress.imported == 2
+        assert progress.skipped == 2
+
+    async def test_progress_reported_per_chunk(self, history_service):
+        """on_progress fires after each committed chunk and at completion."""
+        data = make_ndjson(25)
+        events = []
+
+        async def on_progress(progress):
+            events.append((progress.status, progress.imported))
+
+        progress = await import_stream(
+            history_service,
+            byte_chunks(data, 100),
+            ExportFormat.NDJSON,
+            total_bytes=len(data),
+            chunk_size=10,
+            on_progress=on_progress,
+        )
+
+        assert events == [("running", 10), ("running", 20), ("completed", 25)]
+        assert progress.bytes_read == len(data)
+        assert progress.progress_percent == 100.0
+
+    async def test_imported_rows_are_searchable(self, history_service):
+        """Imported rows are indexed for full-text search."""
+        await import_stream(history_service, byte_chunks(make_ndjson(3), 50), ExportFormat.NDJSON)
+
+        records, total, _ = await history_service.list(search="Imported")
+
+        assert total == 3
+
+
+class TestFormatImport:
+    """Tests for importing the other export formats."""
+
+    async def test_csv_rows_with_multiline_text(self):
+        """Quoted newlines and quotes survive chunk boundaries."""
+        data = (
+            b'\xef\xbb\xbf"id","text","duration_ms"\n"a","line one\nline ""two""",""\n"b","x","5"\n'
+        )
+
+        rows = [row async for row in iter_csv_rows(byte_chunks(data, 5))]
+
+        assert rows == [
+            {"id": "a", "text": 'line one\nline "two"', "duration_ms": None},
+            {"id": "b", "text": "x", "duration_ms": "5"},
+        ]
+
+    async def test_csv_without_text_column(self):
+        """CSV that is not a history export is rejected."""
+        with pytest.raises(ImportFormatError):
+            [row async for row in iter_csv_rows(byte_chunks(b"a,b\n1,2\n", 64))]
+
+    async def test_csv_export_round_trip(self, history_service):
+        """A CSV export re-imports with its ids, metadata and timestamps."""
+        await import_stream(history_service, byte_chunks(make_ndjson(3), 64), ExportFormat.NDJSON)
+        records, _, _ = await history_service.list()
+        content, _, _ = export_service.export(records, ExportFormat.CSV)
+
+        await history_service.clear()
+        progress = await import_stream(
+            history_service, byte_chunks(content.encode(), 16), ExportFormat.CSV
+        )
+
+        assert progress.imported == 3
+        record = await history_service.get("record-1")
+        assert record.model_used == "test-model"
+        assert record.created_at == datetime(2024, 1, 1, 0, 0, 1, tzinfo=timezone.utc)
+
+    async def test_gzip_ndjson(self, history_service):
+        """Compressed uploads are decompressed; bytes_read counts compressed bytes."""
+        data = gzip.compress(make_ndjson(4))
+
+        progress = await import_stream(
+            history_service,
+            byte_chunks(data, 10),
+            ExportFormat.NDJSON,
+            ExportCompression.GZIP,
+            total_bytes=len(data),
+        )
+
+        assert progress.imported == 4
+        assert progress.bytes_read == len(data)
+
+    async def test_truncated_gzip(self, history_service):
+        """A truncated compressed upload is a format error."""
+        data = gzip.compress(make_ndjson(4))[:-12]
+
+        with pytest.raises(ImportFormatError):
+            await import_stream(
+                history_service, byte_chunks(data, 64), compression=ExportCompression.GZIP
+            )
+
+    async def test_text_formats_are_not_importable(self, history_service):
+        """Formats without ids and metadata cannot be imported."""
+        with pytest.raises(ValueError):
+            await import_stream(history_service, byte_chunks(b"text", 4), ExportFormat.TXT)
+
+    @pytest.mark.parametrize("fmt", [ExportFormat.PARQUET, ExportFormat.ARROW])
+    async def test_columnar_round_trip(self, history_service, fmt):
+        """Parquet and Arrow exports re-import when pyarrow is installed."""
+        pytest.importorskip("pyarrow")
+        await import_stream(history_service, byte_chunks(make_ndjson(5), 64), ExportFormat.NDJSON)
+        content = b"".join(
+            [chunk async for chunk in export_service.stream(history_service.iter_records(), fmt)]
+        )
+
+        await history_service.clear()
+        progress = await import_stream(history_service, byte_chunks(content, 100), fmt)
+
+        assert progress.imported == 5
+        record = await history_service.get("record-4")
+        assert record.original_text == "imported text 4"
+        assert record.created_at == datetime(2024, 1, 1, 0, 0, 4, tzinfo=timezone.utc)
+
+    async def test_invalid_parquet(self, history_service):
+        """Data that is not Parquet is a format error."""
+        pytest.importorskip("pyarrow")
+
+        with pytest.raises(ImportFormatError):
+            await import_stream(
+                history_service, byte_chunks(b"not parquet", 4), ExportFormat.PARQUET
+            )
@@ -0,0 +1,150 @@
+"""
+Tests for background history maintenance.
+"""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from speakeasy.services import maintenance as maintenance_module
+from speakeasy.services.history import HistoryService, TranscriptionRecord
+from speakeasy.services.maintenance import MaintenanceScheduler, RetentionPolicy
+from speakeasy.services.settings import AppSettings
+
+
+@pytest.fixture
+async def history_service(tmp_path: Path):
+    """Provide an initialized HistoryService with 20 records, one per day."""
+    service = HistoryService(tmp_path / "maintenance_test.db")
+    await service.initialize()
+    now = datetime.now(timezone.utc)
+    await service.import_records(
+        [
+            TranscriptionRecord(
+                id=f"day-{age:02d}",
+                text=f"maintenance record {age} " * 40,
+                duration_ms=100,
+                model_used=None,
+                language=None,
+                created_at=now - timedelta(days=age, hours=1),
+            )
+            for age in range(20)
+        ]
+    )
+    yield service
+    await service.close()
+
+
+class TestRetentionPolicy:
+    """Tests for building the policy from settings."""
+
+    def test_from_settings(self):
+        """Sizes are configured in MB and enforced in bytes."""
+        settings = AppSettings(history_max_age_days=30, history_max_size_mb=2)
+
+        policy = RetentionPolicy.from_settings(settings)
+
+        assert policy == RetentionPolicy(max_age_days=30, max_records=0, max_bytes=2 * 1024**2)
+
+
+class TestMaintenanceRun:
+    """Tests for one maintenance pass."""
+
+    async def test_run_applies_retention_and_reports(self, history_service: HistoryService):
+        """A run deletes expired records and reports steps and sizes."""
+        settings = AppSettings(history_max_age_days=5)
+        scheduler = MaintenanceScheduler(history_service, lambda: settings)
+
+        report = await scheduler.run()
+
+        assert report.error is None
+        assert report.trigger == "manual"
+        assert report.deleted_records == 15
+        assert set(report.steps_ms) == {"retention", "compress", "archive", "optimize", "compact"}
+        assert report.size_before_bytes > report.size_after_bytes
+        assert report.freed_bytes == report.size_before_bytes - report.size_after_bytes
+        assert scheduler.last_report is report
+        assert await history_service.count() == 5
+
+    async def test_run_archives_old_records(self, history_service: HistoryService):
+        """Records past the archive threshold move to archive files after retention."""
+        settings = AppSettings(history_max_age_days=15, history_archive_after_days=5)
+        scheduler = MaintenanceScheduler(history_service, lambda: settings)
+
+        report = await scheduler.run()
+
+        assert report.deleted_records == 5
+        assert report.archived_records == 10
+        assert report.to_dict()["archived_records"] == 10
+        assert await history_service.count() == 5
+        assert await history_service.count_archived() == 10
+
+    async def test_run_compresses_text(self, history_service: HistoryService):
+        """Once compression is enabled, a run compresses the text of existing records."""
+        pytest.importorskip("zstandard")
+        await history_service.close()
+        service = HistoryService(history_service.db_path, compress_text=True)
+        await service.initialize()
+        try:
+            report = await MaintenanceScheduler(service, AppSettings).run()
+        finally:
+            await service.close()
+
+        assert report.error is None
+        assert report.compressed_records == 20
+        assert report.to_dict()["compressed_records"] == 20
+
+    async def test_run_without_limits_keeps_records(self, history_service: HistoryService):
+        """With the default settings maintenance only compacts."""
+        scheduler = MaintenanceScheduler(history_service, AppSettings)
+
+        report = await scheduler.run()
+
+        assert report.deleted_records == 0
+        assert await history_service.count() == 20
+
+    async def test_failed_step_is_reported(self, history_service: HistoryService, monkeypatch):
+        """An error ends the run and is recorded instead of raised."""
+
+        async def fail(**kwargs):
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(history_service, "apply_retention", fail)
+        scheduler = MaintenanceScheduler(history_service, AppSettings)
+
+        report = await scheduler.run()
+
+        assert report.error == "disk full"
+        assert "optimize" not in report.steps_ms
+        assert report.to_dict()["error"] == "disk full"
+
+
+class TestMaintenanceScheduler:
+    """Tests for idle detection and the background schedule."""
+
+    async def test_idle_requires_quiet_history(self, history_service: HistoryService, monkeypatch):
+        """Recent writes or a busy app postpone scheduled runs."""
+        busy = False
+        scheduler = MaintenanceScheduler(history_service, AppSettings, is_busy=lambda: busy)
+
+        assert scheduler.is_idle() is False  # The fixture just wrote
+
+        monkeypatch.setattr(maintenance_module, "IDLE_WRITE_GAP_S", 0.0)
+        assert scheduler.is_idle() is True
+        busy = True
+        assert scheduler.is_idle() is False
+
+    async def test_start_and_stop(self, history_service: HistoryService):
+        """The schedule reports its next run and stops cleanly."""
+        scheduler = MaintenanceScheduler(history_service, AppSettings)
+
+        scheduler.start()
+        await maintenance_module.asyncio.sleep(0)
+        status = scheduler.status()
+        await scheduler.stop()
+
+        assert status["next_run_at"] is not None
+        assert status["interval_minutes"] == 60
+        assert status["last_report"] is None
+        assert scheduler.status()["next_run_at"] is None
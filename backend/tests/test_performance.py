@@ -179,3 +179,296 @@ class TestConcurrencyPerformance:
         _, total = await history_service.list(limit=20)
         assert total == 10
         assert elapsed_ms < 500, f"Concurrent adds took {elapsed_ms:.2f}ms, expected < 500ms"
+
+
+class TestTextCleanupPerformance:
+    """Performance benchmarks for filler word removal."""
+
+    @staticmethod
+    def _make_transcript(words: int) -> str:
+        """Build a long transcript sprinkled with fillers and punctuation."""
+        vocab = ["the", "project", "um", "meeting", "like", "deadline", "you", "know", "so"]
+        endings = ["", "", "", ",", "."]
+        return " ".join(vocab[i % len(vocab)] + endings[i % len(endings)] for i in range(words))
+
+    def test_cleanup_with_1000_custom_fillers(self):
+        """Cleanup of a 100k-word transcript with 1000 custom fillers completes in under 2s."""
+        from speakeasy.core.text_cleanup import TextCleanupProcessor
+
+        custom_fillers = [f"filler{i}" for i in range(999)] + ["you know"]
+        processor = TextCleanupProcessor(custom_fillers=custom_fillers)
+        text = self._make_transcript(100_000)
+
+        start = time.perf_counter()
+        result = processor.cleanup(text)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert result.startswith("The project meeting, deadline")
+        assert " um " not in result and " like " not in result
+        assert "you know" not in result
+        assert elapsed_ms < 2000, f"Cleanup took {elapsed_ms:.2f}ms, expected < 2000ms"
+
+    def test_cached_processor_lookup_performance(self):
+        """get_cleanup_processor() cache hits complete in under 0.1ms."""
+        from speakeasy.core.text_cleanup import clear_cleanup_processors, get_cleanup_processor
+
+        custom_fillers = [f"filler{i}" for i in range(1000)]
+        clear_cleanup_processors()
+        get_cleanup_processor(custom_fillers)
+
+        iterations = 1000
+        start = time.perf_counter()
+        for _ in range(iterations):
+            get_cleanup_processor(custom_fillers)
+        per_call_ms = (time.perf_counter() - start) * 1000 / iterations
+
+        clear_cleanup_processors()
+        assert per_call_ms < 0.1, f"Lookup took {per_call_ms:.4f}ms avg, expected < 0.1ms"
+
+
+class TestHistoryConcurrencyPerformance:
+    """List/search latency while a writer keeps inserting (e.g. a batch job)."""
+
+    @pytest.fixture
+    async def history_service(self, tmp_path):
+        """Provide an initialized HistoryService with 1000 records."""
+        from speakeasy.services.history import HistoryService
+
+        service = HistoryService(tmp_path / "concurrent_rw.db")
+        await service.initialize()
+        for i in range(1000):
+            await service.add(
+                text=f"Seed transcription {i} about the quarterly budget meeting",
+                duration_ms=1000,
+                model_used="test-model",
+                language="en",
+            )
+        yield service
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_list_and_search_latency_under_write_load(self, history_service):
+        """p95 list/search latency stays under 50ms while rows are being inserted."""
+        stop = asyncio.Event()
+        written = 0
+
+        async def writer():
+            nonlocal written
+            while not stop.is_set():
+                await history_service.add(
+                    text=f"Batch transcription {written} about the budget",
+                    duration_ms=500,
+                    model_used="test-model",
+                    language="en",
+                )
+                written += 1
+
+        async def timed(coro) -> float:
+            start = time.perf_counter()
+            await coro
+            return (time.perf_counter() - start) * 1000
+
+        writer_task = asyncio.create_task(writer())
+        try:
+            list_ms = []
+            search_ms = []
+            for _ in range(50):
+                list_ms.append(await timed(history_service.list(limit=50)))
+                search_ms.append(await timed(history_service.list(limit=50, search="budget")))
+        finally:
+            stop.set()
+            await writer_task
+
+        list_p95 = sorted(list_ms)[int(len(list_ms) * 0.95)]
+        search_p95 = sorted(search_ms)[int(len(search_ms) * 0.95)]
+
+        assert written > 0
+        assert list_p95 < 50, f"List p95 {list_p95:.2f}ms under write load, expected < 50ms"
+        assert search_p95 < 50, f"Search p95 {search_p95:.2f}ms under write load, expected < 50ms"
+
+
+class TestHistoryWriteBehindPerformance:
+    """Throughput of deferred (write-behind) history inserts."""
+
+    @pytest.mark.asyncio
+    async def test_write_behind_10k_rows_throughput(self, tmp_path):
+        """10k deferred inserts commit at more than 5000 rows/s."""
+        from speakeasy.services.history import HistoryService
+
+        service = HistoryService(tmp_path / "write_behind.db")
+        await service.initialize()
+        try:
+            rows = 10_000
+            start = time.perf_counter()
+            for i in range(rows):
+                await service.add(
+                    text=f"Imported transcription number {i}",
+                    duration_ms=1000,
+                    model_used="test-model",
+                    language="en",
+                    deferred=True,
+                )
+            await service.flush()
+            elapsed = time.perf_counter() - start
+
+            _, total, _ = await service.list(limit=1)
+            rows_per_second = rows / elapsed
+            assert total == rows
+            assert rows_per_second > 5000, f"{rows_per_second:.0f} rows/s, expected > 5000"
+        finally:
+            await service.close()
+
+
+class TestHistoryPagePerformance:
+    """Page latency on a large history, where COUNT(*) used to dominate."""
+
+    @pytest.fixture
+    async def large_history(self, tmp_path):
+        """Provide a HistoryService with 50k imported records."""
+        from speakeasy.services.history import HistoryService, TranscriptionRecord
+
+        service = HistoryService(tmp_path / "large.db")
+        await service.initialize()
+        base = datetime(2024, 1, 1)
+        for start in range(0, 50_000, 5000):
+            await service.import_records(
+                [
+                    TranscriptionRecord(
+                        id=f"rec-{i:06d}",
+                        text=f"Large history record {i} about project planning",
+                        duration_ms=1000,
+                        model_used="test-model",
+                        language="en",
+                        created_at=base.replace(second=i % 60, minute=i // 60 % 60),
+                    )
+                    for i in range(start, start + 5000)
+                ]
+            )
+        yield service
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_page_with_total_on_50k_rows(self, large_history):
+        """A 50-row page including the total completes in under 10ms."""
+        await large_history.list(limit=50)
+
+        start = time.perf_counter()
+        records, total, _ = await large_history.list(limit=50)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert total == 50_000
+        assert len(records) == 50
+        assert elapsed_ms < 10, f"Page took {elapsed_ms:.2f}ms, expected < 10ms"
+
+    @pytest.mark.asyncio
+    async def test_cached_search_total_on_50k_rows(self, large_history):
+        """Repeated search pages reuse the cached match count."""
+        _, first_total, cursor = await large_history.list(limit=50, search="planning")
+
+        start = time.perf_counter()
+        _, total, _ = await large_history.list(limit=50, search="planning", cursor=cursor)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert total == first_total == 50_000
+        assert ("transcriptions_fts", '"planning"') in large_history._search_totals
+        assert elapsed_ms < 100, f"Search page took {elapsed_ms:.2f}ms, expected < 100ms"
+
+    @pytest.mark.asyncio
+    async def test_stats_on_50k_rows(self, large_history):
+        """get_stats() reads the daily rollup and completes in under 10ms."""
+        start = time.perf_counter()
+        stats = await large_history.get_stats()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert stats["total_count"] == 50_000
+        assert elapsed_ms < 10, f"Stats took {elapsed_ms:.2f}ms, expected < 10ms"
+
+    @pytest.mark.asyncio
+    async def test_range_query_on_50k_rows(self, large_history):
+        """A date-range query is an index range scan, not a scan plus filter."""
+        window = {"start": datetime(2024, 1, 1, 0, 10), "end": datetime(2024, 1, 1, 0, 10, 59)}
+        await large_history.list(limit=10_000, **window)
+
+        start = time.perf_counter()
+        records, total, _ = await large_history.list(limit=10_000, **window)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert total == len(records) == 840
+        assert elapsed_ms < 20, f"Range query took {elapsed_ms:.2f}ms, expected < 20ms"
+
+    @pytest.mark.asyncio
+    async def test_deep_cursor_page_on_50k_rows(self, large_history):
+        """A keyset page near the oldest rows is a range scan, not a sort of every older row."""
+        from speakeasy.services.history import encode_cursor
+
+        cursor = encode_cursor(datetime(2024, 1, 1, 0, 59, 0), "rec-000000")
+        await large_history.list(limit=50, cursor=cursor, include_total=False)
+
+        start = time.perf_counter()
+        records, _, _ = await large_history.list(limit=50, cursor=cursor, include_total=False)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert len(records) == 50
+        assert elapsed_ms < 10, f"Cursor page took {elapsed_ms:.2f}ms, expected < 10ms"
+
+
+class TestBackupPerformance:
+    """Online backup throughput and how long it stalls concurrent history writes."""
+
+    @pytest.mark.asyncio
+    async def test_backup_under_write_load(self, tmp_path):
+        """A backup copies > 20 MB/s while single-row inserts never stall > 100ms."""
+        from datetime import timedelta, timezone
+
+        from speakeasy.services.backup import BackupService
+        from speakeasy.services.history import HistoryService, TranscriptionRecord
+
+        service = HistoryService(tmp_path / "speakeasy.db")
+        await service.initialize()
+        now = datetime.now(timezone.utc)
+        await service.import_records(
+            [
+                TranscriptionRecord(
+                    id=f"rec-{i:05d}",
+                    text=f"Transcription {i} about the quarterly budget and hiring plan " * 20,
+                    duration_ms=1000,
+                    model_used="test-model",
+                    language="en",
+                    created_at=now - timedelta(seconds=i),
+                )
+                for i in range(10_000)
+            ]
+        )
+        backups = BackupService(tmp_path / "backups", service.db_path, tmp_path / "batch.db")
+
+        stop = asyncio.Event()
+        write_ms = []
+
+        async def writer():
+            while not stop.is_set():
+                start = time.perf_counter()
+                await service.add(
+                    text=f"Written during the backup {len(write_ms)}",
+                    duration_ms=500,
+                    model_used="test-model",
+                    language="en",
+                )
+                write_ms.append((time.perf_counter() - start) * 1000)
+
+        writer_task = asyncio.create_task(writer())
+        try:
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            backup = await backups.create(pause_writes=service.writes_paused)
+            elapsed = time.perf_counter() - start
+        finally:
+            stop.set()
+            await writer_task
+            await service.close()
+
+        megabytes = sum(database["size_bytes"] for database in backup.databases) / 1024**2
+        mb_per_second = megabytes / elapsed
+        max_stall_ms = max(write_ms)
+        assert len(write_ms) > 10
+        assert mb_per_second > 20, f"Backup ran at {mb_per_second:.0f} MB/s, expected > 20"
+        assert max_stall_ms < 100, f"Insert stalled {max_stall_ms:.1f}ms, expected < 100ms"
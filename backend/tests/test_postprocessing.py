@@ -0,0 +1,195 @@
+"""
+Tests for the post-processing pipeline and the metrics registry.
+"""
+
+import threading
+
+import pytest
+
+from speakeasy.core.postprocessing import (
+    FormattingStage,
+    PostProcessingPipeline,
+    PostProcessingStage,
+    ReplacementDictionary,
+    build_pipeline,
+    get_replacement_dictionary,
+)
+from speakeasy.utils.metrics import MetricsRegistry
+
+
+class UpperStage(PostProcessingStage):
+    """Test stage that upper-cases text."""
+
+    name = "upper"
+
+    def process(self, text, language=None):
+        return text.upper()
+
+
+class ThreadRecordingStage(PostProcessingStage):
+    """Test stage that records the thread it ran on."""
+
+    name = "offloaded"
+    offload = True
+
+    def __init__(self):
+        self.thread_id = None
+
+    def process(self, text, language=None):
+        self.thread_id = threading.get_ident()
+        return text + "!"
+
+
+class TestReplacementDictionary:
+    """Tests for compiled word replacements."""
+
+    def test_whole_word_replacement(self):
+        """Only whole words are replaced."""
+        dictionary = ReplacementDictionary({"gonna": "going to"})
+        assert dictionary.apply("I'm gonna go, not gonnabe") == "I'm going to go, not gonnabe"
+
+    def test_case_insensitive_with_capitalization(self):
+        """Matches ignore case and keep a leading capital."""
+        dictionary = ReplacementDictionary({"speak easy": "SpeakEasy", "wanna": "want to"})
+        assert dictionary.apply("Wanna try speak easy?") == "Want to try SpeakEasy?"
+
+    def test_longest_phrase_wins(self):
+        """Longer phrases take precedence over their prefixes."""
+        dictionary = ReplacementDictionary({"new": "old", "new york": "NYC"})
+        assert dictionary.apply("new york is new") == "NYC is old"
+
+    def test_empty_dictionary_is_noop(self):
+        """An empty dictionary returns the text unchanged."""
+        dictionary = ReplacementDictionary({"  ": "x"})
+        assert len(dictionary) == 0
+        assert dictionary.apply("hello") == "hello"
+
+    def test_compiled_dictionary_is_cached(self):
+        """Identical dictionaries reuse one compiled instance."""
+        first = get_replacement_dictionary({"a": "b", "c": "d"})
+        second = get_replacement_dictionary({"c": "d", "a": "b"})
+        assert first is second
+
+
+class TestPostProcessingPipeline:
+    """Tests for stage execution and timing."""
+
+    @pytest.fixture
+    def registry(self) -> MetricsRegistry:
+        """Provide an isolated metrics registry."""
+        return MetricsRegistry()
+
+    async def test_stages_run_in_order(self, registry):
+        """Stages run in order and each one is timed."""
+        pipeline = PostProcessingPipeline([UpperStage(), FormattingStage()], registry=registry)
+
+        result = await pipeline.run("  hello   world ")
+
+        assert result.text == "HELLO WORLD"
+        assert list(result.timings_ms) == ["upper", "formatting"]
+        assert result.total_ms >= 0
+
+    async def test_offloaded_stage_runs_off_event_loop(self, registry):
+        """Offloaded stages run in a worker thread."""
+        stage = ThreadRecordingStage()
+        pipeline = PostProcessingPipeline([stage], registry=registry)
+
+        result = await pipeline.run("done")
+
+        assert result.text == "done!"
+        assert stage.thread_id != threading.get_ident()
+
+    async def test_timings_recorded_in_registry(self, registry):
+        """Stage and total timings land in the metrics registry."""
+        pipeline = PostProcessingPipeline([UpperStage()], registry=registry)
+
+        await pipeline.run("a")
+        await pipeline.run("b")
+
+        snapshot = registry.snapshot(prefix="postprocess")
+        assert snapshot["timings"]["postprocess.upper"]["count"] == 2
+        assert snapshot["timings"]["postprocess.total"]["count"] == 2
+
+    def test_run_sync_matches_async(self, registry):
+        """run_sync() applies the same stages on the calling thread."""
+        pipeline = PostProcessingPipeline([UpperStage()], registry=registry)
+        assert pipeline.run_sync("abc").text == "ABC"
+
+    async def test_build_pipeline_standard_stages(self):
+        """The standard pipeline cleans fillers and applies replacements."""
+        pipeline = build_pipeline(custom_fillers=["dude"], replacements={"gonna": "going to"})
+
+        result = await pipeline.run("um dude I'm gonna go")
+
+        assert pipeline.stage_names == ["cleanup", "replacements", "formatting"]
+        assert result.text == "I'm going to go"
+
+    async def test_paragraph_breaks_kept(self):
+        """Formatting trims each line but keeps line and paragraph breaks."""
+        pipeline = build_pipeline()
+
+        result = await pipeline.run("Hello  there. \n\n\tNew paragraph here.\nLast line.")
+
+        assert result.text == "Hello there.\n\nNew paragraph here.\nLast line."
+
+    def test_stage_must_implement_process(self):
+        """A stage without process() cannot be created."""
+
+        class IncompleteStage(PostProcessingStage):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            IncompleteStage()
+
+    async def test_build_pipeline_disabled_is_passthrough(self):
+        """With every feature disabled the text is returned untouched."""
+        pipeline = build_pipeline(enable_cleanup=False)
+
+        result = await pipeline.run("um  raw text ")
+
+        assert pipeline.stage_names == []
+        assert result.text == "um  raw text "
+
+
+class TestMetricsRegistry:
+    """Tests for the metrics registry."""
+
+    def test_timing_stats(self):
+        """Timings aggregate count, min, max and average."""
+        registry = MetricsRegistry()
+        for value in (1.0, 2.0, 3.0):
+            registry.record_timing("op", value)
+
+        stats = registry.get_timing("op")
+        assert stats["count"] == 3
+        assert stats["min_ms"] == 1.0
+        assert stats["max_ms"] == 3.0
+        assert stats["avg_ms"] == 2.0
+        assert stats["last_ms"] == 3.0
+
+    def test_counters_and_gauges(self):
+        """Counters accumulate and gauges keep the latest value."""
+        registry = MetricsRegistry()
+        registry.increment("rows", 5)
+        registry.increment("rows")
+        registry.set_gauge("queue_depth", 3)
+        registry.set_gauge("queue_depth", 1)
+
+        snapshot = registry.snapshot()
+        assert snapshot["counters"] == {"rows": 6}
+        assert snapshot["gauges"] == {"queue_depth": 1}
+
+    def test_timer_context_manager(self):
+        """timer() records the duration of its block."""
+        registry = MetricsRegistry()
+        with registry.timer("block"):
+            pass
+        assert registry.get_timing("block")["count"] == 1
+        assert registry.get_timing("missing") is None
+
+    def test_reset(self):
+        """reset() drops all metrics."""
+        registry = MetricsRegistry()
+        registry.increment("x")
+        registry.reset()
+        assert registry.snapshot() == {"timings": {}, "counters": {}, "gauges": {}}
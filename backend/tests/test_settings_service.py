@@ -242,6 +242,34 @@ class TestAppSettingsDefaults:
         assert settings.show_recording_indicator is True
         assert settings.server_port == 8765
 
+    def test_retention_defaults_to_unlimited(self):
+        """History retention, archiving and compression are off; maintenance runs hourly."""
+        settings = AppSettings()
+
+        assert settings.history_max_age_days == 0
+        assert settings.history_max_records == 0
+        assert settings.history_max_size_mb == 0
+        assert settings.history_maintenance_interval_minutes == 60
+        assert settings.history_archive_after_days == 0
+        assert settings.history_compress_text is False
+
+    def test_backup_keep(self):
+        """Five backups are kept by default, and at least one."""
+        assert AppSettings().backup_keep == 5
+        with pytest.raises(ValueError):
+            AppSettings(backup_keep=0)
+
+    def test_batch_cpu_workers(self):
+        """Batch jobs use the loaded model by default; the worker count cannot be negative."""
+        assert AppSettings().batch_cpu_workers == 0
+        with pytest.raises(ValueError):
+            AppSettings(batch_cpu_workers=-1)
+
+    def test_retention_rejects_negative_limits(self):
+        """Retention limits cannot be negative."""
+        with pytest.raises(ValueError):
+            AppSettings(history_max_records=-1)
+
 
 class TestCorruptedFile:
     """Tests for handling corrupted settings files."""
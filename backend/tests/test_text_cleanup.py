@@ -6,7 +6,11 @@ and edge cases for the text cleanup functionality.
 """
 
 import pytest
-from speakeasy.core.text_cleanup import TextCleanupProcessor
+from speakeasy.core.text_cleanup import (
+    TextCleanupProcessor,
+    clear_cleanup_processors,
+    get_cleanup_processor,
+)
 
 
 class TestTextCleanupProcessor:
@@ -514,3 +518,47 @@ class TestTextCleanupProcessor:
         assert "test" in result
         assert "works" in result
         assert "great" in result
+
+
+class TestCleanupProcessorRegistry:
+    """Tests for cached processors and per-language filler lists."""
+
+    @pytest.fixture(autouse=True)
+    def clear_registry(self):
+        """Start and end each test with an empty processor cache."""
+        clear_cleanup_processors()
+        yield
+        clear_cleanup_processors()
+
+    def test_same_fillers_return_cached_processor(self):
+        """Identical filler sets share one compiled processor."""
+        first = get_cleanup_processor(["dude", "bro"])
+        second = get_cleanup_processor(["bro", "dude"])
+        assert first is second
+
+    def test_different_fillers_return_new_processor(self):
+        """Different filler sets compile separate processors."""
+        assert get_cleanup_processor(["dude"]) is not get_cleanup_processor(["bro"])
+
+    def test_unknown_language_uses_default_fillers(self):
+        """Languages without their own list share the English processor."""
+        assert get_cleanup_processor(language="en") is get_cleanup_processor(language="ja")
+        assert get_cleanup_processor(language="auto").cleanup("um hello") == "Hello"
+
+    def test_language_specific_fillers(self):
+        """Language lists replace the English defaults."""
+        processor = get_cleanup_processor(language="de-DE")
+        assert processor.cleanup("ähm das ist halt gut") == "Das ist gut"
+        assert processor.cleanup("so well") == "So well"
+
+    def test_custom_fillers_with_language(self):
+        """Custom fillers are added on top of the language list."""
+        processor = get_cleanup_processor(["genau"], language="de")
+        assert processor.cleanup("äh genau, das stimmt") == "Das stimmt"
+
+    def test_many_custom_fillers(self):
+        """Large filler lists match multi-word and longest fillers."""
+        fillers = [f"filler{i}" for i in range(1000)] + ["you know what"]
+        processor = get_cleanup_processor(fillers)
+        text = "filler999 this is you know what a filler12 test"
+        assert processor.cleanup(text) == "This is a test"
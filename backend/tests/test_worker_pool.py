@@ -0,0 +1,232 @@
+"""
+Tests for the multi-process CPU worker pool.
+
+Tests cover:
+- Files transcribed on worker processes, with per-file errors
+- Idle workers taking the next file while another is busy (work stealing)
+- Admission bounded by the estimated decoded audio
+- Replacing a worker process that dies
+- Chunk progress and resuming long files
+- Batch jobs run on a pool
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from speakeasy.services.batch import BatchFileStatus, BatchJobStatus, BatchService
+from speakeasy.services.worker_pool import CpuWorkerPool, threads_per_worker
+
+
+class FakeModel:
+    """Decodes a file to samples holding its number; slow, broken and crash files misbehave."""
+
+    def __init__(self, cpu_threads: int):
+        self.cpu_threads = cpu_threads
+
+    def load_audio_file(self, path: str) -> np.ndarray:
+        name = Path(path).stem
+        if name.startswith("crash"):
+            os._exit(3)
+        if name.startswith("broken"):
+            raise ValueError(f"Cannot decode {path}")
+        return np.full(100, int(name.split("_")[-1]), dtype=np.float32)
+
+    def transcribe(
+        self, audio_data: np.ndarray, language=None, progress_callback=None, completed_chunks=None
+    ):
+        if audio_data[0] == 50:  # A long file of three chunks
+            texts = list(completed_chunks)
+            for i in range(len(texts), 3):
+                texts.append(f"part {i}")
+                progress_callback(i + 1, 3, texts[-1])
+            return SimpleNamespace(
+                text=" ".join(texts), duration_ms=1, model_used="", language=language
+            )
+        time.sleep(0.5 if audio_data[0] >= 100 else 0.01)
+        return SimpleNamespace(
+            text=f"clip {int(audio_data[0])}",
+            duration_ms=1,
+            model_used=f"pid-{os.getpid()}",
+            language=language,
+        )
+
+
+@dataclass
+class FakeReplica:
+    """Loads a FakeModel in a worker process, or fails to."""
+
+    fail: bool = False
+
+    def __call__(self, cpu_threads: int) -> FakeModel:
+        if self.fail:
+            raise RuntimeError("model file missing")
+        return FakeModel(cpu_threads)
+
+
+@pytest.fixture
+async def pool():
+    """Provide a started pool of two workers with automatic cleanup."""
+    pool = CpuWorkerPool(FakeReplica(), workers=2, estimate_fn=lambda path: 100)
+    await pool.start()
+    yield pool
+    await pool.close()
+
+
+def _paths(tmp_path: Path, *names: str) -> list[str]:
+    """Create empty audio files with the given names."""
+    paths = []
+    for name in names:
+        path = tmp_path / f"{name}.wav"
+        path.touch()
+        paths.append(str(path))
+    return paths
+
+
+class TestCpuWorkerPool:
+    """Tests for CpuWorkerPool."""
+
+    async def test_files_transcribed(self, pool, tmp_path):
+        """Each file's result or error comes back with decode and inference times."""
+        paths = _paths(tmp_path, "clip_1", "broken_2", "clip_3")
+
+        futures = [await pool.submit(path, "en") for path in paths]
+        outcomes = await asyncio.gather(*futures)
+
+        assert [o[0].text if o[0] else None for o in outcomes] == ["clip 1", None, "clip 3"]
+        assert outcomes[0][0].language == "en"
+        assert "Cannot decode" in outcomes[1][1]
+        assert set(outcomes[0][2]) == {"decode_s", "inference_s"}
+        assert pool.reserved_bytes == 0
+
+    async def test_idle_worker_takes_next_files(self, pool, tmp_path):
+        """Files queued behind a slow one are taken by the other worker."""
+        paths = _paths(tmp_path, "slow_100", *(f"clip_{i}" for i in range(6)))
+
+        futures = [await pool.submit(path) for path in paths]
+        outcomes = await asyncio.gather(*futures)
+
+        slow_worker = outcomes[0][0].model_used
+        assert all(o[0].model_used != slow_worker for o in outcomes[1:])
+
+    async def test_admission_bounded_by_memory(self, tmp_path):
+        """A file that does not fit the memory budget waits for an earlier one to finish."""
+        pool = CpuWorkerPool(
+            FakeReplica(), workers=2, memory_budget=250, estimate_fn=lambda path: 100
+        )
+        await pool.start()
+        try:
+            paths = _paths(tmp_path, "slow_100", "slow_101", "clip_1")
+            first = [await pool.submit(path) for path in paths[:2]]
+            assert pool.reserved_bytes == 200
+
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(pool.submit(paths[2]), 0.1)
+            third = await pool.submit(paths[2])
+
+            assert any(future.done() for future in first)
+            assert (await third)[0].text == "clip 1"
+        finally:
+            await pool.close()
+
+    async def test_crashed_worker_replaced(self, pool, tmp_path):
+        """A worker that dies fails its file and is replaced."""
+        paths = _paths(tmp_path, "crash_1", "clip_2")
+
+        result, error, _ = await (await pool.submit(paths[0]))
+        assert result is None
+        assert "exited" in error
+
+        result, error, _ = await (await pool.submit(paths[1]))
+        assert result.text == "clip 2"
+        assert pool.restarts == 1
+
+    async def test_chunks_reported_and_resumed(self, pool, tmp_path):
+        """A long file continues after its completed chunks and reports the others."""
+        chunks = []
+        [path] = _paths(tmp_path, "long_50")
+
+        future = await pool.submit(
+            path, completed_chunks=["part 0"], on_chunk=lambda *chunk: chunks.append(chunk)
+        )
+        result, error, _ = await future
+
+        assert result.text == "part 0 part 1 part 2"
+        assert chunks == [(2, 3, "part 1"), (3, 3, "part 2")]
+
+    async def test_no_replica_loaded(self):
+        """start() fails when no worker can load its model."""
+        pool = CpuWorkerPool(FakeReplica(fail=True), workers=1)
+
+        with pytest.raises(RuntimeError, match="model file missing"):
+            await pool.start()
+        assert not pool.started
+
+    def test_threads_split_across_workers(self):
+        """Each replica gets an equal share of the cores, at least one."""
+        assert threads_per_worker(4, cores=16) == 4
+        assert threads_per_worker(3, cores=16) == 5
+        assert threads_per_worker(8, cores=2) == 1
+
+
+class TestBatchJobOnPool:
+    """Tests for BatchService.process_job() with a worker pool."""
+
+    async def test_job_processed_on_pool(self, pool, tmp_path):
+        """Every file's result and status comes back into the job."""
+        service = BatchService(tmp_path / "batch.db")
+        await service.initialize()
+        events = []
+
+        async def broadcast(event: str, data: dict) -> None:
+            events.append(data)
+
+        class History:
+            async def add(self, **kwargs):
+                return SimpleNamespace(id=f"record-{kwargs['text']}")
+
+        try:
+            paths = _paths(tmp_path, *(f"clip_{i}" for i in range(5)), "broken_5")
+            job = await service.create_job(paths)
+            await service.process_job(job.id, None, History(), broadcast, worker_pool=pool)
+
+            job = await service.get_job(job.id)
+            assert job.status == BatchJobStatus.COMPLETED
+            statuses = [f.status for f in job.files]
+            assert statuses == [BatchFileStatus.COMPLETED] * 5 + [BatchFileStatus.FAILED]
+            assert [f.transcription_id for f in job.files[:5]] == [
+                f"record-clip {i}" for i in range(5)
+            ]
+            assert events[-1]["completed"] == 5
+            assert events[-1]["failed"] == 1
+            assert events[-1]["utilization"]["inference"] > 0
+        finally:
+            await service.close()
+
+    async def test_pool_failure_fails_job(self, tmp_path):
+        """A pool that cannot start fails the job and leaves its files pending."""
+        service = BatchService(tmp_path / "batch.db")
+        await service.initialize()
+        pool = CpuWorkerPool(FakeReplica(fail=True), workers=1)
+        events = []
+
+        async def broadcast(event: str, data: dict) -> None:
+            events.append(data)
+
+        try:
+            job = await service.create_job(_paths(tmp_path, "clip_1", "clip_2"))
+            await service.process_job(job.id, None, None, broadcast, worker_pool=pool)
+
+            job = await service.get_job(job.id)
+            assert job.status == BatchJobStatus.FAILED
+            assert all(f.status == BatchFileStatus.PENDING for f in job.files)
+            assert events[-1]["status"] == "failed"
+            assert "model file missing" in events[-1]["error"]
+        finally:
+            await service.close()